@@ -12,6 +12,7 @@ if project_root not in sys.path:
 
 # --- 核心组件导入 ---
 from src.database.database_manager import DatabaseManager
+from src.database.query_profiler import PROFILER
 from src.engine.scheduler import Scheduler  # 导入新的调度器
 from src.algorithms.base_algorithm import BaseAlgorithm
 from src.algorithms import AVAILABLE_ALGORITHMS
@@ -57,6 +58,9 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        PROFILER.print_summary()
+        if os.getenv('DB_PROFILE_FILE'):
+            PROFILER.save(os.getenv('DB_PROFILE_FILE'))
         if db_manager and db_manager.is_connected():
             db_manager.disconnect()
 
@@ -5,6 +5,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 from src.utils.helpers import get_db_manager, authenticated_page, get_algorithm_display_names
 from src.ui.style_utils import load_global_styles
+from src.algorithms.advanced_algorithms.similarity_index import DrawSimilarityIndex
+from src.engine.performance_aggregates import PerformanceAggregateStore
 
 
 # --- 数据获取函数 (扩展以支持多期数据) ---
@@ -32,12 +34,42 @@ def get_number_statistics(db_manager, number_type='front'):
 
 
 def get_algorithm_performance(db_manager):
+    """
+    由滚动性能汇总表换算出每个算法的长期命中率、稳定性与趋势。
+    (评估流程已改为只写 algorithm_performance_summary，algorithm_performance 不再随开奖更新)
+    """
     try:
-        query = "SELECT * FROM algorithm_performance"
-        return db_manager.execute_query(query)
+        aggregates = PerformanceAggregateStore(db_manager).get_aggregates()
     except Exception as e:
         st.error(f"获取算法性能时出错: {e}");
         return []
+    rows = []
+    for version, agg in aggregates.items():
+        mean, std = agg['window_mean'], agg['window_variance'] ** 0.5
+        # 稳定性: 1 - 近期得分的变异系数 (截断到 [0, 1])
+        stability = max(0.0, 1.0 - std / mean) if mean > 0 else 0.0
+        # 趋势: EWMA 相对近期均值的偏离超过 5% 视为上升/下降
+        if agg['ewma_score'] > mean * 1.05:
+            trend = '上升'
+        elif agg['ewma_score'] < mean * 0.95:
+            trend = '下降'
+        else:
+            trend = '平稳'
+        rows.append({'algorithm_version': version,
+                     'avg_front_hit_rate': agg['avg_front_hit_rate'],
+                     'avg_back_hit_rate': agg['avg_back_hit_rate'],
+                     'stability_score': round(stability, 4),
+                     'performance_trend': trend})
+    return rows
+
+
+def get_performance_aggregates(db_manager):
+    """读取算法滚动性能汇总表 (EWMA / 最近N期均值与方差 / 命中直方图)。"""
+    try:
+        return PerformanceAggregateStore(db_manager).get_aggregates()
+    except Exception as e:
+        st.error(f"获取滚动性能汇总时出错: {e}");
+        return {}
 
 
 def get_recent_lottery_history(db_manager, periods=10):
@@ -57,6 +89,26 @@ def get_recent_lottery_history(db_manager, periods=10):
         return []
 
 
+@st.cache_resource(max_entries=2)
+def get_similarity_index(_db_manager, latest_period, history_limit=100000):
+    """
+    按最新期号缓存相似开奖索引: 新开奖入库后期号变化，自动重建一份新索引。
+    缓存对象在会话间共享，调用方只能查询，不能修改。
+    """
+    return DrawSimilarityIndex.from_history(_db_manager.get_all_lottery_history(limit=history_limit))
+
+
+def find_similar_periods(db_manager, front_nums, back_nums, period_number=None, top_k=10):
+    """查询与给定号码最相似的历史开奖及其下一期号码 (索引按最新期号缓存)"""
+    try:
+        latest = db_manager.fetch_one("SELECT MAX(period_number) AS period_number FROM lottery_history")
+        index = get_similarity_index(db_manager, (latest or {}).get('period_number') or '')
+        return index.query(front_nums, back_nums, top_k=top_k, exclude_period=period_number)
+    except Exception as e:
+        st.error(f"相似开奖检索时出错: {e}")
+        return []
+
+
 # --- 图表创建函数 (部分修改) ---
 def create_number_heat_map(stats_data, title):
     if not stats_data: return
@@ -224,7 +276,7 @@ def analysis_page():
         latest_period_result = db_manager.execute_query(latest_period_query)
         default_period = latest_period_result[0]['period_number'] if latest_period_result else "2025127"  # 使用真实期号示例
         selected_period = st.text_input("分析期号", value=default_period)
-        analysis_type = st.selectbox("分析类型", ["号码热度分析", "遗漏分析", "算法性能分析", "综合模式分析", "高级指标分析"])
+        analysis_type = st.selectbox("分析类型", ["号码热度分析", "遗漏分析", "算法性能分析", "综合模式分析", "高级指标分析", "相似开奖检索"])
 
     if st.sidebar.button("开始分析", type="primary", use_container_width=True):
         with st.spinner("正在执行深度分析..."):
@@ -270,6 +322,28 @@ def analysis_page():
                         display_df.columns = ['算法名称', '平均前区命中率', '平均后区命中率', '稳定性评分', '性能趋势']
                         st.dataframe(display_df, use_container_width=True, hide_index=True)
 
+                    aggregates = get_performance_aggregates(db_manager)
+                    if aggregates:
+                        st.markdown("#### 滚动性能汇总")
+                        ALGO_NAME_MAP = get_algorithm_display_names()
+                        agg_df = pd.DataFrame([{
+                            '算法名称': ALGO_NAME_MAP.get(name, name),
+                            '评估期数': agg['periods_evaluated'],
+                            '得分EWMA': round(agg['ewma_score'], 4),
+                            '近期均值': round(agg['window_mean'], 4),
+                            '近期标准差': round(agg['window_variance'] ** 0.5, 4),
+                            '平均前区命中率': round(agg['avg_front_hit_rate'], 4),
+                            '平均后区命中率': round(agg['avg_back_hit_rate'], 4),
+                        } for name, agg in aggregates.items()])
+                        st.dataframe(agg_df, use_container_width=True, hide_index=True)
+                        hist_df = pd.DataFrame([
+                            {'算法名称': ALGO_NAME_MAP.get(name, name), '前区命中数': k, '期数': count}
+                            for name, agg in aggregates.items() for k, count in agg['front_hit_histogram'].items()
+                        ])
+                        fig = px.bar(hist_df, x='前区命中数', y='期数', color='算法名称', barmode='group',
+                                     title='前区命中数分布')
+                        st.plotly_chart(fig, use_container_width=True)
+
                 elif analysis_type == "综合模式分析":
                     st.markdown("### 🧩 综合模式分析")
                     patterns = analyze_patterns(analysis_data)
@@ -333,6 +407,29 @@ def analysis_page():
                         fig_tail = px.bar(tail_df, x='尾号', y='个数', title="尾号分布")
                         st.plotly_chart(fig_tail, use_container_width=True)
 
+                elif analysis_type == "相似开奖检索":
+                    st.markdown("### 🧬 相似开奖检索")
+                    similar = find_similar_periods(db_manager, front_nums, back_nums, selected_period, top_k=10)
+                    if similar:
+                        similar_df = pd.DataFrame([{
+                            '期号': item['period_number'],
+                            '开奖号码': " ".join(map(str, item['front_area'])) + " + " + " ".join(map(str, item['back_area'])),
+                            '相同号码': " ".join(map(str, item['shared_front'] + item['shared_back'])),
+                            'Jaccard相似度': item['jaccard'],
+                            '下一期': item['next_period'] or '-',
+                            '下一期号码': (" ".join(map(str, item['next_front_area'])) + " + " +
+                                        " ".join(map(str, item['next_back_area']))) if item['next_period'] else '-',
+                        } for item in similar])
+                        st.dataframe(similar_df, use_container_width=True, hide_index=True)
+
+                        next_numbers = [n for item in similar if item['next_front_area'] for n in item['next_front_area']]
+                        if next_numbers:
+                            follow_df = pd.Series(next_numbers).value_counts().rename_axis('号码').reset_index(name='次数')
+                            fig_follow = px.bar(follow_df, x='号码', y='次数', title="相似开奖之后一期的前区号码分布")
+                            st.plotly_chart(fig_follow, use_container_width=True)
+                    else:
+                        st.info("暂无可用的相似开奖")
+
             else:
                 st.error(f"未找到期号 {selected_period} 的数据")
     else:
@@ -4,6 +4,7 @@ import pandas as pd
 import json
 from src.utils.helpers import get_db_manager, authenticated_page, get_algorithm_display_names
 from src.ui.style_utils import load_global_styles
+from src.database.blob_store import BlobStore
 
 
 @st.cache_data(ttl=600)
@@ -198,9 +199,11 @@ def backtest_analysis_page():
                 st.write("预计中奖概率：", d.get("win_probability", "N/A"))
 
                 # 若你希望看到 meta 的分析依据，也可以在此处展示
+                # analysis_basis 可能是压缩 blob 的引用，勾选后才解压读取
                 if meta.get("analysis_basis"):
                     with st.expander("查看该算法元数据（analysis_basis）"):
-                        st.json(meta.get("analysis_basis"))
+                        if st.checkbox("加载分析依据", key=f"basis_{meta_id}_{d.get('id')}"):
+                            st.json(BlobStore(db_manager).resolve(meta.get("analysis_basis")))
 
                 # 原始数据
                 with st.popover("查看原始组合记录"):
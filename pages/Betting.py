@@ -7,6 +7,8 @@ import json
 import math  # 需要导入 math 库来进行组合计算
 from src.database.database_manager import DatabaseManager
 from src.ui.style_utils import load_global_styles
+from src.utils.ticket_set import TicketSet
+from src.utils.prize_rules import ticket_cost
 
 FRONT_AREA_NUMBERS = list(range(1, 36))
 BACK_AREA_NUMBERS = list(range(1, 13))
@@ -17,33 +19,9 @@ def optimize_recommendations(combo_list):
     """
     智能去重 + 压缩组合（避免重复投注）
     combo_list: [ { front_numbers: [...], back_numbers: [...] }, ... ]
+    号码按位掩码编码，被其他组合完全包含的组合 (含复式、胆拖展开后的包含关系) 会被剔除。
     """
-    # ---- Step1：数字排序，消除格式差异 ----
-    normalized = []
-    for c in combo_list:
-        fn = sorted(list(set(c['front_numbers'])))
-        bn = sorted(list(set(c['back_numbers'])))
-        normalized.append((tuple(fn), tuple(bn)))
-
-    # ---- Step2：去掉完全重复的组合 ----
-    unique_combos = list(set(normalized))
-
-    # ---- Step3：去掉“被完全包含”的组合（减少浪费）----
-    final_combos = []
-    for a in unique_combos:
-        a_fn, a_bn = set(a[0]), set(a[1])
-        covered = False
-        for b in unique_combos:
-            if a == b: continue
-            b_fn, b_bn = set(b[0]), set(b[1])
-            if a_fn.issubset(b_fn) and a_bn.issubset(b_bn):
-                covered = True
-                break
-        if not covered:
-            final_combos.append(a)
-
-    # ---- 返回优化结果 ----
-    return [{"front": list(a[0]), "back": list(a[1])} for a in final_combos]
+    return TicketSet.from_combos(combo_list).remove_dominated().to_combos()
 
 def calculate_and_validate_bet(bet_type, front_nums, back_nums):
     """验证投注并计算注数，已修复单式验证逻辑"""
@@ -125,14 +103,14 @@ def insert_betting_record(db_manager, user_id, bet_data):
         query = """
         INSERT INTO personal_betting 
         (user_id, period_number, bet_time, bet_type, front_numbers, front_count, 
-         back_numbers, back_count, bet_amount, multiple, strategy_type, confidence_level, analysis_notes)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+         back_numbers, back_count, bet_amount, multiple, is_additional, strategy_type, confidence_level, analysis_notes)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         success = db_manager.execute_update(query, (
             user_id, bet_data['period_number'], bet_data['bet_time'], bet_data['bet_type'],
             bet_data['front_numbers'], bet_data['front_count'], bet_data['back_numbers'],
             bet_data['back_count'], bet_data['bet_amount'], bet_data['multiple'],
-            bet_data.get('strategy_type', 'manual'), bet_data.get('confidence_level', 50),
+            int(bet_data.get('is_additional', False)), bet_data.get('strategy_type', 'manual'), bet_data.get('confidence_level', 50),
             bet_data.get('analysis_notes', '')
         ))
         return success
@@ -190,6 +168,7 @@ def betting_page():
                                             {"single": "单式", "compound": "复式", "dantuo": "胆拖"}[x])
                 with col2:
                     multiple = st.number_input("投注倍数", min_value=1, value=1, step=1)
+                    is_additional = st.checkbox("追加投注 (每注 +1 元)")
                     confidence_level = st.slider("信心指数", 0, 100, 50)
 
                 st.markdown("---")
@@ -218,6 +197,12 @@ def betting_page():
                         st.markdown("#### 👇 最新算法推荐方案")
                         recommendations = get_latest_recommendations(db_manager)
                         if recommendations:
+                            merged = TicketSet.from_combos(recommendations).remove_dominated()
+                            merged_coverage = merged.coverage()
+                            st.caption(
+                                f"合并去重后 {merged_coverage['bets']} 组，共 {merged_coverage['total_tickets']} 注"
+                                f" (¥{merged.total_cost():.2f})，覆盖前区 {len(merged_coverage['front_numbers'])} 个、"
+                                f"后区 {len(merged_coverage['back_numbers'])} 个号码")
                             st.info("点击下方按钮可将号码填充至上方选号区。")
                             for i, rec in enumerate(recommendations):
                                 with st.expander(f"方案 {i + 1}: {rec['recommend_type']}"):
@@ -254,7 +239,7 @@ def betting_page():
                     st.warning("您选择的号码组合无法构成有效投注（0注）。");
                     return
 
-                bet_amount = combinations * 2.0 * multiple
+                bet_amount = ticket_cost(combinations, multiple, is_additional)
                 front_db_json, back_db_json = json.dumps(front_input_data), json.dumps(back_input_data)
                 front_count = len(front_input_data) if isinstance(front_input_data, list) else len(
                     front_input_data["dan"]) + len(front_input_data["tuo"])
@@ -265,6 +250,7 @@ def betting_page():
                     'period_number': period_number, 'bet_time': datetime.now(), 'bet_type': bet_type,
                     'front_numbers': front_db_json, 'front_count': front_count, 'back_numbers': back_db_json,
                     'back_count': back_count, 'bet_amount': bet_amount, 'multiple': multiple,
+                    'is_additional': is_additional,
                     'strategy_type': strategy_type, 'confidence_level': confidence_level,
                     'analysis_notes': analysis_notes
                 }
@@ -300,7 +286,8 @@ def betting_page():
                                                                                              bet['bet_type']),
                         "前区": front_display, "后区": back_display,
                         "金额": f"¥{bet['bet_amount']:.2f}", "倍数": bet['multiple'],
-                        "状态": "🎉 中奖" if bet['is_winning'] else "⏳ 待开奖",
+                        "状态": "🎉 中奖" if bet['is_winning'] else (
+                            f"❌ {bet['winning_level']}" if bet.get('winning_level') else "⏳ 待开奖"),
                         "中奖金额": f"¥{bet['winning_amount']:.2f}" if bet['is_winning'] else "-"
                     })
                 df = pd.DataFrame(bet_display_list)
@@ -1,65 +1,66 @@
-# file: pages/Chatbot.py (已修改为工作流触发器)
+# file: pages/Chatbot.py (已修改为后台任务队列的提交与跟踪页面)
 import streamlit as st
-import subprocess
-import sys
-import os
-from src.utils.helpers import authenticated_page
+import time
+from datetime import datetime
+from src.engine.job_queue import JobQueue, ACTIVE_STATUSES, ensure_workers
+from src.utils.helpers import authenticated_page, get_db_manager
 from src.ui.style_utils import load_global_styles
 
+WORKFLOW_NAME = 'daily_workflow'
+POLL_SECONDS = 1.5
+LOG_TAIL_LINES = 200
+STATUS_LABELS = {'queued': '⏳ 排队中', 'running': '🏃 执行中', 'succeeded': '✅ 已完成', 'failed': '❌ 失败'}
 
-def run_main_workflow():
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    return JobQueue()
+
+
+def resolve_target_period() -> str:
+    """
+    工作流的目标期号 (与 PredictionTask 的计算方式一致: 最新开奖期号 + 1)，用于合并相同的任务。
+    取不到历史数据时退回当天日期，同一天内的重复点击仍会合并。
+    """
+    history = get_db_manager().get_latest_lottery_history(limit=1)
+    if history:
+        return str(int(history[0].period_number) + 1)
+    return datetime.now().strftime('%Y%m%d')
+
+
+def format_job(job: dict) -> str:
+    """把任务状态与日志末尾渲染为 Markdown。"""
+    log_tail = '\n'.join(job['log'].splitlines()[-LOG_TAIL_LINES:])
+    header = (f"**任务 #{job['id']}** · 目标期号 {job['target_period']} · {STATUS_LABELS.get(job['status'], job['status'])}"
+              f" · 已被请求 {job['request_count']} 次")
+    if job['status'] == 'failed':
+        header += f"\n\n--- ❌ {job['message']} ---"
+    elif job['status'] == 'succeeded':
+        header += f"\n\n--- ✅ 流程执行完毕 ({job['finished_at']}) ---"
+    return f"{header}\n```log\n{log_tail}\n```"
+
+
+def poll_job(job_id: int) -> dict:
     """
-    执行 main.py 脚本并实时返回其输出。
-    这是一个生成器函数，会逐行 yield 输出。
+    轮询任务状态直到结束，期间刷新进度条与日志。
+    任务在后台工作进程中执行，离开页面不会中断，回到页面后继续跟踪。
     """
-    # 确保我们使用的是与Streamlit应用相同的Python环境
-    python_executable = sys.executable
-
-    # 获取项目根目录，并构建 main.py 的绝对路径
-    # __file__ -> .../pages/Chatbot.py
-    # os.path.dirname -> .../pages
-    # os.path.dirname -> .../
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    main_script_path = os.path.join(project_root, "main.py")
-
-    if not os.path.exists(main_script_path):
-        yield "❌ **错误**: 找不到 'main.py' 文件。"
-        return
-
-    # 使用 Popen 启动子进程，以便我们可以实时读取输出
-    process = subprocess.Popen(
-        [python_executable, main_script_path],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        encoding='utf-8',
-        bufsize=1,  # 行缓冲
-        cwd=project_root  # 在项目根目录执行脚本，以确保相对路径正确
-    )
-
-    # 实时读取标准输出
-    for line in iter(process.stdout.readline, ''):
-        yield line.strip()
-
-    process.stdout.close()
-
-    # 等待进程结束并检查错误
-    return_code = process.wait()
-    if return_code != 0:
-        # 如果有错误，读取并返回标准错误流的内容
-        error_output = process.stderr.read()
-        yield f"\n--- ❌ 脚本执行出错 (返回码: {return_code}) ---\n"
-        yield error_output.strip()
-    else:
-        yield "\n--- ✅ 流程执行完毕 ---"
-
-    process.stderr.close()
+    queue = get_job_queue()
+    progress_bar, log_placeholder = st.progress(0.0), st.empty()
+    while True:
+        job = queue.get(job_id)
+        progress_bar.progress(min(max(job['progress'], 0.0), 1.0),
+                              text=job['message'] or STATUS_LABELS.get(job['status'], job['status']))
+        log_placeholder.markdown(format_job(job))
+        if job['status'] not in ACTIVE_STATUSES:
+            return job
+        time.sleep(POLL_SECONDS)
 
 
 @authenticated_page
 def chatbot_page():
     """
-    一个AI助手页面，用于触发并监控后端的 main.py 工作流。
+    一个AI助手页面，用于向后台任务队列提交 main.py 工作流并跟踪其进度。
     """
     load_global_styles()
     user = st.session_state.get("user")
@@ -72,7 +73,9 @@ def chatbot_page():
     </div>
     """, unsafe_allow_html=True)
 
-    # --- 移除模型选择的侧边栏 ---
+    # --- 侧边栏: 是否复用已完成的结果 ---
+    rerun = st.sidebar.checkbox("忽略本期已完成的结果，重新运行", value=False,
+                                help="默认情况下，同一目标期号已成功执行过的工作流会直接展示上次的结果。")
 
     # --- 聊天会话状态初始化 ---
     if "workflow_messages" not in st.session_state:
@@ -91,28 +94,31 @@ def chatbot_page():
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # 2. 准备执行工作流
+        # 2. 提交到后台任务队列 (相同目标期号的任务只会执行一次)
         with st.chat_message("assistant"):
-            st.info("✅ 指令已收到！正在启动系统主流程... 请稍候。")
-
-            # 使用 st.empty() 创建一个占位符，用于实时更新日志输出
-            log_placeholder = st.empty()
-
-            full_log_output = ""
             try:
-                # 实时显示工作流的输出
-                for line in run_main_workflow():
-                    # 将新日志行追加到完整日志中
-                    full_log_output += line + "\n"
-                    # 使用Markdown的代码块格式来显示日志，更美观
-                    log_placeholder.markdown(f"```log\n{full_log_output}\n```")
-
+                job, created = get_job_queue().enqueue(WORKFLOW_NAME, resolve_target_period(),
+                                                       requested_by=user.username, reuse_succeeded=not rerun)
+                ensure_workers()
             except Exception as e:
-                full_log_output += f"❌ 前端调用时发生严重错误: {e}"
-                log_placeholder.error(full_log_output)
-
-        # 3. 将完整的日志输出保存到会话历史中
-        st.session_state.workflow_messages.append({"role": "assistant", "content": f"```log\n{full_log_output}\n```"})
+                st.error(f"❌ 提交工作流失败: {e}")
+                st.session_state.workflow_messages.append({"role": "assistant", "content": f"❌ 提交工作流失败: {e}"})
+                return
+            if created:
+                st.info(f"✅ 指令已收到！已提交后台任务 #{job['id']}，离开页面不会中断执行。")
+            elif job['status'] in ACTIVE_STATUSES:
+                st.info(f"🔁 目标期号 {job['target_period']} 的工作流已在执行 (任务 #{job['id']})，直接跟踪其进度。")
+            else:
+                st.info(f"📦 目标期号 {job['target_period']} 的工作流已于 {job['finished_at']} 完成，以下为执行结果。")
+            st.session_state.workflow_job_id = job['id']
+
+    # 3. 跟踪当前会话的任务 (包括刷新页面前尚未结束的任务)，结束后保存到会话历史中
+    job_id = st.session_state.get("workflow_job_id")
+    if job_id is not None:
+        with st.chat_message("assistant"):
+            job = poll_job(job_id)
+        st.session_state.workflow_job_id = None
+        st.session_state.workflow_messages.append({"role": "assistant", "content": format_job(job)})
 
 
 # 运行页面
@@ -2,11 +2,12 @@
 import streamlit as st
 import pandas as pd
 import json
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Callable
 
 # 项目工具（请确保这些函数在你的项目中存在）
 from src.utils.helpers import get_db_manager, authenticated_page, get_algorithm_display_names
 from src.ui.style_utils import load_global_styles
+from src.database.blob_store import BLOB_COLUMNS, BlobStore, blob_key_of
 
 
 # -------------------------
@@ -51,11 +52,13 @@ def parse_number_field(val) -> List[int]:
     return nums
 
 
-def extract_combinations_from_meta(meta: Dict[str, Any], raw_details: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+def extract_combinations_from_meta(meta: Dict[str, Any], raw_details: List[Dict[str, Any]] = None,
+                                   resolve_blob: Optional[Callable[[str], Any]] = None) -> List[Dict[str, Any]]:
     """
     统一提取组合列表：
       1) 优先使用 recommendation_details 子表（raw_details）
       2) 若子表为空，从 meta 中的 analysis_basis / llm_cognitive_details / model_weights 等 JSON 字段解析组合
+         (字段为压缩 blob 引用时，只有走到这一步才通过 resolve_blob 解压)
     返回的每一项结构：
       {
         "recommend_type": str,
@@ -85,6 +88,9 @@ def extract_combinations_from_meta(meta: Dict[str, Any], raw_details: List[Dict[
     def try_parse_json_field(field_val) -> Optional[Dict[str, Any]]:
         if not field_val:
             return None
+        blob_key = blob_key_of(field_val)
+        if blob_key:
+            return resolve_blob(blob_key) if resolve_blob else None
         if isinstance(field_val, dict):
             return field_val
         if isinstance(field_val, str):
@@ -237,6 +243,12 @@ def load_recommendations_and_details(period_number: str) -> Tuple[List[Dict[str,
     return metas, detail_map
 
 
+@st.cache_data(ttl=600, show_spinner=False)
+def load_blob(blob_key: str) -> Any:
+    """按需解压 analysis_basis / llm_cognitive_details 引用的内容 (同一 blob 只解压一次)。"""
+    return BlobStore(get_db_manager()).get(blob_key)
+
+
 # -------------------------
 # 页面主体
 # -------------------------
@@ -297,7 +309,7 @@ def model_recommendation_comparison_page():
         display_name = ALGO_NAME_MAP.get(meta.get("algorithm_version", model_identifier), model_identifier)
 
         raw_details = detail_map.get(meta_id, [])  # 子表
-        combos = extract_combinations_from_meta(meta, raw_details)
+        combos = extract_combinations_from_meta(meta, raw_details, resolve_blob=load_blob)
 
         # 统计
         total_combos = len(combos)
@@ -366,6 +378,12 @@ def model_recommendation_comparison_page():
             st.write(f"组合数：{m['total_combinations']}  | 平均预测概率：{m['avg_win_probability']:.6f}")
             with st.expander("查看模型元数据 (meta)"):
                 st.json(m["raw_meta"])
+                if st.checkbox("加载分析依据与认知细节", key=f"blobs_{m['meta_id']}"):
+                    for column in BLOB_COLUMNS:
+                        value = m["raw_meta"].get(column)
+                        blob_key = blob_key_of(value)
+                        st.markdown(f"**{column}**")
+                        st.json(load_blob(blob_key) if blob_key else value)
 
             combos = m["combos"]
             if not combos:
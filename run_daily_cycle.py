@@ -4,7 +4,7 @@ import os
 import sys
 import json
 import argparse
-from typing import Set
+from typing import Set, List, Dict, Any, Optional
 
 # --- 环境设置 ---
 project_root = os.path.abspath(os.path.dirname(__file__))
@@ -12,14 +12,19 @@ if project_root not in sys.path: sys.path.insert(0, project_root)
 
 # --- 核心组件导入 ---
 from src.database.database_manager import DatabaseManager
+from src.database.query_profiler import PROFILER
 from src.config.database_config import DB_CONFIG
 from src.algorithms import AVAILABLE_ALGORITHMS
 from src.model.lottery_models import LotteryHistory
 from src.algorithms.dynamic_ensemble_optimizer import DynamicEnsembleOptimizer
+from src.algorithms.advanced_algorithms.monte_carlo_bankroll import portfolio_roi_summary
 from src.engine.recommendation_engine import RecommendationEngine
 from src.engine.imperial_senate import ImperialSenate
 from src.prompt_templates import build_final_mandate_prompt
 from src.llm.clients import get_llm_client
+from src.engine.simulation_checkpoint import CheckpointedSimulationRunner, SimulationCheckpointStore, run_sharded
+from src.engine.prediction_log_retention import PredictionLogRetention
+from src.database.blob_store import BLOB_COLUMNS, BlobStore, store_blob
 
 # --- 全局配置 ---
 MODELS_TO_SIMULATE = ["qwen3-max",
@@ -27,22 +32,36 @@ MODELS_TO_SIMULATE = ["qwen3-max",
                       "gemini-2.5-flash",
                       "deepseek-chat"]
 NUM_PERIODS_TO_SIMULATE = 9999
+SIMULATION_RUN_TAG = "full_historical_simulation"
+SIMULATION_WARMUP_PERIODS = 30  # 前30期只作为训练数据，不参与模拟
 
 
 class DailyCycleRunner:
     """ “帝国一日”总调度器 (稳定版) """
 
-    def __init__(self, db_config: dict, force_rerun: bool = False):
+    def __init__(self, db_config: dict, force_rerun: bool = False, batch_size: int = 10, workers: int = 1,
+                 keep_log_periods: Optional[int] = None):
+        self.db_config = db_config
         self.db = DatabaseManager(**db_config)
         self.force_rerun = force_rerun
+        self.batch_size = batch_size
+        self.workers = workers
+        self.keep_log_periods = keep_log_periods
+        self._all_history_in_mem: List[LotteryHistory] = []
         if not self.db.connect(): raise ConnectionError("数据库连接失败")
+        BlobStore(self.db).ensure_table()
 
     def run_all(self):
         print("\n" + "#" * 70 + "\n###      ☀️  “帝国一日”自动化流程启动      ###\n" + "#" * 70)
         if self.force_rerun: self._cleanup_for_rerun()
         self._run_base_algorithm_evaluation()
-        self._run_full_historical_simulation()
+        if self.workers > 1:
+            run_sharded(_simulation_shard_worker, self.workers, self.db_config, self.batch_size)
+        else:
+            self._run_full_historical_simulation()
         self._run_llm_backtesting()
+        if self.keep_log_periods:
+            PredictionLogRetention(self.db, keep_periods=self.keep_log_periods).compact()
         print("\n" + "#" * 70 + "\n###      🌙  “帝国一日”自动化流程全部执行完毕      ###\n" + "#" * 70)
         self.db.disconnect()
 
@@ -55,6 +74,9 @@ class DailyCycleRunner:
         self.db.execute_update("TRUNCATE TABLE recommendation_details;")
         self.db.execute_update("TRUNCATE TABLE algorithm_recommendation;")
         self.db.execute_update("TRUNCATE TABLE algorithm_performance;")
+        checkpoint_store = SimulationCheckpointStore(self.db)
+        checkpoint_store.ensure_table()
+        checkpoint_store.clear()
         print("  - ✅ 清理完毕。")
 
     def _run_base_algorithm_evaluation(self):
@@ -109,104 +131,128 @@ class DailyCycleRunner:
                     print(f"  - ❌ {algo_name} 的历史战报写入失败。")
 
     # <<< 这里是关键修复：将下面的函数定义取消缩进，使其成为类的正确方法 >>>
-    def _run_full_historical_simulation(self):
+    def _run_full_historical_simulation(self, shard_index: int = 0, shard_count: int = 1) -> List[Dict[str, Any]]:
+        """
+        断点续跑版历史模拟: 已完成的 (模型, 期号) 记录在 simulation_checkpoints 中，重跑时自动跳过；
+        每 batch_size 期在一个事务内提交，中途崩溃只会丢失尚未提交的那一批。
+        """
         print("\n" + "=" * 70 + "\n=== 步骤 2/3: LLM 全流程历史决策模拟 (动态引擎版) ===")
         print("=" * 70)
         all_history_in_mem_raw = self.db.execute_query("SELECT * FROM lottery_history ORDER BY period_number ASC")
-        all_history_in_mem = self.db._convert_rows_to_history_list(all_history_in_mem_raw)
+        self._all_history_in_mem = self.db._convert_rows_to_history_list(all_history_in_mem_raw)
+        period_numbers = [draw.period_number for draw in self._all_history_in_mem]
 
+        runner = CheckpointedSimulationRunner(self.db, SIMULATION_RUN_TAG, batch_size=self.batch_size,
+                                              shard_index=shard_index, shard_count=shard_count)
+        all_stats = []
         for llm_model_name in MODELS_TO_SIMULATE:
             print(f"\n--- 开始对模型: [{llm_model_name}] 进行模拟 ---")
-            periods_to_simulate = all_history_in_mem[30:]
-
-            for i, target_draw in enumerate(periods_to_simulate, 1):
-                target_period = target_draw.period_number
-                print(
-                    f"\n--- 模拟进度 [{llm_model_name}]: {i}/{len(periods_to_simulate)} (期号: {target_period}) ---")
-
-                try:
-                    training_data = all_history_in_mem[:30 + i - 1]
-
-                    base_scorers = [AlgoClass() for name, AlgoClass in AVAILABLE_ALGORITHMS.items() if
-                                    name != "DynamicEnsembleOptimizer"]
-
-                    # 假设 DynamicEnsembleOptimizer 构造函数已更新以接受 db_manager
-                    fusion_algorithm = DynamicEnsembleOptimizer(base_algorithms=base_scorers, db_manager=self.db)
-
-                    engine = RecommendationEngine(base_scorers=base_scorers, fusion_algorithm=fusion_algorithm)
-                    print("  - [诊断] 正在调用核心推荐引擎生成所有模型输出...")
-                    model_outputs = engine.generate_all_recommendations(training_data)
-                    print("  - [诊断] 引擎运行完毕。")
-
-                    senate = ImperialSenate(self.db, {}, model_outputs)
-                    edict, quant_prop, ml_brief = senate.generate_all_briefings(training_data, "上期ROI-2%")
-
-                    prompt_text, _ = build_final_mandate_prompt(
-                        recent_draws=training_data,
-                        model_outputs=model_outputs,
-                        performance_log={},
-                        next_issue_hint=target_period,
-                        last_performance_report="上期ROI-2%",
-                        senate_edict=edict,
-                        quant_proposal=quant_prop,
-                        ml_briefing=ml_brief
-                    )
-
-                    print("  - [诊断] 正在调用 LLM...")
-                    llm_client = get_llm_client(llm_model_name)
-                    response_str = llm_client.generate(system_prompt=prompt_text,
-                                                       user_prompt="Your Majesty, your final decree.",
-                                                       json_mode=True)
-                    response_data = json.loads(response_str.strip().replace('```json', '').replace('```', ''))
-                    print("  - [诊断] LLM 返回并解析成功。")
-
-                    recommend_time = self.db.get_current_time()
-                    meta_data = {'period_number': target_period, 'recommend_time': recommend_time,
-                                 'algorithm_version': f"TheFinalMandate_{llm_model_name}_V1.2_DynamicSim",
-                                 'confidence_score': 0.9 if response_data.get('self_check', {}).get('e_hits_ok',
-                                                                                                    False) else 0.7,
-                                 'risk_level': '中性',
-                                 'analysis_basis': json.dumps(model_outputs, ensure_ascii=False, default=str),
-                                 # 添加 default=str 以防序列化问题
-                                 'llm_cognitive_details': json.dumps(
-                                     {'senate_edict': edict, 'quant_proposal': json.loads(quant_prop),
-                                      'ml_briefing': json.loads(ml_brief),
-                                      'final_memo': response_data.get('edict', {}).get('final_memo')},
-                                     ensure_ascii=False), 'models': llm_model_name}
-
-                    recommendation_id = self.db.execute_insert('algorithm_recommendation', meta_data)
-                    if not recommendation_id: recommendation_id = self.db.get_last_insert_id()
-                    if not recommendation_id: raise Exception("插入元数据后未能获取 ID。")
-
-                    final_edict = response_data.get('edict', {})
-                    portfolio = final_edict.get('final_imperial_portfolio', {})
-                    recommendations = portfolio.get('recommendations', [])
-
-                    if recommendations:
-                        details_to_insert = [(recommendation_id, r.get('type'), r.get('role'),
-                                              ','.join(map(str, r.get('front_numbers', []))),
-                                              ','.join(map(str, r.get('back_numbers', []))), r.get('sharpe')) for r
-                                             in recommendations]
-                        self.db.execute_batch_insert(
-                            "INSERT INTO recommendation_details (recommendation_metadata_id, recommend_type, strategy_logic, front_numbers, back_numbers, win_probability) VALUES (%s, %s, %s, %s, %s, %s)",
-                            details_to_insert)
-
-                    output_data = {"recommendation_id": recommendation_id, "issue": target_period,
-                                   "model_name": llm_model_name,
-                                   "portfolio": json.dumps(portfolio, ensure_ascii=False),
-                                   "memo": final_edict.get('final_memo'),
-                                   "expected_hits_range": str(portfolio.get('overall_e_hits_range', 'N/A')),
-                                   "predicted_roi": portfolio.get('allocation_summary', '')[:250],
-                                   "self_check_details": json.dumps(response_data.get('self_check', {}),
-                                                                    ensure_ascii=False)}
-                    self.db.execute_insert('prediction_outputs', output_data)
-                    print(f"  - ✅ 已为期号 {target_period} 成功存入双轨制数据。")
-
-                except Exception as e:
-                    print(f"\n  - ❌❌❌ 在处理期号 {target_period} 时发生致命错误！ ❌❌❌")
-                    import traceback
-                    traceback.print_exc()
-                    continue
+            stats = runner.run(llm_model_name, period_numbers, self._simulate_period,
+                               self._persist_simulated_period, start_index=SIMULATION_WARMUP_PERIODS)
+            print(f"  - 📊 [{llm_model_name}] 本次完成 {stats['completed']} 期，跳过 {stats['skipped']} 期，"
+                  f"失败 {stats['failed']} 期，耗时 {stats['elapsed']}s。")
+            all_stats.append(stats)
+        return all_stats
+
+    def _simulate_period(self, llm_model_name: str, target_index: int) -> Optional[Dict[str, Any]]:
+        """对单个期号执行完整决策流程，只计算不落库，返回待持久化的载荷。"""
+        target_period = self._all_history_in_mem[target_index].period_number
+        try:
+            training_data = self._all_history_in_mem[:target_index]
+
+            base_scorers = [AlgoClass() for name, AlgoClass in AVAILABLE_ALGORITHMS.items() if
+                            name != "DynamicEnsembleOptimizer"]
+
+            # 假设 DynamicEnsembleOptimizer 构造函数已更新以接受 db_manager
+            fusion_algorithm = DynamicEnsembleOptimizer(base_algorithms=base_scorers, db_manager=self.db)
+
+            engine = RecommendationEngine(base_scorers=base_scorers, fusion_algorithm=fusion_algorithm)
+            print("  - [诊断] 正在调用核心推荐引擎生成所有模型输出...")
+            model_outputs = engine.generate_all_recommendations(training_data)
+            print("  - [诊断] 引擎运行完毕。")
+
+            senate = ImperialSenate(self.db, {}, model_outputs)
+            edict, quant_prop, ml_brief = senate.generate_all_briefings(training_data, "上期ROI-2%")
+
+            prompt_text, _ = build_final_mandate_prompt(
+                recent_draws=training_data,
+                model_outputs=model_outputs,
+                performance_log={},
+                next_issue_hint=target_period,
+                last_performance_report="上期ROI-2%",
+                senate_edict=edict,
+                quant_proposal=quant_prop,
+                ml_briefing=ml_brief
+            )
+
+            print("  - [诊断] 正在调用 LLM...")
+            llm_client = get_llm_client(llm_model_name)
+            response_str = llm_client.generate(system_prompt=prompt_text,
+                                               user_prompt="Your Majesty, your final decree.",
+                                               json_mode=True)
+            response_data = json.loads(response_str.strip().replace('```json', '').replace('```', ''))
+            print("  - [诊断] LLM 返回并解析成功。")
+
+            recommend_time = self.db.get_current_time()
+            meta_data = {'period_number': target_period, 'recommend_time': recommend_time,
+                         'algorithm_version': f"TheFinalMandate_{llm_model_name}_V1.2_DynamicSim",
+                         'confidence_score': 0.9 if response_data.get('self_check', {}).get('e_hits_ok',
+                                                                                            False) else 0.7,
+                         'risk_level': '中性',
+                         # 大字段在落库时写入 content_blobs，主表只保存引用
+                         'analysis_basis': model_outputs,
+                         'llm_cognitive_details': {'senate_edict': edict, 'quant_proposal': json.loads(quant_prop),
+                                                   'ml_briefing': json.loads(ml_brief),
+                                                   'final_memo': response_data.get('edict', {}).get('final_memo')},
+                         'models': llm_model_name}
+
+            final_edict = response_data.get('edict', {})
+            portfolio = final_edict.get('final_imperial_portfolio', {})
+            recommendations = portfolio.get('recommendations', [])
+            details = [(r.get('type'), r.get('role'),
+                        ','.join(map(str, r.get('front_numbers', []))),
+                        ','.join(map(str, r.get('back_numbers', []))), r.get('sharpe')) for r in recommendations]
+
+            output_data = {"issue": target_period,
+                           "model_name": llm_model_name,
+                           "portfolio": json.dumps(portfolio, ensure_ascii=False),
+                           "memo": final_edict.get('final_memo'),
+                           "expected_hits_range": str(portfolio.get('overall_e_hits_range', 'N/A')),
+                           "predicted_roi": (portfolio_roi_summary(recommendations)
+                                             or portfolio.get('allocation_summary', '')[:250]),
+                           "self_check_details": json.dumps(response_data.get('self_check', {}),
+                                                            ensure_ascii=False)}
+            return {'meta_data': meta_data, 'details': details, 'output_data': output_data}
+
+        except Exception as e:
+            print(f"\n  - ❌❌❌ 在处理期号 {target_period} 时发生致命错误！ ❌❌❌")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    @staticmethod
+    def _persist_simulated_period(cursor, payload: Dict[str, Any]) -> int:
+        """在批次事务内写入一期的双轨制数据，返回推荐主记录ID。"""
+        meta_data = dict(payload['meta_data'])
+        for column in BLOB_COLUMNS:
+            meta_data[column] = store_blob(cursor, meta_data[column])[1]
+        cursor.execute(
+            f"INSERT INTO algorithm_recommendation ({', '.join(f'`{k}`' for k in meta_data)}) "
+            f"VALUES ({', '.join(['%s'] * len(meta_data))})", tuple(meta_data.values()))
+        recommendation_id = cursor.lastrowid
+        if not recommendation_id: raise Exception("插入元数据后未能获取 ID。")
+
+        if payload['details']:
+            cursor.executemany(
+                "INSERT INTO recommendation_details (recommendation_metadata_id, recommend_type, strategy_logic, front_numbers, back_numbers, win_probability) VALUES (%s, %s, %s, %s, %s, %s)",
+                [(recommendation_id, *detail) for detail in payload['details']])
+
+        output_data = {"recommendation_id": recommendation_id, **payload['output_data']}
+        cursor.execute(
+            f"INSERT INTO prediction_outputs ({', '.join(f'`{k}`' for k in output_data)}) "
+            f"VALUES ({', '.join(['%s'] * len(output_data))})", tuple(output_data.values()))
+        print(f"  - ✅ 已为期号 {meta_data['period_number']} 写入双轨制数据 (待批次提交)。")
+        return recommendation_id
 
     # <<< 这里是关键修复：将下面的函数定义取消缩进，使其成为类的正确方法 >>>
     def _run_llm_backtesting(self):
@@ -255,10 +301,28 @@ class DailyCycleRunner:
                 continue
 
 
+def _simulation_shard_worker(db_config: dict, batch_size: int, shard_index: int, shard_count: int):
+    """子进程入口 (spawn 启动，不继承父进程的连接池)：每个分片使用独立的数据库连接池，只模拟属于自己的期号。"""
+    runner = DailyCycleRunner(db_config, batch_size=batch_size)
+    return runner._run_full_historical_simulation(shard_index=shard_index, shard_count=shard_count)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="“帝国一日”总调度器：一键完成清理、模拟与评估。")
     parser.add_argument('--force', action='store_true', help='强制重新运行，会先清空所有历史模拟与评估数据。')
+    parser.add_argument('--batch-size', type=int, default=10, help='历史模拟每多少期提交一次 (默认10)。')
+    parser.add_argument('--workers', type=int, default=1, help='历史模拟的并行工作进程数 (默认1)。')
+    parser.add_argument('--keep-log-periods', type=int, default=None,
+                        help='流程结束后压缩预测日志，热表只保留最近 N 个期号 (其余归档并生成汇总)。')
+    parser.add_argument('--db-profile', type=str, default=None,
+                        help='将本次运行的数据库调用统计保存为 JSON (如 logs/db_profile.json)。')
     args = parser.parse_args()
 
-    runner = DailyCycleRunner(DB_CONFIG, force_rerun=args.force)
-    runner.run_all()
\ No newline at end of file
+    runner = DailyCycleRunner(DB_CONFIG, force_rerun=args.force, batch_size=args.batch_size, workers=args.workers,
+                              keep_log_periods=args.keep_log_periods)
+    try:
+        runner.run_all()
+    finally:
+        PROFILER.print_summary()
+        if args.db_profile:
+            PROFILER.save(args.db_profile)
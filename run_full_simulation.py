@@ -11,6 +11,8 @@ if project_root not in sys.path:
 
 # --- 核心组件导入 ---
 from src.database.database_manager import DatabaseManager
+from src.database.sqlite_manager import SQLiteDatabaseManager
+from src.database.migrations import MigrationRunner
 from src.config.database_config import DB_CONFIG
 from src.model.lottery_models import LotteryHistory
 from src.algorithms import AVAILABLE_ALGORITHMS
@@ -32,11 +34,23 @@ MODELS_TO_SIMULATE = [
 NUM_PERIODS_TO_SIMULATE = 9999
 
 
-def run_full_historical_simulation(force_rerun: bool = False):
+def _open_database(sqlite_path: str = None) -> DatabaseManager:
+    """默认连接 MySQL；指定 sqlite_path 时在本地 SQLite 文件中运行，首次使用时从 MySQL 复制开奖历史。"""
+    if not sqlite_path:
+        return DatabaseManager(**DB_CONFIG)
+    db = SQLiteDatabaseManager(sqlite_path)
+    if not db.fetch_one("SELECT 1 AS found FROM lottery_history LIMIT 1"):
+        db.copy_tables_from(DatabaseManager(**DB_CONFIG), ('lottery_history',))
+    MigrationRunner(db).apply_all()
+    print(f"🗄️ 使用嵌入式 SQLite 数据库: {sqlite_path}")
+    return db
+
+
+def run_full_historical_simulation(force_rerun: bool = False, sqlite_path: str = None):
     """
     V2.0: 对“模型武器库”中的每一个LLM，都执行一次完整的历史决策模拟。
     """
-    db = DatabaseManager(**DB_CONFIG)
+    db = _open_database(sqlite_path)
     if not db.connect():
         print("❌ 数据库连接失败，模拟终止。")
         return
@@ -155,5 +169,6 @@ def run_full_historical_simulation(force_rerun: bool = False):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="运行多模型并行历史决策模拟器。")
     parser.add_argument('--force', action='store_true', help='强制重新运行所有模型的模拟。')
+    parser.add_argument('--sqlite', metavar='PATH', help='在本地 SQLite 文件中运行模拟 (不占用线上 MySQL)。')
     args = parser.parse_args()
-    run_full_historical_simulation(force_rerun=args.force)
\ No newline at end of file
+    run_full_historical_simulation(force_rerun=args.force, sqlite_path=args.sqlite)
\ No newline at end of file
@@ -0,0 +1,248 @@
+# 文件: scripts/benchmark_algorithms.py
+# 算法性能基准测试：不依赖 MySQL，使用合成开奖历史。
+#
+# 用法 (在项目根目录下以模块方式运行):
+#   python -m scripts.benchmark_algorithms                          # 默认规模 500,5000
+#   python -m scripts.benchmark_algorithms --sizes 500,10000,50000
+#   python -m scripts.benchmark_algorithms --save-baseline          # 把本次结果存为基线
+#   python -m scripts.benchmark_algorithms --baseline scripts/benchmark_baseline.json --tolerance 0.3
+#
+# 结果以 JSON 写入 --output，与基线对比时，任一耗时/内存指标超出 (1 + tolerance) 倍即视为回归，
+# 进程以退出码 1 结束，便于在 CI 中使用。
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from src.model.lottery_models import LotteryHistory
+from src.utils.log_predictor import DISABLE_ENV_VAR
+
+DEFAULT_OUTPUT = os.path.join('scripts', 'benchmark_results.json')
+DEFAULT_BASELINE = os.path.join('scripts', 'benchmark_baseline.json')
+
+# 参与回归对比的指标 (数值越大越差)；periods_per_second 越小越差，单独处理
+_LOWER_IS_BETTER = ('train_seconds', 'predict_seconds', 'train_peak_mb', 'predict_peak_mb', 'fusion_seconds')
+_HIGHER_IS_BETTER = ('periods_per_second',)
+
+
+# --- 合成数据 ---
+def generate_synthetic_history(periods: int, seed: int = 42) -> List[LotteryHistory]:
+    """生成 periods 期合成开奖历史 (期号连续、号码均匀随机)，规模到 5 万期也只需一次数组运算。"""
+    rng = np.random.default_rng(seed)
+    front = np.sort(np.argsort(rng.random((periods, 35)), axis=1)[:, :5] + 1, axis=1)
+    back = np.sort(np.argsort(rng.random((periods, 12)), axis=1)[:, :2] + 1, axis=1)
+    return [LotteryHistory(id=i + 1, period_number=str(1000001 + i),
+                           front_area=front[i].tolist(), back_area=back[i].tolist())
+            for i in range(periods)]
+
+
+# --- 计时与内存 ---
+def measure(fn: Callable[[], Any]) -> Dict[str, Any]:
+    """执行 fn，返回 (耗时秒, 峰值内存 MB, 返回值)。峰值内存由 tracemalloc 统计 Python 层分配。"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {'seconds': round(elapsed, 6), 'peak_mb': round(peak / 1024 / 1024, 3), 'result': result}
+
+
+def bench_algorithm(algo_cls, history: List[LotteryHistory]) -> Dict[str, Any]:
+    algo = algo_cls()
+    train = measure(lambda: algo.train(history))
+    predict = measure(lambda: algo.predict(history))
+    prediction = predict['result'] if isinstance(predict['result'], dict) else {}
+    return {
+        'train_seconds': train['seconds'],
+        'train_peak_mb': train['peak_mb'],
+        'predict_seconds': predict['seconds'],
+        'predict_peak_mb': predict['peak_mb'],
+        'trained': bool(train['result']),
+        'predict_ok': 'error' not in prediction,
+    }
+
+
+def bench_walk_forward(algo_cls, history: List[LotteryHistory], steps: int, retrain_every: int) -> Dict[str, Any]:
+    from src.algorithms.advanced_algorithms.backtesting_engine import BacktestingEngine
+    start_idx = max(30, len(history) - steps)
+    engine = BacktestingEngine(algo_cls(), retrain_every=retrain_every)
+    start = time.perf_counter()
+    result = engine.run(history, start_idx=start_idx)
+    elapsed = time.perf_counter() - start
+    return {
+        'steps': result['periods'],
+        'retrain_every': retrain_every,
+        'seconds': round(elapsed, 6),
+        'periods_per_second': round(result['periods'] / max(elapsed, 1e-9), 2),
+    }
+
+
+def bench_fusion(history: List[LotteryHistory], repeats: int = 20) -> Dict[str, Any]:
+    """
+    DynamicEnsembleOptimizer 的融合开销：先收集一次子算法预测，再单独对
+    _dynamic_ensemble + _calculate_ensemble_confidence 计时，排除子算法本身的耗时。
+    """
+    from src.algorithms.dynamic_ensemble_optimizer import DynamicEnsembleOptimizer
+    optimizer = DynamicEnsembleOptimizer()
+    if not optimizer.train(history):
+        return {'error': '集成优化器训练失败'}
+    predictions = optimizer._collect_all_predictions(history)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        optimizer._dynamic_ensemble(predictions)
+        optimizer._calculate_ensemble_confidence(predictions)
+    elapsed = (time.perf_counter() - start) / repeats
+    return {'sub_algorithms': len(predictions), 'fusion_seconds': round(elapsed, 6)}
+
+
+def _safe(fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    try:
+        return fn()
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+
+
+# --- 主流程 ---
+def run_benchmarks(sizes: List[int], algorithm_names: List[str] = None, walk_steps: int = 100,
+                   retrain_every: int = 10, seed: int = 42, verbose: bool = True) -> Dict[str, Any]:
+    from src.algorithms import AVAILABLE_ALGORITHMS
+
+    selected = {name: cls for name, cls in AVAILABLE_ALGORITHMS.items()
+                if not algorithm_names or name in algorithm_names}
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'seed': seed,
+        'sizes': {},
+    }
+
+    for size in sizes:
+        history = generate_synthetic_history(size, seed)
+        size_report = {'algorithms': {}, 'walk_forward': {}}
+        if verbose:
+            print(f"\n📏 规模: {size} 期")
+        for name, algo_cls in selected.items():
+            metrics = _safe(lambda: bench_algorithm(algo_cls, history))
+            size_report['algorithms'][name] = metrics
+            if verbose:
+                if 'error' in metrics:
+                    print(f"  ❌ {name}: {metrics['error']}")
+                else:
+                    print(f"  ⏱️ {name}: train {metrics['train_seconds']:.4f}s / {metrics['train_peak_mb']:.1f}MB, "
+                          f"predict {metrics['predict_seconds']:.4f}s / {metrics['predict_peak_mb']:.1f}MB")
+            if name != 'DynamicEnsembleOptimizer' and walk_steps > 0:
+                wf = _safe(lambda: bench_walk_forward(algo_cls, history, walk_steps, retrain_every))
+                size_report['walk_forward'][name] = wf
+                if verbose and 'error' not in wf:
+                    print(f"     🔁 walk-forward: {wf['periods_per_second']} 期/秒")
+
+        if not algorithm_names or 'DynamicEnsembleOptimizer' in algorithm_names:
+            size_report['fusion'] = _safe(lambda: bench_fusion(history))
+            if verbose:
+                print(f"  🧩 融合开销: {size_report['fusion']}")
+        report['sizes'][str(size)] = size_report
+    return report
+
+
+def _iter_metrics(report: Dict[str, Any]):
+    """展开为 (指标路径, 指标名, 数值) 三元组，供基线对比。"""
+    for size, size_report in report.get('sizes', {}).items():
+        for section in ('algorithms', 'walk_forward'):
+            for name, metrics in size_report.get(section, {}).items():
+                for key, value in metrics.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        yield f"{size}/{section}/{name}/{key}", key, value
+        for key, value in size_report.get('fusion', {}).items():
+            if isinstance(value, (int, float)):
+                yield f"{size}/fusion/{key}", key, value
+
+
+def compare_with_baseline(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25,
+                          min_seconds: float = 0.005) -> List[Dict[str, Any]]:
+    """
+    返回所有回归项。耗时低于 min_seconds 的指标噪声太大，不参与比较。
+    """
+    baseline_metrics = {path: value for path, _, value in _iter_metrics(baseline)}
+    regressions = []
+    for path, key, value in _iter_metrics(current):
+        base = baseline_metrics.get(path)
+        if base is None or base <= 0:
+            continue
+        if key in _LOWER_IS_BETTER:
+            if key.endswith('seconds') and max(base, value) < min_seconds:
+                continue
+            ratio = value / base
+            if ratio > 1 + tolerance:
+                regressions.append({'metric': path, 'baseline': base, 'current': value, 'ratio': round(ratio, 3)})
+        elif key in _HIGHER_IS_BETTER:
+            ratio = base / max(value, 1e-9)
+            if ratio > 1 + tolerance:
+                regressions.append({'metric': path, 'baseline': base, 'current': value, 'ratio': round(ratio, 3)})
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="算法性能基准测试 (无需数据库)")
+    parser.add_argument('--sizes', default='500,5000', help="逗号分隔的合成历史期数，范围 500~50000")
+    parser.add_argument('--algorithms', default='', help="只测试指定算法 (AVAILABLE_ALGORITHMS 的键，逗号分隔)")
+    parser.add_argument('--walk-steps', type=int, default=100, help="walk-forward 回测的期数，0 表示跳过")
+    parser.add_argument('--retrain-every', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=None, help="与指定的基线 JSON 对比")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="允许的相对退化比例")
+    parser.add_argument('--save-baseline', action='store_true', help=f"把本次结果另存为 {DEFAULT_BASELINE}")
+    parser.add_argument('--with-db-log', action='store_true', help="保留 predict 的数据库日志写入 (默认关闭)")
+    args = parser.parse_args(argv)
+
+    # 基准只衡量算法本身：关闭 @log_prediction 的数据库写入与 INFO 级日志
+    if not args.with_db_log:
+        os.environ[DISABLE_ENV_VAR] = '1'
+    logging.disable(logging.INFO)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    for size in sizes:
+        if not 500 <= size <= 50000:
+            parser.error(f"规模 {size} 超出 500~50000 的范围")
+    names = [n.strip() for n in args.algorithms.split(',') if n.strip()]
+
+    report = run_benchmarks(sizes, names, args.walk_steps, args.retrain_every, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 结果已写入 {args.output}")
+
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📌 基线已更新: {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n⚠️ 发现 {len(regressions)} 项性能回归 (容差 {args.tolerance:.0%}):")
+            for item in regressions:
+                print(f"  - {item['metric']}: {item['baseline']} -> {item['current']} (x{item['ratio']})")
+            return 1
+        print("\n✅ 与基线相比未发现性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
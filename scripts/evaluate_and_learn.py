@@ -7,17 +7,17 @@ if project_root not in sys.path: sys.path.insert(0, project_root)
 from src.database.database_manager import DatabaseManager
 from src.config.database_config import DB_CONFIG
 from src.engine.evaluation_service import run_evaluation_for_period  # 从核心服务导入
+from src.engine.prediction_log_retention import PredictionLogRetention
 
 
 def run_full_backtest(db_manager: DatabaseManager):
     print("\n" + "#" * 70 + "\n###      🚀 执行完整历史回测与学习      ###\n" + "#" * 70)
     db_manager.execute_update("TRUNCATE TABLE algorithm_performance")
-    periods_raw = db_manager.execute_query(
-        "SELECT DISTINCT period_number FROM algorithm_prediction_logs ORDER BY period_number ASC")
-    if not periods_raw:
+    # 热表与已归档 (只剩汇总) 的期号都参与回测
+    periods = PredictionLogRetention(db_manager).all_periods()
+    if not periods:
         print("  - ❌ `algorithm_prediction_logs` 为空，无法回测。")
         return
-    periods = [p['period_number'] for p in periods_raw]
     print(f"  - 将对 {len(periods)} 个历史期号进行评估...")
     for i, period in enumerate(periods):
         print(f"\r--- 进度: {i + 1}/{len(periods)} (期号: {period}) ---", end="")
@@ -1,29 +1,169 @@
 # src/algorithms/advanced_algorithms/backtesting_engine.py
 from src.model.lottery_models import LotteryHistory
 from src.algorithms.base_algorithm import BaseAlgorithm
-from typing import List, Dict, Any
+from src.algorithms.advanced_algorithms.score_tensor_store import ScoreTensorStore
+from src.utils.prize_rules import PRIZE_LEVEL_MATRIX, PRIZE_AMOUNT_MATRIX, LEVEL_NAMES, TICKET_PRICE
+from typing import List, Dict, Any, Optional, Callable
+from collections import Counter
+import time
 import numpy as np
 
+
 class BacktestingEngine:
-    """简易回测引擎"""
+    """
+    滚动前推 (walk-forward) 回测引擎
+    - retrain_every: 每 N 期完整重训一次 (1 = 每期重训，即旧行为)。
+    - window: 'expanding' 使用全部既往数据，'rolling' 只使用最近 window_size 期。
+    - use_incremental: 两次重训之间，若算法实现了 update() 则用新开奖数据增量更新；
+      否则直接复用上次训练的状态。增量更新只在 expanding 窗口下启用。
+    - score_store: 传入 ScoreTensorStore 时，每期的号码评分与实际开奖会写入评分张量，
+      之后的融合权重实验可直接读取张量，无需重跑评分器。
+    每一期都会记录训练/预测耗时与命中情况，最终汇总命中分布、奖级分布与 ROI。
+    """
 
-    def __init__(self, algorithm: BaseAlgorithm):
+    def __init__(self, algorithm: BaseAlgorithm, retrain_every: int = 1, window: str = 'expanding',
+                 window_size: Optional[int] = None, use_incremental: bool = True, max_tickets: int = 5,
+                 score_store: Optional[ScoreTensorStore] = None, score_label: Optional[str] = None):
+        if window not in ('expanding', 'rolling'):
+            raise ValueError(f"未知的窗口类型: {window}")
+        if window == 'rolling' and not window_size:
+            raise ValueError("rolling 窗口需要指定 window_size")
         self.algorithm = algorithm
+        self.retrain_every = max(1, int(retrain_every))
+        self.window = window
+        self.window_size = window_size
+        self.use_incremental = use_incremental and window == 'expanding'
+        self.max_tickets = max_tickets
+        self.score_store = score_store
+        self.score_label = score_label or getattr(algorithm, 'name', type(algorithm).__name__)
+
+    def _training_slice(self, history_data: List[LotteryHistory], i: int) -> List[LotteryHistory]:
+        if self.window == 'rolling':
+            return history_data[max(0, i - self.window_size):i]
+        return history_data[:i]
+
+    def _extract_tickets(self, prediction: Dict[str, Any]) -> List[tuple]:
+        """
+        从预测结果中提取投注号码。
+        组合型算法直接使用 front_numbers/back_numbers；评分型算法取前区前5、后区前2。
+        """
+        tickets = []
+        for rec in prediction.get('recommendations', [])[:self.max_tickets]:
+            front = rec.get('front_numbers')
+            back = rec.get('back_numbers')
+            if front is None and rec.get('front_number_scores'):
+                front = [item['number'] for item in rec['front_number_scores'][:5]]
+            if back is None and rec.get('back_number_scores'):
+                back = [item['number'] for item in rec['back_number_scores'][:2]]
+            if front:
+                tickets.append((set(front), set(back or [])))
+        return tickets
+
+    def _score_sources(self, prediction: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """需要写入评分张量的 {算法名: 预测}；集成优化器同时写入各子算法与融合结果。"""
+        if 'individual_predictions' in prediction:
+            sources = {entry['algorithm_version'].rsplit('_', 1)[0]: entry['predictions']
+                       for entry in prediction['individual_predictions']}
+            if 'ensembled_result' in prediction:
+                sources[self.score_label] = prediction['ensembled_result']
+            return sources
+        return {self.score_label: prediction}
 
-    def run(self, history_data: List[LotteryHistory], start_idx=50) -> Dict[str, Any]:
+    def run(self, history_data: List[LotteryHistory], start_idx=50,
+            step_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        steps = []
         rewards = []
-        for i in range(start_idx, len(history_data) - 1):
-            train_data = history_data[:i]
+        last_trained_idx = None   # 最近一次完整训练发生在哪一期
+        consumed_idx = 0          # 模型状态已经包含了 history_data[:consumed_idx]
+
+        for i in range(start_idx, len(history_data)):
+            train_data = self._training_slice(history_data, i)
             test = history_data[i]
-            self.algorithm.train(train_data)
+
+            t0 = time.perf_counter()
+            if last_trained_idx is None or i - last_trained_idx >= self.retrain_every:
+                self.algorithm.train(train_data)
+                last_trained_idx, consumed_idx, action = i, i, 'retrain'
+            elif self.use_incremental and self.algorithm.update(history_data[consumed_idx:i]):
+                consumed_idx, action = i, 'incremental'
+            else:
+                action = 'reuse'
+            t1 = time.perf_counter()
             res = self.algorithm.predict(train_data)
-            recs = res.get('recommendations', [])
-            hit = any(set(test.front_area).intersection(r.get('front_numbers', [])) for r in recs)
-            reward = 10 if hit else -1
-            rewards.append(reward)
+            t2 = time.perf_counter()
+
+            tickets = self._extract_tickets(res) if 'error' not in res else []
+            if self.score_store is not None:
+                if 'error' not in res:
+                    for label, prediction in self._score_sources(res).items():
+                        self.score_store.write_prediction(test.period_number, label, prediction)
+                self.score_store.write_actual(test.period_number, test.front_area, test.back_area)
+            actual_front, actual_back = set(test.front_area), set(test.back_area)
+            hits = [(len(front & actual_front), len(back & actual_back)) for front, back in tickets]
+            best_front, best_back = max(hits, key=lambda h: (PRIZE_AMOUNT_MATRIX[h], h[0] + h[1]), default=(0, 0))
+            prize = float(sum(PRIZE_AMOUNT_MATRIX[h] for h in hits))
+
+            # 兼容旧指标：任一推荐与前区有交集记 +10，否则 -1
+            rewards.append(10 if any(h[0] > 0 for h in hits) else -1)
+
+            step = {
+                'period_number': test.period_number,
+                'action': action,
+                'train_size': len(train_data),
+                'train_seconds': round(t1 - t0, 6),
+                'predict_seconds': round(t2 - t1, 6),
+                'tickets': len(tickets),
+                'front_hits': best_front,
+                'back_hits': best_back,
+                'prize_level': int(PRIZE_LEVEL_MATRIX[best_front, best_back]),
+                'prize': prize,
+                'cost': TICKET_PRICE * len(tickets),
+            }
+            steps.append(step)
+            if step_callback:
+                step_callback(step)
+
+        if self.score_store is not None:
+            self.score_store.flush()
+        return self._summarize(steps, rewards)
+
+    def _summarize(self, steps: List[Dict[str, Any]], rewards: List[int]) -> Dict[str, Any]:
+        periods = len(steps)
+        if not periods:
+            return {'periods': 0, 'win_rate': 0.0, 'avg_return': 0.0, 'steps': []}
+
+        total_cost = sum(s['cost'] for s in steps)
+        total_prize = sum(s['prize'] for s in steps)
+        train_seconds = sum(s['train_seconds'] for s in steps)
+        predict_seconds = sum(s['predict_seconds'] for s in steps)
+        actions = Counter(s['action'] for s in steps)
+        level_counts = Counter(s['prize_level'] for s in steps)
+
         return {
-            'periods': len(rewards),
-            'win_rate': sum(r > 0 for r in rewards) / len(rewards),
-            'avg_return': np.mean(rewards)
+            'periods': periods,
+            'win_rate': sum(r > 0 for r in rewards) / periods,
+            'avg_return': float(np.mean(rewards)),
+            'hit_distribution': {
+                'front': dict(sorted(Counter(s['front_hits'] for s in steps).items())),
+                'back': dict(sorted(Counter(s['back_hits'] for s in steps).items())),
+                'combined': dict(sorted(Counter(f"{s['front_hits']}+{s['back_hits']}" for s in steps).items())),
+            },
+            'avg_front_hits': float(np.mean([s['front_hits'] for s in steps])),
+            'avg_back_hits': float(np.mean([s['back_hits'] for s in steps])),
+            'prize_tiers': {LEVEL_NAMES[level]: count for level, count in sorted(level_counts.items()) if level},
+            'prize_win_rate': sum(1 for s in steps if s['prize'] > 0) / periods,
+            'total_cost': total_cost,
+            'total_prize': total_prize,
+            'roi': (total_prize - total_cost) / total_cost if total_cost else 0.0,
+            'timing': {
+                'train_seconds': round(train_seconds, 4),
+                'predict_seconds': round(predict_seconds, 4),
+                'periods_per_second': round(periods / max(train_seconds + predict_seconds, 1e-9), 2),
+                'retrains': actions.get('retrain', 0),
+                'incremental_updates': actions.get('incremental', 0),
+                'reused': actions.get('reuse', 0),
+            },
+            'config': {'retrain_every': self.retrain_every, 'window': self.window,
+                       'window_size': self.window_size, 'use_incremental': self.use_incremental},
+            'steps': steps,
         }
-
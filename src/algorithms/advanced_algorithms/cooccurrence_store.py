@@ -0,0 +1,291 @@
+# src/algorithms/advanced_algorithms/cooccurrence_store.py
+from typing import List, Dict, Any, Sequence, Optional
+from itertools import combinations
+import logging
+import numpy as np
+from src.model.lottery_models import LotteryHistory
+
+AREA_SIZES = {'front': 35, 'back': 12}
+# 前区三元组按 (i<j<k) 的字典序编号，共 C(35,3) = 6545 个
+TRIPLE_COMBOS = np.array(list(combinations(range(35), 3)), dtype=np.int16)
+TRIPLE_RANK = np.full((35, 35, 35), -1, dtype=np.int32)
+TRIPLE_RANK[TRIPLE_COMBOS[:, 0], TRIPLE_COMBOS[:, 1], TRIPLE_COMBOS[:, 2]] = np.arange(len(TRIPLE_COMBOS))
+
+# 与 number_statistics 一同维护的持久化表
+COOCCURRENCE_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS `number_cooccurrence` (
+  `decay` decimal(6, 4) NOT NULL DEFAULT 1.0000 COMMENT '指数衰减系数 (1 表示不衰减)',
+  `number_type` enum('front','back') CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '号码类型',
+  `number_a` tinyint(4) NOT NULL COMMENT '号码A (0 表示元数据行)',
+  `number_b` tinyint(4) NOT NULL DEFAULT 0 COMMENT '号码B (0 表示单号计数)',
+  `number_c` tinyint(4) NOT NULL DEFAULT 0 COMMENT '号码C (0 表示号码对)',
+  `weight` double NOT NULL DEFAULT 0 COMMENT '(衰减后的) 共现权重',
+  `draw_count` int(11) NOT NULL DEFAULT 0 COMMENT '元数据行: 已计入的开奖期数',
+  `last_period` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL DEFAULT NULL COMMENT '元数据行: 最后计入的期号',
+  `last_updated` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`decay`, `number_type`, `number_a`, `number_b`, `number_c`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '号码对/三元组共现统计表' ROW_FORMAT = DYNAMIC
+"""
+
+# number_cooccurrence 表中持久化的衰减系数 (system_orchestrator 写入、ImperialSenate 读取共用)
+PERSISTED_DECAY = 0.95
+
+# 缩放因子低于该值时把权重落实到数组并复位，防止浮点下溢
+_RESCALE_THRESHOLD = 1e-100
+
+
+class CooccurrenceStore:
+    """
+    号码共现存储：前区 35×35、后区 12×12 号码对矩阵 + 前区 C(35,3) 三元组表 + 单号计数。
+    - decay < 1 时为指数衰减计数：每来一期，旧数据权重乘以 decay。
+      实现上不逐项乘衰减，而是维护全局缩放因子 scale (真实权重 = 存储值 × scale)，
+      新一期以 1/scale 的权重写入，因此每期更新只触及 10 个号码对和 10 个三元组，为 O(1)。
+    - 支持从数据库增量刷新 (只读取 last_period 之后的新开奖) 并回写到 number_cooccurrence 表。
+    """
+
+    def __init__(self, decay: float = 1.0):
+        if not 0 < decay <= 1:
+            raise ValueError("decay 必须在 (0, 1] 区间内")
+        self.decay = float(decay)
+        self._singles = {area: np.zeros(size) for area, size in AREA_SIZES.items()}
+        self._pairs = {area: np.zeros((size, size)) for area, size in AREA_SIZES.items()}
+        self._triples = np.zeros(len(TRIPLE_COMBOS))
+        self._total = 0.0
+        self._scale = 1.0
+        self.draw_count = 0
+        self.last_period: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # 构建与增量更新
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_history(cls, history_data: List[LotteryHistory], decay: float = 1.0) -> 'CooccurrenceStore':
+        """批量构建：号码对由 one-hot 矩阵的加权内积得到，三元组用 bincount 聚合。"""
+        store = cls(decay)
+        store.extend(history_data)
+        return store
+
+    def extend(self, records: List[LotteryHistory]):
+        records = sorted(records, key=lambda r: str(r.period_number))
+        if not records:
+            return
+        if len(records) < 16:
+            for record in records:
+                self.update(record)
+            return
+
+        n = len(records)
+        self._apply_decay(self.decay ** n)
+        # 第 t 期 (0 起) 在本批结束时的真实权重为 decay^(n-1-t)，换算为存储值再除以 scale
+        weights = self.decay ** np.arange(n - 1, -1, -1, dtype=np.float64) / self._scale
+
+        for area, size in AREA_SIZES.items():
+            onehot = np.zeros((n, size))
+            for t, record in enumerate(records):
+                numbers = [x - 1 for x in self._valid(record, area)]
+                onehot[t, numbers] = 1.0
+            weighted = onehot * weights[:, None]
+            self._singles[area] += weighted.sum(axis=0)
+            pairs = weighted.T @ onehot
+            np.fill_diagonal(pairs, 0.0)
+            self._pairs[area] += pairs
+
+        ranks, rank_weights = [], []
+        for t, record in enumerate(records):
+            front = sorted(x - 1 for x in self._valid(record, 'front'))
+            for i, j, k in combinations(front, 3):
+                ranks.append(TRIPLE_RANK[i, j, k])
+                rank_weights.append(weights[t])
+        if ranks:
+            self._triples += np.bincount(ranks, weights=rank_weights, minlength=len(TRIPLE_COMBOS))
+
+        self._total += weights.sum()
+        self.draw_count += n
+        self.last_period = str(records[-1].period_number)
+
+    def update(self, record: LotteryHistory):
+        """计入一期新开奖，复杂度与历史长度无关。"""
+        self._apply_decay(self.decay)
+        w = 1.0 / self._scale
+        for area in AREA_SIZES:
+            numbers = sorted(x - 1 for x in self._valid(record, area))
+            singles, pairs = self._singles[area], self._pairs[area]
+            singles[numbers] += w
+            for i, j in combinations(numbers, 2):
+                pairs[i, j] += w
+                pairs[j, i] += w
+            if area == 'front':
+                for i, j, k in combinations(numbers, 3):
+                    self._triples[TRIPLE_RANK[i, j, k]] += w
+        self._total += w
+        self.draw_count += 1
+        self.last_period = str(record.period_number)
+
+    def _apply_decay(self, factor: float):
+        if factor == 1.0:
+            return
+        self._scale *= factor
+        if self._scale < _RESCALE_THRESHOLD:
+            for area in AREA_SIZES:
+                self._singles[area] *= self._scale
+                self._pairs[area] *= self._scale
+            self._triples *= self._scale
+            self._total *= self._scale
+            self._scale = 1.0
+
+    @staticmethod
+    def _valid(record: LotteryHistory, area: str) -> List[int]:
+        numbers = record.front_area if area == 'front' else record.back_area
+        return sorted({int(x) for x in numbers if x is not None and 1 <= int(x) <= AREA_SIZES[area]})
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    @property
+    def total_weight(self) -> float:
+        return self._total * self._scale
+
+    def singles(self, area: str) -> np.ndarray:
+        """各号码的 (衰减) 出现权重，下标 0 对应号码 1。"""
+        return self._singles[area] * self._scale
+
+    def pairs(self, area: str) -> np.ndarray:
+        """对称的号码对共现权重矩阵，对角线为 0。"""
+        return self._pairs[area] * self._scale
+
+    def pair_weight(self, area: str, a: int, b: int) -> float:
+        return float(self._pairs[area][a - 1, b - 1] * self._scale)
+
+    def triple_weight(self, a: int, b: int, c: int) -> float:
+        i, j, k = sorted((a - 1, b - 1, c - 1))
+        rank = TRIPLE_RANK[i, j, k]
+        return float(self._triples[rank] * self._scale) if rank >= 0 else 0.0
+
+    def triples(self) -> np.ndarray:
+        """(6545,) 三元组权重，与 TRIPLE_COMBOS 一一对应。"""
+        return self._triples * self._scale
+
+    def conditional(self, area: str, given: Sequence[int]) -> np.ndarray:
+        """
+        条件共现概率 P(x 同期出现 | given 全部出现)，返回长度为号码数的数组 (given 本身为 0)。
+        前区给定 2 个号码时使用三元组精确计算；其余情况取各给定号码条件概率的平均。
+        """
+        size = AREA_SIZES[area]
+        given = sorted({int(g) for g in given if 1 <= int(g) <= size})
+        result = np.zeros(size)
+        if not given:
+            total = self._total
+            return self._singles[area] / total if total > 0 else result
+
+        if area == 'front' and len(given) == 2:
+            i, j = given[0] - 1, given[1] - 1
+            denom = self._pairs[area][i, j]
+            if denom > 0:
+                others = np.array([k for k in range(size) if k not in (i, j)])
+                trip = np.sort(np.stack([np.full(len(others), i), np.full(len(others), j), others], axis=1), axis=1)
+                result[others] = self._triples[TRIPLE_RANK[trip[:, 0], trip[:, 1], trip[:, 2]]] / denom
+            return result
+
+        singles = self._singles[area]
+        rows = [self._pairs[area][g - 1] / singles[g - 1] for g in given if singles[g - 1] > 0]
+        if rows:
+            result = np.mean(rows, axis=0)
+        result[[g - 1 for g in given]] = 0.0
+        return result
+
+    def top_pairs(self, area: str, k: int = 10) -> List[Dict[str, Any]]:
+        pairs = self.pairs(area)
+        iu = np.triu_indices(len(pairs), 1)
+        values = pairs[iu]
+        order = np.argsort(-values, kind='stable')[:k]
+        return [{'numbers': [int(iu[0][o]) + 1, int(iu[1][o]) + 1], 'weight': round(float(values[o]), 4)}
+                for o in order if values[o] > 0]
+
+    def companions(self, area: str, k: int, seeds: Sequence[int] = ()) -> List[int]:
+        """
+        贪心选出 k 个彼此共现最强的号码：以 seeds (缺省为权重最高的单号) 起步，
+        每次加入与已选号码共现权重之和最大的号码，平局时取单号权重更高者。
+        """
+        size = AREA_SIZES[area]
+        singles, pairs = self.singles(area), self.pairs(area)
+        chosen = [int(s) - 1 for s in seeds if 1 <= int(s) <= size][:k]
+        if not chosen and k > 0:
+            chosen = [int(np.argmax(singles))]
+        while len(chosen) < min(k, size):
+            strength = pairs[chosen].sum(axis=0) + singles * 1e-9
+            strength[chosen] = -np.inf
+            chosen.append(int(np.argmax(strength)))
+        return sorted(c + 1 for c in chosen)
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+    def to_rows(self) -> List[tuple]:
+        """(decay, number_type, a, b, c, weight, draw_count, last_period) 行，只输出非零权重。"""
+        rows = [(self.decay, 'front', 0, 0, 0, self.total_weight, self.draw_count, self.last_period)]
+        for area in AREA_SIZES:
+            singles, pairs = self.singles(area), self.pairs(area)
+            rows.extend((self.decay, area, i + 1, 0, 0, float(w), 0, None) for i, w in enumerate(singles) if w > 0)
+            for i, j in zip(*np.triu_indices(len(pairs), 1)):
+                if pairs[i, j] > 0:
+                    rows.append((self.decay, area, int(i) + 1, int(j) + 1, 0, float(pairs[i, j]), 0, None))
+        triples = self.triples()
+        for rank in np.flatnonzero(triples > 0):
+            i, j, k = TRIPLE_COMBOS[rank]
+            rows.append((self.decay, 'front', int(i) + 1, int(j) + 1, int(k) + 1, float(triples[rank]), 0, None))
+        return rows
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]], decay: float = 1.0) -> 'CooccurrenceStore':
+        store = cls(decay)
+        for row in rows:
+            a, b, c, w = int(row['number_a']), int(row['number_b']), int(row['number_c']), float(row['weight'])
+            area = row['number_type']
+            if a == 0:
+                store._total, store.draw_count, store.last_period = w, int(row['draw_count']), row['last_period']
+            elif b == 0:
+                store._singles[area][a - 1] = w
+            elif c == 0:
+                store._pairs[area][a - 1, b - 1] = store._pairs[area][b - 1, a - 1] = w
+            else:
+                store._triples[TRIPLE_RANK[a - 1, b - 1, c - 1]] = w
+        return store
+
+    def save(self, db_manager) -> bool:
+        """整体替换该 decay 下的持久化数据 (单个事务内完成)。"""
+        try:
+            with db_manager.transaction() as cursor:
+                cursor.execute(COOCCURRENCE_TABLE_DDL)
+                cursor.execute("DELETE FROM number_cooccurrence WHERE decay = %s", (self.decay,))
+                cursor.executemany(
+                    "INSERT INTO number_cooccurrence (decay, number_type, number_a, number_b, number_c, weight, "
+                    "draw_count, last_period) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", self.to_rows())
+            return True
+        except Exception as e:
+            logging.error(f"保存共现统计失败: {e}")
+            return False
+
+    @classmethod
+    def load(cls, db_manager, decay: float = 1.0) -> 'CooccurrenceStore':
+        rows = db_manager.execute_query(
+            "SELECT number_type, number_a, number_b, number_c, weight, draw_count, last_period "
+            "FROM number_cooccurrence WHERE decay = %s", (decay,))
+        return cls.from_rows(rows or [], decay)
+
+    @classmethod
+    def refresh(cls, db_manager, decay: float = 1.0) -> 'CooccurrenceStore':
+        """读取已持久化的共现统计，只计入 last_period 之后的新开奖，再写回数据库。"""
+        try:
+            store = cls.load(db_manager, decay)
+        except Exception:
+            store = cls(decay)
+        query = "SELECT * FROM lottery_history ORDER BY period_number ASC"
+        params = None
+        if store.last_period:
+            query = "SELECT * FROM lottery_history WHERE period_number > %s ORDER BY period_number ASC"
+            params = (store.last_period,)
+        new_records = [LotteryHistory.from_dict(row) for row in db_manager.execute_query(query, params) or []]
+        if new_records:
+            store.extend(new_records)
+            store.save(db_manager)
+        return store
@@ -0,0 +1,154 @@
+# src/algorithms/advanced_algorithms/ensemble_weight_fitter.py
+from typing import List, Dict, Any, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+import os
+import numpy as np
+
+FRONT_NUMBERS = 35
+BACK_NUMBERS = 12
+OBJECTIVES = ('top_k', 'log_likelihood')
+
+
+class EnsembleWeightFitter:
+    """
+    基于历史评分张量拟合融合权重
+    - 输入为 (期数, 算法数, 47) 的评分张量 (ScoreTensorStore.tensor()) 与 (期数, 47) 的实际开奖矩阵;
+    - 目标函数 (全部向量化，一次计算一批候选权重):
+      'top_k'          融合评分前区取前 top_front、后区取前 top_back 时的平均命中数;
+      'log_likelihood' 把融合评分按区域归一化为概率后，实际开奖号码的平均对数似然;
+    - 正则化：目标减去 l2 × 算法数 × ||w - 均匀权重||²，样本少时权重自然收缩到均匀分配;
+    - 候选权重：均匀、各单算法顶点、上次最优解，以及围绕当前最优解的 Dirichlet 采样，
+      逐轮提高集中度做局部细化；候选分块后由线程池并行评估 (numpy 运算期间释放 GIL)。
+    fit_rolling 每期只用最近 window 期重拟合，并以上一期的最优解热启动 (只做一轮局部细化)，
+    单次重拟合在毫秒级。
+    """
+
+    def __init__(self, objective: str = 'top_k', window: int = 200, l2: float = 0.05, top_front: int = 5,
+                 top_back: int = 2, n_candidates: int = 128, rounds: int = 3, n_jobs: Optional[int] = None,
+                 seed: int = 2024):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"未知的目标函数: {objective}")
+        self.objective = objective
+        self.window = window
+        self.l2 = l2
+        self.top_front = top_front
+        self.top_back = top_back
+        self.n_candidates = n_candidates
+        self.rounds = rounds
+        self.n_jobs = n_jobs or min(4, os.cpu_count() or 1)
+        self.rng = np.random.default_rng(seed)
+        self.last_weights: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------
+    # 目标函数
+    # ------------------------------------------------------------------
+    def _evaluate(self, scores: np.ndarray, actuals: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """scores (P, A, 47)、actuals (P, 47)、candidates (C, A) -> (C,) 目标值 (越大越好，未含正则项)。"""
+        fused = np.einsum('pan,ca->cpn', scores, candidates)
+        front, back = fused[..., :FRONT_NUMBERS], fused[..., FRONT_NUMBERS:]
+        actual_front, actual_back = actuals[:, :FRONT_NUMBERS], actuals[:, FRONT_NUMBERS:]
+
+        if self.objective == 'top_k':
+            # 只需前 K 名的集合，argpartition 比完整排序快得多
+            front_top = np.argpartition(-front, self.top_front - 1, axis=2)[..., :self.top_front]
+            back_top = np.argpartition(-back, self.top_back - 1, axis=2)[..., :self.top_back]
+            hits = np.take_along_axis(np.broadcast_to(actual_front, front.shape), front_top, axis=2).sum(axis=2) + \
+                np.take_along_axis(np.broadcast_to(actual_back, back.shape), back_top, axis=2).sum(axis=2)
+            return hits.mean(axis=1)
+
+        total = 0.0
+        for area, actual in ((front, actual_front), (back, actual_back)):
+            area = np.maximum(area, 0.0) + 1e-6
+            log_prob = np.log(area) - np.log(area.sum(axis=2, keepdims=True))
+            total = total + (log_prob * actual).sum(axis=2)
+        return total.mean(axis=1)
+
+    def objective_values(self, scores: np.ndarray, actuals: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """带正则项的目标值；候选数较多时分块交给线程池并行计算。"""
+        n_algos = scores.shape[1]
+        penalty = self.l2 * n_algos * ((candidates - 1.0 / n_algos) ** 2).sum(axis=1)
+        chunks = np.array_split(np.arange(len(candidates)), min(self.n_jobs, len(candidates)))
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                parts = list(executor.map(lambda idx: self._evaluate(scores, actuals, candidates[idx]), chunks))
+            values = np.concatenate(parts)
+        else:
+            values = self._evaluate(scores, actuals, candidates)
+        return values - penalty
+
+    # ------------------------------------------------------------------
+    # 拟合
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _prepare(scores: np.ndarray, actuals: np.ndarray):
+        # 缺失评分视为 0，与 DynamicEnsembleOptimizer._ensemble_scores 的处理一致
+        return np.nan_to_num(np.asarray(scores, dtype=np.float32)), np.asarray(actuals, dtype=np.float32)
+
+    def fit(self, scores: np.ndarray, actuals: np.ndarray, warm_start: Optional[np.ndarray] = None) -> np.ndarray:
+        """在给定的 (期数, 算法数, 47) 样本上拟合，返回和为 1 的非负权重。"""
+        scores, actuals = self._prepare(scores, actuals)
+        n_algos = scores.shape[1]
+        uniform = np.full(n_algos, 1.0 / n_algos)
+        if len(scores) == 0 or n_algos == 1:
+            return uniform
+
+        seeds = [uniform, *np.eye(n_algos)]
+        warm = warm_start is not None and len(warm_start) == n_algos
+        if warm:
+            # 热启动：窗口只滑动了一期，最优解变化很小，跳过全局采样，只做一轮局部细化
+            seeds.append(np.asarray(warm_start, dtype=np.float64))
+            candidates = np.array(seeds)
+        else:
+            candidates = np.vstack([np.array(seeds), self.rng.dirichlet(np.ones(n_algos), self.n_candidates)])
+        values = self.objective_values(scores, actuals, candidates)
+        best, best_value = candidates[np.argmax(values)], values.max()
+
+        concentration = 20.0 * 3 ** (self.rounds - 1) if warm else 20.0
+        for _ in range(1 if warm else self.rounds):
+            local = self.rng.dirichlet(best * concentration * n_algos + 1e-3, self.n_candidates)
+            local_values = self.objective_values(scores, actuals, local)
+            if local_values.max() > best_value:
+                best, best_value = local[np.argmax(local_values)], local_values.max()
+            concentration *= 3
+        self.last_weights = best / best.sum()
+        return self.last_weights
+
+    def fit_rolling(self, scores: np.ndarray, actuals: np.ndarray, start: Optional[int] = None) -> np.ndarray:
+        """
+        逐期滚动拟合：第 t 期的权重只用 [t-window, t) 的样本，返回 (期数, 算法数)。
+        t < start (默认 = 算法数 × 5) 时样本太少，使用均匀权重。
+        """
+        n_periods, n_algos = scores.shape[0], scores.shape[1]
+        start = start if start is not None else n_algos * 5
+        weights = np.full((n_periods, n_algos), 1.0 / n_algos)
+        previous = None
+        for t in range(max(start, 1), n_periods):
+            rows = slice(max(0, t - self.window), t)
+            previous = self.fit(scores[rows], actuals[rows], warm_start=previous)
+            weights[t] = previous
+        return weights
+
+    def evaluate_rolling(self, scores: np.ndarray, actuals: np.ndarray, weights: np.ndarray) -> Dict[str, float]:
+        """按 fit_rolling 给出的逐期权重做样本外评估 (每期只用当期权重)。"""
+        scores, actuals = self._prepare(scores, actuals)
+        fused = np.einsum('pan,pa->pn', scores, weights)
+        front_top = np.argsort(-fused[:, :FRONT_NUMBERS], axis=1, kind='stable')[:, :self.top_front]
+        back_top = np.argsort(-fused[:, FRONT_NUMBERS:], axis=1, kind='stable')[:, :self.top_back]
+        front_hits = np.take_along_axis(actuals[:, :FRONT_NUMBERS], front_top, axis=1).sum(axis=1)
+        back_hits = np.take_along_axis(actuals[:, FRONT_NUMBERS:], back_top, axis=1).sum(axis=1)
+        return {'avg_front_hits': float(front_hits.mean()), 'avg_back_hits': float(back_hits.mean())}
+
+    def fit_store(self, score_store, algorithms: Optional[Sequence[str]] = None,
+                  end_period: Optional[str] = None) -> Dict[str, float]:
+        """
+        直接在 ScoreTensorStore 上拟合最近 window 期 (截止到 end_period，含)，
+        返回 DynamicEnsembleOptimizer.algorithm_weights 使用的 {算法名: 权重}。
+        """
+        algorithms = [a for a in (algorithms or score_store.algorithms) if a in score_store.algorithms]
+        if not algorithms:
+            return {}
+        rows = score_store.period_slice(end_period=end_period)
+        rows = slice(max(rows.start, rows.stop - self.window), rows.stop)
+        weights = self.fit(score_store.tensor(algorithms)[rows], score_store.actuals()[rows],
+                           warm_start=self.last_weights)
+        return {name: float(w) for name, w in zip(algorithms, weights)}
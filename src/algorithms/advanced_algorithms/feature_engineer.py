@@ -1,10 +1,16 @@
 # src/algorithms/advanced_algorithms/feature_engineer.py
-from typing import List, Tuple
+from typing import List, Tuple, Sequence
 import numpy as np
 import pandas as pd
-from collections import Counter
 from src.model.lottery_models import LotteryHistory
 
+FRONT_NUMBERS = 35
+BACK_NUMBERS = 12
+# 每个回看窗口产出的特征列: 5 个汇总特征 + 35 个前区频次 + 12 个后区频次
+_SUMMARY_COLUMNS = ['mean_sum', 'std_sum', 'mean_odd_ratio', 'front_unique', 'back_unique']
+_BLOCK_WIDTH = len(_SUMMARY_COLUMNS) + FRONT_NUMBERS + BACK_NUMBERS
+
+
 class FeatureEngineer:
     """
     将历史开奖转换为机器学习/深度学习可用的特征。
@@ -13,44 +19,73 @@ class FeatureEngineer:
 
     @staticmethod
     def build_features(history_data: List[LotteryHistory], lookback: int = 20) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        if len(history_data) < lookback + 1:
+        return FeatureEngineer.build_rolling_features(history_data, lookbacks=(lookback,))
+
+    @staticmethod
+    def feature_columns(lookbacks: Sequence[int]) -> List[str]:
+        """特征列名。单窗口时沿用旧列名，多窗口时追加 _w{lookback} 后缀区分。"""
+        block = _SUMMARY_COLUMNS + [f'front_freq_{n}' for n in range(1, FRONT_NUMBERS + 1)] \
+            + [f'back_freq_{n}' for n in range(1, BACK_NUMBERS + 1)]
+        if len(lookbacks) == 1:
+            return block
+        return [f'{col}_w{lb}' for lb in lookbacks for col in block]
+
+    @staticmethod
+    def build_rolling_features(history_data: List[LotteryHistory],
+                               lookbacks: Sequence[int] = (20,)) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        滑动窗口特征构建，耗时与历史长度呈线性关系。
+
+        对每一期先做一次 one-hot / 和值 / 奇偶统计，再求前缀和 P；
+        窗口 [i-lb, i) 的计数 = P[i] - P[i-lb]，即“加上进入窗口的一期、减去离开窗口的一期”，
+        所有窗口、所有回看长度在同一次遍历中直接写入预分配的特征矩阵。
+        行 i 的目标为第 i+1 期的和值 (与旧实现一致)。
+        返回的 DataFrame 直接包裹该矩阵，不做额外复制。
+        """
+        lookbacks = sorted({int(lb) for lb in lookbacks})
+        max_lookback = lookbacks[-1]
+        if len(history_data) < max_lookback + 1:
             return pd.DataFrame(), pd.DataFrame()
 
-        rows, targets = [], []
-        history_sorted = sorted(history_data, key=lambda r: r.date)
-
-        for i in range(lookback, len(history_sorted) - 1):
-            window = history_sorted[i - lookback:i]
-            next_rec = history_sorted[i + 1]
-
-            front_counts = Counter()
-            back_counts = Counter()
-            sums, odd_ratios = [], []
-
-            for w in window:
-                front_counts.update(w.front_area)
-                back_counts.update(w.back_area)
-                total = sum(w.front_area + w.back_area)
-                sums.append(total)
-                odd = sum(1 for n in w.front_area + w.back_area if n % 2 == 1)
-                even = len(w.front_area) + len(w.back_area) - odd
-                odd_ratios.append(odd / (even + 1e-6))
-
-            features = {
-                'mean_sum': np.mean(sums),
-                'std_sum': np.std(sums),
-                'mean_odd_ratio': np.mean(odd_ratios),
-                'front_unique': len(front_counts),
-                'back_unique': len(back_counts)
-            }
-
-            for num in range(1, 36):
-                features[f'front_freq_{num}'] = front_counts.get(num, 0)
-            for num in range(1, 13):
-                features[f'back_freq_{num}'] = back_counts.get(num, 0)
-
-            target_sum = sum(next_rec.front_area) + sum(next_rec.back_area)
-            rows.append(features)
-            targets.append({'target_sum': target_sum})
-
-        return pd.DataFrame(rows), pd.DataFrame(targets)
+        history_sorted = sorted(history_data, key=lambda r: str(r.period_number))
+        n = len(history_sorted)
+        front = np.array([r.front_area for r in history_sorted], dtype=np.int64)
+        back = np.array([r.back_area for r in history_sorted], dtype=np.int64)
+
+        front_onehot = np.zeros((n, FRONT_NUMBERS), dtype=np.int64)
+        back_onehot = np.zeros((n, BACK_NUMBERS), dtype=np.int64)
+        np.put_along_axis(front_onehot, front - 1, 1, axis=1)
+        np.put_along_axis(back_onehot, back - 1, 1, axis=1)
+
+        draw_sums = (front.sum(axis=1) + back.sum(axis=1)).astype(np.float64)
+        odd = (front % 2).sum(axis=1) + (back % 2).sum(axis=1)
+        even = front.shape[1] + back.shape[1] - odd
+        odd_ratios = odd / (even + 1e-6)
+
+        def prefix(values: np.ndarray) -> np.ndarray:
+            out = np.zeros((n + 1,) + values.shape[1:], dtype=np.float64)
+            np.cumsum(values, axis=0, out=out[1:])
+            return out
+
+        p_sum, p_sum_sq, p_odd = prefix(draw_sums), prefix(draw_sums ** 2), prefix(odd_ratios)
+        p_front, p_back = prefix(front_onehot), prefix(back_onehot)
+
+        rows = np.arange(max_lookback, n - 1)
+        matrix = np.empty((len(rows), _BLOCK_WIDTH * len(lookbacks)), dtype=np.float64)
+        for block, lb in enumerate(lookbacks):
+            lo, hi = rows - lb, rows
+            out = matrix[:, block * _BLOCK_WIDTH:(block + 1) * _BLOCK_WIDTH]
+            mean_sum = (p_sum[hi] - p_sum[lo]) / lb
+            out[:, 0] = mean_sum
+            out[:, 1] = np.sqrt(np.maximum((p_sum_sq[hi] - p_sum_sq[lo]) / lb - mean_sum ** 2, 0.0))
+            out[:, 2] = (p_odd[hi] - p_odd[lo]) / lb
+            front_counts = out[:, 5:5 + FRONT_NUMBERS]
+            back_counts = out[:, 5 + FRONT_NUMBERS:]
+            np.subtract(p_front[hi], p_front[lo], out=front_counts)
+            np.subtract(p_back[hi], p_back[lo], out=back_counts)
+            out[:, 3] = np.count_nonzero(front_counts, axis=1)
+            out[:, 4] = np.count_nonzero(back_counts, axis=1)
+
+        features = pd.DataFrame(matrix, columns=FeatureEngineer.feature_columns(lookbacks), copy=False)
+        targets = pd.DataFrame({'target_sum': draw_sums[rows + 1].astype(np.int64)})
+        return features, targets
@@ -2,101 +2,208 @@
 
 from src.algorithms.base_algorithm import BaseAlgorithm
 from src.model.lottery_models import LotteryHistory
-from typing import List, Dict, Any
-import random
+from src.utils.bitmask import (FRONT_RANGE, BACK_RANGE, numbers_to_mask, mask_to_numbers,
+                               popcount64, masks_to_bits, bits_to_masks, history_to_masks)
+from typing import List, Dict, Any, Optional
 import numpy as np
 
+
 class HitRateOptimizer(BaseAlgorithm):
     """
-    命中率优化算法
+    命中率优化算法 (V2.0 - 位掩码向量化版)
     通过遗传搜索和历史回测，找到期望命中率最高的号码组合。
+    - 种群以 uint64 位掩码编码，一代的适应度 = 一次 (种群 × 验证期) 的向量化 popcount。
+    - 支持精英保留、锦标赛选择与平台期早停，前区与后区分别独立搜索。
     """
+    name = "HitRateOptimizer"
+    version = "2.0"
 
-    def __init__(self, sub_models: List[BaseAlgorithm]):
-        super().__init__("hit_rate_optimizer", "1.0")
-        self.sub_models = sub_models
+    def __init__(self, sub_models: Optional[List[BaseAlgorithm]] = None):
+        super().__init__()
+        self.sub_models = sub_models or []
         self.parameters = {
             'population_size': 30,
             'generations': 50,
-            'mutation_rate': 0.15
+            'mutation_rate': 0.15,
+            'elite_count': 2,
+            'tournament_size': 3,
+            'eval_window': 30,        # 最近N期用于验证
+            'patience': 10,           # 连续N代最优适应度无提升则早停
+            'min_improvement': 1e-6,
+            'top_k': 5,               # 输出的最佳组合数量
+            'candidate_top_n': 15,    # 从评分型子模型中各取前N个号码进入候选池
+            'optimize_back': True,
+            'seed': None
         }
         self.best_combinations = []
+        self.best_back_combinations = []
+        self.search_stats = {}
+
+    # ------------------------------------------------------------------
+    # 适应度
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _fitness(population: np.ndarray, draw_masks: np.ndarray, numbers_per_draw: int) -> np.ndarray:
+        """整代适应度: 每个个体在验证期内的平均命中率，(P,) & (D,) -> (P, D) popcount。"""
+        if len(draw_masks) == 0:
+            return np.zeros(len(population))
+        hits = popcount64(population[:, None] & draw_masks[None, :]).sum(axis=1)
+        return hits / float(len(draw_masks) * numbers_per_draw)
 
     def _evaluate_hit_score(self, candidate, history_data):
-        """计算组合在历史数据中的平均命中率"""
-        hits = 0
-        total = 0
-        for rec in history_data[-30:]:  # 最近30期验证
-            hit_count = len(set(candidate).intersection(set(rec.front_area)))
-            hits += hit_count
-            total += len(rec.front_area)
-        return hits / (total or 1)
-
+        """计算单个组合在历史数据中的平均命中率 (保留旧接口)。"""
+        draw_masks, _ = history_to_masks(history_data[-self.parameters['eval_window']:])
+        population = np.array([numbers_to_mask(candidate)], dtype=np.uint64)
+        return float(self._fitness(population, draw_masks, 5)[0])
+
+    # ------------------------------------------------------------------
+    # 训练
+    # ------------------------------------------------------------------
     def train(self, history_data: List[LotteryHistory]) -> bool:
         if not history_data:
             return False
 
-        # 从子模型收集候选号码
-        candidate_pool = set()
-        for m in self.sub_models:
-            m.train(history_data)
-            res = m.predict(history_data)
-            for r in res.get('recommendations', []):
-                candidate_pool.update(r.get('front_numbers', []))
-
-        candidate_pool = list(candidate_pool)
-        if len(candidate_pool) < 10:
-            candidate_pool = random.sample(range(1, 36), 15)
+        rng = np.random.default_rng(self.parameters['seed'])
+        front_pool, back_pool = self._collect_candidate_pools(history_data, rng)
+        front_draws, back_draws = history_to_masks(history_data[-self.parameters['eval_window']:])
 
-        # 初始化种群
-        population = [random.sample(candidate_pool, 5) for _ in range(self.parameters['population_size'])]
+        front_best, front_stats = self._genetic_search(front_pool, FRONT_RANGE, 5, front_draws, rng)
+        self.best_combinations = [mask_to_numbers(m) for m in front_best]
+        self.search_stats = {'front': front_stats}
 
-        for g in range(self.parameters['generations']):
-            fitness = [self._evaluate_hit_score(ind, history_data) for ind in population]
-            selected = self._select(population, fitness)
-            children = self._crossover(selected)
-            population = self._mutate(children, candidate_pool)
+        if self.parameters['optimize_back']:
+            back_best, back_stats = self._genetic_search(back_pool, BACK_RANGE, 2, back_draws, rng)
+            self.best_back_combinations = [mask_to_numbers(m) for m in back_best]
+            self.search_stats['back'] = back_stats
 
-        # 取前5组作为最佳推荐
-        scored = [(p, self._evaluate_hit_score(p, history_data)) for p in population]
-        scored.sort(key=lambda x: x[1], reverse=True)
-        self.best_combinations = [s[0] for s in scored[:5]]
         self.is_trained = True
         return True
 
-    def _select(self, population, fitness):
-        probs = np.array(fitness) / (np.sum(fitness) + 1e-9)
-        idx = np.random.choice(len(population), size=len(population)//2, p=probs)
-        return [population[i] for i in idx]
-
-    def _crossover(self, parents):
-        children = []
-        for i in range(0, len(parents)-1, 2):
-            p1, p2 = parents[i], parents[i+1]
-            cut = random.randint(1, 4)
-            child = list(set(p1[:cut] + p2[cut:]))[:5]
-            if len(child) < 5:
-                child += random.sample(range(1, 36), 5 - len(child))
-            children.append(child)
-        return children
-
-    def _mutate(self, population, pool):
-        for p in population:
-            if random.random() < self.parameters['mutation_rate']:
-                idx = random.randint(0, len(p)-1)
-                p[idx] = random.choice(pool)
+    def _collect_candidate_pools(self, history_data: List[LotteryHistory], rng: np.random.Generator):
+        """从子模型收集候选号码，兼容 front_numbers 列表与 front_number_scores 评分两种输出。"""
+        top_n = self.parameters['candidate_top_n']
+        front_pool, back_pool = set(), set()
+        for m in self.sub_models:
+            m.train(history_data)
+            res = m.predict(history_data)
+            for r in res.get('recommendations', []):
+                front_pool.update(r.get('front_numbers', []))
+                back_pool.update(r.get('back_numbers', []))
+                front_pool.update(item['number'] for item in r.get('front_number_scores', [])[:top_n])
+                back_pool.update(item['number'] for item in r.get('back_number_scores', [])[:top_n // 3 + 1])
+
+        if len(front_pool) < 10:
+            front_pool = set(rng.choice(np.arange(1, FRONT_RANGE + 1), 15, replace=False).tolist())
+        if len(back_pool) < 4:
+            back_pool = set(range(1, BACK_RANGE + 1))
+        return sorted(front_pool), sorted(back_pool)
+
+    def _genetic_search(self, pool: List[int], width: int, k: int, draw_masks: np.ndarray,
+                        rng: np.random.Generator):
+        """在候选池上做遗传搜索，返回 (最佳的 top_k 个掩码, 搜索统计)。"""
+        p = self.parameters
+        size = max(p['population_size'], p['elite_count'] + 2)
+        pool_bits = np.zeros(width, dtype=bool)
+        pool_bits[np.asarray(pool, dtype=int) - 1] = True
+
+        population = self._random_population(pool_bits, k, size, rng)
+        fitness = self._fitness(population, draw_masks, k)
+        best, stale, generation = fitness.max(), 0, 0
+
+        for generation in range(1, p['generations'] + 1):
+            elite_idx = np.argsort(fitness)[::-1][:p['elite_count']]
+            n_children = size - len(elite_idx)
+            parents_a = self._tournament(fitness, n_children, rng, p['tournament_size'])
+            parents_b = self._tournament(fitness, n_children, rng, p['tournament_size'])
+            children = self._crossover(population[parents_a], population[parents_b], width, k, rng)
+            children = self._mutate(children, pool_bits, width, rng)
+
+            population = np.concatenate([population[elite_idx], children])
+            fitness = self._fitness(population, draw_masks, k)
+
+            current = fitness.max()
+            if current > best + p['min_improvement']:
+                best, stale = current, 0
+            else:
+                stale += 1
+                if stale >= p['patience']:
+                    break
+
+        unique_masks, first_idx = np.unique(population, return_index=True)
+        order = np.argsort(fitness[first_idx])[::-1][:p['top_k']]
+        stats = {'generations_run': generation, 'best_fitness': round(float(best), 4),
+                 'early_stopped': generation < p['generations'], 'population_size': int(size)}
+        return unique_masks[order].tolist(), stats
+
+    # ------------------------------------------------------------------
+    # 遗传算子 (全部在整代上向量化执行)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _pick_top_k(bits_priority: np.ndarray, k: int) -> np.ndarray:
+        """按每行的优先级分数选出 k 个号码位，返回 (N, width) 布尔矩阵。"""
+        top = np.argpartition(-bits_priority, k - 1, axis=1)[:, :k]
+        chosen = np.zeros(bits_priority.shape, dtype=bool)
+        np.put_along_axis(chosen, top, True, axis=1)
+        return chosen
+
+    def _random_population(self, pool_bits: np.ndarray, k: int, size: int, rng: np.random.Generator) -> np.ndarray:
+        # 池外号码的优先级为负，只有池内号码不足 k 个时才会被选中
+        priority = rng.random((size, len(pool_bits))) + np.where(pool_bits, 1.0, -1.0)
+        return bits_to_masks(self._pick_top_k(priority, k))
+
+    @staticmethod
+    def _tournament(fitness: np.ndarray, n: int, rng: np.random.Generator, size: int = 3) -> np.ndarray:
+        """锦标赛选择: 每个名额随机抽 size 个个体，取其中适应度最高者。"""
+        contenders = rng.integers(0, len(fitness), size=(n, max(1, size)))
+        return contenders[np.arange(n), np.argmax(fitness[contenders], axis=1)]
+
+    def _crossover(self, parents_a: np.ndarray, parents_b: np.ndarray, width: int, k: int,
+                   rng: np.random.Generator) -> np.ndarray:
+        """
+        均匀交叉: 双亲共有的号码必然遗传，其余名额从双亲各自独有的号码中随机补足，
+        保证子代恰好 k 个号码 (池外号码优先级最低，仅作兜底)。
+        """
+        bits_a, bits_b = masks_to_bits(parents_a, width), masks_to_bits(parents_b, width)
+        noise = rng.random(bits_a.shape)
+        priority = (bits_a & bits_b) * 2.0 + (bits_a ^ bits_b) * 1.0 + noise * 0.5
+        return bits_to_masks(self._pick_top_k(priority, k))
+
+    def _mutate(self, population: np.ndarray, pool_bits: np.ndarray, width: int,
+                rng: np.random.Generator) -> np.ndarray:
+        """以 mutation_rate 的概率，把个体中的一个号码替换为候选池中未被选中的号码。"""
+        mutate_rows = np.flatnonzero(rng.random(len(population)) < self.parameters['mutation_rate'])
+        if len(mutate_rows) == 0:
+            return population
+        bits = masks_to_bits(population[mutate_rows], width)
+        addable = ~bits & pool_bits
+        can_mutate = addable.any(axis=1)
+        rows = np.flatnonzero(can_mutate)
+        if len(rows) == 0:
+            return population
+
+        drop = np.argmax(np.where(bits[rows], rng.random((len(rows), width)), -1.0), axis=1)
+        add = np.argmax(np.where(addable[rows], rng.random((len(rows), width)), -1.0), axis=1)
+        bits[rows, drop] = False
+        bits[rows, add] = True
+
+        population = population.copy()
+        population[mutate_rows] = bits_to_masks(bits)
         return population
 
     def predict(self, history_data: List[LotteryHistory]) -> Dict[str, Any]:
         if not self.is_trained:
             return {'error': '模型未训练'}
 
+        recommendations = []
+        for i, combo in enumerate(self.best_combinations):
+            rec = {'front_numbers': sorted(combo), 'confidence': 0.8}
+            if self.best_back_combinations:
+                rec['back_numbers'] = sorted(self.best_back_combinations[i % len(self.best_back_combinations)])
+            recommendations.append(rec)
+
         return {
             'algorithm': self.name,
             'version': self.version,
-            'recommendations': [
-                {'front_numbers': sorted(c), 'confidence': 0.8} for c in self.best_combinations
-            ],
-            'analysis': {'model_count': len(self.sub_models)}
+            'recommendations': recommendations,
+            'analysis': {'model_count': len(self.sub_models), 'search_stats': self.search_stats}
         }
-
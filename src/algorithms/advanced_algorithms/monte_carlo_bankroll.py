@@ -0,0 +1,220 @@
+# src/algorithms/advanced_algorithms/monte_carlo_bankroll.py
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import combinations
+from math import comb
+import numpy as np
+
+from src.utils.bitmask import numbers_to_mask, popcount64
+from src.utils.prize_rules import prize_matrices, ticket_cost
+
+FRONT_NUMBERS = 35
+BACK_NUMBERS = 12
+
+
+@lru_cache(maxsize=1)
+def _all_draw_masks() -> Tuple[np.ndarray, np.ndarray]:
+    """全部 C(35,5)=324632 种前区组合与 C(12,2)=66 种后区组合的位掩码 (进程内缓存)。"""
+    def masks(size: int, pick: int) -> np.ndarray:
+        combos = np.fromiter((n for combo in combinations(range(size), pick) for n in combo),
+                             dtype=np.uint64).reshape(-1, pick)
+        return np.bitwise_or.reduce(np.left_shift(np.uint64(1), combos), axis=1)
+    return masks(FRONT_NUMBERS, 5), masks(BACK_NUMBERS, 2)
+
+
+def expand_ticket(front_numbers: Sequence[int], back_numbers: Sequence[int]) -> List[Tuple[List[int], List[int]]]:
+    """复式投注展开为单式注 (前区 ≥5 个、后区 ≥2 个号码)。"""
+    return [(list(f), list(b)) for f in combinations(sorted(front_numbers), 5)
+            for b in combinations(sorted(back_numbers), 2)]
+
+
+def _hit_profiles(universe: np.ndarray, ticket_masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    对开奖组合全集计算每注命中数，并把"各注命中数完全相同"的组合合并：
+    返回 (不同命中向量 (K, 注数), 每种命中向量出现的组合数)。
+    """
+    hits = np.stack([popcount64(universe & mask) for mask in ticket_masks], axis=1).astype(np.int8)
+    return np.unique(hits, axis=0, return_counts=True)
+
+
+def _simulate_chunk(args) -> Dict[str, np.ndarray]:
+    """
+    模拟一批投注序列 (进程池工作函数，需为模块级函数)。
+    各期独立地从精确的单期派奖分布中抽样，所有序列在每一期同时向量化推进。
+    """
+    (values, cdf, cost, n_sequences, n_periods, initial_bankroll,
+     max_loss_ratio, trailing_stop, take_profit, seed) = args
+    rng = np.random.default_rng(seed)
+
+    bankroll = np.full(n_sequences, float(initial_bankroll))
+    peak = bankroll.copy()
+    max_drawdown = np.zeros(n_sequences)
+    active = np.ones(n_sequences, dtype=bool)
+    ruined = np.zeros(n_sequences, dtype=bool)
+    stopped = np.zeros(n_sequences, dtype=bool)
+    ruin_curve = np.zeros(n_periods, dtype=np.int64)
+    stop_curve = np.zeros(n_periods, dtype=np.int64)
+    periods_played = np.zeros(n_sequences, dtype=np.int32)
+
+    loss_floor = initial_bankroll * (1.0 - max_loss_ratio) if max_loss_ratio is not None else -np.inf
+    profit_cap = initial_bankroll * (1.0 + take_profit) if take_profit is not None else np.inf
+
+    for t in range(n_periods):
+        # 资金不足以支付一期投注即视为破产
+        broke = active & (bankroll < cost)
+        ruined |= broke
+        active &= ~broke
+
+        payout = values[np.searchsorted(cdf, rng.random(n_sequences), side='right').clip(max=len(values) - 1)]
+        bankroll = np.where(active, bankroll - cost + payout, bankroll)
+        periods_played += active
+        np.maximum(peak, bankroll, out=peak)
+        np.maximum(max_drawdown, (peak - bankroll) / peak, out=max_drawdown)
+
+        hit_stop = active & ((bankroll <= loss_floor) | (bankroll >= profit_cap))
+        if trailing_stop is not None:
+            hit_stop |= active & (bankroll <= peak * (1.0 - trailing_stop))
+        stopped |= hit_stop
+        active &= ~hit_stop
+
+        ruin_curve[t] = ruined.sum() + (active & (bankroll < cost)).sum()
+        stop_curve[t] = stopped.sum()
+
+    return {'final_bankroll': bankroll, 'max_drawdown': max_drawdown, 'ruin_curve': ruin_curve,
+            'stop_curve': stop_curve, 'periods_played': periods_played,
+            'ruined': ruined | (active & (bankroll < cost))}
+
+
+class MonteCarloBankrollSimulator:
+    """
+    大乐透资金曲线蒙特卡洛模拟
+    - 投注组合为若干单式注 (复式注先用 expand_ticket 展开)，奖金取 src.utils.prize_rules 的官方奖级;
+    - 单期派奖分布是精确的：枚举全部 324632×66 种开奖，按"各注命中数向量"合并后只需计算几百种情形，
+      一、二等奖这类千万分之一的小概率事件也不会被采样遗漏;
+    - 模拟阶段每期按该分布逆 CDF 抽样，所有序列向量化推进，可选多进程分块并行;
+    - 止损策略：max_loss_ratio (亏损达初始资金比例即停)、trailing_stop (自峰值回撤比例即停)、
+      take_profit (盈利达比例即停)；资金不足一期投注视为破产。
+    """
+
+    def __init__(self, tickets: Sequence[Tuple[Sequence[int], Sequence[int]]], multiple: int = 1,
+                 is_additional: bool = False, floating_prizes: Optional[Dict[int, float]] = None):
+        singles = [single for front, back in tickets for single in expand_ticket(front, back)]
+        if not singles:
+            raise ValueError("投注组合为空")
+        self.tickets = singles
+        self.multiple = int(multiple)
+        self.is_additional = is_additional
+        self.cost = ticket_cost(len(singles), self.multiple, is_additional)
+        _, amounts, additional = prize_matrices(floating_prizes)
+        self._prize_table = (amounts + (additional if is_additional else 0.0)) * self.multiple
+        self._distribution: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    # ------------------------------------------------------------------
+    # 精确的单期派奖分布
+    # ------------------------------------------------------------------
+    def outcome_distribution(self) -> Tuple[np.ndarray, np.ndarray]:
+        """返回 (单期总奖金取值 升序, 对应概率)。"""
+        if self._distribution is None:
+            front_universe, back_universe = _all_draw_masks()
+            front_masks = np.array([numbers_to_mask(f) for f, _ in self.tickets], dtype=np.uint64)
+            back_masks = np.array([numbers_to_mask(b) for _, b in self.tickets], dtype=np.uint64)
+            front_profiles, front_counts = _hit_profiles(front_universe, front_masks)
+            back_profiles, back_counts = _hit_profiles(back_universe, back_masks)
+
+            # (前区情形, 后区情形, 注) 查奖金表后按注求和
+            payouts = self._prize_table[front_profiles[:, None, :], back_profiles[None, :, :]].sum(axis=2)
+            weights = np.outer(front_counts, back_counts).astype(np.float64)
+            values, inverse = np.unique(payouts.ravel(), return_inverse=True)
+            probabilities = np.bincount(inverse, weights=weights.ravel()) / weights.sum()
+            self._distribution = (values, probabilities)
+        return self._distribution
+
+    def expected_roi(self) -> float:
+        """单期期望回报率 (期望奖金 - 投注成本) / 投注成本，精确值。"""
+        values, probabilities = self.outcome_distribution()
+        return float((values @ probabilities - self.cost) / self.cost)
+
+    def hit_probability(self) -> float:
+        """单期至少中一个奖级的概率。"""
+        values, probabilities = self.outcome_distribution()
+        return float(probabilities[values > 0].sum())
+
+    def sample_period_returns(self, n: int, seed: Optional[int] = None) -> np.ndarray:
+        """抽样 n 期的单期回报率。"""
+        values, probabilities = self.outcome_distribution()
+        rng = np.random.default_rng(seed)
+        return (rng.choice(values, size=n, p=probabilities) - self.cost) / self.cost
+
+    # ------------------------------------------------------------------
+    # 蒙特卡洛
+    # ------------------------------------------------------------------
+    def simulate(self, n_sequences: int = 1_000_000, n_periods: int = 100, initial_bankroll: float = 1000.0,
+                 max_loss_ratio: Optional[float] = None, trailing_stop: Optional[float] = None,
+                 take_profit: Optional[float] = None, n_jobs: int = 1, chunk_size: int = 250_000,
+                 seed: Optional[int] = None, histogram_bins: int = 50) -> Dict[str, Any]:
+        """
+        模拟 n_sequences 条长度为 n_periods 的投注序列，返回:
+        ruin_curve / stop_curve (逐期累计破产、止损比例)、roi 分布 (分位数与直方图)、
+        expected_drawdown (最大回撤均值) 等汇总。n_jobs > 1 时分块交给进程池。
+        """
+        values, probabilities = self.outcome_distribution()
+        cdf = np.cumsum(probabilities)
+        sizes = [min(chunk_size, n_sequences - start) for start in range(0, n_sequences, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(values, cdf, self.cost, size, n_periods, initial_bankroll, max_loss_ratio,
+                  trailing_stop, take_profit, s) for size, s in zip(sizes, seeds)]
+
+        if n_jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as executor:
+                parts = list(executor.map(_simulate_chunk, tasks))
+        else:
+            parts = [_simulate_chunk(task) for task in tasks]
+
+        final_bankroll = np.concatenate([p['final_bankroll'] for p in parts])
+        max_drawdown = np.concatenate([p['max_drawdown'] for p in parts])
+        roi = (final_bankroll - initial_bankroll) / initial_bankroll
+        counts, edges = np.histogram(roi, bins=histogram_bins)
+        percentiles = np.percentile(roi, [1, 5, 25, 50, 75, 95, 99])
+
+        return {
+            'n_sequences': int(n_sequences),
+            'n_periods': int(n_periods),
+            'cost_per_period': self.cost,
+            'expected_period_roi': self.expected_roi(),
+            'ruin_curve': sum(p['ruin_curve'] for p in parts) / n_sequences,
+            'stop_curve': sum(p['stop_curve'] for p in parts) / n_sequences,
+            'ruin_probability': float(np.concatenate([p['ruined'] for p in parts]).mean()),
+            'profit_probability': float((roi > 0).mean()),
+            'roi_mean': float(roi.mean()),
+            'roi_std': float(roi.std()),
+            'roi_percentiles': dict(zip(('p1', 'p5', 'p25', 'p50', 'p75', 'p95', 'p99'),
+                                        (float(v) for v in percentiles))),
+            'roi_histogram': {'counts': counts, 'edges': edges},
+            'expected_drawdown': float(max_drawdown.mean()),
+            'drawdown_p95': float(np.percentile(max_drawdown, 95)),
+            'avg_periods_played': float(np.concatenate([p['periods_played'] for p in parts]).mean()),
+        }
+
+
+def portfolio_roi_summary(recommendations: Sequence[Dict[str, Any]], max_length: int = 50,
+                          max_tickets: int = 64) -> str:
+    """
+    按推荐组合 (front_numbers/back_numbers) 的精确派奖分布生成简短 ROI 描述，
+    用于 prediction_outputs.predicted_roi (varchar(50))；组合无效或展开后注数过多时返回空串。
+    """
+    tickets = []
+    for rec in recommendations:
+        try:
+            front = sorted({int(n) for n in rec.get('front_numbers') or [] if 1 <= int(n) <= FRONT_NUMBERS})
+            back = sorted({int(n) for n in rec.get('back_numbers') or [] if 1 <= int(n) <= BACK_NUMBERS})
+        except (TypeError, ValueError):
+            continue
+        if len(front) >= 5 and len(back) >= 2:
+            tickets.append((front, back))
+    n_singles = sum(comb(len(f), 5) * comb(len(b), 2) for f, b in tickets)
+    if not tickets or n_singles > max_tickets:
+        return ''
+    simulator = MonteCarloBankrollSimulator(tickets)
+    text = f"期望ROI {simulator.expected_roi():+.1%} | 中奖率 {simulator.hit_probability():.2%} | 成本 {simulator.cost:.0f}元"
+    return text[:max_length]
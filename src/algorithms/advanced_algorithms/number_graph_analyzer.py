@@ -5,8 +5,8 @@ from src.algorithms.base_algorithm import BaseAlgorithm
 from src.model.lottery_models import LotteryHistory
 from typing import List, Dict, Any, Tuple
 import logging
-from collections import defaultdict
 
+from src.algorithms.advanced_algorithms.cooccurrence_store import CooccurrenceStore
 from src.utils.log_predictor import log_prediction
 
 
@@ -20,6 +20,7 @@ class NumberGraphAnalyzer(BaseAlgorithm):
         self.front_graph = None
         self.back_graph = None
         self.centrality_measures = {}
+        self.cooccurrence = None
 
     def train(self, history_data: List[LotteryHistory]) -> bool:
         """构建号码关系图"""
@@ -28,6 +29,9 @@ class NumberGraphAnalyzer(BaseAlgorithm):
             return False
 
         try:
+            # 号码对共现计数由共享的共现存储一次性矩阵化得到
+            self.cooccurrence = CooccurrenceStore.from_history(history_data)
+
             # 构建前区号码图
             self.front_graph = self._build_number_graph(history_data, 'front', 35)
 
@@ -86,24 +90,13 @@ class NumberGraphAnalyzer(BaseAlgorithm):
         for i in range(1, num_count + 1):
             graph.add_node(i)
 
-        # 构建共现关系
-        cooccurrence_counts = defaultdict(int)
-
-        for record in history_data:
-            numbers = record.front_area if area_type == 'front' else record.back_area
-
-            # 记录每对号码的共现次数
-            for i in range(len(numbers)):
-                for j in range(i + 1, len(numbers)):
-                    num1, num2 = numbers[i], numbers[j]
-                    if 1 <= num1 <= num_count and 1 <= num2 <= num_count:
-                        pair = tuple(sorted([num1, num2]))
-                        cooccurrence_counts[pair] += 1
-
         # 添加边（权重为共现次数）
-        for (num1, num2), count in cooccurrence_counts.items():
-            if count > 0:
-                graph.add_edge(num1, num2, weight=count)
+        if self.cooccurrence is None:
+            self.cooccurrence = CooccurrenceStore.from_history(history_data)
+        pairs = self.cooccurrence.pairs(area_type)
+        rows, cols = np.nonzero(np.triu(pairs[:num_count, :num_count], 1))
+        graph.add_weighted_edges_from(
+            (int(i) + 1, int(j) + 1, int(round(pairs[i, j]))) for i, j in zip(rows, cols))
 
         logging.info(f"构建了{area_type}区号码图: {graph.number_of_nodes()}节点, {graph.number_of_edges()}边")
         return graph
@@ -0,0 +1,262 @@
+# src/algorithms/advanced_algorithms/pattern_index.py
+from typing import List, Dict, Any, Sequence, Tuple, Optional
+from collections import defaultdict
+import numpy as np
+from src.model.lottery_models import LotteryHistory
+from src.utils.bitmask import FRONT_RANGE, BACK_RANGE, numbers_to_mask
+
+# 前区号码占第 0-34 列，后区号码占第 35-46 列
+WIDTH = FRONT_RANGE + BACK_RANGE
+BIG_THRESHOLD = 18
+
+
+def _column(number: int, area: str) -> int:
+    return int(number) - 1 if area == 'front' else FRONT_RANGE + int(number) - 1
+
+
+def draw_signature(front_area: Sequence[int]) -> int:
+    """单期结构签名: 前区奇数个数 × 6 + 大号 (>18) 个数，取值 0-35。"""
+    odd = sum(1 for n in front_area if n % 2 == 1)
+    big = sum(1 for n in front_area if n > BIG_THRESHOLD)
+    return odd * 6 + big
+
+
+class _GrowableArray:
+    """按倍增策略扩容的 numpy 数组，append 均摊 O(1)，view() 零拷贝。"""
+
+    def __init__(self, row_shape=(), dtype=np.int32, capacity: int = 64):
+        self._data = np.zeros((capacity,) + tuple(row_shape), dtype=dtype)
+        self.size = 0
+
+    def append(self, row):
+        if self.size == len(self._data):
+            grown = np.zeros((len(self._data) * 2,) + self._data.shape[1:], dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size] = row
+        self.size += 1
+
+    def extend(self, rows: np.ndarray):
+        needed = self.size + len(rows)
+        if needed > len(self._data):
+            capacity = max(needed, len(self._data) * 2)
+            grown = np.zeros((capacity,) + self._data.shape[1:], dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:needed] = rows
+        self.size = needed
+
+    def view(self) -> np.ndarray:
+        return self._data[:self.size]
+
+
+class PatternIndex:
+    """
+    开奖历史的增量模式索引，按期号升序保存：
+    - 位掩码序列: 每期前区/后区 uint64 掩码 (供相似度、集合包含查询);
+    - 倒排索引: 号码 -> 出现的期次位置 (有序), 配合 lag 即可回答 (号码, 滞后) 查询;
+    - 累计计数: C[i] = 前 i 期各号码出现次数, 任意区间频次为 C[j] - C[i];
+    - 结构签名 n-gram: 连续 n 期的签名序列 -> 该序列结束的位置。
+    新开奖通过 append/extend 追加，每期只做常数次更新，不必重新扫描全部历史。
+    """
+
+    def __init__(self, ngram_sizes: Sequence[int] = (1, 2, 3)):
+        self.ngram_sizes = tuple(sorted(set(int(n) for n in ngram_sizes)))
+        self.period_numbers: List[str] = []
+        self._front_masks = _GrowableArray(dtype=np.uint64)
+        self._back_masks = _GrowableArray(dtype=np.uint64)
+        self._signatures = _GrowableArray(dtype=np.int8)
+        self._front_sums = _GrowableArray(dtype=np.int32)
+        self._onehot = _GrowableArray((WIDTH,), dtype=np.int8)
+        self._cumulative = _GrowableArray((WIDTH,), dtype=np.int32)
+        self._cumulative.append(np.zeros(WIDTH, dtype=np.int32))
+        self._postings = [_GrowableArray(dtype=np.int32) for _ in range(WIDTH)]
+        self._ngrams: Dict[Tuple[int, ...], List[int]] = defaultdict(list)
+
+    @classmethod
+    def from_history(cls, history_data: List[LotteryHistory], **kwargs) -> 'PatternIndex':
+        index = cls(**kwargs)
+        index.extend(history_data)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.period_numbers)
+
+    # ------------------------------------------------------------------
+    # 增量维护
+    # ------------------------------------------------------------------
+    def append(self, record: LotteryHistory):
+        pos = len(self.period_numbers)
+        row = np.zeros(WIDTH, dtype=np.int8)
+        for num in record.front_area:
+            row[_column(num, 'front')] = 1
+        for num in record.back_area:
+            row[_column(num, 'back')] = 1
+        for col in np.flatnonzero(row):
+            self._postings[col].append(pos)
+
+        self.period_numbers.append(str(record.period_number))
+        self._front_masks.append(numbers_to_mask(record.front_area))
+        self._back_masks.append(numbers_to_mask(record.back_area))
+        self._onehot.append(row)
+        self._cumulative.append(self._cumulative.view()[-1] + row)
+        self._front_sums.append(sum(record.front_area))
+        self._signatures.append(draw_signature(record.front_area))
+
+        signatures = self._signatures.view()
+        for n in self.ngram_sizes:
+            if pos + 1 >= n:
+                self._ngrams[tuple(signatures[pos + 1 - n:pos + 1].tolist())].append(pos)
+
+    def extend(self, records: List[LotteryHistory]):
+        """批量追加 (按期号排序)，各数组一次性写入，结果与逐期 append 相同。"""
+        records = sorted(records, key=lambda r: str(r.period_number))
+        if len(records) < 32:
+            for record in records:
+                self.append(record)
+            return
+
+        start, count = len(self), len(records)
+        block = np.zeros((count, WIDTH), dtype=np.int8)
+        for i, record in enumerate(records):
+            block[i, [_column(n, 'front') for n in record.front_area]] = 1
+            block[i, [_column(n, 'back') for n in record.back_area]] = 1
+
+        self.period_numbers.extend(str(r.period_number) for r in records)
+        self._front_masks.extend(np.fromiter((numbers_to_mask(r.front_area) for r in records), np.uint64, count))
+        self._back_masks.extend(np.fromiter((numbers_to_mask(r.back_area) for r in records), np.uint64, count))
+        self._onehot.extend(block)
+        self._cumulative.extend(self._cumulative.view()[-1] + np.cumsum(block, axis=0, dtype=np.int32))
+        self._front_sums.extend(np.fromiter((sum(r.front_area) for r in records), np.int32, count))
+        self._signatures.extend(np.fromiter((draw_signature(r.front_area) for r in records), np.int8, count))
+        for col in range(WIDTH):
+            self._postings[col].extend(np.flatnonzero(block[:, col]) + start)
+
+        signatures = self._signatures.view().tolist()
+        for pos in range(start, start + count):
+            for n in self.ngram_sizes:
+                if pos + 1 >= n:
+                    self._ngrams[tuple(signatures[pos + 1 - n:pos + 1])].append(pos)
+
+    def sync(self, history_data: List[LotteryHistory]) -> 'PatternIndex':
+        """
+        使索引与 history_data 保持一致：若已索引的期号是 history_data 的前缀，
+        只追加新增的期数；否则 (例如滚动窗口) 重建索引。返回可用的索引对象。
+        """
+        sorted_data = sorted(history_data, key=lambda r: str(r.period_number))
+        n = len(self)
+        if n <= len(sorted_data) and all(
+                self.period_numbers[i] == str(sorted_data[i].period_number) for i in (0, n - 1) if n):
+            self.extend(sorted_data[n:])
+            return self
+        return PatternIndex.from_history(sorted_data, ngram_sizes=self.ngram_sizes)
+
+    # ------------------------------------------------------------------
+    # 基础视图
+    # ------------------------------------------------------------------
+    @property
+    def front_masks(self) -> np.ndarray:
+        return self._front_masks.view()
+
+    @property
+    def back_masks(self) -> np.ndarray:
+        return self._back_masks.view()
+
+    @property
+    def onehot(self) -> np.ndarray:
+        return self._onehot.view()
+
+    @property
+    def signatures(self) -> np.ndarray:
+        return self._signatures.view()
+
+    @property
+    def front_sums(self) -> np.ndarray:
+        return self._front_sums.view()
+
+    def counts(self, start: int = 0, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """[start, end) 区间内各号码的出现次数，O(号码数)。"""
+        cumulative = self._cumulative.view()
+        end = len(self) if end is None else end
+        diff = cumulative[end] - cumulative[start]
+        return {'front': diff[:FRONT_RANGE], 'back': diff[FRONT_RANGE:]}
+
+    def positions(self, number: int, area: str = 'front') -> np.ndarray:
+        """号码出现过的期次位置 (升序)。"""
+        return self._postings[_column(number, area)].view()
+
+    def last_seen_before(self, number: int, query_positions: np.ndarray, area: str = 'front',
+                         default: int = -1) -> np.ndarray:
+        """对每个查询位置 q，返回号码在 q 之前最后一次出现的位置 (没有则为 default)。"""
+        posting = self.positions(number, area)
+        k = np.searchsorted(posting, query_positions, side='left')
+        return np.where(k > 0, posting[np.maximum(k - 1, 0)] if len(posting) else default, default)
+
+    # ------------------------------------------------------------------
+    # 模式查询
+    # ------------------------------------------------------------------
+    def occurrences(self, front_numbers: Sequence[int] = (), back_numbers: Sequence[int] = ()) -> np.ndarray:
+        """同时包含给定号码的所有期次位置：倒排列表从短到长依次求交。"""
+        lists = [self.positions(n, 'front') for n in front_numbers] + \
+                [self.positions(n, 'back') for n in back_numbers]
+        if not lists:
+            return np.arange(len(self), dtype=np.int32)
+        lists.sort(key=len)
+        result = lists[0]
+        for other in lists[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
+
+    def followers(self, positions: np.ndarray, within: int = 1) -> Dict[str, np.ndarray]:
+        """给定出现位置 p，统计 (p, p+within] 各期中每个号码出现的总次数 (超出历史末尾的部分截断)。"""
+        cumulative = self._cumulative.view()
+        positions = np.asarray(positions, dtype=np.int64)
+        positions = positions[positions < len(self) - 1]
+        if len(positions) == 0:
+            return {'front': np.zeros(FRONT_RANGE, dtype=np.int64), 'back': np.zeros(BACK_RANGE, dtype=np.int64),
+                    'support': 0}
+        ends = np.minimum(positions + within, len(self) - 1) + 1
+        total = cumulative[ends].sum(axis=0, dtype=np.int64) - cumulative[positions + 1].sum(axis=0, dtype=np.int64)
+        return {'front': total[:FRONT_RANGE], 'back': total[FRONT_RANGE:], 'support': int(len(positions))}
+
+    def follow_pattern(self, front_numbers: Sequence[int] = (), back_numbers: Sequence[int] = (),
+                       within: int = 1) -> Dict[str, np.ndarray]:
+        """“包含模式 P 的开奖之后 within 期内出现了哪些号码”。"""
+        return self.followers(self.occurrences(front_numbers, back_numbers), within)
+
+    def lag_followers(self, number: int, lag: int = 1, area: str = 'front') -> Dict[str, np.ndarray]:
+        """号码出现后恰好第 lag 期的号码分布，即 (number, lag) 倒排查询。"""
+        posting = self.positions(number, area).astype(np.int64) + lag
+        posting = posting[posting < len(self)]
+        total = self.onehot[posting].sum(axis=0, dtype=np.int64)
+        return {'front': total[:FRONT_RANGE], 'back': total[FRONT_RANGE:], 'support': int(len(posting))}
+
+    def ngram_positions(self, signature_sequence: Sequence[int]) -> np.ndarray:
+        return np.asarray(self._ngrams.get(tuple(int(s) for s in signature_sequence), []), dtype=np.int64)
+
+    def signature_followers(self, n: int = 2, within: int = 1) -> Dict[str, np.ndarray]:
+        """以最近 n 期的结构签名序列为模式，统计历史上同一序列之后出现的号码。"""
+        if n not in self.ngram_sizes or len(self) < n:
+            return self.followers(np.array([], dtype=np.int64), within)
+        latest = self.signatures[-n:].tolist()
+        return self.followers(self.ngram_positions(latest), within)
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+    def save(self, path: str):
+        np.savez_compressed(path, period_numbers=np.array(self.period_numbers), onehot=self.onehot,
+                            ngram_sizes=np.array(self.ngram_sizes))
+
+    @classmethod
+    def load(cls, path: str) -> 'PatternIndex':
+        data = np.load(path, allow_pickle=False)
+        index = cls(ngram_sizes=data['ngram_sizes'].tolist())
+        for period, row in zip(data['period_numbers'].tolist(), data['onehot']):
+            cols = np.flatnonzero(row)
+            index.append(LotteryHistory(period_number=period,
+                                        front_area=[int(c) + 1 for c in cols if c < FRONT_RANGE],
+                                        back_area=[int(c) - FRONT_RANGE + 1 for c in cols if c >= FRONT_RANGE]))
+        return index
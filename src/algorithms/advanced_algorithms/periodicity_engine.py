@@ -0,0 +1,185 @@
+# src/algorithms/advanced_algorithms/periodicity_engine.py
+from typing import List, Dict, Any, Sequence
+import numpy as np
+from src.model.lottery_models import LotteryHistory
+
+FRONT_NUMBERS = 35
+BACK_NUMBERS = 12
+# 周期检测的最大滞后期，更长的"周期"在开奖数据上基本是噪声
+MAX_CYCLE_LAG = 100
+
+
+class PeriodicityEngine:
+    """
+    号码间隔/周期性分析引擎 (向量化版)
+    以 (期数 × 号码) 的 one-hot 开奖矩阵为输入，所有号码在同一组数组运算中完成：
+    - 出现间隔：对整张矩阵 np.nonzero 后按号码分组做 np.diff，再用 bincount 聚合均值/标准差；
+    - 多尺度趋势：窗口内出现率、线性回归斜率、动量、移动平均全部由累计和与矩阵乘法得到；
+    - 周期检测：零均值序列经 FFT 求自相关，取每个号码自相关最强的滞后期作为主周期。
+    TimeSeriesAnalyzer 与 time_series_predictor 共用本引擎。
+    """
+
+    def __init__(self, history_data: List[LotteryHistory]):
+        sorted_data = sorted(history_data, key=lambda x: str(x.period_number))
+        self.periods = len(sorted_data)
+        self.matrices = {
+            'front': self._one_hot([r.front_area for r in sorted_data], FRONT_NUMBERS),
+            'back': self._one_hot([r.back_area for r in sorted_data], BACK_NUMBERS),
+        }
+
+    @staticmethod
+    def _one_hot(draws: Sequence[Sequence[int]], width: int) -> np.ndarray:
+        matrix = np.zeros((len(draws), width), dtype=np.int8)
+        rows = np.repeat(np.arange(len(draws)), [len(d) for d in draws])
+        cols = np.fromiter((n for d in draws for n in d), dtype=np.int64, count=len(rows)) - 1
+        valid = (cols >= 0) & (cols < width)
+        matrix[rows[valid], cols[valid]] = 1
+        return matrix
+
+    def series(self, area_type: str) -> Dict[int, List[int]]:
+        """兼容旧格式的 {号码: 0/1 序列}。"""
+        matrix = self.matrices[area_type]
+        return {num: matrix[:, num - 1].tolist() for num in range(1, matrix.shape[1] + 1)}
+
+    # ------------------------------------------------------------------
+    # 出现间隔
+    # ------------------------------------------------------------------
+    def interval_stats(self, area_type: str) -> Dict[str, np.ndarray]:
+        """每个号码的出现次数、平均间隔、间隔标准差、当前遗漏和最后出现位置 (均为长度 = 号码数 的数组)。"""
+        matrix = self.matrices[area_type]
+        n, width = matrix.shape
+        cols, idx = np.nonzero(matrix.T)  # 按号码分组、组内按期次升序
+
+        counts = np.bincount(cols, minlength=width)
+        same = cols[1:] == cols[:-1]
+        gaps = np.diff(idx)[same].astype(np.float64)
+        gap_cols = cols[1:][same]
+        gap_counts = np.bincount(gap_cols, minlength=width)
+        gap_sum = np.bincount(gap_cols, weights=gaps, minlength=width)
+        gap_sq = np.bincount(gap_cols, weights=gaps ** 2, minlength=width)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg = np.where(gap_counts > 0, gap_sum / gap_counts, 0.0)
+            std = np.sqrt(np.maximum(np.where(gap_counts > 0, gap_sq / gap_counts, 0.0) - avg ** 2, 0.0))
+
+        last = np.full(width, -1, dtype=np.int64)
+        last[cols] = idx  # 同一号码后写入的位置更靠后
+        omission = np.where(last >= 0, n - last - 1, n)
+        return {'total_appearances': counts, 'avg_interval': avg, 'std_interval': std,
+                'current_omission': omission, 'last_appearance_idx': last}
+
+    # ------------------------------------------------------------------
+    # 多尺度趋势
+    # ------------------------------------------------------------------
+    def trend_metrics(self, area_type: str, window: int, slope_threshold: float = 0.02) -> Dict[str, np.ndarray]:
+        """
+        最近 window 期的趋势指标。数据不足 window 期时返回空字典 (与旧实现一致)。
+        斜率为 0/1 序列对期序号的最小二乘斜率，等价于逐号码 np.polyfit(x, y, 1)。
+        """
+        matrix = self.matrices[area_type]
+        if self.periods < window or window <= 0:
+            return {}
+        recent = matrix[-window:].astype(np.float64)
+        prefix = np.zeros((window + 1, matrix.shape[1]))
+        np.cumsum(recent[::-1], axis=0, out=prefix[1:])  # prefix[k] = 最近 k 期出现次数
+
+        totals = prefix[window]
+        rate = totals / window
+
+        if window >= 2:
+            x = np.arange(window, dtype=np.float64)
+            x -= x.mean()
+            slope = (x @ recent) / (x @ x)
+            direction = np.where(slope > slope_threshold, 1, np.where(slope < -slope_threshold, -1, 0))
+        else:
+            direction = np.zeros(matrix.shape[1], dtype=np.int64)
+
+        if window >= 5:
+            recent_window, long_window = min(5, window // 2), min(10, window)
+            recent_avg = prefix[recent_window] / recent_window
+            long_avg = prefix[long_window] / long_window
+            with np.errstate(invalid='ignore', divide='ignore'):
+                momentum = np.where(long_avg > 0, (recent_avg - long_avg) / long_avg, 0.0)
+        else:
+            momentum = np.zeros(matrix.shape[1])
+
+        ma_window = min(5, window)
+        return {'appearance_rate': rate, 'total_appearances': totals.astype(np.int64),
+                'trend_direction': direction, 'momentum': momentum,
+                'moving_avg': prefix[ma_window] / ma_window}
+
+    def rolling_rates(self, area_type: str, windows: Sequence[int]) -> Dict[int, np.ndarray]:
+        """每一期结束时、各窗口长度下的滚动出现率，形状 (期数, 号码数)，窗口未满的行为 NaN。"""
+        matrix = self.matrices[area_type]
+        prefix = np.zeros((self.periods + 1, matrix.shape[1]))
+        np.cumsum(matrix, axis=0, out=prefix[1:])
+        result = {}
+        for w in windows:
+            rates = np.full(matrix.shape, np.nan)
+            if w <= self.periods:
+                rates[w - 1:] = (prefix[w:] - prefix[:-w]) / w
+            result[w] = rates
+        return result
+
+    # ------------------------------------------------------------------
+    # 周期检测
+    # ------------------------------------------------------------------
+    def autocorrelation(self, area_type: str, max_lag: int) -> np.ndarray:
+        """全部号码的归一化自相关 (max_lag+1, 号码数)，基于 FFT，复杂度 O(n log n)。"""
+        matrix = self.matrices[area_type].astype(np.float64)
+        n = self.periods
+        centered = matrix - matrix.mean(axis=0)
+        size = 1 << int(np.ceil(np.log2(max(2 * n - 1, 1))))
+        spectrum = np.fft.rfft(centered, n=size, axis=0)
+        acf = np.fft.irfft(spectrum * np.conj(spectrum), n=size, axis=0)[:max_lag + 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            acf = np.where(acf[0] > 0, acf / acf[0], 0.0)
+        return acf
+
+    def dominant_cycles(self, area_type: str, min_lag: int = 2, max_lag: int = None) -> Dict[str, np.ndarray]:
+        """每个号码自相关最强的滞后期 (主周期) 与强度；序列太短时周期为 0。"""
+        width = self.matrices[area_type].shape[1]
+        max_lag = min(max_lag or min(self.periods // 3, MAX_CYCLE_LAG), self.periods - 1)
+        if max_lag < min_lag:
+            return {'cycle': np.zeros(width, dtype=np.int64), 'strength': np.zeros(width)}
+        acf = self.autocorrelation(area_type, max_lag)[min_lag:]
+        best = np.argmax(acf, axis=0)
+        strength = acf[best, np.arange(width)]
+        return {'cycle': best + min_lag, 'strength': strength}
+
+    # ------------------------------------------------------------------
+    # 供时序算法直接使用的字典格式
+    # ------------------------------------------------------------------
+    def period_table(self, area_type: str) -> Dict[int, Dict[str, Any]]:
+        """与旧 _analyze_number_periods 相同的结构 (只包含出现过至少两次的号码)，并附带主周期。"""
+        stats = self.interval_stats(area_type)
+        cycles = self.dominant_cycles(area_type)
+        table = {}
+        for i in np.flatnonzero(stats['total_appearances'] > 1):
+            table[int(i) + 1] = {
+                'total_appearances': int(stats['total_appearances'][i]),
+                'avg_interval': float(stats['avg_interval'][i]),
+                'std_interval': float(stats['std_interval'][i]),
+                'current_omission': int(stats['current_omission'][i]),
+                'last_appearance_idx': int(stats['last_appearance_idx'][i]),
+                'dominant_cycle': int(cycles['cycle'][i]),
+                'cycle_strength': round(float(cycles['strength'][i]), 4),
+            }
+        return table
+
+    def trend_table(self, area_type: str, window: int, **extra) -> Dict[int, Dict[str, Any]]:
+        """与旧 _analyze_time_scale 单个区域相同的结构；extra 中的键值原样附加到每个号码。"""
+        metrics = self.trend_metrics(area_type, window)
+        if not metrics:
+            return {}
+        return {
+            i + 1: {
+                'appearance_rate': float(metrics['appearance_rate'][i]),
+                'total_appearances': int(metrics['total_appearances'][i]),
+                'trend_direction': int(metrics['trend_direction'][i]),
+                'momentum': float(metrics['momentum'][i]),
+                'moving_avg': float(metrics['moving_avg'][i]),
+                **extra,
+            }
+            for i in range(len(metrics['appearance_rate']))
+        }
@@ -0,0 +1,208 @@
+# src/algorithms/advanced_algorithms/score_tensor_store.py
+from typing import List, Dict, Any, Optional, Sequence
+import bisect
+import json
+import os
+import numpy as np
+
+FRONT_NUMBERS = 35
+BACK_NUMBERS = 12
+WIDTH = FRONT_NUMBERS + BACK_NUMBERS
+DEFAULT_DIRECTORY = os.path.join('data', 'score_tensors')
+
+_SCORES_FILE = 'scores.f32'
+_ACTUALS_FILE = 'actuals.u8'
+_META_FILE = 'meta.json'
+
+
+def scores_to_vector(prediction: Dict[str, Any]) -> np.ndarray:
+    """
+    把评分器输出的 front_number_scores / back_number_scores 转成长度 47 的 float32 向量
+    (下标 0-34 为前区 1-35，35-46 为后区 1-12)，缺失号码为 NaN。
+    """
+    vector = np.full(WIDTH, np.nan, dtype=np.float32)
+    rec = (prediction.get('recommendations') or [{}])[0]
+    for key, offset, size in (('front_number_scores', 0, FRONT_NUMBERS), ('back_number_scores', FRONT_NUMBERS, BACK_NUMBERS)):
+        for item in rec.get(key) or []:
+            number = int(item.get('number', 0))
+            if 1 <= number <= size:
+                vector[offset + number - 1] = float(item.get('score', 0.0))
+    return vector
+
+
+def draw_to_vector(front_area: Sequence[int], back_area: Sequence[int]) -> np.ndarray:
+    vector = np.zeros(WIDTH, dtype=np.uint8)
+    vector[[n - 1 for n in front_area if 1 <= n <= FRONT_NUMBERS]] = 1
+    vector[[FRONT_NUMBERS + n - 1 for n in back_area if 1 <= n <= BACK_NUMBERS]] = 1
+    return vector
+
+
+class ScoreTensorStore:
+    """
+    逐期评分张量存储
+    - scores.f32: 形状 (容量, 算法槽位数, 47) 的 float32 内存映射文件，未写入的位置为 NaN;
+    - actuals.u8: 形状 (容量, 47) 的实际开奖 0/1 矩阵，回测/权重搜索不必再查数据库;
+    - meta.json: 算法名列表与期号索引。
+    walk-forward 回测时逐期写入；读取端以只读方式映射，tensor()/actuals() 返回的是映射视图，不复制数据。
+    期数超过容量时文件按倍数扩容。
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, mode: str = 'a', capacity: int = 1024,
+                 max_algorithms: int = 16):
+        if mode not in ('r', 'a', 'w'):
+            raise ValueError(f"未知的打开模式: {mode}")
+        self.directory = directory
+        self.mode = mode
+        meta_path = os.path.join(directory, _META_FILE)
+        if mode == 'w' or not os.path.exists(meta_path):
+            if mode == 'r':
+                raise FileNotFoundError(f"评分张量目录不存在: {directory}")
+            os.makedirs(directory, exist_ok=True)
+            self.algorithms: List[str] = []
+            self.periods: List[str] = []
+            self.capacity = max(1, int(capacity))
+            self.max_algorithms = int(max_algorithms)
+            self._create_files()
+        else:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            self.algorithms = meta['algorithms']
+            self.periods = meta['periods']
+            self.capacity = meta['capacity']
+            self.max_algorithms = meta['max_algorithms']
+        self._period_index = {p: i for i, p in enumerate(self.periods)}
+        self._open_maps()
+
+    @classmethod
+    def open(cls, directory: str = DEFAULT_DIRECTORY) -> 'ScoreTensorStore':
+        """只读打开 (零拷贝读取)。"""
+        return cls(directory, mode='r')
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    # ------------------------------------------------------------------
+    # 文件管理
+    # ------------------------------------------------------------------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _create_files(self):
+        scores = np.memmap(self._path(_SCORES_FILE), dtype=np.float32, mode='w+',
+                           shape=(self.capacity, self.max_algorithms, WIDTH))
+        scores[:] = np.nan
+        scores.flush()
+        np.memmap(self._path(_ACTUALS_FILE), dtype=np.uint8, mode='w+', shape=(self.capacity, WIDTH)).flush()
+        self._write_meta()
+
+    def _open_maps(self):
+        map_mode = 'r' if self.mode == 'r' else 'r+'
+        self._scores = np.memmap(self._path(_SCORES_FILE), dtype=np.float32, mode=map_mode,
+                                 shape=(self.capacity, self.max_algorithms, WIDTH))
+        self._actuals = np.memmap(self._path(_ACTUALS_FILE), dtype=np.uint8, mode=map_mode,
+                                  shape=(self.capacity, WIDTH))
+
+    def _grow(self, min_capacity: int):
+        new_capacity = self.capacity
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+        self.flush()
+        del self._scores, self._actuals
+        row_bytes = self.max_algorithms * WIDTH * 4
+        with open(self._path(_SCORES_FILE), 'r+b') as f:
+            f.truncate(new_capacity * row_bytes)
+        with open(self._path(_ACTUALS_FILE), 'r+b') as f:
+            f.truncate(new_capacity * WIDTH)
+        old_capacity, self.capacity = self.capacity, new_capacity
+        self._open_maps()
+        self._scores[old_capacity:] = np.nan
+
+    def _write_meta(self):
+        meta = {'algorithms': self.algorithms, 'periods': self.periods, 'capacity': self.capacity,
+                'max_algorithms': self.max_algorithms, 'width': WIDTH}
+        tmp_path = self._path(_META_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(_META_FILE))
+
+    def flush(self):
+        if self.mode == 'r':
+            return
+        self._scores.flush()
+        self._actuals.flush()
+        self._write_meta()
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+    def _row(self, period_number: str) -> int:
+        period_number = str(period_number)
+        row = self._period_index.get(period_number)
+        if row is None:
+            row = len(self.periods)
+            if row >= self.capacity:
+                self._grow(row + 1)
+            self.periods.append(period_number)
+            self._period_index[period_number] = row
+        return row
+
+    def _column(self, algorithm: str) -> int:
+        if algorithm not in self.algorithms:
+            if len(self.algorithms) >= self.max_algorithms:
+                raise ValueError(f"算法槽位已满 ({self.max_algorithms})，无法写入 {algorithm}")
+            self.algorithms.append(algorithm)
+        return self.algorithms.index(algorithm)
+
+    def write(self, period_number: str, algorithm: str, scores: np.ndarray):
+        if self.mode == 'r':
+            raise PermissionError("只读模式下不能写入")
+        row, column = self._row(period_number), self._column(algorithm)  # 可能触发扩容，需先于取映射
+        self._scores[row, column] = scores
+
+    def write_prediction(self, period_number: str, algorithm: str, prediction: Dict[str, Any]):
+        self.write(period_number, algorithm, scores_to_vector(prediction))
+
+    def write_actual(self, period_number: str, front_area: Sequence[int], back_area: Sequence[int]):
+        if self.mode == 'r':
+            raise PermissionError("只读模式下不能写入")
+        row = self._row(period_number)
+        self._actuals[row] = draw_to_vector(front_area, back_area)
+
+    # ------------------------------------------------------------------
+    # 读取 (均为内存映射视图)
+    # ------------------------------------------------------------------
+    def tensor(self, algorithms: Optional[Sequence[str]] = None) -> np.ndarray:
+        """(期数, 算法数, 47) 评分张量。不指定 algorithms 时返回零拷贝视图；指定时按顺序取出对应列。"""
+        view = self._scores[:len(self.periods), :len(self.algorithms)]
+        if algorithms is None:
+            return view
+        return view[:, [self.algorithms.index(a) for a in algorithms]]
+
+    def actuals(self) -> np.ndarray:
+        """(期数, 47) 实际开奖 0/1 矩阵视图。"""
+        return self._actuals[:len(self.periods)]
+
+    def period_slice(self, start_period: Optional[str] = None, end_period: Optional[str] = None) -> slice:
+        """期号区间 [start, end] 对应的行切片 (期号按升序写入；期号不在索引中时按大小定位)。"""
+        start = bisect.bisect_left(self.periods, str(start_period)) if start_period is not None else 0
+        end = bisect.bisect_right(self.periods, str(end_period)) if end_period is not None else len(self.periods)
+        return slice(start, end)
+
+    def fuse(self, weights: Dict[str, float], rows: slice = slice(None)) -> np.ndarray:
+        """按权重对评分做线性融合，缺失评分按 0 处理，返回 (期数, 47)。"""
+        names = [a for a in weights if a in self.algorithms]
+        if not names:
+            return np.zeros((len(range(*rows.indices(len(self)))), WIDTH), dtype=np.float32)
+        w = np.array([weights[a] for a in names], dtype=np.float32)
+        return np.einsum('pan,a->pn', np.nan_to_num(self.tensor(names)[rows]), w)
+
+    def hit_counts(self, fused: np.ndarray, rows: slice = slice(None), top_front: int = 5,
+                   top_back: int = 2) -> Dict[str, np.ndarray]:
+        """融合评分前区取前 top_front、后区取前 top_back 时每期的命中数。"""
+        actual = self.actuals()[rows]
+        # 稳定排序：同分时取号码较小者，与评分器按分数排序后截取前几名的结果一致
+        front_top = np.argsort(-fused[:, :FRONT_NUMBERS], axis=1, kind='stable')[:, :top_front]
+        back_top = np.argsort(-fused[:, FRONT_NUMBERS:], axis=1, kind='stable')[:, :top_back]
+        front_hits = np.take_along_axis(actual[:, :FRONT_NUMBERS], front_top, axis=1).sum(axis=1)
+        back_hits = np.take_along_axis(actual[:, FRONT_NUMBERS:], back_top, axis=1).sum(axis=1)
+        return {'front': front_hits, 'back': back_hits}
@@ -0,0 +1,179 @@
+# src/algorithms/advanced_algorithms/similarity_index.py
+from typing import List, Dict, Any, Sequence, Optional
+from collections import defaultdict
+import numpy as np
+from src.model.lottery_models import LotteryHistory
+from src.utils.bitmask import FRONT_RANGE, BACK_RANGE, numbers_to_mask, mask_to_numbers, popcount64, masks_to_bits
+
+WIDTH = FRONT_RANGE + BACK_RANGE
+
+
+def draw_mask(front_area: Sequence[int], back_area: Sequence[int]) -> int:
+    """前区占第 0-34 位、后区占第 35-46 位的 47 位开奖掩码。"""
+    return numbers_to_mask(front_area) | (numbers_to_mask(back_area) << FRONT_RANGE)
+
+
+class DrawSimilarityIndex:
+    """
+    相似开奖检索 (MinHash-LSH)
+    - 每期开奖视为 47 个号码上的集合，用 bands × rows 个随机排列计算 MinHash 签名;
+    - 签名按 band 切分后放入哈希桶，查询时只取与查询期至少在一个 band 上碰撞的候选，
+      按碰撞 band 数 (Jaccard 的估计) 截取至多 max_candidates 个，再用 popcount 精确重排;
+    - 历史不超过 exact_threshold 期或候选数量不足 top_k 时直接全量 popcount 扫描 (小规模下更快且精确)。
+    新开奖 append 时只计算一个签名并写入 bands 个桶，不需要重建。
+    """
+
+    def __init__(self, bands: int = 20, rows: int = 3, max_candidates: int = 2000, exact_threshold: int = 5000,
+                 seed: int = 2024):
+        self.bands = bands
+        self.rows = rows
+        self.max_candidates = max_candidates
+        self.exact_threshold = exact_threshold
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        # ranks[p, j] = 第 p 个排列下号码位 j 的次序
+        self._ranks = np.array([rng.permutation(WIDTH) for _ in range(bands * rows)], dtype=np.int16)
+        self._band_weights = WIDTH ** np.arange(rows, dtype=np.int64)
+        self.period_numbers: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self.front_areas: List[List[int]] = []
+        self.back_areas: List[List[int]] = []
+        self._masks = np.zeros(0, dtype=np.uint64)
+        self._buckets = [defaultdict(list) for _ in range(bands)]
+
+    @classmethod
+    def from_history(cls, history_data: List[LotteryHistory], **kwargs) -> 'DrawSimilarityIndex':
+        index = cls(**kwargs)
+        index.extend(history_data)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.period_numbers)
+
+    # ------------------------------------------------------------------
+    # 构建与增量维护
+    # ------------------------------------------------------------------
+    def _band_keys(self, masks: np.ndarray) -> np.ndarray:
+        """(N,) 掩码 -> (N, bands) 的桶键。"""
+        bits = masks_to_bits(masks, WIDTH)
+        signatures = np.where(bits[:, None, :], self._ranks[None, :, :], WIDTH).min(axis=2).astype(np.int64)
+        return signatures.reshape(len(masks), self.bands, self.rows) @ self._band_weights
+
+    def extend(self, records: List[LotteryHistory]):
+        records = sorted(records, key=lambda r: str(r.period_number))
+        if not records:
+            return
+        start = len(self)
+        masks = np.fromiter((draw_mask(r.front_area, r.back_area) for r in records), dtype=np.uint64,
+                            count=len(records))
+        keys = self._band_keys(masks).tolist()
+        for offset, band_keys in enumerate(keys):
+            for band, key in enumerate(band_keys):
+                self._buckets[band][key].append(start + offset)
+        self._masks = np.concatenate([self._masks, masks])
+        self.period_numbers.extend(str(r.period_number) for r in records)
+        self._positions.update((str(r.period_number), start + i) for i, r in enumerate(records))
+        self.front_areas.extend(sorted(r.front_area) for r in records)
+        self.back_areas.extend(sorted(r.back_area) for r in records)
+
+    def append(self, record: LotteryHistory):
+        self.extend([record])
+
+    def sync(self, history_data: List[LotteryHistory]) -> 'DrawSimilarityIndex':
+        """与 PatternIndex.sync 相同：历史只在末尾增长时追加，否则重建。"""
+        sorted_data = sorted(history_data, key=lambda r: str(r.period_number))
+        n = len(self)
+        if n <= len(sorted_data) and all(
+                self.period_numbers[i] == str(sorted_data[i].period_number) for i in (0, n - 1) if n):
+            self.extend(sorted_data[n:])
+            return self
+        return DrawSimilarityIndex.from_history(sorted_data, bands=self.bands, rows=self.rows,
+                                                max_candidates=self.max_candidates,
+                                                exact_threshold=self.exact_threshold, seed=self.seed)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    def _candidates(self, mask: int) -> np.ndarray:
+        keys = self._band_keys(np.array([mask], dtype=np.uint64))[0].tolist()
+        hits = [self._buckets[band].get(key, ()) for band, key in enumerate(keys)]
+        if not any(hits):
+            return np.zeros(0, dtype=np.int64)
+        positions, collisions = np.unique(np.concatenate([np.asarray(h, dtype=np.int64) for h in hits]),
+                                          return_counts=True)
+        if len(positions) > self.max_candidates:
+            keep = np.argpartition(-collisions, self.max_candidates - 1)[:self.max_candidates]
+            positions = positions[keep]
+        return positions
+
+    def query(self, front_area: Sequence[int], back_area: Sequence[int] = (), top_k: int = 10,
+              exclude_period: Optional[str] = None, exact: bool = False) -> List[Dict[str, Any]]:
+        """
+        返回与给定号码最相似的 top_k 个历史期 (按 Jaccard 降序)，并附带其下一期开奖。
+        exact=True 时跳过 LSH，直接全量 popcount 扫描。
+        """
+        if not len(self):
+            return []
+        mask = draw_mask(front_area, back_area)
+        candidates = None if exact or len(self) <= self.exact_threshold else self._candidates(mask)
+        if candidates is None or len(candidates) < top_k + 1:
+            candidates = np.arange(len(self))
+        if exclude_period is not None and str(exclude_period) in self._positions:
+            candidates = candidates[candidates != self._positions[str(exclude_period)]]
+        if len(candidates) == 0:
+            return []
+
+        masks = self._masks[candidates]
+        query_mask = np.uint64(mask)
+        shared = popcount64(masks & query_mask)
+        union = popcount64(masks | query_mask)
+        jaccard = shared / np.maximum(union, 1)
+        # 相似度相同时优先较近的期
+        order = np.lexsort((-candidates, -jaccard))[:top_k]
+
+        results = []
+        for i in order:
+            pos = int(candidates[i])
+            item_mask = int(self._masks[pos])
+            item = {
+                'period_number': self.period_numbers[pos],
+                'position': pos,
+                'front_area': self.front_areas[pos],
+                'back_area': self.back_areas[pos],
+                'shared_front': mask_to_numbers(item_mask & mask & ((1 << FRONT_RANGE) - 1)),
+                'shared_back': mask_to_numbers((item_mask & mask) >> FRONT_RANGE),
+                'jaccard': round(float(jaccard[i]), 4),
+                'hamming': int(bin(item_mask ^ mask).count('1')),
+                'next_period': None, 'next_front_area': None, 'next_back_area': None,
+            }
+            if pos + 1 < len(self):
+                item.update({'next_period': self.period_numbers[pos + 1],
+                             'next_front_area': self.front_areas[pos + 1],
+                             'next_back_area': self.back_areas[pos + 1]})
+            results.append(item)
+        return results
+
+    def follow_scores(self, front_area: Sequence[int], back_area: Sequence[int] = (), top_k: int = 20,
+                      exclude_period: Optional[str] = None) -> Dict[str, Dict[int, float]]:
+        """
+        供评分器使用：最相似的 top_k 期之后一期各号码出现的加权频率 (权重 = Jaccard)，归一化到 0-1。
+        """
+        front_scores = np.zeros(FRONT_RANGE + 1)
+        back_scores = np.zeros(BACK_RANGE + 1)
+        for item in self.query(front_area, back_area, top_k, exclude_period):
+            if item['next_front_area'] is None:
+                continue
+            front_scores[item['next_front_area']] += item['jaccard']
+            back_scores[item['next_back_area']] += item['jaccard']
+        front_scores /= max(front_scores.max(), 1e-9)
+        back_scores /= max(back_scores.max(), 1e-9)
+        return {'front': {n: float(front_scores[n]) for n in range(1, FRONT_RANGE + 1)},
+                'back': {n: float(back_scores[n]) for n in range(1, BACK_RANGE + 1)}}
+
+
+def find_similar_draws(history_data: List[LotteryHistory], front_area: Sequence[int], back_area: Sequence[int] = (),
+                       top_k: int = 10, exclude_period: Optional[str] = None,
+                       index: Optional[DrawSimilarityIndex] = None) -> List[Dict[str, Any]]:
+    """页面/脚本用的便捷查询；传入已构建的 index 时复用并与 history_data 同步。"""
+    index = (index or DrawSimilarityIndex()).sync(history_data)
+    return index.query(front_area, back_area, top_k, exclude_period)
@@ -0,0 +1,50 @@
+# test_backtesting_engine.py
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.algorithms.advanced_algorithms.backtesting_engine import BacktestingEngine
+from src.algorithms.statistical_algorithms import FrequencyAnalysisAlgorithm, OmissionValueAlgorithm
+from src.model.lottery_models import LotteryHistory
+
+
+def _make_history(periods=120, seed=11):
+    rnd = random.Random(seed)
+    return [LotteryHistory(period_number=str(2020001 + i),
+                           front_area=sorted(rnd.sample(range(1, 36), 5)),
+                           back_area=sorted(rnd.sample(range(1, 13), 2)))
+            for i in range(periods)]
+
+
+def test_walk_forward_incremental_matches_full_retrain():
+    """增量更新的频率/遗漏统计必须与每期完整重训的结果一致"""
+    print("=== 测试滚动前推回测 ===")
+    history_data = _make_history()
+
+    for algo_cls in (FrequencyAnalysisAlgorithm, OmissionValueAlgorithm):
+        full = BacktestingEngine(algo_cls(), retrain_every=1).run(history_data, start_idx=50)
+        fast = BacktestingEngine(algo_cls(), retrain_every=10).run(history_data, start_idx=50)
+
+        assert full['periods'] == fast['periods'] == 70
+        assert fast['timing']['retrains'] == 7
+        assert fast['timing']['incremental_updates'] == 63
+        assert [(s['front_hits'], s['back_hits']) for s in full['steps']] == \
+               [(s['front_hits'], s['back_hits']) for s in fast['steps']]
+        assert full['total_cost'] == 70 * 2
+        print(f"{algo_cls.name}: ROI={fast['roi']:.3f}, 命中分布={fast['hit_distribution']['combined']}")
+
+
+def test_rolling_window_without_incremental():
+    history_data = _make_history()
+    engine = BacktestingEngine(FrequencyAnalysisAlgorithm(), retrain_every=5, window='rolling', window_size=30)
+    result = engine.run(history_data, start_idx=40)
+    assert result['timing']['incremental_updates'] == 0
+    assert result['timing']['reused'] == result['periods'] - result['timing']['retrains']
+    assert all(s['train_size'] == 30 for s in result['steps'])
+
+
+if __name__ == "__main__":
+    test_walk_forward_incremental_matches_full_retrain()
+    test_rolling_window_without_incremental()
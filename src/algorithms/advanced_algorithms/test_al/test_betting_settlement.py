@@ -0,0 +1,57 @@
+# test_betting_settlement.py
+import sys
+import os
+import json
+import random
+from itertools import combinations
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.betting_settlement import settle_bets, INVALID_LEVEL
+from src.utils.prize_rules import prize_amount, prize_level, LEVEL_NAMES
+
+
+def _expected(fronts, backs, draw_front, draw_back, multiple, is_additional):
+    amounts, levels = 0.0, []
+    for front in fronts:
+        for back in backs:
+            front_hits, back_hits = len(set(front) & set(draw_front)), len(set(back) & set(draw_back))
+            amounts += prize_amount(front_hits, back_hits, is_additional)
+            levels.append(prize_level(front_hits, back_hits) or 10)
+    best = min(levels)
+    return round(amounts * multiple, 2), LEVEL_NAMES[best if best < 10 else 0]
+
+
+def test_settlement_matches_ticket_by_ticket_reference():
+    """复式、胆拖展开后的向量化结算应与逐注计算一致 (含追加与倍数)"""
+    rnd = random.Random(11)
+    draw_front, draw_back = [2, 7, 13, 21, 30], [5, 9]
+    bets, expected = [], {}
+    for bet_id in range(400):
+        multiple, is_additional = rnd.randint(1, 3), rnd.random() < 0.4
+        pool = rnd.sample(sorted(set(range(1, 14)) | set(draw_front)), 9)  # 提高命中概率
+        if bet_id % 3 == 2:
+            dan, tuo = pool[:2], pool[2:2 + rnd.randint(4, 6)]
+            back_tuo = rnd.sample(range(1, 13), 3)
+            fronts = [tuple(dan) + c for c in combinations(tuo, 3)]
+            backs = list(combinations(back_tuo, 2))
+            front_json, back_json = json.dumps({'dan': dan, 'tuo': tuo}), json.dumps({'dan': [], 'tuo': back_tuo})
+        else:
+            front, back = sorted(set(pool[:rnd.randint(5, 7)])), rnd.sample(range(1, 13), rnd.randint(2, 3))
+            fronts, backs = list(combinations(front, 5)), list(combinations(back, 2))
+            front_json, back_json = json.dumps(front), json.dumps(back)
+        bets.append({'id': bet_id, 'front_numbers': front_json, 'back_numbers': back_json,
+                     'multiple': multiple, 'is_additional': is_additional})
+        expected[bet_id] = _expected(fronts, backs, draw_front, draw_back, multiple, is_additional)
+    bets.append({'id': 999, 'front_numbers': '[1, 2]', 'back_numbers': '[3, 4]', 'multiple': 1})
+
+    results = {r['id']: r for r in settle_bets(bets, draw_front, draw_back)}
+    for bet_id, (amount, level) in expected.items():
+        assert results[bet_id]['winning_amount'] == amount and results[bet_id]['winning_level'] == level
+        assert results[bet_id]['is_winning'] == int(amount > 0)
+    assert results[999]['winning_level'] == INVALID_LEVEL
+    print(f"✅ 结算 {len(bets)} 笔，中奖 {sum(r['is_winning'] for r in results.values())} 笔")
+
+
+if __name__ == "__main__":
+    test_settlement_matches_ticket_by_ticket_reference()
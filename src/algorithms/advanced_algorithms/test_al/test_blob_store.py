@@ -0,0 +1,86 @@
+# test_blob_store.py
+import sys
+import os
+import json
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.sqlite_manager import SQLiteDatabaseManager
+from src.database.blob_store import BlobStore, blob_key_of, externalize_recommendations
+
+
+def _model_outputs():
+    heatmap = [{'number': n, 'score': round(n / 35, 4)} for n in range(1, 36)]
+    return {f"scorer_{k}": {'front_number_scores': heatmap, 'analysis': {'note': '热号'}} for k in range(20)}
+
+
+def test_put_deduplicates_and_resolves_lazily():
+    db = SQLiteDatabaseManager(':memory:')
+    store = BlobStore(db)
+    store.ensure_table()
+    outputs = _model_outputs()
+    refs = {store.put(dict(reversed(list(outputs.items())))) for _ in range(4)}  # 键顺序不同也是同一内容
+    assert len(refs) == 1 and len(next(iter(refs))) < 100
+    stats = store.stats()
+    assert stats['blobs'] == 1 and stats['stored_bytes'] * 5 < stats['raw_bytes']
+    assert BlobStore(db).resolve(next(iter(refs))) == outputs
+    assert store.resolve('{"a": 1}') == {'a': 1} and blob_key_of('{"a": 1}') is None
+
+    try:
+        with db.transaction() as cursor:
+            store.put({'rolled': 'back'}, cursor)
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+    assert store.stats()['blobs'] == 1
+    print("✅ blob 按内容去重、压缩存储并可还原")
+
+
+def test_externalize_legacy_inline_rows():
+    db = SQLiteDatabaseManager(':memory:')
+    outputs = _model_outputs()
+    for model in ('qwen3-max', 'gpt-4o', 'deepseek-chat'):
+        db.execute_insert('algorithm_recommendation', {
+            'period_number': '2025001', 'recommend_time': datetime(2025, 1, 1), 'algorithm_version': model,
+            'confidence_score': 0.8, 'analysis_basis': json.dumps(outputs, ensure_ascii=False),
+            'llm_cognitive_details': json.dumps({'final_memo': model}), 'models': model})
+    result = externalize_recommendations(db, batch_size=2)
+    assert result['converted'] == 3 and result['blobs'] == 4  # analysis_basis 共用一份
+    assert externalize_recommendations(db)['converted'] == 0
+
+    rows = db.execute_query("SELECT analysis_basis, llm_cognitive_details FROM algorithm_recommendation ORDER BY id")
+    store = BlobStore(db)
+    assert all(store.resolve(r['analysis_basis']) == outputs for r in rows)
+    assert store.resolve(rows[1]['llm_cognitive_details']) == {'final_memo': 'gpt-4o'}
+
+
+def test_tripartite_reader_resolves_migrated_details():
+    """迁移后的 *_Strategy_C 记录经由 TripartiteMetaPredictor 读取时仍返回原始内容"""
+    from src.algorithms import tripartite_meta_predictor as tmp
+    from src.analysis.bulk_importer import BulkHistoryImporter
+
+    db = SQLiteDatabaseManager(':memory:')
+    BulkHistoryImporter(db).import_api_items([{'expect': '2025001', 'time': '2025-01-01 21:25:00',
+                                               'frontArea': [1, 2, 3, 4, 5], 'backArea': [1, 2]}])
+    details = {'final_ruling': {'portfolio': [[1, 2, 3, 4, 5, 6, 7]]}, 'memo': '终裁'}
+    db.execute_insert('algorithm_recommendation', {
+        'period_number': db.get_next_period_number(), 'recommend_time': datetime(2025, 1, 2),
+        'algorithm_version': 'gpt-4o_Strategy_C', 'confidence_score': 0.8,
+        'llm_cognitive_details': json.dumps(details, ensure_ascii=False), 'models': 'gpt-4o_Strategy_C'})
+    assert externalize_recommendations(db)['converted'] == 1
+
+    predictor = tmp.TripartiteMetaPredictor.__new__(tmp.TripartiteMetaPredictor)
+    predictor.db_manager = db
+    llm_service = tmp.LLMCallService
+    tmp.LLMCallService = lambda model_name: None
+    try:
+        assert predictor.generate_prediction('gpt-4o') == details
+    finally:
+        tmp.LLMCallService = llm_service
+
+
+if __name__ == "__main__":
+    test_put_deduplicates_and_resolves_lazily()
+    test_externalize_legacy_inline_rows()
+    test_tripartite_reader_resolves_migrated_details()
@@ -0,0 +1,63 @@
+# test_bulk_importer.py
+import sys
+import os
+import json
+import random
+from itertools import combinations
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis.bulk_importer import normalize_record, compute_derived_fields, build_rows, COLUMNS
+
+
+def _runs(front):
+    runs, current = [], [front[0]]
+    for n in front[1:]:
+        if n == current[-1] + 1:
+            current.append(n)
+        else:
+            if len(current) > 1:
+                runs.append(current)
+            current = [n]
+    if len(current) > 1:
+        runs.append(current)
+    return runs
+
+
+def test_derived_fields_match_scalar_reference():
+    rnd = random.Random(3)
+    front = np.array([sorted(rnd.sample(range(1, 36), 5)) for _ in range(500)])
+    back = np.array([sorted(rnd.sample(range(1, 13), 2)) for _ in range(500)])
+    derived = compute_derived_fields(front, back)
+    for k in range(len(front)):
+        numbers = [int(n) for n in front[k]]
+        assert derived['ac_value'][k] == len({b - a for a, b in combinations(numbers, 2)}) - 4
+        runs = _runs(numbers)
+        assert derived['consecutive_count'][k] == len(runs)
+        assert derived['consecutive_numbers'][k] == (json.dumps(runs) if runs else None)
+        tails = json.loads(derived['tail_numbers'][k])
+        assert sum(tails.values()) == 7 and tails.get(str(numbers[0] % 10), 0) >= 1
+    print("✅ 500 期派生字段与逐期计算一致")
+
+
+def test_normalize_record_formats():
+    api = normalize_record({'expect': '24001', 'time': '2024-01-01 21:25:00', 'openCode': '05,01,12,23,35+09,02'})
+    assert api['front'] == [1, 5, 12, 23, 35] and api['back'] == [2, 9]
+    assert api['draw_date'] == '2024-01-01' and api['draw_time'] == '2024-01-01 21:25:00'
+
+    csv_row = {'period_number': '24002', 'draw_date': '2024-01-03', 'front_area_1': '3', 'front_area_2': '4',
+               'front_area_3': '5', 'front_area_4': '20', 'front_area_5': '30', 'back_area_1': '1', 'back_area_2': '12'}
+    record = normalize_record(csv_row, 'csv_import')
+    assert record['draw_time'] == '2024-01-03 21:25:00' and record['data_source'] == 'csv_import'
+
+    row = build_rows([record])[0]
+    assert len(row) == len(COLUMNS)
+    assert dict(zip(COLUMNS, row))['consecutive_numbers'] == '[[3, 4, 5]]'
+    assert normalize_record({'expect': '24003', 'time': '2024-01-05', 'openCode': '01,01,02,03,04+01,02'}) is None
+
+
+if __name__ == "__main__":
+    test_derived_fields_match_scalar_reference()
+    test_normalize_record_formats()
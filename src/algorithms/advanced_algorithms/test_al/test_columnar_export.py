@@ -0,0 +1,73 @@
+# test_columnar_export.py
+import sys
+import os
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis.columnar_export import prediction_frames, reward_frame, ColumnarExporter
+from src.database.sqlite_manager import SQLiteDatabaseManager
+from src.utils.bitmask import numbers_to_mask
+
+
+def _make_logs():
+    payload = {"algorithm": "frequency_analysis",
+               "analysis": {"back_frequency_top": {"1": 9, "2": 12}, "transition_top": [[14, 0.32]]},
+               "recommendations": [{"confidence": 0.75, "front_numbers": [6, 8, 14, 18, 22], "back_numbers": [4, 10]},
+                                   {"front_numbers": "2,6", "back_numbers": "1,2"}]}
+    return [{'id': 1, 'period_number': '2025124', 'algorithm_version': 'frequency_analysis_1.0',
+             'confidence_score': 0.5, 'predictions': json.dumps(payload)},
+            {'id': 2, 'period_number': '2025125', 'algorithm_version': 'frequency_analysis_1.0',
+             'confidence_score': 0.5, 'predictions': json.dumps({"recommendations": [
+                 {"front_numbers": [1, 2, 3, 4, 5], "back_numbers": [1, 2]}]})}]
+
+
+def test_prediction_payloads_are_flattened_with_hits():
+    draws = {'2025124': (numbers_to_mask([1, 2, 3, 6, 8]), numbers_to_mask([4, 5]))}
+    predictions, scores = prediction_frames(_make_logs(), draws)
+    assert len(predictions) == 3 and list(predictions['confidence']) == [0.75, 0.5, 0.5]
+    assert list(predictions['front_hits'][:2]) == [2, 2] and list(predictions['back_hits'][:2]) == [1, 0]
+    assert predictions['front_hits'].isna().iloc[2]  # 2025125 尚未开奖
+    assert ColumnarExporter._next_watermark(predictions, '') == '2025125'
+    assert set(zip(scores['area'], scores['number'])) == {('back', 1), ('back', 2), ('front', 14)}
+
+
+def test_reward_json_columns_become_number_lists():
+    df = reward_frame([{'id': 1, 'period_number': '2024100', 'hit_score': '75.00', 'reward_points': 25,
+                        'penalty_points': 0, 'net_points': 25, 'accuracy_deviation': None,
+                        'hit_details': '{"back_hits": [8], "front_hits": [5, 12, 23]}',
+                        'missed_numbers': '{"back_missed": [3], "front_missed": [7, 18]}'}])
+    row = df.iloc[0]
+    assert row['front_hit_numbers'] == [5, 12, 23] and row['back_missed_numbers'] == [3]
+    assert row['hit_score'] == 75.0 and row['period_year'] == 2024 and 'hit_details' not in df
+
+
+def test_late_rows_below_watermark_are_reexported():
+    """水位之前的期号补录了新行 (id 超过已导出最大 id) 时，该期整期重新导出"""
+    db = SQLiteDatabaseManager(':memory:')
+    logs = _make_logs()
+    for period in ('2025120', '2025121', '2025124', '2025125'):
+        db.execute_insert('algorithm_prediction_logs', {'period_number': period, 'algorithm_version': 'freq_1.0',
+                                                         'predictions': logs[0]['predictions']})
+    exporter = ColumnarExporter(db, export_dir='unused')
+    state = {'predictions': {'period': '2025124', 'max_id': 4}, 'rewards': '2025124'}
+    assert exporter._late_periods('predictions', '2025124', 4) == []
+
+    db.execute_insert('algorithm_prediction_logs', {'period_number': '2025121', 'algorithm_version': 'bayes_1.0',
+                                                     'predictions': logs[1]['predictions']})
+    since, max_id = exporter._watermark(state, 'predictions')
+    late = exporter._late_periods('predictions', since, max_id)
+    assert late == ['2025121']
+    where, params = exporter._window('period_number', since, late)
+    rows = db.execute_query(f"SELECT id, period_number FROM algorithm_prediction_logs WHERE {where} ORDER BY id",
+                            params)
+    assert [r['period_number'] for r in rows] == ['2025121', '2025124', '2025125', '2025121']
+    # 旧格式状态文件只有期号，无法判断补录行
+    assert exporter._watermark(state, 'rewards') == ('2025124', None)
+    assert exporter._late_periods('rewards', '2025124', None) == []
+
+
+if __name__ == "__main__":
+    test_prediction_payloads_are_flattened_with_hits()
+    test_reward_json_columns_become_number_lists()
+    test_late_rows_below_watermark_are_reexported()
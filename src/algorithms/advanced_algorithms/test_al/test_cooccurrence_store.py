@@ -0,0 +1,116 @@
+# test_cooccurrence_store.py
+import sys
+import os
+import random
+from itertools import combinations
+from collections import Counter
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.algorithms.advanced_algorithms.cooccurrence_store import CooccurrenceStore, PERSISTED_DECAY
+from src.algorithms.advanced_algorithms.number_graph_analyzer import NumberGraphAnalyzer
+from src.analysis.bulk_importer import BulkHistoryImporter
+from src.database.sqlite_manager import SQLiteDatabaseManager
+from src.engine.imperial_senate import ImperialSenate
+from src.model.lottery_models import LotteryHistory
+
+
+def _make_history(periods=400, seed=21):
+    rnd = random.Random(seed)
+    return [LotteryHistory(period_number=str(1000001 + i),
+                           front_area=sorted(rnd.sample(range(1, 36), 5)),
+                           back_area=sorted(rnd.sample(range(1, 13), 2)))
+            for i in range(periods)]
+
+
+def test_counts_match_naive_enumeration():
+    """不衰减时号码对/三元组权重应等于逐期枚举计数"""
+    history_data = _make_history()
+    store = CooccurrenceStore.from_history(history_data)
+    pair_counts = Counter(p for r in history_data for p in combinations(r.front_area, 2))
+    triple_counts = Counter(t for r in history_data for t in combinations(r.front_area, 3))
+    for (a, b), count in list(pair_counts.items())[:50]:
+        assert store.pair_weight('front', a, b) == count
+    for (a, b, c), count in list(triple_counts.items())[:50]:
+        assert store.triple_weight(c, a, b) == count
+    assert store.pairs('back').sum() == 2 * len(history_data)
+    print("✅ 共现计数与朴素枚举一致")
+
+
+def test_incremental_decay_matches_bulk_build():
+    """逐期 O(1) 更新的衰减权重应与批量构建一致"""
+    history_data = _make_history()
+    bulk = CooccurrenceStore.from_history(history_data, decay=0.97)
+    incremental = CooccurrenceStore.from_history(history_data[:100], decay=0.97)
+    for record in history_data[100:]:
+        incremental.update(record)
+    assert np.allclose(bulk.pairs('front'), incremental.pairs('front'))
+    assert np.allclose(bulk.triples(), incremental.triples())
+    assert np.isclose(bulk.total_weight, (1 - 0.97 ** len(history_data)) / (1 - 0.97))
+    assert incremental.last_period == history_data[-1].period_number
+
+    restored = CooccurrenceStore.from_rows(
+        [dict(zip(['decay', 'number_type', 'number_a', 'number_b', 'number_c', 'weight', 'draw_count',
+                   'last_period'], row)) for row in bulk.to_rows()], decay=0.97)
+    assert np.allclose(restored.triples(), bulk.triples()) and restored.draw_count == len(history_data)
+    print("✅ 增量衰减更新与持久化往返一致")
+
+
+def test_graph_analyzer_uses_store():
+    history_data = _make_history(120)
+    analyzer = NumberGraphAnalyzer()
+    assert analyzer.train(history_data)
+    a, b = history_data[0].front_area[:2]
+    assert analyzer.front_graph[a][b]['weight'] == analyzer.cooccurrence.pair_weight('front', a, b)
+    print("✅ 号码图边权来自共现存储")
+
+
+def test_senate_uses_only_given_history():
+    """元老院只能看到传入的历史：持久化统计超前时改用内存构建，且不回写数据库"""
+    history_data = _make_history(200)
+    db = SQLiteDatabaseManager()
+    assert CooccurrenceStore.from_history(history_data, PERSISTED_DECAY).save(db)
+    senate = ImperialSenate(db, {}, {})
+
+    past = list(reversed(history_data[:120]))  # 与 get_latest_lottery_history 一致: 最新一期在前
+    store = senate._load_cooccurrence(past)
+    assert store.draw_count == 120 and store.last_period == history_data[119].period_number
+    assert np.allclose(store.pairs('front'), CooccurrenceStore.from_history(past, PERSISTED_DECAY).pairs('front'))
+    assert CooccurrenceStore.load(db, PERSISTED_DECAY).draw_count == 200
+
+    assert senate._load_cooccurrence(history_data[-100:]).draw_count == 200  # 截止期一致时直接读取持久化统计
+    print("✅ 元老院共现统计无未来数据泄漏")
+
+
+def test_refresh_counts_new_draw():
+    """同步到一期新开奖后，refresh 只计入这一期并更新数据库中的共现矩阵"""
+    history_data = _make_history(60)
+    db = SQLiteDatabaseManager()
+    BulkHistoryImporter(db).import_api_items(
+        {'expect': r.period_number, 'time': '2025-01-01 21:25:00',
+         'frontArea': r.front_area, 'backArea': r.back_area} for r in history_data)
+    assert CooccurrenceStore.from_history(history_data[:-1], PERSISTED_DECAY).save(db)
+
+    store = CooccurrenceStore.refresh(db, PERSISTED_DECAY)
+    saved = CooccurrenceStore.load(db, PERSISTED_DECAY)
+    expected = CooccurrenceStore.from_history(history_data, PERSISTED_DECAY)
+    assert store.draw_count == saved.draw_count == 60
+    assert saved.last_period == history_data[-1].period_number
+    assert np.allclose(saved.pairs('front'), expected.pairs('front'))
+    assert np.allclose(saved.triples(), expected.triples())
+    a, b = history_data[-1].front_area[:2]
+    before = CooccurrenceStore.from_history(history_data[:-1], PERSISTED_DECAY)
+    assert saved.pair_weight('front', a, b) > before.pair_weight('front', a, b) * PERSISTED_DECAY
+
+    assert CooccurrenceStore.refresh(db, PERSISTED_DECAY).draw_count == 60  # 没有新开奖时不重复计入
+    print("✅ 新开奖增量计入持久化共现统计")
+
+
+if __name__ == "__main__":
+    test_counts_match_naive_enumeration()
+    test_incremental_decay_matches_bulk_build()
+    test_graph_analyzer_uses_store()
+    test_senate_uses_only_given_history()
+    test_refresh_counts_new_draw()
@@ -0,0 +1,98 @@
+# test_feature_engineer.py
+import sys
+import os
+import random
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.algorithms.advanced_algorithms.feature_engineer import FeatureEngineer
+from src.model.lottery_models import LotteryHistory
+
+
+def _make_history(periods=60, seed=5):
+    rnd = random.Random(seed)
+    history_data = [LotteryHistory(period_number=str(2024001 + i),
+                                   front_area=sorted(rnd.sample(range(1, 36), 5)),
+                                   back_area=sorted(rnd.sample(range(1, 13), 2)))
+                    for i in range(periods)]
+    rnd.shuffle(history_data)  # 构建器应自行按期号排序
+    return history_data
+
+
+def _per_window_features(history_data, lookback):
+    """逐窗口 Counter 统计的旧实现 (仅把排序键从不存在的 date 换成 period_number)，作为对照"""
+    if len(history_data) < lookback + 1:
+        return pd.DataFrame(), pd.DataFrame()
+
+    rows, targets = [], []
+    history_sorted = sorted(history_data, key=lambda r: str(r.period_number))
+    for i in range(lookback, len(history_sorted) - 1):
+        window = history_sorted[i - lookback:i]
+        next_rec = history_sorted[i + 1]
+        front_counts, back_counts = Counter(), Counter()
+        sums, odd_ratios = [], []
+        for w in window:
+            front_counts.update(w.front_area)
+            back_counts.update(w.back_area)
+            sums.append(sum(w.front_area + w.back_area))
+            odd = sum(1 for n in w.front_area + w.back_area if n % 2 == 1)
+            even = len(w.front_area) + len(w.back_area) - odd
+            odd_ratios.append(odd / (even + 1e-6))
+        features = {
+            'mean_sum': np.mean(sums),
+            'std_sum': np.std(sums),
+            'mean_odd_ratio': np.mean(odd_ratios),
+            'front_unique': len(front_counts),
+            'back_unique': len(back_counts)
+        }
+        for num in range(1, 36):
+            features[f'front_freq_{num}'] = front_counts.get(num, 0)
+        for num in range(1, 13):
+            features[f'back_freq_{num}'] = back_counts.get(num, 0)
+        rows.append(features)
+        targets.append({'target_sum': sum(next_rec.front_area) + sum(next_rec.back_area)})
+    return pd.DataFrame(rows), pd.DataFrame(targets)
+
+
+def test_single_lookback_matches_per_window():
+    history_data = _make_history()
+    for lookback in (1, 5, 20, 58, 59, 60, 80):
+        features, targets = FeatureEngineer.build_features(history_data, lookback=lookback)
+        expected_features, expected_targets = _per_window_features(history_data, lookback)
+        assert len(features) == len(expected_features) and len(targets) == len(expected_targets)
+        if lookback >= len(history_data):
+            # 窗口长于历史: 两种实现都返回空表
+            assert features.empty and targets.empty
+            continue
+        if expected_features.empty:
+            continue
+        assert list(features.columns) == list(expected_features.columns)
+        assert np.allclose(features.to_numpy(), expected_features.to_numpy(dtype=float))
+        assert (targets['target_sum'].to_numpy() == expected_targets['target_sum'].to_numpy()).all()
+    print("✅ 前缀和滑窗特征与逐窗口实现一致")
+
+
+def test_multi_lookback_blocks_match_per_window():
+    history_data = _make_history()
+    lookbacks = (5, 10, 30)
+    features, targets = FeatureEngineer.build_rolling_features(history_data, lookbacks=lookbacks)
+    assert len(features) == len(history_data) - max(lookbacks) - 1
+    for lb in lookbacks:
+        expected, expected_targets = _per_window_features(history_data, lb)
+        offset = max(lookbacks) - lb  # 多窗口结果从最长窗口可用的那一期开始
+        block = features[[f'{col}_w{lb}' for col in expected.columns]].to_numpy()
+        assert np.allclose(block, expected.to_numpy(dtype=float)[offset:])
+        assert (targets['target_sum'].to_numpy() == expected_targets['target_sum'].to_numpy()[offset:]).all()
+
+    features, targets = FeatureEngineer.build_rolling_features(history_data, lookbacks=(5, len(history_data)))
+    assert features.empty and targets.empty  # 任一窗口长于历史时不产出特征
+    print("✅ 多窗口特征块与逐窗口实现一致")
+
+
+if __name__ == "__main__":
+    test_single_lookback_matches_per_window()
+    test_multi_lookback_blocks_match_per_window()
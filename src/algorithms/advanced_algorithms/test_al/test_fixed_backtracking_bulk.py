@@ -0,0 +1,147 @@
+# test_fixed_backtracking_bulk.py
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis.bulk_importer import BulkHistoryImporter
+from src.database.sqlite_manager import SQLiteDatabaseManager
+from src.engine.fixed_backtracking_engine import FixedBacktrackingEngine
+
+DRAWS = [
+    ('2025001', [3, 8, 15, 22, 30], [2, 9]),
+    ('2025002', [1, 5, 12, 19, 33], [4, 11]),
+    ('2025003', [7, 9, 18, 25, 34], [1, 6]),
+    ('2025004', [2, 10, 14, 27, 31], [3, 12]),
+    ('2025005', [4, 11, 20, 28, 35], [5, 7]),  # 该期没有推荐，只计入窗口期数
+]
+# (期号, 算法版本, [(前区, 后区), ...])；前区为 None 的明细行应被 JOIN 条件排除
+RECOMMENDATIONS = [
+    ('2025001', 'algo_a_1.0', [('3,8,15,22,31', '2,9'), ('1,2,4,5,6', '10,11')]),
+    ('2025002', 'algo_b_1.0', [('1,5,12,20,21', '4,8')]),
+    ('2025003', 'algo_a_1.0', [('7,9,18,25,34', '1,6')]),
+    ('2025004', 'algo_b_1.0', [(None, '3,12'), ('2,10,14,16,17', '1,2')]),
+]
+
+# algorithm_performance 线上为“超级表”结构，这里只建回溯引擎读写的字段
+PERFORMANCE_DDL = """
+CREATE TABLE `algorithm_performance` (
+  `id` bigint(20) NOT NULL AUTO_INCREMENT,
+  `algorithm_version` varchar(100) NULL DEFAULT NULL,
+  `total_recommendations` int(11) NULL DEFAULT 0,
+  `total_periods_analyzed` int(11) NULL DEFAULT 0,
+  `confidence_accuracy` float NULL DEFAULT 0,
+  `last_updated` datetime NULL DEFAULT NULL,
+  PRIMARY KEY (`id`) USING BTREE
+) ENGINE = InnoDB
+"""
+REWARD_COLUMNS = ("period_number, algorithm_version, recommendation_id, front_hit_count, back_hit_count, hit_score, "
+                  "reward_points, penalty_points, net_points, performance_rating")
+
+
+def _build_db():
+    """两条路径使用同一份初始数据: algo_a 已有性能记录 (走 CASE UPDATE)，algo_b 没有 (走批量 INSERT)，
+    2025002 期的奖罚记录已存在 (应被跳过)"""
+    db = SQLiteDatabaseManager()
+    BulkHistoryImporter(db).import_api_items(
+        {'expect': period, 'time': f'2025-01-{i + 1:02d} 21:25:00', 'frontArea': front, 'backArea': back}
+        for i, (period, front, back) in enumerate(DRAWS))
+    rec_ids = []
+    for period, version, details in RECOMMENDATIONS:
+        rec_id = db.execute_update(
+            "INSERT INTO algorithm_recommendation (period_number, recommend_time, algorithm_version, confidence_score) "
+            "VALUES (%s, %s, %s, %s)", (period, datetime(2025, 1, 1), version, 0.5))
+        for front, back in details:
+            db.execute_update(
+                "INSERT INTO recommendation_details (recommendation_metadata_id, recommend_type, front_numbers, "
+                "back_numbers) VALUES (%s, %s, %s, %s)", (rec_id, 'primary', front, back))
+        rec_ids.append(rec_id)
+
+    db.execute_update("DROP TABLE algorithm_performance")
+    db.execute_update(PERFORMANCE_DDL)
+    db.execute_update("INSERT INTO algorithm_performance (algorithm_version, total_recommendations) VALUES (%s, %s)",
+                      ('algo_a_1.0', 99))
+    db.execute_update(
+        f"INSERT INTO reward_penalty_records ({REWARD_COLUMNS}) VALUES (%s, %s, %s, 0, 0, 0, 0, 0, 0, 1)",
+        ('2025002', 'algo_b_1.0', rec_ids[1]))
+    return db, rec_ids
+
+
+def _engine(db):
+    engine = FixedBacktrackingEngine(db_config={})
+    engine._get_connection = db._get_connection
+    execute_query = engine._execute_query
+
+    def _query(query, params=None):
+        # 逐条路径的列探测没有限定 TABLE_SCHEMA，这里用 pragma 给出同样的结果
+        if 'INFORMATION_SCHEMA' in query:
+            return db.execute_query(
+                "SELECT name AS COLUMN_NAME FROM pragma_table_info('algorithm_performance') "
+                "WHERE name IN ('total_recommendations', 'confidence_accuracy')")
+        return execute_query(query, params)
+
+    engine._execute_query = _query
+    return engine
+
+
+def _snapshot(db):
+    rewards = db.execute_query(f"SELECT {REWARD_COLUMNS} FROM reward_penalty_records "
+                               f"ORDER BY period_number, recommendation_id, hit_score")
+    performance = db.execute_query("SELECT algorithm_version, total_recommendations, confidence_accuracy, "
+                                   "total_periods_analyzed, last_updated FROM algorithm_performance "
+                                   "ORDER BY algorithm_version")
+    return rewards, performance
+
+
+def test_window_rows_grouped_per_recommendation():
+    db, rec_ids = _build_db()
+    result = _engine(db).run_algorithm_backtracking(period_count=10, bulk=True)
+    assert result['status'] == 'success' and result['total_periods_analyzed'] == 4
+
+    by_period = {r['period_number']: r for r in result['backtrack_results']}
+    assert '2025005' not in by_period
+    assert [r['recommendation_id'] for r in by_period['2025001']['recommendation_results']] == [rec_ids[0]] * 2
+    assert [r['recommendation_id'] for r in by_period['2025004']['recommendation_results']] == [rec_ids[3]]
+    assert by_period['2025001']['actual_numbers']['front_numbers'] == DRAWS[0][1]
+    hits = [(r['performance']['front_hits'], r['performance']['back_hits'])
+            for r in by_period['2025001']['recommendation_results']]
+    assert hits == [(4, 2), (0, 0)]
+    assert by_period['2025003']['recommendation_results'][0]['performance']['hit_score'] == 100.0
+    print("✅ 窗口 JOIN 结果按期号与推荐正确分组")
+
+
+def test_bulk_writes_match_per_row_path():
+    bulk_db, rec_ids = _build_db()
+    per_row_db, _ = _build_db()
+    bulk = _engine(bulk_db).run_algorithm_backtracking(period_count=10, bulk=True)
+    per_row = _engine(per_row_db).run_algorithm_backtracking(period_count=10, bulk=False)
+    assert bulk['backtrack_results'] == per_row['backtrack_results']
+    assert bulk['summary_metrics'] == per_row['summary_metrics']
+
+    bulk_rewards, bulk_performance = _snapshot(bulk_db)
+    per_row_rewards, per_row_performance = _snapshot(per_row_db)
+    assert bulk_rewards == per_row_rewards
+    # 已存在的 2025002 期奖罚记录被跳过；同一推荐的第二条明细与逐条路径一样只保存一次
+    assert len(bulk_rewards) == 4
+    assert [r['hit_score'] for r in bulk_rewards if r['recommendation_id'] == rec_ids[1]] == [0]
+
+    assert [p['algorithm_version'] for p in bulk_performance] == ['algo_a_1.0', 'algo_b_1.0']
+    assert len(per_row_performance) == len(bulk_performance)
+    for bulk_row, per_row_row in zip(bulk_performance, per_row_performance):
+        assert bulk_row['total_recommendations'] == per_row_row['total_recommendations']
+        assert abs(bulk_row['confidence_accuracy'] - per_row_row['confidence_accuracy']) < 1e-9
+        assert bulk_row['last_updated'] is not None
+    assert {p['algorithm_version']: p['total_recommendations'] for p in bulk_performance} == \
+        {'algo_a_1.0': 3, 'algo_b_1.0': 2}
+    assert all(p['total_periods_analyzed'] == 4 for p in bulk_performance)
+
+    # 重复运行不会重复写入奖罚记录
+    _engine(bulk_db).run_algorithm_backtracking(period_count=10, bulk=True)
+    assert _snapshot(bulk_db)[0] == bulk_rewards
+    print("✅ 批量回溯的奖罚记录与性能统计与逐条路径一致")
+
+
+if __name__ == "__main__":
+    test_window_rows_grouped_per_recommendation()
+    test_bulk_writes_match_per_row_path()
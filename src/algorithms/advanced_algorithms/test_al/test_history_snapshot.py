@@ -0,0 +1,50 @@
+# test_history_snapshot.py
+import sys
+import os
+import json
+import random
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm.history_snapshot import get_history_snapshot, clear_history_snapshots
+
+
+def _write_history(path, periods=150, seed=5):
+    rnd = random.Random(seed)
+    items = []
+    for i in range(periods):
+        front = sorted(rnd.sample(range(1, 36), 5))
+        back = sorted(rnd.sample(range(1, 13), 2))
+        items.append({"openCode": ",".join(f"{n:02d}" for n in front) + "+" + ",".join(f"{n:02d}" for n in back),
+                      "expect": str(2024001 + i), "time": "2024-01-01 21:25:00"})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(list(reversed(items)), f)  # 与接口一致：最新在前
+    return items
+
+
+def test_snapshot_is_sorted_shared_and_reloaded_on_change():
+    clear_history_snapshots()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history.json')
+        items = _write_history(path)
+        snapshot = get_history_snapshot(path=path)
+        assert snapshot.version == items[-1]['expect'] and snapshot.next_period() == str(2024151)
+        assert [r['expect'] for r in snapshot.records] == [item['expect'] for item in items]
+
+        summary = snapshot.summary()
+        assert summary['periods_analyzed'] == 100 and len(summary['recent_20_data']) == 20
+        expected_avg = sum(r['frontArea_Sum'] for r in snapshot.records[-100:]) / 100
+        assert abs(summary['average_sum'] - expected_avg) < 1e-9
+        assert get_history_snapshot(path=path) is snapshot and snapshot.summary() is summary
+
+        _write_history(path, periods=151)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+        refreshed = get_history_snapshot(path=path)
+        assert refreshed is not snapshot and refreshed.version == str(2024151)
+        assert refreshed.to_lottery_history(5)[0].period_number == str(2024151)
+    print("✅ 快照按期号复用、变化后重新加载")
+
+
+if __name__ == "__main__":
+    test_snapshot_is_sorted_shared_and_reloaded_on_change()
@@ -0,0 +1,66 @@
+# test_hit_rate_optimizer.py
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.algorithms.advanced_algorithms.hit_rate_optimizer import HitRateOptimizer
+from src.algorithms.statistical_algorithms import FrequencyAnalysisAlgorithm
+from src.model.lottery_models import LotteryHistory
+
+
+def _make_history(periods=200, seed=7):
+    """生成随机开奖历史，测试不依赖数据库。"""
+    rnd = random.Random(seed)
+    return [LotteryHistory(period_number=str(2020001 + i),
+                           front_area=sorted(rnd.sample(range(1, 36), 5)),
+                           back_area=sorted(rnd.sample(range(1, 13), 2)))
+            for i in range(periods)]
+
+
+# 命中率优化器测试
+def test_hit_rate_optimizer():
+    """测试位掩码版遗传搜索"""
+    print("=== 测试命中率优化器 ===")
+    history_data = _make_history()
+
+    optimizer = HitRateOptimizer()
+    optimizer.set_parameters({'seed': 42, 'population_size': 200, 'generations': 40})
+    print(f"算法名称: {optimizer.name}")
+    print(f"版本: {optimizer.version}")
+
+    assert optimizer.train(history_data)
+    result = optimizer.predict(history_data)
+    recommendations = result['recommendations']
+    print(f"搜索统计: {result['analysis']['search_stats']}")
+
+    assert 0 < len(recommendations) <= optimizer.parameters['top_k']
+    for rec in recommendations:
+        assert len(set(rec['front_numbers'])) == 5
+        assert all(1 <= n <= 35 for n in rec['front_numbers'])
+        assert len(set(rec['back_numbers'])) == 2
+        assert all(1 <= n <= 12 for n in rec['back_numbers'])
+
+    # 向量化适应度必须与逐期集合求交的旧算法一致
+    best = recommendations[0]['front_numbers']
+    expected = sum(len(set(best) & set(r.front_area)) for r in history_data[-30:]) / (30 * 5)
+    assert abs(optimizer._evaluate_hit_score(best, history_data) - expected) < 1e-9
+    print(f"最佳组合: {best}, 平均命中率: {expected:.4f}")
+
+
+def test_hit_rate_optimizer_with_sub_models():
+    """评分型子模型的前N号码应进入候选池"""
+    history_data = _make_history()
+    optimizer = HitRateOptimizer(sub_models=[FrequencyAnalysisAlgorithm()])
+    optimizer.set_parameters({'seed': 1, 'candidate_top_n': 10})
+    front_pool, back_pool = optimizer._collect_candidate_pools(history_data, None)
+    assert len(front_pool) == 10
+    assert optimizer.train(history_data)
+    for rec in optimizer.predict(history_data)['recommendations']:
+        assert set(rec['front_numbers']) <= set(front_pool)
+
+
+if __name__ == "__main__":
+    test_hit_rate_optimizer()
+    test_hit_rate_optimizer_with_sub_models()
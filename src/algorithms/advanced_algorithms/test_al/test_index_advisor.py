@@ -0,0 +1,50 @@
+# test_index_advisor.py
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.sqlite_manager import SQLiteDatabaseManager
+from src.database.migrations import MigrationRunner, existing_columns, existing_indexes
+from src.database.index_advisor import seed_database, check_hot_queries
+
+
+def test_migrations_remove_full_scans_and_are_idempotent():
+    db = SQLiteDatabaseManager(':memory:')
+    params = seed_database(db, periods=40, models=3)
+    before = {r.query.name: r.full_scans for r in check_hot_queries(db, params)}
+    assert before['performance_by_version'] == ['algorithm_performance']
+    assert before['reward_by_version'] == ['reward_penalty_records']
+
+    result = MigrationRunner(db).apply_all()
+    assert result['applied'] == 5 and result['indexes_created'] == 5  # 已有的关联列索引不重复创建
+    assert MigrationRunner(db).apply_all() == {'applied': 0, 'indexes_created': 0}
+    assert ['period_number', 'models'] in existing_indexes(db, 'algorithm_recommendation').values()
+
+    after = check_hot_queries(db, params)
+    assert not [r.query.name for r in after if r.full_scans]
+    plan = {r.query.name: r.plan for r in after}
+    assert any('idx_period_models' in line for line in plan['delete_recommendations_by_model_base'])
+    print("✅ 迁移后热点查询均走索引")
+
+
+def test_migration_adds_missing_betting_column():
+    """旧库的 personal_betting 缺少 is_additional 与按期结算索引时由迁移补齐"""
+    db = SQLiteDatabaseManager(':memory:')
+    db.execute_update('DROP INDEX IF EXISTS "personal_betting__idx_period_settlement"')
+    db.execute_update('ALTER TABLE personal_betting DROP COLUMN is_additional')
+    assert 'is_additional' not in existing_columns(db, 'personal_betting')
+
+    MigrationRunner(db).apply_all()
+    assert 'is_additional' in existing_columns(db, 'personal_betting')
+    assert ['period_number', 'winning_level'] in existing_indexes(db, 'personal_betting').values()
+    assert db.execute_update(
+        "INSERT INTO personal_betting (user_id, period_number, bet_time, bet_type, front_numbers, front_count, "
+        "back_numbers, back_count, bet_amount, is_additional) VALUES (%s, %s, NOW(), %s, %s, 5, %s, 2, 3.0, 1)",
+        ('u1', '2025001', 'single', '[1, 2, 3, 4, 5]', '[1, 2]'))
+    print("✅ 迁移补齐投注表缺失的列与索引")
+
+
+if __name__ == "__main__":
+    test_migrations_remove_full_scans_and_are_idempotent()
+    test_migration_adds_missing_betting_column()
@@ -0,0 +1,86 @@
+# test_job_queue.py
+import sys
+import os
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine import job_queue
+from src.engine.job_queue import JobQueue, ProgressTracker, worker_loop
+
+FAKE_WORKFLOW = (
+    "print('🚀 [任务1/2] 执行: 初始化');"
+    "print('--- [步骤 1/2] 准备 ---');"
+    "print('--- [步骤 2/2] 预测 ---');"
+    "print('🧠 [任务2/2] 执行: 收尾');"
+    "print('done')"
+)
+
+
+def test_job_queue():
+    job_queue.WORKFLOWS['fake'] = ['-c', FAKE_WORKFLOW]
+    job_queue.WORKFLOWS['broken'] = ['-c', "import sys; print('boom'); sys.exit(3)"]
+    path = os.path.join(tempfile.mkdtemp(), 'jobs.sqlite3')
+    queue = JobQueue(path)
+
+    # 1. 并发提交同一 (工作流, 期号) 只产生一个任务，不同期号各自独立
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: queue.enqueue('fake', '2025001', requested_by=f'u{i}'), range(8)))
+    assert len({job['id'] for job, _ in results}) == 1
+    assert sum(created for _, created in results) == 1
+    job_id = results[0][0]['id']
+    assert queue.get(job_id)['request_count'] == 8
+    other, created = queue.enqueue('fake', '2025002')
+    assert created and other['id'] != job_id
+    try:
+        queue.enqueue('unknown', '2025001')
+        assert False, "未知工作流应报错"
+    except ValueError:
+        pass
+
+    # 2. 工作进程按顺序执行，输出、进度与结果写回状态表
+    assert worker_loop(path, poll_seconds=0.05, max_jobs=2) == 2
+    job = queue.get(job_id)
+    assert job['status'] == 'succeeded' and job['return_code'] == 0 and job['progress'] == 1.0
+    assert '[步骤 2/2]' in job['log'] and 'done' in job['log']
+    assert json.loads(job['result'])['tail'][-1] == 'done'
+    assert queue.get(other['id'])['status'] == 'succeeded'
+
+    # 3. 已完成的任务默认直接复用，rerun 时重新排队
+    again, created = queue.enqueue('fake', '2025001')
+    assert not created and again['id'] == job_id and again['status'] == 'succeeded'
+    rerun, created = queue.enqueue('fake', '2025001', reuse_succeeded=False)
+    assert created and rerun['status'] == 'queued'
+
+    # 4. 失败的任务记录返回码，之后可以重新提交
+    failed, _ = queue.enqueue('broken', '2025001')
+    worker_loop(path, poll_seconds=0.05, max_jobs=2)
+    failed = queue.get(failed['id'])
+    assert failed['status'] == 'failed' and failed['return_code'] == 3 and 'boom' in failed['log']
+    assert queue.enqueue('broken', '2025001')[1]
+
+    # 5. 心跳超时的执行中任务视为工作进程已退出
+    claimed = queue.claim(worker_pid=999999)
+    conn = queue._connect()
+    conn.execute("UPDATE jobs SET heartbeat_at = '2000-01-01 00:00:00' WHERE id = ?", (claimed['id'],))
+    conn.close()
+    assert queue.reap_orphans() == 1
+    assert queue.get(claimed['id'])['status'] == 'failed'
+    assert queue.live_workers() == 0
+
+    # 6. 进度估算
+    tracker = ProgressTracker()
+    assert not tracker.feed("普通输出")
+    tracker.feed("=== 👑 [任务3/3] 执行: 最终预测 ===")
+    tracker.feed("--- [步骤 3/5] 蒸馏情报 ---")
+    assert abs(tracker.progress - (2 + 2 / 5) / 3) < 1e-9
+    assert tracker.message.startswith('[步骤 3/5]')
+
+    del job_queue.WORKFLOWS['fake'], job_queue.WORKFLOWS['broken']
+    print("✅ 任务队列: 合并、执行、复用、失败与超时回收均正确")
+
+
+if __name__ == "__main__":
+    test_job_queue()
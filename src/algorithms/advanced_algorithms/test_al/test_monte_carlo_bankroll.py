@@ -0,0 +1,67 @@
+# test_monte_carlo_bankroll.py
+import sys
+import os
+import random
+from math import comb
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.algorithms.advanced_algorithms.monte_carlo_bankroll import MonteCarloBankrollSimulator, portfolio_roi_summary
+from src.algorithms.risk_management_algorithms import (RiskAssessmentAlgorithm, PortfolioOptimizationAlgorithm,
+                                                       StopLossAlgorithm)
+from src.model.lottery_models import LotteryHistory
+from src.utils.prize_rules import PRIZE_LEVELS, BASE_PRIZES, TICKET_PRICE
+
+
+def _make_history(periods=80, seed=9):
+    rnd = random.Random(seed)
+    return [LotteryHistory(period_number=str(2021001 + i),
+                           front_area=sorted(rnd.sample(range(1, 36), 5)),
+                           back_area=sorted(rnd.sample(range(1, 13), 2)))
+            for i in range(periods)]
+
+
+def test_single_ticket_distribution_is_exact():
+    """单注的派奖分布应与超几何分布的解析结果一致"""
+    simulator = MonteCarloBankrollSimulator([([3, 8, 15, 22, 31], [4, 9])])
+    hit_probability, expected_prize = 0.0, 0.0
+    for (front_hits, back_hits), level in PRIZE_LEVELS.items():
+        p = comb(5, front_hits) * comb(30, 5 - front_hits) / comb(35, 5) * \
+            comb(2, back_hits) * comb(10, 2 - back_hits) / comb(12, 2)
+        hit_probability += p
+        expected_prize += p * BASE_PRIZES[level]
+    assert np.isclose(simulator.hit_probability(), hit_probability)
+    assert np.isclose(simulator.expected_roi(), (expected_prize - TICKET_PRICE) / TICKET_PRICE)
+    print(f"✅ 单注中奖率 {hit_probability:.4%}，期望ROI {simulator.expected_roi():+.2%}")
+
+
+def test_stop_loss_bounds_losses_and_curves_are_monotone():
+    simulator = MonteCarloBankrollSimulator([([1, 2, 3, 4, 5, 6], [1, 2])])  # 复式 6+2 = 6 注
+    assert len(simulator.tickets) == 6 and simulator.cost == 12.0
+    result = simulator.simulate(n_sequences=50_000, n_periods=60, initial_bankroll=300.0,
+                                max_loss_ratio=0.3, chunk_size=20_000, seed=1)
+    assert result['ruin_curve'].shape == (60,) and np.all(np.diff(result['stop_curve']) >= 0)
+    # 止损后单期最多再亏一期成本
+    assert result['roi_percentiles']['p1'] >= -0.3 - simulator.cost / 300.0
+    assert 0.0 < result['expected_drawdown'] <= 0.3 + simulator.cost / 300.0
+    assert result['stop_curve'][-1] > 0.5
+    print(f"✅ 止损概率 {result['stop_curve'][-1]:.2%}，平均回撤 {result['expected_drawdown']:.2%}")
+
+
+def test_risk_algorithms_use_simulation():
+    history_data = _make_history()
+    for algorithm in (RiskAssessmentAlgorithm(), PortfolioOptimizationAlgorithm(), StopLossAlgorithm()):
+        algorithm.set_parameters({'simulation_sequences': 5000})
+        assert algorithm.train(history_data)
+        recommendation = algorithm.predict(history_data)['recommendations'][0]
+        assert recommendation['predicted_roi'] < 0
+    assert portfolio_roi_summary([{'front_numbers': [1, 2, 3, 4, 5], 'back_numbers': [1, 2]}]).startswith('期望ROI')
+    assert portfolio_roi_summary([{'front_numbers': ['x'], 'back_numbers': []}]) == ''
+
+
+if __name__ == "__main__":
+    test_single_ticket_distribution_is_exact()
+    test_stop_loss_bounds_losses_and_curves_are_monotone()
+    test_risk_algorithms_use_simulation()
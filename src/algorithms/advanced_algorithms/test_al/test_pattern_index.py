@@ -0,0 +1,79 @@
+# test_pattern_index.py
+import sys
+import os
+import random
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.algorithms.advanced_algorithms.pattern_index import PatternIndex
+from src.algorithms.intelligent_pattern_recognizer import IntelligentPatternRecognizer
+from src.model.lottery_models import LotteryHistory
+
+
+def _make_history(periods=300, seed=5):
+    rnd = random.Random(seed)
+    return [LotteryHistory(period_number=str(2020001 + i),
+                           front_area=sorted(rnd.sample(range(1, 36), 5)),
+                           back_area=sorted(rnd.sample(range(1, 13), 2)))
+            for i in range(periods)]
+
+
+def test_follow_queries_match_linear_scan():
+    """索引查询与逐期集合运算的结果一致"""
+    history_data = _make_history()
+    index = PatternIndex.from_history(history_data[:200])
+    for record in history_data[200:]:
+        index.append(record)
+
+    pattern, within = {3, 17}, 2
+    expected = [0] * 36
+    support = 0
+    for pos, record in enumerate(history_data[:-1]):
+        if pattern <= set(record.front_area):
+            support += 1
+            for follow in history_data[pos + 1:pos + 1 + within]:
+                for num in follow.front_area:
+                    expected[num] += 1
+    result = index.follow_pattern(front_numbers=sorted(pattern), within=within)
+    assert result['support'] == support
+    assert result['front'].tolist() == expected[1:]
+
+    lag = index.lag_followers(7, lag=3)
+    manual = sum(1 for pos, r in enumerate(history_data[:-3]) if 7 in r.front_area and 12 in history_data[pos + 3].front_area)
+    assert lag['front'][11] == manual
+
+
+def test_recognizer_reuses_index_incrementally():
+    history_data = _make_history()
+    recognizer = IntelligentPatternRecognizer()
+    assert recognizer.train(history_data[:250])
+    index = recognizer.pattern_index
+    assert recognizer.train(list(reversed(history_data[:260])))
+    assert recognizer.pattern_index is index and len(index) == 260
+    scores = recognizer.predict(history_data[:260])['recommendations'][0]['front_number_scores']
+    assert len(scores) == 35
+
+
+def test_structural_mode_ties_prefer_smaller_value():
+    """奇偶/大小比例次数并列时取较小的取值，结果与输入顺序无关"""
+    assert IntelligentPatternRecognizer._most_common(np.array([3, 1, 3, 1, 2])) == 1
+    assert IntelligentPatternRecognizer._most_common(np.array([1, 3, 1, 3, 4, 4, 4])) == 4
+
+    # 前区 3奇4大 与 2奇1大 交替出现，奇数个数与大号个数都是并列
+    fronts = [[1, 19, 21, 22, 24], [2, 3, 5, 6, 20]]
+    history_data = [LotteryHistory(period_number=str(2021001 + i), front_area=fronts[i % 2], back_area=[1, 2])
+                    for i in range(40)]
+    for ordered in (history_data, list(reversed(history_data))):
+        recognizer = IntelligentPatternRecognizer()
+        assert recognizer.train(ordered)
+        structural = recognizer.patterns['structural_balance']
+        assert structural['common_parity'] == '2:3' and structural['common_size'] == '1:4'
+    print("✅ 结构模式并列时按取值稳定选择")
+
+
+if __name__ == "__main__":
+    test_follow_queries_match_linear_scan()
+    test_recognizer_reuses_index_incrementally()
+    test_structural_mode_ties_prefer_smaller_value()
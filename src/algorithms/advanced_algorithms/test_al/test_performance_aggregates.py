@@ -0,0 +1,53 @@
+# test_performance_aggregates.py
+import sys
+import os
+import re
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.sqlite_manager import SQLiteDatabaseManager
+from src.engine.performance_aggregates import (PerformanceAggregateStore, SUMMARY_TABLE, SUMMARY_TABLE_DDL,
+                                               WINDOW_SIZE)
+
+_IDENTIFIER = re.compile(r"(?<![\w.`])(\w+)(?![\w(])")
+
+
+def test_upsert_has_no_ambiguous_columns():
+    """ON DUPLICATE KEY UPDATE 的取值表达式中，汇总表列必须带表名或包在 VALUES() 中。"""
+    summary_columns = set(re.findall(r"`(\w+)`", SUMMARY_TABLE_DDL)) - {SUMMARY_TABLE}
+    sql = PerformanceAggregateStore(db_manager=None)._summary_upsert_sql(2)
+    head, update = re.split(r"\bON DUPLICATE KEY UPDATE\b", sql)
+    assert 'LEFT JOIN algorithm_performance_summary s ' in head  # 汇总表以别名 s 参与 SELECT
+    update = re.sub(r"VALUES\(\w+\)", "?", update)
+    assignments = re.split(r",\s*(?=\w+ = )", update.strip())
+    assert len(assignments) >= 20
+    for assignment in assignments:
+        column, expression = assignment.split(' = ', 1)
+        assert column in summary_columns
+        bare = [name for name in _IDENTIFIER.findall(expression) if name in summary_columns]
+        assert not bare, f"{column} 的表达式中存在未限定的列: {bare}"
+
+
+def test_rolling_window_on_sqlite():
+    db = SQLiteDatabaseManager()
+    store = PerformanceAggregateStore(db)
+    scores = [0.1 * (i % 7) for i in range(WINDOW_SIZE + 5)]
+    for i, score in enumerate(scores):
+        rows = [{'algorithm_version': 'freq_1.0', 'score': score, 'front_hits': i % 6, 'back_hits': i % 3}]
+        assert store.record_period(str(2024001 + i), rows)
+    # 同一期重复评估不会重复累加
+    assert store.record_period(str(2024001 + len(scores) - 1), [{'algorithm_version': 'freq_1.0', 'score': 9.0}])
+
+    aggregate = store.get_aggregates()['freq_1.0']
+    window = scores[-WINDOW_SIZE:]
+    assert aggregate['periods_evaluated'] == len(scores)
+    assert aggregate['window_count'] == WINDOW_SIZE
+    assert abs(aggregate['window_mean'] - sum(window) / WINDOW_SIZE) < 1e-9
+    assert aggregate['last_period'] == str(2024001 + len(scores) - 1)
+    assert sum(aggregate['front_hit_histogram'].values()) == len(scores)
+
+
+if __name__ == "__main__":
+    test_upsert_has_no_ambiguous_columns()
+    test_rolling_window_on_sqlite()
+    print("✅ 滚动汇总: upsert 无歧义列，窗口与幂等更新正确")
@@ -0,0 +1,61 @@
+# test_prediction_log_retention.py
+import sys
+import os
+import json
+import random
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis.bulk_importer import BulkHistoryImporter
+from src.database.sqlite_manager import SQLiteDatabaseManager
+from src.engine.prediction_log_retention import PredictionLogRetention, load_prediction_logs, archive_path
+
+
+def _seed(db, periods=30, algorithms=('freq_1.0', 'markov_1.0')):
+    rnd = random.Random(11)
+    draws = [{'expect': str(2024001 + i), 'time': '2024-03-01 21:25:00',
+              'frontArea': sorted(rnd.sample(range(1, 36), 5)), 'backArea': sorted(rnd.sample(range(1, 13), 2))}
+             for i in range(periods)]
+    BulkHistoryImporter(db).import_api_items(draws)
+    rows = []
+    for i in range(periods + 1):  # 最后一期尚未开奖
+        for version in algorithms:
+            recs = [{'front_numbers': sorted(rnd.sample(range(1, 36), 5)),
+                     'back_numbers': sorted(rnd.sample(range(1, 13), 2)), 'confidence': 0.6}]
+            rows.append((str(2024001 + i), version, json.dumps({'recommendations': recs}), 0.5))
+    db.execute_batch_insert("INSERT INTO algorithm_prediction_logs (period_number, algorithm_version, predictions, "
+                            "confidence_score) VALUES (%s, %s, %s, %s)", rows)
+    return {d['expect']: d for d in draws}
+
+
+def test_compaction_archives_rolls_up_and_reads_fall_back():
+    db = SQLiteDatabaseManager(':memory:')
+    draws = _seed(db)
+    with tempfile.TemporaryDirectory() as tmp:
+        retention = PredictionLogRetention(db, archive_dir=tmp, keep_periods=10, chunk_periods=7)
+        original = db.execute_query("SELECT * FROM algorithm_prediction_logs WHERE period_number = %s", ('2024003',))
+
+        stats = retention.compact()
+        assert stats == {'periods': 21, 'logs': 42, 'rollups': 42}
+        remaining = db.execute_query("SELECT DISTINCT period_number FROM algorithm_prediction_logs")
+        assert len(remaining) == 10 and os.path.exists(archive_path(tmp, '2024003'))
+
+        archived = load_prediction_logs(db, '2024003', tmp)
+        assert [(r['id'], r['algorithm_version'], r['predictions']) for r in archived] == \
+            [(r['id'], r['algorithm_version'], r['predictions']) for r in original]
+
+        rollup = retention.rollups('2024003')[0]
+        rec = json.loads(original[0]['predictions'])['recommendations'][0]
+        draw = draws['2024003']
+        assert rollup['front_hits'] == len(set(rec['front_numbers']) & set(draw['frontArea']))
+        assert rollup['back_hits'] == len(set(rec['back_numbers']) & set(draw['backArea']))
+        assert json.loads(rollup['top_front']) == rec['front_numbers'] and rollup['log_count'] == 1
+
+        assert retention.compact()['periods'] == 0  # 幂等
+        assert len(retention.all_periods()) == 31
+    print("✅ 旧期号已归档为压缩文件与汇总，读取透明回退")
+
+
+if __name__ == "__main__":
+    test_compaction_archives_rolls_up_and_reads_fall_back()
@@ -0,0 +1,70 @@
+# test_query_profiler.py
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.query_profiler import PROFILER, fingerprint
+from src.database.sqlite_manager import SQLiteDatabaseManager
+
+
+def test_fingerprint_normalizes_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM t WHERE a = 'x' AND b = 12\n  AND c IN (%s, %s, %s);") == \
+        "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)"
+    assert fingerprint("SELECT front_area_1 FROM t2 WHERE id IN (%s)") == "SELECT front_area_1 FROM t2 WHERE id IN (...)"
+
+
+def test_calls_are_attributed_to_call_sites_and_tags():
+    db = SQLiteDatabaseManager(':memory:')
+    PROFILER.reset()
+    for period in ('24001', '24002', '24003'):
+        db.execute_query("SELECT * FROM lottery_history WHERE period_number = %s", (period,))
+    db.get_latest_lottery_history(5)
+    with PROFILER.tag('daily_cycle.step1'):
+        db.execute_update("DELETE FROM lottery_history WHERE period_number = %s", ('0',))
+    db.execute_query("SELECT * FROM missing_table")
+
+    lookup = [r for r in PROFILER.summary()
+              if r['fingerprint'] == "SELECT * FROM lottery_history WHERE period_number = ?"]
+    assert len(lookup) == 1 and 'test_query_profiler.py:' in lookup[0]['caller']
+    lookup = lookup[0]
+    assert lookup['calls'] == 3 and lookup['rows'] == 0 and sum(lookup['histogram']) == 3
+    assert any(r['caller'].endswith('-> get_latest_lottery_history') for r in PROFILER.summary())
+    assert any(r['caller'] == 'daily_cycle.step1' and r['kind'] == 'update' for r in PROFILER.summary())
+    assert PROFILER.totals()['errors'] == 1 and PROFILER.totals()['round_trips'] == 6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = json.load(open(PROFILER.save(os.path.join(tmp, 'profile.json')), encoding='utf-8'))
+    assert report['totals']['round_trips'] == 6 and report['callers'][0]['calls'] >= 1
+    PROFILER.reset()
+    print("✅ 数据库调用按语句指纹与调用点统计")
+
+
+def test_transaction_statements_are_profiled_individually():
+    db = SQLiteDatabaseManager(':memory:')
+    db.execute_update("CREATE TABLE IF NOT EXISTS `tx_probe` (`period_number` varchar(20) NOT NULL, "
+                      "`score` int(11) NOT NULL DEFAULT 0, PRIMARY KEY (`period_number`))")
+    PROFILER.reset()
+    with db.transaction() as cursor:
+        cursor.executemany("INSERT INTO tx_probe (period_number) VALUES (%s)", [('24001',), ('24002',), ('24003',)])
+        for period in ('24001', '24002'):
+            cursor.execute("UPDATE tx_probe SET score = 3 WHERE period_number = %s", (period,))
+        assert cursor.rowcount == 1 and cursor.lastrowid is not None  # 其余属性透传
+
+    rows = {r['kind']: r for r in PROFILER.summary()}
+    assert rows['tx_batch']['calls'] == 1 and rows['tx_batch']['rows'] == 3
+    assert rows['tx_execute']['calls'] == 2 and rows['tx_execute']['rows'] == 2
+    assert rows['tx_execute']['fingerprint'] == "UPDATE tx_probe SET score = ? WHERE period_number = ?"
+    assert 'test_query_profiler.py:' in rows['tx_execute']['caller']
+    assert rows['transaction']['fingerprint'] == '<transaction>' and rows['transaction']['calls'] == 1
+    assert PROFILER.totals()['round_trips'] == 4
+    PROFILER.reset()
+    print("✅ 事务内的语句逐条计时")
+
+
+if __name__ == "__main__":
+    test_fingerprint_normalizes_literals_and_in_lists()
+    test_calls_are_attributed_to_call_sites_and_tags()
+    test_transaction_statements_are_profiled_individually()
@@ -0,0 +1,44 @@
+# test_similarity_index.py
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.algorithms.advanced_algorithms.similarity_index import DrawSimilarityIndex, find_similar_draws
+from src.model.lottery_models import LotteryHistory
+
+
+def _make_history(periods=8000, seed=13):
+    rnd = random.Random(seed)
+    return [LotteryHistory(period_number=str(1000001 + i),
+                           front_area=sorted(rnd.sample(range(1, 36), 5)),
+                           back_area=sorted(rnd.sample(range(1, 13), 2)))
+            for i in range(periods)]
+
+
+def test_lsh_query_close_to_exact_scan():
+    """LSH 候选重排后的相似度应接近全量扫描"""
+    history_data = _make_history()
+    index = DrawSimilarityIndex.from_history(history_data, exact_threshold=1000)
+    ratios = []
+    for record in history_data[-20:]:
+        approx = index.query(record.front_area, record.back_area, top_k=10, exclude_period=record.period_number)
+        exact = index.query(record.front_area, record.back_area, top_k=10, exclude_period=record.period_number,
+                            exact=True)
+        assert len(approx) == 10 and all(item['period_number'] != record.period_number for item in approx)
+        ratios.append(sum(i['jaccard'] for i in approx) / sum(i['jaccard'] for i in exact))
+    assert sum(ratios) / len(ratios) > 0.95
+
+
+def test_find_similar_draws_reports_followers():
+    history_data = _make_history(periods=300)
+    target = history_data[100]
+    result = find_similar_draws(history_data, target.front_area, target.back_area, top_k=3)
+    assert result[0]['period_number'] == target.period_number and result[0]['jaccard'] == 1.0
+    assert result[0]['next_front_area'] == history_data[101].front_area
+
+
+if __name__ == "__main__":
+    test_lsh_query_close_to_exact_scan()
+    test_find_similar_draws_reports_followers()
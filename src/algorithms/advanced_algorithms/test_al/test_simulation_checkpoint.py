@@ -0,0 +1,39 @@
+# test_simulation_checkpoint.py
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.database_manager import DatabaseManager
+from src.engine.simulation_checkpoint import run_sharded, shard_periods
+
+
+def _pool_probe(tag: str, shard_index: int, shard_count: int):
+    """分片工作函数：报告子进程内是否还能看到父进程的连接池。"""
+    return {'tag': tag, 'shard': shard_index, 'pid': os.getpid(),
+            'inherited_pool': DatabaseManager._connection_pool is not None}
+
+
+def test_shard_periods_interleaves():
+    periods = [str(2025001 + i) for i in range(10)]
+    shards = [shard_periods(periods, 3, i) for i in range(3)]
+    assert shards[0] == periods[0::3] and sorted(sum(shards, [])) == periods
+    assert shard_periods(periods) == periods
+
+
+def test_run_sharded_does_not_inherit_connection_pool():
+    saved = DatabaseManager._connection_pool
+    DatabaseManager._connection_pool = object()  # 模拟父进程已建立的连接池
+    try:
+        results = run_sharded(_pool_probe, 2, 'sim')
+    finally:
+        DatabaseManager._connection_pool = saved
+    assert [r['shard'] for r in results] == [0, 1]
+    assert not any(r['inherited_pool'] for r in results)
+    assert all(r['pid'] != os.getpid() for r in results)
+    print("✅ 分片子进程使用各自的连接池")
+
+
+if __name__ == "__main__":
+    test_shard_periods_interleaves()
+    test_run_sharded_does_not_inherit_connection_pool()
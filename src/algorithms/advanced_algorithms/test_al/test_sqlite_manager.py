@@ -0,0 +1,47 @@
+# test_sqlite_manager.py
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.sqlite_manager import SQLiteDatabaseManager, translate_sql
+from src.analysis.bulk_importer import BulkHistoryImporter
+
+
+def _make_history(periods=60, seed=3):
+    rnd = random.Random(seed)
+    return [{'expect': str(2024001 + i), 'time': '2024-03-01 21:25:00',
+             'frontArea': sorted(rnd.sample(range(1, 36), 5)), 'backArea': sorted(rnd.sample(range(1, 13), 2))}
+            for i in range(periods)]
+
+
+def test_translate_mysql_dialect():
+    sql = translate_sql("INSERT INTO t (a, b) VALUES (%s, %s) ON DUPLICATE KEY UPDATE b = VALUES(b), c = NOW()")
+    assert sql == "INSERT INTO t (a, b) VALUES (?, ?) ON CONFLICT DO UPDATE SET b = excluded.b, c = NOW()"
+    sql = translate_sql("INSERT INTO t (a) SELECT x FROM v LEFT JOIN s ON s.a = v.a ON DUPLICATE KEY UPDATE a = 1")
+    assert "LEFT JOIN s ON s.a = v.a WHERE true ON CONFLICT DO UPDATE SET" in sql
+    assert translate_sql("INSERT IGNORE INTO t VALUES (%s)") == "INSERT OR IGNORE INTO t VALUES (?)"
+    assert "CAST(p AS INTEGER)" in translate_sql("SELECT 1 FROM t ORDER BY CAST(p AS UNSIGNED)")
+
+
+def test_history_helpers_and_upsert_in_memory():
+    db = SQLiteDatabaseManager(':memory:')
+    items = _make_history()
+    assert BulkHistoryImporter(db).import_api_items(items)['written'] == 60
+    assert BulkHistoryImporter(db).import_api_items(items[:5])['written'] == 0  # INSERT IGNORE 去重
+    latest = db.get_latest_lottery_history(2)
+    assert [h.period_number for h in latest] == ['2024060', '2024059']
+    assert latest[0].front_area == items[-1]['frontArea'] and db.get_next_period_number() == '2024061'
+
+    new_id = db.execute_insert('algorithm_configs', {'algorithm_name': 'a', 'algorithm_type': 'ml',
+                                                    'parameters': '{}', 'version': '1.0'})
+    assert new_id == db.get_last_insert_id() and new_id > 0
+    assert db.execute_update("UPDATE algorithm_configs SET version = %s WHERE id = %s", ('2.0', new_id)) == 1
+    assert db.fetch_one("SELECT version FROM algorithm_configs WHERE id = %s", (new_id,))['version'] == '2.0'
+    db.close()
+
+
+if __name__ == "__main__":
+    test_translate_mysql_dialect()
+    test_history_helpers_and_upsert_in_memory()
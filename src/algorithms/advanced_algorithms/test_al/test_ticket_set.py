@@ -0,0 +1,50 @@
+# test_ticket_set.py
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.ticket_set import TicketSet
+
+
+def _singles(ticket_set, bet):
+    single = TicketSet()
+    single._bets[bet] = None
+    return set(single.iter_singles())
+
+
+def test_remove_dominated_matches_pairwise_subset_check():
+    """与逐对展开单式注做集合包含判断的结果一致 (含复式、胆拖)"""
+    rnd = random.Random(7)
+    ticket_set = TicketSet()
+    for _ in range(40):
+        front_dan = rnd.sample(range(1, 10), rnd.randint(0, 2))
+        back_dan = rnd.sample(range(1, 5), rnd.randint(0, 1))
+        ticket_set.add_dantuo(front_dan, rnd.sample(range(1, 10), rnd.randint(4, 7)),
+                              back_dan, rnd.sample(range(1, 5), rnd.randint(2, 3)))
+    bets = list(ticket_set._bets)
+    singles = {bet: _singles(ticket_set, bet) for bet in bets}
+    expected = {b for b in bets if not any(b != c and singles[b] <= singles[c] for c in bets)}
+
+    optimized = ticket_set.remove_dominated()
+    assert set(optimized._bets) == expected
+    assert optimized.coverage()['unique_tickets'] == len(set().union(*singles.values()))
+    print(f"✅ {len(bets)} 组投注去除覆盖后剩 {len(optimized)} 组")
+
+
+def test_from_combos_dedupes_and_costs():
+    combos = [{'front_numbers': '1,2,3,4,5', 'back_numbers': '1,2'},
+              {'front_numbers': [5, 4, 3, 2, 1], 'back_numbers': [2, 1]},
+              {'front_numbers': [1, 2, 3, 4, 5, 6], 'back_numbers': [1, 2]},
+              {'front_numbers': {'dan': [7], 'tuo': [8, 9, 10, 11, 12]}, 'back_numbers': [3, 4, 5]}]
+    ticket_set = TicketSet.from_combos(combos)
+    assert len(ticket_set) == 3
+    optimized = ticket_set.remove_dominated()
+    assert optimized.ticket_count() == 6 + 5 * 3 and optimized.total_cost() == 42.0
+    assert {'front': [7, 8, 9, 10, 11, 12], 'back': [3, 4, 5], 'front_dan': [7]} in optimized.to_combos()
+
+
+if __name__ == "__main__":
+    test_remove_dominated_matches_pairwise_subset_check()
+    test_from_combos_dedupes_and_costs()
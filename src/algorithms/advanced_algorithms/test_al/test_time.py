@@ -118,5 +118,38 @@ def test_time_series_analyzer():
         traceback.print_exc()
 
 
+def test_periodicity_engine_matches_loops():
+    """向量化周期引擎与逐号码循环的结果一致"""
+    import random
+    import numpy as np
+    from src.algorithms.advanced_algorithms.periodicity_engine import PeriodicityEngine
+    from src.model.lottery_models import LotteryHistory
+
+    rnd = random.Random(3)
+    history_data = [LotteryHistory(period_number=str(2020001 + i),
+                                   front_area=sorted(rnd.sample(range(1, 36), 5)),
+                                   back_area=sorted(rnd.sample(range(1, 13), 2)))
+                    for i in range(300)]
+    engine = PeriodicityEngine(list(reversed(history_data)))
+    table = engine.period_table('front')
+    trends = engine.trend_table('front', 20)
+
+    for num in range(1, 36):
+        appearances = [idx for idx, r in enumerate(history_data) if num in r.front_area]
+        intervals = np.diff(appearances)
+        assert table[num]['total_appearances'] == len(appearances)
+        assert abs(table[num]['avg_interval'] - np.mean(intervals)) < 1e-9
+        assert abs(table[num]['std_interval'] - np.std(intervals)) < 1e-9
+        assert table[num]['current_omission'] == len(history_data) - appearances[-1] - 1
+        assert 2 <= table[num]['dominant_cycle'] <= 100
+
+        recent = [1 if num in r.front_area else 0 for r in history_data[-20:]]
+        slope = np.polyfit(np.arange(20), recent, 1)[0]
+        expected_direction = 1 if slope > 0.02 else -1 if slope < -0.02 else 0
+        assert trends[num]['trend_direction'] == expected_direction
+        assert abs(trends[num]['appearance_rate'] - np.mean(recent)) < 1e-12
+
+
 if __name__ == "__main__":
-    test_time_series_analyzer()
\ No newline at end of file
+    test_time_series_analyzer()
+    test_periodicity_engine_matches_loops()
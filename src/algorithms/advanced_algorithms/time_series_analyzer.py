@@ -3,6 +3,7 @@ import pandas as pd
 import numpy as np
 from src.algorithms.base_algorithm import BaseAlgorithm
 from src.model.lottery_models import LotteryHistory
+from src.algorithms.advanced_algorithms.periodicity_engine import PeriodicityEngine
 from typing import List, Dict, Any
 import logging
 
@@ -30,14 +31,14 @@ class TimeSeriesAnalyzer(BaseAlgorithm):
             return False
 
         try:
-            # 准备时序数据
-            ts_data = self._prepare_time_series(history_data)
+            # 准备时序数据 (one-hot 开奖矩阵)
+            engine = self._prepare_time_series(history_data)
 
             # 多时间尺度分析
-            self._analyze_multi_scale_trends(ts_data)
+            self._analyze_multi_scale_trends(engine)
 
             # 分析周期性模式
-            self._analyze_periodic_patterns(history_data)
+            self._analyze_periodic_patterns(engine)
 
             self.is_trained = True
             logging.info(f"时序分析器训练完成，分析了 {len(history_data)} 期数据")
@@ -80,160 +81,38 @@ class TimeSeriesAnalyzer(BaseAlgorithm):
             logging.error(f"时序预测失败: {e}")
             return {'error': str(e)}
 
-    def _prepare_time_series(self, history_data: List[LotteryHistory]) -> Dict[str, Any]:
-        """将历史数据转换为时间序列格式"""
-        front_series = {i: [] for i in range(1, 36)}
-        back_series = {i: [] for i in range(1, 13)}
+    def _prepare_time_series(self, history_data: List[LotteryHistory]) -> PeriodicityEngine:
+        """将历史数据转换为 (期数 × 号码) 的 one-hot 开奖矩阵，按期号从早到晚排列"""
+        engine = PeriodicityEngine(history_data)
+        logging.info(f"准备了 {engine.periods} 期数据的时序序列")
+        return engine
 
-        # 按时间顺序处理数据（确保从早到晚）
-        sorted_data = sorted(history_data, key=lambda x: x.period_number)
-
-        for record in sorted_data:
-            for num in range(1, 36):
-                front_series[num].append(1 if num in record.front_area else 0)
-            for num in range(1, 13):
-                back_series[num].append(1 if num in record.back_area else 0)
-
-        logging.info(f"准备了 {len(sorted_data)} 期数据的时序序列")
-        return {'front': front_series, 'back': back_series}
-
-    def _analyze_multi_scale_trends(self, ts_data: Dict[str, Any]):
+    def _analyze_multi_scale_trends(self, engine: PeriodicityEngine):
         """多时间尺度趋势分析"""
         self.trend_data = {
-            'short_term': self._analyze_time_scale(ts_data, self.parameters['short_term_window']),
-            'medium_term': self._analyze_time_scale(ts_data, self.parameters['medium_term_window']),
-            'long_term': self._analyze_time_scale(ts_data, self.parameters['long_term_window'])
+            'short_term': self._analyze_time_scale(engine, self.parameters['short_term_window']),
+            'medium_term': self._analyze_time_scale(engine, self.parameters['medium_term_window']),
+            'long_term': self._analyze_time_scale(engine, self.parameters['long_term_window'])
         }
 
         logging.info("多时间尺度趋势分析完成")
 
-    def _analyze_time_scale(self, ts_data: Dict[str, Any], window: int) -> Dict[str, Any]:
-        """分析指定时间尺度的趋势"""
-        front_trends = {}
-        back_trends = {}
-
-        # 分析前区号码趋势
-        for num in range(1, 36):
-            series = ts_data['front'][num]
-            if len(series) >= window:
-                recent_data = series[-window:]
-                trend_info = self._calculate_trend_metrics(recent_data)
-                front_trends[num] = trend_info
-
-        # 分析后区号码趋势
-        for num in range(1, 13):
-            series = ts_data['back'][num]
-            if len(series) >= window:
-                recent_data = series[-window:]
-                trend_info = self._calculate_trend_metrics(recent_data)
-                back_trends[num] = trend_info
-
-        return {'front': front_trends, 'back': back_trends}
-
-    def _calculate_trend_metrics(self, series: List[int]) -> Dict[str, Any]:
-        """计算趋势指标"""
-        if not series:
-            return {}
-
-        # 基础统计
-        appearance_rate = np.mean(series)
-        total_appearances = sum(series)
-
-        # 趋势分析
-        trend_direction = self._calculate_trend_direction(series)
-        momentum = self._calculate_momentum(series)
-
-        # 移动平均
-        window_size = min(5, len(series))
-        moving_avg = pd.Series(series).rolling(window=window_size).mean().iloc[-1] if len(
-            series) >= window_size else appearance_rate
-
+    def _analyze_time_scale(self, engine: PeriodicityEngine, window: int) -> Dict[str, Any]:
+        """分析指定时间尺度的趋势 (数据不足 window 期时为空)"""
         return {
-            'appearance_rate': float(appearance_rate),
-            'total_appearances': total_appearances,
-            'trend_direction': trend_direction,  # 1:上升, -1:下降, 0:平稳
-            'momentum': float(momentum),
-            'moving_avg': float(moving_avg) if not np.isnan(moving_avg) else 0.0
+            'front': engine.trend_table('front', window),
+            'back': engine.trend_table('back', window)
         }
 
-    def _calculate_trend_direction(self, series: List[int]) -> int:
-        """计算趋势方向"""
-        if len(series) < 2:
-            return 0
-
-        # 使用线性回归计算趋势
-        x = np.arange(len(series))
-        y = np.array(series)
-
-        try:
-            slope = np.polyfit(x, y, 1)[0]
-            if slope > 0.02:  # 上升趋势
-                return 1
-            elif slope < -0.02:  # 下降趋势
-                return -1
-            else:  # 平稳
-                return 0
-        except:
-            return 0
-
-    def _calculate_momentum(self, series: List[int]) -> float:
-        """计算动量指标"""
-        if len(series) < 5:
-            return 0.0
-
-        # 近期表现与长期表现的对比
-        recent_window = min(5, len(series) // 2)
-        long_window = min(10, len(series))
-
-        recent_avg = np.mean(series[-recent_window:])
-        long_avg = np.mean(series[-long_window:])
-
-        if long_avg > 0:
-            return (recent_avg - long_avg) / long_avg
-        else:
-            return 0.0
-
-    def _analyze_periodic_patterns(self, history_data: List[LotteryHistory]):
-        """分析周期性模式"""
+    def _analyze_periodic_patterns(self, engine: PeriodicityEngine):
+        """分析周期性模式：出现间隔、当前遗漏与自相关主周期"""
         self.periodic_patterns = {
-            'front': self._analyze_number_periods(history_data, 'front'),
-            'back': self._analyze_number_periods(history_data, 'back')
+            'front': engine.period_table('front'),
+            'back': engine.period_table('back')
         }
 
         logging.info("周期性模式分析完成")
 
-    def _analyze_number_periods(self, history_data: List[LotteryHistory], area_type: str) -> Dict[int, Any]:
-        """分析号码出现周期"""
-        periods = {}
-        numbers_range = range(1, 36) if area_type == 'front' else range(1, 13)
-        sorted_data = sorted(history_data, key=lambda x: x.period_number)
-
-        for num in numbers_range:
-            appearances = []
-            for idx, record in enumerate(sorted_data):
-                numbers = record.front_area if area_type == 'front' else record.back_area
-                if num in numbers:
-                    appearances.append(idx)
-
-            if len(appearances) > 1:
-                # 计算出现间隔
-                intervals = [appearances[i] - appearances[i - 1] for i in range(1, len(appearances))]
-                avg_interval = np.mean(intervals) if intervals else 0
-                std_interval = np.std(intervals) if len(intervals) > 1 else 0
-
-                # 当前遗漏期数
-                current_omission = len(sorted_data) - appearances[-1] - 1 if appearances else len(sorted_data)
-
-                periods[num] = {
-                    'total_appearances': len(appearances),
-                    'avg_interval': float(avg_interval),
-                    'std_interval': float(std_interval),
-                    'current_omission': current_omission,
-                    'last_appearance_idx': appearances[-1] if appearances else -1
-                }
-
-        return periods
-
     def _generate_time_based_recommendations(self, area_type: str) -> List[Dict[str, Any]]:
         """生成基于时序的推荐"""
         recommendations = []
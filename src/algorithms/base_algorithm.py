@@ -29,6 +29,13 @@ class BaseAlgorithm(ABC):
         """进行预测"""
         pass
 
+    def update(self, new_records: List[LotteryHistory]) -> bool:
+        """
+        增量更新 (可选)：在已训练的状态上追加新开奖的数据。
+        默认不支持，返回 False，调用方应回退为完整的 train()。
+        """
+        return False
+
     def set_parameters(self, parameters: Dict[str, Any]):
         """设置算法参数"""
         self.parameters.update(parameters)
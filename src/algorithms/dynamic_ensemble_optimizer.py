@@ -4,17 +4,38 @@ from src.model.lottery_models import LotteryHistory
 from typing import List, Dict, Any
 import logging
 
+from src.algorithms.advanced_algorithms.ensemble_weight_fitter import EnsembleWeightFitter
+
 
 class DynamicEnsembleOptimizer(BaseAlgorithm):
     """动态集成优化器 - 智能整合多个算法的结果"""
     name = "DynamicEnsembleOptimizer"
     version = "1.0"
 
-    def __init__(self):
+    # 静态权重 (无历史评分张量时使用)
+    BASE_WEIGHTS = {
+        'bayesian': 0.25,
+        'time_series': 0.20,
+        'markov': 0.15,
+        'graph_analysis': 0.20,
+        'pattern_recognition': 0.20
+    }
+
+    def __init__(self, weight_mode: str = 'static', score_store=None,
+                 weight_fitter: EnsembleWeightFitter = None):
+        """
+        weight_mode: 'static' 使用 BASE_WEIGHTS；'fitted' 在 score_store (ScoreTensorStore) 的
+        历史评分上拟合权重，张量中没有可用数据时退回静态权重。
+        """
         super().__init__()
+        if weight_mode not in ('static', 'fitted'):
+            raise ValueError(f"未知的权重模式: {weight_mode}")
         self.algorithms = {}
         self.algorithm_weights = {}
         self.performance_history = {}
+        self.weight_mode = weight_mode
+        self.score_store = score_store
+        self.weight_fitter = weight_fitter or EnsembleWeightFitter()
 
     def train(self, history_data: List[LotteryHistory]) -> bool:
         """训练集成优化器"""
@@ -152,21 +173,18 @@ class DynamicEnsembleOptimizer(BaseAlgorithm):
             logging.error("没有可用的算法进行权重计算")
             return
 
-        # 模拟历史性能评估（实际应用中应该基于真实的历史预测性能）
-        base_weights = {
-            'bayesian': 0.25,
-            'time_series': 0.20,
-            'markov': 0.15,
-            'graph_analysis': 0.20,
-            'pattern_recognition': 0.20
-        }
+        # 只用训练数据最后一期及之前的评分，避免回测时用到未来数据
+        last_period = str(history_data[-1].period_number) if history_data else None
+        if self.weight_mode == 'fitted' and self.refit_weights(last_period):
+            return
 
         # 根据算法可用性调整权重
+        self.algorithm_weights = {}
         total_weight = 0
         for algo_name in self.algorithms.keys():
-            if algo_name in base_weights:
-                self.algorithm_weights[algo_name] = base_weights[algo_name]
-                total_weight += base_weights[algo_name]
+            if algo_name in self.BASE_WEIGHTS:
+                self.algorithm_weights[algo_name] = self.BASE_WEIGHTS[algo_name]
+                total_weight += self.BASE_WEIGHTS[algo_name]
 
         # 归一化权重
         if total_weight > 0:
@@ -175,6 +193,23 @@ class DynamicEnsembleOptimizer(BaseAlgorithm):
 
         logging.info(f"权重分配: {self.algorithm_weights}")
 
+    def refit_weights(self, end_period: str = None) -> bool:
+        """
+        在评分张量上重新拟合权重 (只用 end_period 及之前最近 window 期，热启动)，
+        开销为毫秒级，可在每期开奖后调用。成功时返回 True。
+        """
+        if self.score_store is None or not len(self.score_store):
+            return False
+        names = [name for name in self.algorithms if name in self.score_store.algorithms]
+        if not names:
+            return False
+        fitted = self.weight_fitter.fit_store(self.score_store, names, end_period)
+        if not fitted:
+            return False
+        self.algorithm_weights = fitted
+        logging.info(f"拟合权重分配: {self.algorithm_weights}")
+        return True
+
     def _collect_all_predictions(self, history_data: List[LotteryHistory]) -> Dict[str, Any]:
         """收集所有算法的预测结果"""
         predictions = {}
@@ -281,6 +316,23 @@ class DynamicEnsembleOptimizer(BaseAlgorithm):
         else:
             return 0.0
 
+    def evaluate_weights_on_store(self, score_store, weights: Dict[str, float] = None,
+                                  rows: slice = slice(None)) -> Dict[str, Any]:
+        """
+        直接在评分张量 (ScoreTensorStore) 上回测一组融合权重，不重跑任何子算法。
+        weights 缺省时使用当前的 algorithm_weights。
+        """
+        weights = weights or self.algorithm_weights
+        fused = score_store.fuse(weights, rows)
+        hits = score_store.hit_counts(fused, rows)
+        periods = len(hits['front'])
+        return {
+            'periods': periods,
+            'weights': dict(weights),
+            'avg_front_hits': float(hits['front'].mean()) if periods else 0.0,
+            'avg_back_hits': float(hits['back'].mean()) if periods else 0.0,
+        }
+
     def _get_ensemble_info(self, all_predictions: Dict[str, Any]) -> Dict[str, Any]:
         """获取集成信息"""
         return {
@@ -4,9 +4,11 @@ from src.algorithms.base_algorithm import BaseAlgorithm
 from src.model.lottery_models import LotteryHistory
 from typing import List, Dict, Any
 import logging
-from collections import Counter
 import pandas as pd
 
+from src.algorithms.advanced_algorithms.cooccurrence_store import CooccurrenceStore
+from src.algorithms.advanced_algorithms.pattern_index import PatternIndex
+from src.algorithms.advanced_algorithms.similarity_index import DrawSimilarityIndex
 from src.utils.log_predictor import log_prediction
 
 
@@ -14,11 +16,16 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
     """智能模式识别器 - 识别历史数据中的复杂模式"""
     name = "IntelligentPatternRecognizer"
     version = "1.0"
+    # 伴随模式使用的共现衰减系数 (约 50 期半衰期)
+    COOCCURRENCE_DECAY = 0.986
 
     def __init__(self):
         super().__init__()
         self.patterns = {}
         self.pattern_confidence = {}
+        self.pattern_index = PatternIndex()
+        self.similarity_index = DrawSimilarityIndex()
+        self.cooccurrence = CooccurrenceStore(self.COOCCURRENCE_DECAY)
 
     def train(self, history_data: List[LotteryHistory]) -> bool:
         """训练模式识别模型"""
@@ -27,11 +34,18 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
             return False
 
         try:
+            # 同步增量模式索引 (新开奖只追加，不重复扫描历史)
+            self.pattern_index = self.pattern_index.sync(history_data)
+            self.similarity_index = self.similarity_index.sync(history_data)
+            self._sync_cooccurrence()
+
             # 识别多种模式
             self._identify_frequency_patterns(history_data)
             self._identify_sequential_patterns(history_data)
             self._identify_structural_patterns(history_data)
             self._identify_temporal_patterns(history_data)
+            self._identify_follow_patterns(history_data)
+            self._identify_companion_patterns(history_data)
 
             # 计算模式置信度
             self._calculate_pattern_confidence(history_data)
@@ -79,19 +93,13 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
             return {'error': str(e)}
 
     def _identify_frequency_patterns(self, history_data: List[LotteryHistory]):
-        """识别频率相关模式"""
-        # 热冷号模式
-        front_freq = Counter()
-        back_freq = Counter()
-
-        for record in history_data:
-            for num in record.front_area:
-                front_freq[num] += 1
-            for num in record.back_area:
-                back_freq[num] += 1
-
-        # 热号、温号、冷号分类
-        total_periods = len(history_data)
+        """识别频率相关模式 (频次直接取自索引的累计计数)"""
+        counts = self.pattern_index.counts()
+        total_periods = len(self.pattern_index)
+
+        # 热号、温号、冷号分类 (只考虑出现过的号码)
+        front_freq = {num: int(c) for num, c in enumerate(counts['front'], start=1) if c > 0}
+        back_freq = {num: int(c) for num, c in enumerate(counts['back'], start=1) if c > 0}
         front_hot = [num for num, count in front_freq.items() if count / total_periods > 0.25]
         front_cold = [num for num, count in front_freq.items() if count / total_periods < 0.1]
 
@@ -107,32 +115,16 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
         }
 
     def _identify_sequential_patterns(self, history_data: List[LotteryHistory]):
-        """识别序列模式"""
-        sorted_data = sorted(history_data, key=lambda x: x.period_number)
-
-        # 遗漏模式
-        front_last_seen = {i: 0 for i in range(1, 36)}
-        back_last_seen = {i: 0 for i in range(1, 13)}
-
-        omission_patterns = []
-        for idx, record in enumerate(sorted_data):
-            # 更新遗漏信息
-            current_omissions = {}
-            for num in range(1, 36):
-                current_omissions[num] = idx - front_last_seen[num]
-            for num in record.front_area:
-                front_last_seen[num] = idx
-
-            omission_patterns.append(current_omissions)
+        """识别序列模式：最近10期每期开奖前各号码的遗漏 (从未出现记为距第0期的期数)"""
+        n = len(self.pattern_index)
+        query = np.arange(max(0, n - 10), n)
+        omissions = np.array([query - self.pattern_index.last_seen_before(num, query, 'front', default=0)
+                              for num in range(1, 36)])
 
         # 分析遗漏趋势
-        high_omission_numbers = []
-        avg_omission = np.mean([omission for pattern in omission_patterns[-10:] for omission in pattern.values()])
-
-        for num in range(1, 36):
-            recent_omissions = [pattern[num] for pattern in omission_patterns[-5:]]
-            if np.mean(recent_omissions) > avg_omission * 1.5:
-                high_omission_numbers.append(num)
+        avg_omission = np.mean(omissions)
+        recent_means = omissions[:, -5:].mean(axis=1)
+        high_omission_numbers = [num for num, value in zip(range(1, 36), recent_means) if value > avg_omission * 1.5]
 
         self.patterns['sequential_omission'] = {
             'high_omission_numbers': high_omission_numbers,
@@ -141,28 +133,15 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
         }
 
     def _identify_structural_patterns(self, history_data: List[LotteryHistory]):
-        """识别结构模式"""
-        # 奇偶模式
-        parity_patterns = []
-        size_patterns = []  # 大小模式 (以18为界)
-        sum_patterns = []
-
-        for record in history_data:
-            # 奇偶比例
-            odd_count = sum(1 for num in record.front_area if num % 2 == 1)
-            parity_patterns.append(f"{odd_count}:{5 - odd_count}")
-
-            # 大小比例
-            big_count = sum(1 for num in record.front_area if num > 18)
-            size_patterns.append(f"{big_count}:{5 - big_count}")
+        """识别结构模式 (奇偶、大小以18为界、和值)，由索引中的结构签名直接统计"""
+        signatures = self.pattern_index.signatures.astype(np.int64)
+        odd_counts, big_counts = signatures // 6, signatures % 6
 
-            # 和值
-            sum_patterns.append(sum(record.front_area))
-
-        # 最常见模式
-        common_parity = Counter(parity_patterns).most_common(1)[0][0]
-        common_size = Counter(size_patterns).most_common(1)[0][0]
-        avg_sum = np.mean(sum_patterns)
+        odd_count = self._most_common(odd_counts)
+        big_count = self._most_common(big_counts)
+        common_parity = f"{odd_count}:{5 - odd_count}"
+        common_size = f"{big_count}:{5 - big_count}"
+        avg_sum = np.mean(self.pattern_index.front_sums)
 
         self.patterns['structural_balance'] = {
             'common_parity': common_parity,
@@ -171,25 +150,21 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
             'description': f"结构平衡模式: 奇偶{common_parity}, 大小{common_size}, 平均和值{avg_sum:.1f}"
         }
 
-    def _identify_temporal_patterns(self, history_data: List[LotteryHistory]):
-        """识别时间模式"""
-        sorted_data = sorted(history_data, key=lambda x: x.period_number)
+    @staticmethod
+    def _most_common(values: np.ndarray) -> int:
+        """出现次数最多的取值；次数并列时取较小的取值 (与历史数据的输入顺序无关)"""
+        counts = np.bincount(values)
+        return int(sorted(np.flatnonzero(counts), key=lambda value: (-counts[value], value))[0])
 
-        # 周期性分析
+    def _identify_temporal_patterns(self, history_data: List[LotteryHistory]):
+        """识别时间模式：各号码倒排位置列表的平均间隔"""
         period_intervals = {}
         for area in ['front', 'back']:
             numbers_range = range(1, 36) if area == 'front' else range(1, 13)
             for num in numbers_range:
-                appearances = []
-                for idx, record in enumerate(sorted_data):
-                    numbers = record.front_area if area == 'front' else record.back_area
-                    if num in numbers:
-                        appearances.append(idx)
-
+                appearances = self.pattern_index.positions(num, area)
                 if len(appearances) > 1:
-                    intervals = [appearances[i] - appearances[i - 1] for i in range(1, len(appearances))]
-                    avg_interval = np.mean(intervals)
-                    period_intervals[f"{area}_{num}"] = avg_interval
+                    period_intervals[f"{area}_{num}"] = np.mean(np.diff(appearances))
 
         # 找出周期性强的号码
         periodic_numbers = []
@@ -206,10 +181,73 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
             'description': f"时间周期模式: {len(periodic_numbers)}个号码出现周期稳定"
         }
 
+    def _identify_follow_patterns(self, history_data: List[LotteryHistory]):
+        """
+        识别跟随模式，综合三类样本：
+        1. 上一期每个号码在历史上出现后下一期跟出的号码 ((号码, 滞后1) 倒排查询);
+        2. 与最近两期结构签名序列相同的历史片段之后出现的号码;
+        3. 与上一期最相似的历史开奖 (MinHash-LSH 近邻) 的下一期号码。
+        前两类为计数、第三类为 Jaccard 加权频率，各自归一化后相加。
+        """
+        index = self.pattern_index
+        last_front = (np.flatnonzero(index.onehot[-1][:35]) + 1).tolist()
+        last_back = (np.flatnonzero(index.onehot[-1][35:]) + 1).tolist()
+
+        front_total = np.zeros(35, dtype=np.int64)
+        back_total = np.zeros(12, dtype=np.int64)
+        support = 0
+        for follow in [index.lag_followers(n, 1, 'front') for n in last_front] + \
+                      [index.lag_followers(n, 1, 'back') for n in last_back] + [index.signature_followers(2)]:
+            front_total += follow['front']
+            back_total += follow['back']
+            support += follow['support']
+
+        similar = self.similarity_index.follow_scores(last_front, last_back, top_k=20,
+                                                      exclude_period=index.period_numbers[-1])
+        front_strength = front_total / max(front_total.max(), 1) + np.array(list(similar['front'].values()))
+        back_strength = back_total / max(back_total.max(), 1) + np.array(list(similar['back'].values()))
+
+        front_top = [int(i) + 1 for i in np.argsort(-front_strength, kind='stable')[:8] if front_strength[i] > 0]
+        back_top = [int(i) + 1 for i in np.argsort(-back_strength, kind='stable')[:3] if back_strength[i] > 0]
+        self.patterns['sequential_follow'] = {
+            'front_followers': front_top,
+            'back_followers': back_top,
+            'support': support,
+            'description': f"跟随模式: 基于{support}个历史样本及相似开奖, 前区跟随号{front_top}, 后区跟随号{back_top}"
+        }
+
+    def _sync_cooccurrence(self):
+        """共现存储与模式索引对齐：索引只在末尾增长时逐期 O(1) 追加，否则按索引内容重建。"""
+        index = self.pattern_index
+        store = self.cooccurrence
+        if store.draw_count and (store.draw_count > len(index)
+                                 or index.period_numbers[store.draw_count - 1] != store.last_period):
+            store = CooccurrenceStore(self.COOCCURRENCE_DECAY)
+        for pos in range(store.draw_count, len(index)):
+            row = index.onehot[pos]
+            store.update(LotteryHistory(period_number=index.period_numbers[pos],
+                                        front_area=(np.flatnonzero(row[:35]) + 1).tolist(),
+                                        back_area=(np.flatnonzero(row[35:]) + 1).tolist()))
+        self.cooccurrence = store
+
+    def _identify_companion_patterns(self, history_data: List[LotteryHistory]):
+        """识别伴随模式：以近期 (衰减加权) 最热的两个号码为种子，贪心扩展出彼此共现最强的号码组。"""
+        store = self.cooccurrence
+        front_seeds = (np.argsort(-store.singles('front'), kind='stable')[:2] + 1).tolist()
+        front_group = store.companions('front', 7, seeds=front_seeds)
+        back_group = store.companions('back', 3)
+        top_pair = store.top_pairs('front', 1)
+        self.patterns['cooccurrence_companion'] = {
+            'front_companions': front_group,
+            'back_companions': back_group,
+            'top_front_pair': top_pair[0]['numbers'] if top_pair else [],
+            'description': f"伴随模式: 近期前区共现最强号码组{front_group}, 后区{back_group}"
+        }
+
     def _calculate_pattern_confidence(self, history_data: List[LotteryHistory]):
         """计算模式置信度"""
         # 基于模式清晰度和数据量计算置信度
-        total_periods = len(history_data)
+        total_periods = len(self.pattern_index)
 
         # 频率模式置信度
         freq_pattern = self.patterns['frequency_hot_cold']
@@ -224,13 +262,8 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
             self.pattern_confidence['sequential'] = 0.5
 
         # 结构模式置信度
-        struct_pattern = self.patterns['structural_balance']
-        parity_counter = Counter()
-        for record in history_data:
-            odd_count = sum(1 for num in record.front_area if num % 2 == 1)
-            parity_counter[f"{odd_count}:{5 - odd_count}"] += 1
-
-        most_common_ratio = parity_counter.most_common(1)[0][1] / total_periods
+        parity_counts = np.bincount(self.pattern_index.signatures.astype(np.int64) // 6)
+        most_common_ratio = float(parity_counts.max()) / total_periods
         self.pattern_confidence['structural'] = most_common_ratio
 
         # 时间模式置信度
@@ -240,6 +273,13 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
         else:
             self.pattern_confidence['temporal'] = 0.4
 
+        # 跟随模式置信度 (样本越多越可信)
+        follow_pattern = self.patterns['sequential_follow']
+        self.pattern_confidence['follow'] = 0.6 if follow_pattern['support'] >= 30 else 0.3
+
+        # 伴随模式置信度 (衰减后的有效样本期数越多越可信)
+        self.pattern_confidence['companion'] = 0.5 if self.cooccurrence.total_weight >= 30 else 0.3
+
     def _pattern_based_prediction(self, area_type: str) -> List[Dict[str, Any]]:
         """基于多种模式生成预测"""
         numbers_range = range(1, 36) if area_type == 'front' else range(1, 13)
@@ -290,6 +330,18 @@ class IntelligentPatternRecognizer(BaseAlgorithm):
                     pattern_matches.append("周期稳定模式")
                     break
 
+            # 跟随模式匹配
+            follow_pattern = self.patterns['sequential_follow']
+            if number in follow_pattern[f'{area_type}_followers']:
+                score += 0.15 * self.pattern_confidence['follow']
+                pattern_matches.append("跟随模式")
+
+            # 伴随模式匹配
+            companion_pattern = self.patterns['cooccurrence_companion']
+            if number in companion_pattern[f'{area_type}_companions']:
+                score += 0.1 * self.pattern_confidence['companion']
+                pattern_matches.append("伴随模式")
+
             # 基础分
             score += 0.1
 
@@ -2,19 +2,36 @@
 from src.algorithms.base_algorithm import BaseAlgorithm
 from typing import List, Dict, Any
 from src.model.lottery_models import LotteryHistory
-import random
+from src.algorithms.advanced_algorithms.monte_carlo_bankroll import MonteCarloBankrollSimulator
+from collections import Counter
 import math
 
+
+def build_reference_portfolio(history_data: List[LotteryHistory], n_tickets: int) -> List[tuple]:
+    """按历史频率排名构造 n_tickets 注互不重叠的参考投注 (第 i 注取排名第 5i~5i+4 的前区号码)。"""
+    front_rank = [n for n, _ in Counter(n for r in history_data for n in r.front_area).most_common()]
+    back_rank = [n for n, _ in Counter(n for r in history_data for n in r.back_area).most_common()]
+    front_rank += [n for n in range(1, 36) if n not in front_rank]
+    back_rank += [n for n in range(1, 13) if n not in back_rank]
+    n_tickets = max(1, min(n_tickets, 7))
+    return [(sorted(front_rank[5 * i:5 * i + 5]), sorted(back_rank[(2 * i) % 12:(2 * i) % 12 + 2]))
+            for i in range(n_tickets)]
+
 class RiskAssessmentAlgorithm(BaseAlgorithm):
     """风险评估算法"""
+    name = "risk_assessment"
+    version = "1.0"
 
     def __init__(self):
-        super().__init__("risk_assessment", "1.0")
+        super().__init__()
         self.risk_metrics = {}
         self.parameters = {
             'max_stake_ratio': 0.05,  # 最大投注资金比例
             'risk_tolerance': 0.7,    # 风险容忍度
-            'diversification_factor': 3  # 分散投资因子
+            'diversification_factor': 3,  # 分散投资因子
+            'simulation_sequences': 20000,  # 蒙特卡洛模拟序列数
+            'simulation_periods': 50,       # 每条序列的模拟期数
+            'simulation_seed': 2024
         }
 
     def train(self, history_data: List[LotteryHistory]) -> bool:
@@ -38,12 +55,38 @@ class RiskAssessmentAlgorithm(BaseAlgorithm):
             'total_periods': total_periods,
             'front_stability': front_number_stability,
             'back_stability': back_number_stability,
-            'hit_probability_distribution': hit_probability_distribution
+            'hit_probability_distribution': hit_probability_distribution,
+            'simulation': self._simulate_bankroll(history_data)
         }
 
         self.is_trained = True
         return True
 
+    def _simulate_bankroll(self, history_data: List[LotteryHistory]) -> Dict[str, Any]:
+        """
+        对参考投注组合做资金曲线模拟：每期投入 max_stake_ratio 比例的初始资金，
+        亏损达到 risk_tolerance 即止损。
+        """
+        tickets = build_reference_portfolio(history_data, self.parameters['diversification_factor'])
+        simulator = MonteCarloBankrollSimulator(tickets)
+        result = simulator.simulate(
+            n_sequences=self.parameters['simulation_sequences'],
+            n_periods=self.parameters['simulation_periods'],
+            initial_bankroll=simulator.cost / self.parameters['max_stake_ratio'],
+            max_loss_ratio=self.parameters['risk_tolerance'],
+            seed=self.parameters['simulation_seed']
+        )
+        return {
+            'tickets': tickets,
+            'expected_period_roi': result['expected_period_roi'],
+            'stop_loss_probability': float(result['stop_curve'][-1]),
+            'ruin_probability': result['ruin_probability'],
+            'ruin_curve': [float(v) for v in result['ruin_curve']],
+            'roi_mean': result['roi_mean'],
+            'roi_percentiles': result['roi_percentiles'],
+            'expected_drawdown': result['expected_drawdown']
+        }
+
     def _calculate_number_stability(self, number_series: List[List[int]], max_number: int) -> float:
         """计算号码稳定性"""
         if not number_series:
@@ -97,6 +140,7 @@ class RiskAssessmentAlgorithm(BaseAlgorithm):
                 'risk_score': risk_score,
                 'recommended_stake_ratio': recommended_stake,
                 'diversification_strategy': diversification_strategy,
+                'predicted_roi': self.risk_metrics['simulation']['roi_mean'],
                 'confidence': 0.85
             }],
             'analysis': self.risk_metrics
@@ -104,6 +148,12 @@ class RiskAssessmentAlgorithm(BaseAlgorithm):
 
     def _calculate_risk_score(self) -> float:
         """计算风险评分"""
+        simulation = self.risk_metrics.get('simulation')
+        if simulation:
+            # 模拟期内触发止损或破产的概率
+            risk_score = simulation['stop_loss_probability'] + simulation['ruin_probability']
+            return max(0.0, min(1.0, risk_score))
+
         # 基于号码稳定性和其他因素计算综合风险评分
         stability_factor = (self.risk_metrics['front_stability'] + self.risk_metrics['back_stability']) / 2
         # 风险评分，值越小风险越低
@@ -139,14 +189,20 @@ class RiskAssessmentAlgorithm(BaseAlgorithm):
 
 class PortfolioOptimizationAlgorithm(BaseAlgorithm):
     """投资组合优化算法"""
+    name = "portfolio_optimization"
+    version = "1.0"
 
     def __init__(self):
-        super().__init__("portfolio_optimization", "1.0")
+        super().__init__()
         self.optimization_results = {}
         self.parameters = {
             'target_return': 0.1,      # 目标回报率
             'max_volatility': 0.15,    # 最大波动率
-            'risk_free_rate': 0.02     # 无风险利率
+            'risk_free_rate': 0.02,    # 无风险利率
+            'portfolio_tickets': 3,    # 参考投注组合注数
+            'simulation_sequences': 20000,
+            'simulation_periods': 50,
+            'simulation_seed': 2024
         }
 
     def train(self, history_data: List[LotteryHistory]) -> bool:
@@ -154,27 +210,38 @@ class PortfolioOptimizationAlgorithm(BaseAlgorithm):
         if not history_data:
             return False
 
+        self.simulator = MonteCarloBankrollSimulator(
+            build_reference_portfolio(history_data, self.parameters['portfolio_tickets']))
+
         # 分析历史回报和风险
         returns_history = self._calculate_historical_returns(history_data)
         volatility = self._calculate_volatility(returns_history)
-        
+        simulation = self.simulator.simulate(
+            n_sequences=self.parameters['simulation_sequences'],
+            n_periods=self.parameters['simulation_periods'],
+            initial_bankroll=self.simulator.cost * self.parameters['simulation_periods'],
+            seed=self.parameters['simulation_seed']
+        )
+
         self.optimization_results = {
             'historical_returns': returns_history,
             'historical_volatility': volatility,
-            'sharpe_ratio': self._calculate_sharpe_ratio(returns_history, volatility) if volatility > 0 else 0
+            'sharpe_ratio': self._calculate_sharpe_ratio(returns_history, volatility) if volatility > 0 else 0,
+            'expected_period_roi': simulation['expected_period_roi'],
+            'simulated_roi_mean': simulation['roi_mean'],
+            'simulated_roi_percentiles': simulation['roi_percentiles'],
+            'expected_drawdown': simulation['expected_drawdown']
         }
 
         self.is_trained = True
         return True
 
     def _calculate_historical_returns(self, history_data: List[LotteryHistory]) -> List[float]:
-        """计算历史回报率"""
-        # 简化实现，实际中可以基于模拟投注结果计算
-        returns = []
-        for i in range(1, min(21, len(history_data))):  # 最近20期
-            # 模拟固定回报率
-            returns.append(random.uniform(-0.05, 0.2))
-        return returns
+        """计算历史回报率 (按真实奖级表对参考组合抽样的单期回报率，最近20期)"""
+        n_periods = min(20, len(history_data) - 1)
+        if n_periods <= 0:
+            return []
+        return [float(r) for r in self.simulator.sample_period_returns(n_periods, seed=len(history_data))]
 
     def _calculate_volatility(self, returns: List[float]) -> float:
         """计算波动率"""
@@ -210,6 +277,7 @@ class PortfolioOptimizationAlgorithm(BaseAlgorithm):
                 'optimal_allocation': optimal_allocation,
                 'risk_adjusted_strategy': risk_adjusted_strategy,
                 'expected_return': self.parameters['target_return'],
+                'predicted_roi': self.optimization_results['simulated_roi_mean'],
                 'risk_metrics': self.optimization_results,
                 'confidence': 0.8
             }],
@@ -263,14 +331,20 @@ class PortfolioOptimizationAlgorithm(BaseAlgorithm):
 
 class StopLossAlgorithm(BaseAlgorithm):
     """止损算法"""
+    name = "stop_loss"
+    version = "1.0"
 
     def __init__(self):
-        super().__init__("stop_loss", "1.0")
+        super().__init__()
         self.stop_loss_rules = {}
         self.parameters = {
             'max_loss_ratio': 0.2,     # 最大损失比例
             'trailing_stop': 0.1,      # 追踪止损比例
-            'recovery_period': 5       # 恢复期（期数）
+            'recovery_period': 5,      # 恢复期（期数）
+            'portfolio_tickets': 3,    # 参考投注组合注数
+            'simulation_sequences': 20000,
+            'simulation_periods': 50,
+            'simulation_seed': 2024
         }
 
     def train(self, history_data: List[LotteryHistory]) -> bool:
@@ -278,30 +352,31 @@ class StopLossAlgorithm(BaseAlgorithm):
         if not history_data:
             return False
 
+        self.simulator = MonteCarloBankrollSimulator(
+            build_reference_portfolio(history_data, self.parameters['portfolio_tickets']))
+
         # 分析历史最大连续亏损
         max_consecutive_losses = self._analyze_consecutive_losses(history_data)
-        
+        suggested_ratio = min(self.parameters['max_loss_ratio'], max_consecutive_losses * 0.02)
+
         self.stop_loss_rules = {
             'max_consecutive_losses': max_consecutive_losses,
-            'suggested_stop_loss_ratio': min(
-                self.parameters['max_loss_ratio'],
-                max_consecutive_losses * 0.02
-            )
+            'suggested_stop_loss_ratio': suggested_ratio,
+            'policy_evaluation': self._evaluate_stop_loss_policy(suggested_ratio)
         }
 
         self.is_trained = True
         return True
 
     def _analyze_consecutive_losses(self, history_data: List[LotteryHistory]) -> int:
-        """分析历史最大连续亏损期数"""
-        # 简化实现，实际中可以基于模拟投注结果计算
+        """分析历史最大连续亏损期数 (按真实奖级表对参考组合抽样)"""
         max_consecutive = 0
         current_consecutive = 0
-        
-        for i in range(min(50, len(history_data))):  # 分析最近50期
-            # 模拟随机输赢结果
-            is_loss = random.random() > 0.3  # 假设70%的胜率
-            
+        returns = self.simulator.sample_period_returns(min(50, len(history_data)), seed=len(history_data))
+
+        for period_return in returns:  # 分析最近50期
+            is_loss = period_return < 0
+
             if is_loss:
                 current_consecutive += 1
                 max_consecutive = max(max_consecutive, current_consecutive)
@@ -310,6 +385,29 @@ class StopLossAlgorithm(BaseAlgorithm):
                 
         return max(1, max_consecutive)
 
+    def _evaluate_stop_loss_policy(self, stop_loss_ratio: float) -> Dict[str, Any]:
+        """模拟固定止损 + 追踪止损下的资金曲线，与不止损对比"""
+        initial_bankroll = self.simulator.cost * self.parameters['simulation_periods']
+        evaluation = {}
+        for label, policy in (('with_stop_loss', {'max_loss_ratio': stop_loss_ratio,
+                                                  'trailing_stop': self.parameters['trailing_stop']}),
+                              ('without_stop_loss', {})):
+            result = self.simulator.simulate(
+                n_sequences=self.parameters['simulation_sequences'],
+                n_periods=self.parameters['simulation_periods'],
+                initial_bankroll=initial_bankroll,
+                seed=self.parameters['simulation_seed'],
+                **policy
+            )
+            evaluation[label] = {
+                'stop_probability': float(result['stop_curve'][-1]),
+                'ruin_probability': result['ruin_probability'],
+                'roi_mean': result['roi_mean'],
+                'expected_drawdown': result['expected_drawdown'],
+                'avg_periods_played': result['avg_periods_played']
+            }
+        return evaluation
+
     def predict(self, history_data: List[LotteryHistory]) -> Dict[str, Any]:
         """止损策略预测"""
         if not self.is_trained:
@@ -326,6 +424,7 @@ class StopLossAlgorithm(BaseAlgorithm):
                 'stop_loss_strategy': stop_loss_strategy,
                 'recovery_plan': recovery_plan,
                 'max_loss_threshold': self.parameters['max_loss_ratio'],
+                'predicted_roi': self.stop_loss_rules['policy_evaluation']['with_stop_loss']['roi_mean'],
                 'confidence': 0.9
             }],
             'analysis': self.stop_loss_rules
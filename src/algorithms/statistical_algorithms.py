@@ -27,6 +27,14 @@ class FrequencyAnalysisAlgorithm(BaseAlgorithm):
         self.is_trained = True
         return True
 
+    def update(self, new_records: List[LotteryHistory]) -> bool:
+        """频次可直接累加，无需重扫全部历史。"""
+        if not self.is_trained: return False
+        for record in new_records:
+            self.frequency_data['front_frequency'].update(record.front_area)
+            self.frequency_data['back_frequency'].update(record.back_area)
+        return True
+
     def _normalize_scores(self, counter: Counter, number_range: tuple) -> List[Dict[str, Any]]:
         if not counter: return [{'number': n, 'score': 0.0} for n in range(number_range[0], number_range[1] + 1)]
         max_count = max(counter.values()) if counter else 1.0
@@ -115,6 +123,16 @@ class OmissionValueAlgorithm(BaseAlgorithm):
         self.is_trained = True
         return True
 
+    def update(self, new_records: List[LotteryHistory]) -> bool:
+        """每来一期：出现的号码遗漏清零，其余号码遗漏加一。"""
+        if not self.is_trained: return False
+        for record in new_records:
+            for area, drawn in (('front_omission', record.front_area), ('back_omission', record.back_area)):
+                omission = self.omission_data[area]
+                for num in omission:
+                    omission[num] = 0 if num in drawn else omission[num] + 1
+        return True
+
     def _normalize_omission(self, omission_dict: Dict) -> List[Dict[str, Any]]:
         if not omission_dict: return []
         max_omission = max(omission_dict.values()) if omission_dict else 1.0
@@ -6,6 +6,7 @@ from datetime import datetime
 
 # --- Core Component Imports (no changes) ---
 from src.database.database_manager import DatabaseManager
+from src.database.blob_store import BlobStore
 from src.llm.llm_call_service import LLMCallService
 from src.prompt_templates import (
     build_strategy_A_prompt, build_strategy_B_prompt, build_final_allocation_prompt
@@ -121,7 +122,8 @@ class TripartiteMetaPredictor:
                                                                                            final_model_identifier)
             if existing_final_record:
                 print(f"  [ORCHESTRATOR] ✅ Complete result already exists. Operation finished.")
-                return json.loads(existing_final_record['llm_cognitive_details'])
+                # The column may hold a compressed-blob reference; resolve() also parses inline JSON.
+                return BlobStore(self.db_manager).resolve(existing_final_record['llm_cognitive_details'])
 
             print(f"  [ORCHESTRATOR] Cleaning up any partial results for '{model_name}'...")
             self.db_manager.delete_recommendations_by_period_and_model_base(next_issue, model_name)
@@ -0,0 +1,261 @@
+# file: src/analysis/bulk_importer.py
+"""
+历史开奖批量导入管道。
+- 数据源按流式读取：JSON 数组 / JSON Lines 文件、CSV 文件、API 返回的 data 列表；
+- 每 chunk_size 条为一批，派生字段 (和值、跨度、AC 值、奇偶比、大小比、质合比、连号、尾数)
+  在 (批大小, 5) 的号码矩阵上向量化计算；
+- 写入使用多值 INSERT IGNORE (按 period_number 唯一键去重)，upsert=True 时改为
+  ON DUPLICATE KEY UPDATE 覆盖已有记录；每批一个事务。
+"""
+
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from src.database.database_manager import DatabaseManager
+
+PRIMES = np.array([2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31])
+SIZE_BOUNDARY = 18  # 大于 18 为大号
+DEFAULT_DRAW_TIME = '21:25:00'
+
+COLUMNS = (
+    'period_number', 'draw_date', 'draw_time',
+    'front_area_1', 'front_area_2', 'front_area_3', 'front_area_4', 'front_area_5',
+    'back_area_1', 'back_area_2',
+    'sum_value', 'span_value', 'ac_value', 'odd_even_ratio', 'size_ratio', 'prime_composite_ratio',
+    'consecutive_numbers', 'consecutive_count', 'tail_numbers', 'data_source', 'data_quality'
+)
+
+
+# ----------------------------------------------------------------------
+# 数据源 (全部为生成器，不一次性载入)
+# ----------------------------------------------------------------------
+def _split_numbers(value: Any) -> List[int]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.replace(' ', ',').split(',')
+    return [int(n) for n in value if str(n).strip()]
+
+
+def normalize_record(item: Dict[str, Any], data_source: str = 'import') -> Optional[Dict[str, Any]]:
+    """
+    兼容 API/JSON (expect, time, openCode 或 frontArea/backArea) 与
+    CSV/数据库列 (period_number, draw_date, front_area_1..5, back_area_1..2) 两种格式；
+    号码不合法时返回 None。
+    """
+    try:
+        period = item.get('expect') or item.get('period_number') or item.get('period')
+        time_str = str(item.get('time') or item.get('draw_date') or '').strip()
+        if item.get('openCode'):
+            front_str, back_str = item['openCode'].split('+')
+            front, back = _split_numbers(front_str), _split_numbers(back_str)
+        elif item.get('frontArea') is not None:
+            front, back = _split_numbers(item['frontArea']), _split_numbers(item['backArea'])
+        elif item.get('front_area_1') is not None:
+            front = [int(item[f'front_area_{i}']) for i in range(1, 6)]
+            back = [int(item['back_area_1']), int(item['back_area_2'])]
+        else:
+            front, back = _split_numbers(item.get('front_numbers')), _split_numbers(item.get('back_numbers'))
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+    front, back = sorted(front), sorted(back)
+    if (not period or not time_str or len(set(front)) != 5 or len(set(back)) != 2
+            or not all(1 <= n <= 35 for n in front) or not all(1 <= n <= 12 for n in back)):
+        return None
+
+    date_part, _, time_part = time_str.partition(' ')
+    draw_time = str(item.get('draw_time') or '').strip() or f"{date_part} {time_part or DEFAULT_DRAW_TIME}"
+    if len(draw_time) <= 8:  # 只有时分秒
+        draw_time = f"{date_part} {draw_time}"
+    return {'period_number': str(period).strip(), 'draw_date': date_part, 'draw_time': draw_time,
+            'front': front, 'back': back, 'data_source': item.get('data_source') or data_source}
+
+
+def iter_json_records(path: str, data_source: str = 'json_import') -> Iterator[Dict[str, Any]]:
+    """JSON 数组文件或 JSON Lines 文件 (.jsonl，逐行流式读取)。"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            items = (json.loads(line) for line in f if line.strip())
+        else:
+            data = json.load(f)
+            items = data.get('data', []) if isinstance(data, dict) else data
+        for item in items:
+            record = normalize_record(item, data_source)
+            if record:
+                yield record
+
+
+def iter_csv_records(path: str, data_source: str = 'csv_import') -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for item in csv.DictReader(f):
+            record = normalize_record(item, data_source)
+            if record:
+                yield record
+
+
+def iter_api_records(api_items: Iterable[Dict[str, Any]], data_source: str = 'mxnzp_api') -> Iterator[Dict[str, Any]]:
+    for item in api_items:
+        record = normalize_record(item, data_source)
+        if record:
+            yield record
+
+
+def iter_file_records(path: str) -> Iterator[Dict[str, Any]]:
+    if path.lower().endswith('.csv'):
+        return iter_csv_records(path)
+    return iter_json_records(path)
+
+
+# ----------------------------------------------------------------------
+# 向量化派生字段
+# ----------------------------------------------------------------------
+def compute_derived_fields(front: np.ndarray, back: np.ndarray) -> Dict[str, Any]:
+    """
+    front (N, 5) 已升序、back (N, 2)。返回各派生字段的数组/列表 (长度 N):
+    AC 值 = 前区两两差值的不同取值个数 - (5 - 1)；大小比以 18 为界 (大:小)；
+    连号为长度 ≥2 的连续号码段列表；尾数为前后区号码个位数的计数字典。
+    """
+    front = np.asarray(front, dtype=np.int64)
+    back = np.asarray(back, dtype=np.int64)
+    n = len(front)
+
+    i, j = np.triu_indices(5, k=1)
+    diffs = np.sort(front[:, j] - front[:, i], axis=1)
+    ac_value = 1 + (np.diff(diffs, axis=1) != 0).sum(axis=1) - 4
+
+    odd = (front % 2).sum(axis=1)
+    big = (front > SIZE_BOUNDARY).sum(axis=1)
+    prime = np.isin(front, PRIMES).sum(axis=1)
+
+    # 相邻差为 1 的位置；段起点 = 当前相邻且前一位置不相邻
+    adjacent = np.diff(front, axis=1) == 1
+    starts = adjacent & ~np.pad(adjacent, ((0, 0), (1, 0)))[:, :-1]
+    consecutive_count = starts.sum(axis=1)
+
+    tails = np.zeros((n, 10), dtype=np.int64)
+    all_numbers = np.concatenate([front, back], axis=1) % 10
+    np.add.at(tails, (np.repeat(np.arange(n), all_numbers.shape[1]), all_numbers.ravel()), 1)
+
+    consecutive_numbers: List[Optional[str]] = [None] * n
+    for row in np.flatnonzero(consecutive_count):
+        runs, current = [], [int(front[row, 0])]
+        for k in range(4):
+            if adjacent[row, k]:
+                current.append(int(front[row, k + 1]))
+            else:
+                if len(current) > 1:
+                    runs.append(current)
+                current = [int(front[row, k + 1])]
+        if len(current) > 1:
+            runs.append(current)
+        consecutive_numbers[row] = json.dumps(runs)
+
+    tail_numbers = [json.dumps({str(t): int(c) for t, c in enumerate(counts) if c}) for counts in tails]
+    return {
+        'sum_value': front.sum(axis=1),
+        'span_value': front[:, -1] - front[:, 0],
+        'ac_value': ac_value,
+        'odd_even_ratio': [f"{o}:{5 - o}" for o in odd],
+        'size_ratio': [f"{b}:{5 - b}" for b in big],
+        'prime_composite_ratio': [f"{p}:{5 - p}" for p in prime],
+        'consecutive_numbers': consecutive_numbers,
+        'consecutive_count': consecutive_count,
+        'tail_numbers': tail_numbers,
+    }
+
+
+def build_rows(records: List[Dict[str, Any]], data_quality: int = 100) -> List[tuple]:
+    """一批标准化记录 -> 与 COLUMNS 对应的插入参数。"""
+    if not records:
+        return []
+    front = np.array([r['front'] for r in records])
+    back = np.array([r['back'] for r in records])
+    derived = compute_derived_fields(front, back)
+    rows = []
+    for k, record in enumerate(records):
+        rows.append((
+            record['period_number'], record['draw_date'], record['draw_time'],
+            *(int(n) for n in front[k]), *(int(n) for n in back[k]),
+            int(derived['sum_value'][k]), int(derived['span_value'][k]), int(derived['ac_value'][k]),
+            derived['odd_even_ratio'][k], derived['size_ratio'][k], derived['prime_composite_ratio'][k],
+            derived['consecutive_numbers'][k], int(derived['consecutive_count'][k]), derived['tail_numbers'][k],
+            record['data_source'], data_quality
+        ))
+    return rows
+
+
+# ----------------------------------------------------------------------
+# 写入
+# ----------------------------------------------------------------------
+class BulkHistoryImporter:
+    """按批向量化计算派生字段并以多值 INSERT IGNORE / upsert 写入 lottery_history。"""
+
+    def __init__(self, db_manager: DatabaseManager, chunk_size: int = 500, upsert: bool = False):
+        self.db = db_manager
+        self.chunk_size = chunk_size
+        self.upsert = upsert
+
+    def _insert_query(self) -> str:
+        columns = ', '.join(COLUMNS)
+        placeholders = ', '.join(['%s'] * len(COLUMNS))
+        if self.upsert:
+            updates = ', '.join(f"{c} = VALUES({c})" for c in COLUMNS if c != 'period_number')
+            return f"INSERT INTO lottery_history ({columns}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE {updates}"
+        return f"INSERT IGNORE INTO lottery_history ({columns}) VALUES ({placeholders})"
+
+    def import_records(self, records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        消费标准化记录流；同一批内的重复期号只保留最后一条。
+        返回 {'read', 'written', 'skipped'}：INSERT IGNORE 模式下 written 为实际新增行数，
+        upsert 模式下为 MySQL 报告的影响行数 (更新的行计 2)。
+        """
+        stats = {'read': 0, 'written': 0, 'skipped': 0}
+        query = self._insert_query()
+        iterator = iter(records)
+        while True:
+            batch = list(islice(iterator, self.chunk_size))
+            if not batch:
+                break
+            unique = list({r['period_number']: r for r in batch}.values())
+            rows = build_rows(unique)
+            with self.db.transaction() as cursor:
+                cursor.executemany(query, rows)
+                written = max(cursor.rowcount, 0)
+            stats['read'] += len(batch)
+            stats['written'] += written
+            stats['skipped'] += len(batch) - written if not self.upsert else len(batch) - len(unique)
+        print(f"📥 批量导入完成: 读取 {stats['read']} 条，写入 {stats['written']} 条，跳过 {stats['skipped']} 条")
+        return stats
+
+    def import_file(self, path: str) -> Dict[str, int]:
+        return self.import_records(iter_file_records(path))
+
+    def import_api_items(self, api_items: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        return self.import_records(iter_api_records(api_items))
+
+
+def main():
+    """用法: python -m src.analysis.bulk_importer <文件.json|.jsonl|.csv> [--upsert]"""
+    if len(sys.argv) < 2 or not os.path.exists(sys.argv[1]):
+        print(main.__doc__)
+        return
+    from src.config.database_config import DB_CONFIG
+    db = DatabaseManager(**DB_CONFIG)
+    if not db.connect():
+        print("❌ 数据库连接失败。")
+        return
+    started = datetime.now()
+    BulkHistoryImporter(db, upsert='--upsert' in sys.argv[2:]).import_file(sys.argv[1])
+    print(f"⏱️ 用时 {(datetime.now() - started).total_seconds():.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+# file: src/analysis/columnar_export.py
+"""
+离线分析用的列式导出 (Parquet)。
+把 lottery_history / algorithm_prediction_logs / reward_penalty_records / recommendation_details
+同步到 data/parquet/<表>/period_year=YYYY/part.parquet (按年份分区)：
+- 预测日志的 JSON 被展开成强类型列: 每条推荐一行 (号码列表、位掩码、置信度、前后区命中数)，
+  analysis 中的逐号码得分另存为长表 prediction_scores (metric, area, number, score)；
+- 增量同步: _sync_state.json 记录每张表的水位期号与已导出的最大 id，每次查询 period_number >= 水位 的行，
+  以及 id 超过已导出最大 id 的早期期号 (补录的预测日志、重新评估写入的记录等) 的整期数据，
+  并只重写受影响的年份分区；尚未开奖 (命中数为空) 的期号会保留在水位内，开奖后重新导出。
+依赖 pyarrow (pandas.to_parquet / read_parquet 的引擎)。
+"""
+
+import json
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.database.database_manager import DatabaseManager
+from src.utils.bitmask import numbers_to_mask, popcount64
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pyarrow 不可用时仍可使用展开函数，只是不能读写 Parquet
+    pyarrow = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_EXPORT_DIR = os.path.join(PROJECT_ROOT, 'data', 'parquet')
+STATE_FILE = '_sync_state.json'
+PARTITION_COLUMN = 'period_year'
+TABLES = ('lottery_history', 'predictions', 'prediction_scores', 'rewards', 'recommendations')
+# 导出表 -> 导出结果中对应源表自增 id 的列
+ID_COLUMNS = {'lottery_history': 'id', 'predictions': 'log_id', 'prediction_scores': 'log_id',
+              'rewards': 'id', 'recommendations': 'id'}
+# 源表: (FROM 子句, id 表达式, 期号表达式)
+SOURCES = {
+    'lottery_history': ("lottery_history", "id", "period_number"),
+    'predictions': ("algorithm_prediction_logs", "id", "period_number"),
+    'rewards': ("reward_penalty_records", "id", "period_number"),
+    'recommendations': ("recommendation_details rd JOIN algorithm_recommendation ar "
+                        "ON ar.id = rd.recommendation_metadata_id", "rd.id", "ar.period_number"),
+}
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise RuntimeError("列式导出需要 pyarrow，请先执行 pip install pyarrow")
+
+
+def _parse_numbers(value: Any) -> List[int]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.replace(' ', ',').split(',')
+    try:
+        return [int(n) for n in value if str(n).strip()]
+    except (TypeError, ValueError):
+        return []
+
+
+def _load_json(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8')
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _period_year(periods: pd.Series) -> pd.Series:
+    years = pd.to_numeric(periods.astype(str).str[:4], errors='coerce')
+    return years.fillna(0).astype(np.int32)
+
+
+def _attach_hits(df: pd.DataFrame, draws: Dict[str, Tuple[int, int]]) -> pd.DataFrame:
+    """按 period_number 对齐开奖掩码，命中数 = popcount(推荐掩码 & 开奖掩码)；未开奖为空。"""
+    draw_front = df['period_number'].map(lambda p: draws.get(p, (None, None))[0])
+    draw_back = df['period_number'].map(lambda p: draws.get(p, (None, None))[1])
+    drawn = draw_front.notna().to_numpy()
+    front_hits = np.full(len(df), np.nan)
+    back_hits = np.full(len(df), np.nan)
+    if drawn.any():
+        front_hits[drawn] = popcount64(df['front_mask'].to_numpy(dtype=np.uint64)[drawn] &
+                                       draw_front[drawn].to_numpy(dtype=np.uint64))
+        back_hits[drawn] = popcount64(df['back_mask'].to_numpy(dtype=np.uint64)[drawn] &
+                                      draw_back[drawn].to_numpy(dtype=np.uint64))
+    df['front_hits'] = pd.array(front_hits, dtype='Int8')
+    df['back_hits'] = pd.array(back_hits, dtype='Int8')
+    return df
+
+
+# ----------------------------------------------------------------------
+# 行 -> DataFrame (纯函数，不依赖数据库)
+# ----------------------------------------------------------------------
+def history_frame(rows: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    df = pd.DataFrame(list(rows))
+    if df.empty:
+        return df
+    front = df[[f'front_area_{i}' for i in range(1, 6)]].to_numpy(dtype=np.int64)
+    back = df[['back_area_1', 'back_area_2']].to_numpy(dtype=np.int64)
+    df['front_mask'] = np.bitwise_or.reduce(np.left_shift(1, front - 1), axis=1).astype(np.uint64)
+    df['back_mask'] = np.bitwise_or.reduce(np.left_shift(1, back - 1), axis=1).astype(np.uint64)
+    for column in ('consecutive_numbers', 'tail_numbers'):
+        if column in df:
+            df[column] = df[column].map(lambda v: None if v is None else
+                                        (v if isinstance(v, str) else json.dumps(v, ensure_ascii=False)))
+    df['period_number'] = df['period_number'].astype(str)
+    df[PARTITION_COLUMN] = _period_year(df['period_number'])
+    return df.drop(columns=[c for c in ('created_at', 'updated_at') if c in df])
+
+
+def _score_items(metric: str, value: Any) -> Iterable[Tuple[str, int, float]]:
+    """analysis 中的 {号码: 分数} 字典、[[号码, 分数], ...] 列表或 {'front': [...], 'back': [...]} 号码组。"""
+    area = 'back' if metric.startswith('back') else 'front'
+    if isinstance(value, dict):
+        if set(value) <= {'front', 'back'}:
+            for sub_area, numbers in value.items():
+                for number in _parse_numbers(numbers):
+                    yield sub_area, number, 1.0
+            return
+        for number, score in value.items():
+            try:
+                yield area, int(number), float(score)
+            except (TypeError, ValueError):
+                continue
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, (list, tuple)) and len(item) == 2:
+                try:
+                    yield area, int(item[0]), float(item[1])
+                except (TypeError, ValueError):
+                    continue
+
+
+def prediction_frames(rows: Sequence[Dict[str, Any]],
+                      draws: Dict[str, Tuple[int, int]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """algorithm_prediction_logs 行 -> (每条推荐一行的 predictions, 逐号码得分的 prediction_scores)。"""
+    recommendations, scores = [], []
+    for row in rows:
+        payload = _load_json(row.get('predictions')) or {}
+        if not isinstance(payload, dict):
+            payload = {}
+        period = str(row['period_number'])
+        base = {'log_id': row['id'], 'period_number': period, 'algorithm_version': row['algorithm_version'],
+                'algorithm': payload.get('algorithm'),
+                'log_confidence': None if row.get('confidence_score') is None else float(row['confidence_score']),
+                'created_at': row.get('created_at')}
+        for index, rec in enumerate(payload.get('recommendations') or []):
+            if not isinstance(rec, dict):
+                continue
+            front, back = _parse_numbers(rec.get('front_numbers')), _parse_numbers(rec.get('back_numbers'))
+            confidence = rec.get('confidence')
+            recommendations.append({
+                **base, 'rec_index': index,
+                'confidence': float(confidence) if confidence is not None else base['log_confidence'],
+                'front_numbers': front, 'back_numbers': back,
+                'front_count': len(front), 'back_count': len(back),
+                'front_mask': numbers_to_mask(front), 'back_mask': numbers_to_mask(back)
+            })
+        for metric, value in (payload.get('analysis') or {}).items():
+            for area, number, score in _score_items(metric, value):
+                scores.append({'log_id': row['id'], 'period_number': period,
+                               'algorithm_version': row['algorithm_version'],
+                               'metric': metric, 'area': area, 'number': number, 'score': score})
+
+    predictions = pd.DataFrame(recommendations)
+    if not predictions.empty:
+        predictions['front_mask'] = predictions['front_mask'].astype(np.uint64)
+        predictions['back_mask'] = predictions['back_mask'].astype(np.uint64)
+        predictions = _attach_hits(predictions, draws)
+        predictions[PARTITION_COLUMN] = _period_year(predictions['period_number'])
+    score_frame = pd.DataFrame(scores)
+    if not score_frame.empty:
+        score_frame['number'] = score_frame['number'].astype(np.int16)
+        score_frame[PARTITION_COLUMN] = _period_year(score_frame['period_number'])
+    return predictions, score_frame
+
+
+def reward_frame(rows: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    df = pd.DataFrame(list(rows))
+    if df.empty:
+        return df
+    hit_details = df['hit_details'].map(lambda v: _load_json(v) or {})
+    missed = df['missed_numbers'].map(lambda v: _load_json(v) or {})
+    df['front_hit_numbers'] = hit_details.map(lambda d: _parse_numbers(d.get('front_hits')))
+    df['back_hit_numbers'] = hit_details.map(lambda d: _parse_numbers(d.get('back_hits')))
+    df['front_missed_numbers'] = missed.map(lambda d: _parse_numbers(d.get('front_missed')))
+    df['back_missed_numbers'] = missed.map(lambda d: _parse_numbers(d.get('back_missed')))
+    for column in ('hit_score', 'reward_points', 'penalty_points', 'net_points', 'accuracy_deviation'):
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype(np.float64)
+    df['period_number'] = df['period_number'].astype(str)
+    df[PARTITION_COLUMN] = _period_year(df['period_number'])
+    return df.drop(columns=['hit_details', 'missed_numbers'])
+
+
+def recommendation_frame(rows: Sequence[Dict[str, Any]], draws: Dict[str, Tuple[int, int]]) -> pd.DataFrame:
+    df = pd.DataFrame(list(rows))
+    if df.empty:
+        return df
+    df['period_number'] = df['period_number'].astype(str)
+    df['front_numbers'] = df['front_numbers'].map(_parse_numbers)
+    df['back_numbers'] = df['back_numbers'].map(_parse_numbers)
+    df['front_mask'] = df['front_numbers'].map(numbers_to_mask).astype(np.uint64)
+    df['back_mask'] = df['back_numbers'].map(numbers_to_mask).astype(np.uint64)
+    df['win_probability'] = pd.to_numeric(df['win_probability'], errors='coerce').astype(np.float64)
+    df = _attach_hits(df, draws)
+    df[PARTITION_COLUMN] = _period_year(df['period_number'])
+    return df
+
+
+# ----------------------------------------------------------------------
+# 同步任务
+# ----------------------------------------------------------------------
+class ColumnarExporter:
+    """把 OLTP 表增量同步为按年份分区的 Parquet 文件。"""
+
+    def __init__(self, db_manager: DatabaseManager, export_dir: str = DEFAULT_EXPORT_DIR):
+        self.db = db_manager
+        self.export_dir = export_dir
+        self.state_path = os.path.join(export_dir, STATE_FILE)
+
+    def _load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self, state: Dict[str, Any]):
+        os.makedirs(self.export_dir, exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def _watermark(state: Dict[str, Any], table: str) -> Tuple[str, Optional[int]]:
+        """(水位期号, 已导出的最大 id)；旧版状态文件只有期号，此时 id 未知，本次不检测补录行。"""
+        value = state.get(table, '')
+        if isinstance(value, dict):
+            return value.get('period', ''), value.get('max_id')
+        return value, None
+
+    def _late_periods(self, source: str, since: str, max_id: Optional[int]) -> List[str]:
+        """水位之前、但有 id 超过已导出最大 id 的新行的期号 (需要整期重新导出)。"""
+        if max_id is None or not since:
+            return []
+        from_clause, id_expr, period_expr = SOURCES[source]
+        rows = self.db.execute_query(
+            f"SELECT DISTINCT {period_expr} AS period_number FROM {from_clause} "
+            f"WHERE {id_expr} > %s AND {period_expr} < %s", (max_id, since))
+        return sorted(str(r['period_number']) for r in rows)
+
+    @staticmethod
+    def _window(period_expr: str, since: str, late: Sequence[str]) -> Tuple[str, tuple]:
+        """WHERE 条件: 水位之后的期号，加上需要重新导出的早期期号。"""
+        if not late:
+            return f"{period_expr} >= %s", (since,)
+        return (f"({period_expr} >= %s OR {period_expr} IN ({', '.join(['%s'] * len(late))}))",
+                (since, *late))
+
+    def _draws(self, since: str) -> Dict[str, Tuple[int, int]]:
+        rows = self.db.execute_query("""
+            SELECT period_number, front_area_1, front_area_2, front_area_3, front_area_4, front_area_5,
+                   back_area_1, back_area_2
+            FROM lottery_history WHERE period_number >= %s
+        """, (since,))
+        return {str(r['period_number']): (numbers_to_mask(r[f'front_area_{i}'] for i in range(1, 6)),
+                                          numbers_to_mask((r['back_area_1'], r['back_area_2'])))
+                for r in rows}
+
+    def _write_partitions(self, table: str, df: pd.DataFrame, since: str, late: Sequence[str] = ()) -> int:
+        """重写受影响的年份分区：保留分区内 period_number < since 且不在重新导出期号中的旧行，拼接新导出的行。"""
+        written = 0
+        for year, part in df.groupby(PARTITION_COLUMN):
+            part_dir = os.path.join(self.export_dir, table, f"{PARTITION_COLUMN}={year}")
+            part_path = os.path.join(part_dir, 'part.parquet')
+            os.makedirs(part_dir, exist_ok=True)
+            part = part.drop(columns=[PARTITION_COLUMN])
+            if os.path.exists(part_path):
+                existing = pd.read_parquet(part_path)
+                keep = (existing['period_number'] < since) & ~existing['period_number'].isin(list(late))
+                part = pd.concat([existing[keep], part], ignore_index=True)
+            part = part.sort_values('period_number', kind='stable').reset_index(drop=True)
+            tmp_path = part_path + '.tmp'
+            part.to_parquet(tmp_path, engine='pyarrow', index=False)
+            os.replace(tmp_path, part_path)
+            written += len(part)
+        return written
+
+    @staticmethod
+    def _next_watermark(df: pd.DataFrame, since: str) -> str:
+        """有命中列时，水位停在最早一个尚未开奖的期号，以便开奖后重新导出。"""
+        if df.empty:
+            return since
+        if 'front_hits' in df:
+            pending = df.loc[df['front_hits'].isna(), 'period_number']
+            if not pending.empty:
+                return pending.min()
+        return df['period_number'].max()
+
+    def sync(self, tables: Sequence[str] = TABLES) -> Dict[str, int]:
+        """增量同步，返回每张表本次导出的行数。"""
+        _require_pyarrow()
+        state = self._load_state()
+        marks = {table: self._watermark(state, table) for table in TABLES}
+
+        windows: Dict[str, Tuple[str, List[str]]] = {}
+        if 'predictions' in tables or 'prediction_scores' in tables:
+            # 得分与预测日志来自同一张源表，取两者中较早的水位
+            used = [t for t in ('predictions', 'prediction_scores') if t in tables]
+            since = min(marks[t][0] for t in used)
+            ids = [marks[t][1] for t in used]
+            windows['predictions'] = since, self._late_periods(
+                'predictions', since, None if None in ids else min(ids))
+        for source, table in (('lottery_history', 'lottery_history'), ('rewards', 'rewards'),
+                              ('recommendations', 'recommendations')):
+            if table in tables:
+                since, max_id = marks[table]
+                windows[source] = since, self._late_periods(source, since, max_id)
+
+        needs_draws = any(t in tables for t in ('predictions', 'recommendations'))
+        since_all = min((min([since, *late]) for since, late in windows.values()), default='')
+        draws = self._draws(since_all) if needs_draws else {}
+        stats = {}
+
+        if 'lottery_history' in tables:
+            since, late = windows['lottery_history']
+            where, params = self._window('period_number', since, late)
+            df = history_frame(self.db.execute_query(
+                f"SELECT * FROM lottery_history WHERE {where} ORDER BY period_number", params))
+            stats['lottery_history'] = self._export(state, 'lottery_history', df, since, late)
+
+        if 'predictions' in windows:
+            since, late = windows['predictions']
+            where, params = self._window('period_number', since, late)
+            rows = self.db.execute_query(
+                f"SELECT * FROM algorithm_prediction_logs WHERE {where} ORDER BY period_number, id", params)
+            predictions, scores = prediction_frames(rows, draws)
+            # 最大 id 取自源行：没有推荐或得分的日志也算已导出，不会被反复当作补录行
+            max_id = max((int(r['id']) for r in rows), default=None)
+            if 'predictions' in tables:
+                stats['predictions'] = self._export(state, 'predictions', predictions, since, late, max_id=max_id)
+            if 'prediction_scores' in tables:
+                # 得分与预测日志同一水位推进，保证两张表可以按 log_id 关联
+                state_since = self._next_watermark(predictions, since)
+                stats['prediction_scores'] = self._export(state, 'prediction_scores', scores, since, late,
+                                                          state_since, max_id)
+
+        if 'rewards' in tables:
+            since, late = windows['rewards']
+            where, params = self._window('period_number', since, late)
+            df = reward_frame(self.db.execute_query(
+                f"SELECT * FROM reward_penalty_records WHERE {where} ORDER BY period_number, id", params))
+            stats['rewards'] = self._export(state, 'rewards', df, since, late)
+
+        if 'recommendations' in tables:
+            since, late = windows['recommendations']
+            where, params = self._window('ar.period_number', since, late)
+            df = recommendation_frame(self.db.execute_query(f"""
+                SELECT rd.*, ar.period_number, ar.algorithm_version
+                FROM recommendation_details rd
+                JOIN algorithm_recommendation ar ON ar.id = rd.recommendation_metadata_id
+                WHERE {where}
+                ORDER BY ar.period_number, rd.id
+            """, params), draws)
+            stats['recommendations'] = self._export(state, 'recommendations', df, since, late)
+
+        self._save_state(state)
+        print(f"📦 列式导出完成: {stats}")
+        return stats
+
+    def _export(self, state: Dict[str, Any], table: str, df: pd.DataFrame, since: str, late: Sequence[str] = (),
+                next_since: Optional[str] = None, max_id: Optional[int] = None) -> int:
+        """写入分区并推进水位期号与最大 id (max_id 缺省时取导出结果中源表 id 的最大值)。"""
+        if df.empty:
+            return 0
+        self._write_partitions(table, df, since, late)
+        if max_id is None:
+            max_id = int(df[ID_COLUMNS[table]].max())
+        max_ids = [self._watermark(state, table)[1], max_id]
+        state[table] = {'period': next_since or self._next_watermark(df, since),
+                        'max_id': max(i for i in max_ids if i is not None)}
+        return len(df)
+
+
+# ----------------------------------------------------------------------
+# 查询辅助
+# ----------------------------------------------------------------------
+def load_table(table: str, export_dir: str = DEFAULT_EXPORT_DIR, columns: Optional[List[str]] = None,
+               start_period: Optional[str] = None, end_period: Optional[str] = None) -> pd.DataFrame:
+    """
+    读取导出的表；给定期号范围时先按年份分区裁剪，再按 period_number 过滤。
+    例: load_table('predictions', columns=['algorithm_version', 'front_hits'], start_period='2025001')
+    """
+    _require_pyarrow()
+    path = os.path.join(export_dir, table)
+    if not os.path.isdir(path):
+        return pd.DataFrame(columns=columns or [])
+    filters = []
+    if start_period:
+        filters += [(PARTITION_COLUMN, '>=', int(start_period[:4])), ('period_number', '>=', start_period)]
+    if end_period:
+        filters += [(PARTITION_COLUMN, '<=', int(end_period[:4])), ('period_number', '<=', end_period)]
+    read_columns = None if columns is None else list(dict.fromkeys(columns + ['period_number']))
+    df = pd.read_parquet(path, engine='pyarrow', columns=read_columns, filters=filters or None)
+    return df if columns is None else df[columns]
+
+
+def algorithm_hit_summary(export_dir: str = DEFAULT_EXPORT_DIR, start_period: Optional[str] = None) -> pd.DataFrame:
+    """按算法版本汇总已开奖推荐的平均命中数与命中分布 (示例查询)。"""
+    df = load_table('predictions', export_dir, ['algorithm_version', 'front_hits', 'back_hits', 'confidence'],
+                    start_period=start_period)
+    df = df.dropna(subset=['front_hits'])
+    if df.empty:
+        return df
+    return (df.assign(front_hits=df['front_hits'].astype(float), back_hits=df['back_hits'].astype(float),
+                      front_3plus=df['front_hits'] >= 3)
+            .groupby('algorithm_version')
+            .agg(recommendations=('front_hits', 'size'), avg_front_hits=('front_hits', 'mean'),
+                 avg_back_hits=('back_hits', 'mean'), front_3plus_rate=('front_3plus', 'mean'),
+                 avg_confidence=('confidence', 'mean'))
+            .sort_values('avg_front_hits', ascending=False))
+
+
+def main():
+    """用法: python -m src.analysis.columnar_export [导出目录]"""
+    from src.config.database_config import DB_CONFIG
+    db = DatabaseManager(**DB_CONFIG)
+    if not db.connect():
+        print("❌ 数据库连接失败。")
+        return
+    try:
+        ColumnarExporter(db, sys.argv[1] if len(sys.argv) > 1 else DEFAULT_EXPORT_DIR).sync()
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
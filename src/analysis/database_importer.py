@@ -15,6 +15,9 @@ if project_root not in sys.path:
 from src.database.database_manager import DatabaseManager
 from src.database.crud.lottery_history_dao import LotteryHistoryDAO
 from src.model.lottery_models import LotteryHistory
+from src.engine.betting_settlement import BettingSettlementEngine
+from src.analysis.bulk_importer import BulkHistoryImporter
+from src.algorithms.advanced_algorithms.cooccurrence_store import CooccurrenceStore, PERSISTED_DECAY
 
 # --- API 配置 ---
 API_URL = "https://www.mxnzp.com/api/lottery/common/history"
@@ -78,8 +81,6 @@ def sync_lottery_data_to_db(initial_fetch=False):
         print("❌ 数据库连接失败。")
         return
 
-    history_dao = LotteryHistoryDAO(db)
-
     try:
         size = '50' if initial_fetch else '5'
         params = API_PARAMS.copy()
@@ -97,27 +98,19 @@ def sync_lottery_data_to_db(initial_fetch=False):
         api_data_list = api_response['data']
         print(f"✅ 从API成功获取 {len(api_data_list)} 条记录。")
 
-        # 获取数据库中已存在的期号
-        existing_periods = history_dao.get_all_period_numbers()
-
-        new_records_count = 0
-        for item in reversed(api_data_list):  # 从最旧的开始插入，保证顺序
-            period = item.get('expect')
-            if period not in existing_periods:
-                try:
-                    lottery_record = parse_api_data_to_lotteryhistory(item)
-                    if history_dao.insert_lottery_history(lottery_record):
-                        print(f"  - ✅ 成功插入新开奖期号: {period}")
-                        new_records_count += 1
-                    else:
-                        print(f"  - 🔴 插入期号 {period} 失败 (DAO操作返回False)。")
-                except Exception as e:
-                    print(f"  - 🔴 解析或插入期号 {period} 时出错: {e}")
+        # 派生字段按批向量化计算，INSERT IGNORE 按期号唯一键去重，无需预先载入全部期号
+        stats = BulkHistoryImporter(db).import_api_items(reversed(api_data_list))  # 从最旧的开始插入，保证顺序
+        new_records_count = stats['written']
 
         if new_records_count == 0:
             print("👌 数据库已是最新，无需更新。")
         else:
             print(f"🎉 成功向数据库同步了 {new_records_count} 条新记录！")
+            print("🧾 正在结算已开奖期号的个人投注...")
+            BettingSettlementEngine(db).settle_pending()
+            # 只把 last_period 之后的新开奖计入持久化的共现统计
+            store = CooccurrenceStore.refresh(db, PERSISTED_DECAY)
+            print(f"🔗 共现统计已更新至第 {store.last_period} 期 (累计 {store.draw_count} 期)。")
 
     except requests.exceptions.RequestException as e:
         print(f"❌ 请求API时发生网络错误: {e}")
@@ -0,0 +1,194 @@
+# 文件: src/database/blob_store.py
+"""
+按内容寻址的压缩大字段存储。
+
+algorithm_recommendation.analysis_basis / llm_cognitive_details 原先直接保存完整 JSON
+(每个评分器的热力图与分析，同一期的多个模型完全相同)。现在:
+- 内容以规范化 JSON (键排序、紧凑分隔符) 编码后取 SHA-256 作为键，压缩后存入 content_blobs 表，
+  相同内容只存一份 (INSERT IGNORE，同一进程内已写过的键直接跳过往返)；
+- 压缩优先使用 zstd (需安装 zstandard)，不可用时使用 zlib，编码方式逐条记录，读取时按记录解压；
+- 推荐主表中保存引用 {"$blob": "<sha256>"}，仍是合法 JSON，MySQL 的 json 列无需修改；
+- 读取方调用 BlobStore.resolve(字段值)：引用会被解压还原，旧数据中的内联 JSON 原样解析。
+python -m src.database.blob_store 可把历史记录中的内联 JSON 迁移为引用。
+"""
+
+import hashlib
+import json
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.database.database_manager import DatabaseManager
+
+try:
+    import zstandard
+except ImportError:  # 未安装 zstandard 时退回 zlib
+    zstandard = None
+
+BLOB_REF_FIELD = '$blob'
+BLOB_COLUMNS = ('analysis_basis', 'llm_cognitive_details')
+
+BLOB_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS `content_blobs` (
+  `blob_key` char(64) NOT NULL COMMENT '未压缩内容的 SHA-256',
+  `codec` varchar(10) NOT NULL COMMENT '压缩方式: zstd / zlib',
+  `raw_size` int(11) NOT NULL COMMENT '未压缩字节数',
+  `stored_size` int(11) NOT NULL COMMENT '压缩后字节数',
+  `data` longblob NOT NULL,
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`blob_key`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '按内容寻址的压缩大字段表'
+"""
+
+INSERT_BLOB_SQL = ("INSERT IGNORE INTO content_blobs (blob_key, codec, raw_size, stored_size, data) "
+                   "VALUES (%s, %s, %s, %s, %s)")
+
+
+def canonical_bytes(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def compress(raw: bytes, codec: Optional[str] = None) -> Tuple[str, bytes]:
+    codec = codec or ('zstd' if zstandard is not None else 'zlib')
+    if codec == 'zstd':
+        return codec, zstandard.ZstdCompressor(level=3).compress(raw)
+    return 'zlib', zlib.compress(raw, 6)
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("该数据以 zstd 压缩，请先执行 pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(bytes(data))
+    return zlib.decompress(bytes(data))
+
+
+def blob_ref(key: str) -> str:
+    return json.dumps({BLOB_REF_FIELD: key})
+
+
+def blob_key_of(value: Any) -> Optional[str]:
+    """字段值是 blob 引用时返回键，否则返回 None。"""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8')
+    if isinstance(value, str):
+        if BLOB_REF_FIELD not in value or len(value) > 100:
+            return None
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    if isinstance(value, dict) and len(value) == 1 and isinstance(value.get(BLOB_REF_FIELD), str):
+        return value[BLOB_REF_FIELD]
+    return None
+
+
+def store_blob(cursor, obj: Any, known_keys: Optional[set] = None) -> Tuple[str, str]:
+    """
+    在调用方的事务游标上写入 (已存在则忽略)，返回 (键, 写入推荐主表的引用字符串)。
+    known_keys 中是确认已提交的键，命中时跳过压缩与写入。
+    """
+    raw = canonical_bytes(obj)
+    key = hashlib.sha256(raw).hexdigest()
+    if known_keys is None or key not in known_keys:
+        codec, data = compress(raw)
+        cursor.execute(INSERT_BLOB_SQL, (key, codec, len(raw), len(data), data))
+    return key, blob_ref(key)
+
+
+class BlobStore:
+    """content_blobs 表的读写封装，带一个小的解压结果缓存。"""
+
+    def __init__(self, db_manager: DatabaseManager, cache_size: int = 64):
+        self.db = db_manager
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, Any]' = OrderedDict()
+        self._known_keys: set = set()
+
+    def ensure_table(self):
+        self.db.execute_update(BLOB_TABLE_DDL)
+
+    def put(self, obj: Any, cursor=None) -> str:
+        """
+        保存 obj，返回引用字符串。
+        传入 cursor 时在调用方的事务内写入；该事务可能回滚，所以这种情况下不把键记为已提交。
+        """
+        if cursor is not None:
+            return store_blob(cursor, obj, self._known_keys)[1]
+        with self.db.transaction() as own_cursor:
+            key, ref = store_blob(own_cursor, obj, self._known_keys)
+        if len(self._known_keys) > 10000:
+            self._known_keys.clear()
+        self._known_keys.add(key)
+        return ref
+
+    def get(self, key: str) -> Any:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        # 只依赖 execute_query，DatabaseManager 与 AllDAO 子类都可作为 db_manager
+        rows = self.db.execute_query("SELECT codec, data FROM content_blobs WHERE blob_key = %s", (key,))
+        if not rows:
+            raise KeyError(f"blob 不存在: {key}")
+        value = json.loads(decompress(rows[0]['codec'], rows[0]['data']).decode('utf-8'))
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def resolve(self, value: Any) -> Any:
+        """字段值 -> Python 对象: 引用解压还原，内联 JSON 字符串直接解析，无法解析时原样返回。"""
+        key = blob_key_of(value)
+        if key:
+            return self.get(key)
+        if isinstance(value, (bytes, bytearray)):
+            value = value.decode('utf-8')
+        if isinstance(value, str):
+            try:
+                return json.loads(value)
+            except ValueError:
+                return value
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        rows = self.db.execute_query("SELECT COUNT(*) AS blobs, COALESCE(SUM(raw_size), 0) AS raw_bytes, "
+                                     "COALESCE(SUM(stored_size), 0) AS stored_bytes FROM content_blobs")
+        row = rows[0] if rows else {}
+        return {k: int(row.get(k) or 0) for k in ('blobs', 'raw_bytes', 'stored_bytes')}
+
+
+def externalize_recommendations(db_manager: DatabaseManager, batch_size: int = 200) -> Dict[str, int]:
+    """把 algorithm_recommendation 中仍为内联 JSON 的大字段迁移为 blob 引用 (按 id 分批，可重复执行)。"""
+    store = BlobStore(db_manager)
+    store.ensure_table()
+    converted, last_id = 0, 0
+    columns = ', '.join(BLOB_COLUMNS)
+    while True:
+        rows = db_manager.execute_query(
+            f"SELECT id, {columns} FROM algorithm_recommendation WHERE id > %s ORDER BY id LIMIT %s",
+            (last_id, batch_size))
+        if not rows:
+            break
+        with db_manager.transaction() as cursor:
+            for row in rows:
+                updates = {}
+                for column in BLOB_COLUMNS:
+                    value = row.get(column)
+                    if value in (None, '') or blob_key_of(value):
+                        continue
+                    updates[column] = store.put(store.resolve(value), cursor)
+                if updates:
+                    assignments = ', '.join(f"{column} = %s" for column in updates)
+                    cursor.execute(f"UPDATE algorithm_recommendation SET {assignments} WHERE id = %s",
+                                   (*updates.values(), row['id']))
+                    converted += 1
+        last_id = rows[-1]['id']
+    stats = store.stats()
+    print(f"✅ 已迁移 {converted} 条推荐记录；content_blobs 共 {stats['blobs']} 条，"
+          f"原始 {stats['raw_bytes'] / 1024:.1f}KB -> 压缩后 {stats['stored_bytes'] / 1024:.1f}KB")
+    return {'converted': converted, **stats}
+
+
+if __name__ == "__main__":
+    from src.config.database_config import DB_CONFIG
+    externalize_recommendations(DatabaseManager(**DB_CONFIG))
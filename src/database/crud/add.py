@@ -1,7 +1,9 @@
 
 # src/database/crud/add.py
+import json
 from mysql.connector import Error
 from typing import List, Dict, Any
+from src.database.blob_store import BlobStore, blob_key_of
 from src.model.lottery_models import LotteryHistory, AlgorithmRecommendation, RecommendationDetail
 
 
@@ -94,6 +96,7 @@ def get_recommendations(period_number: str = None) -> List[Dict]:
         result = db_manager.execute_query(query, tuple(params))
 
         # 转换为字典格式
+        blob_store = BlobStore(db_manager)
         recommendations = []
         for row in result:
             recommendations.append({
@@ -102,7 +105,9 @@ def get_recommendations(period_number: str = None) -> List[Dict]:
                 "algorithm_version": row["algorithm_version"],
                 "confidence_score": row["confidence_score"],
                 "risk_level": row["risk_level"],
-                "analysis_basis": row["analysis_basis"],
+                # 引用形式的压缩 blob 还原为原来的 JSON 字符串
+                "analysis_basis": (json.dumps(blob_store.resolve(row["analysis_basis"]), ensure_ascii=False)
+                                   if blob_key_of(row["analysis_basis"]) else row["analysis_basis"]),
                 "key_patterns": row["key_patterns"],
                 "models": row["models"],
                 "recommendation_combinations": row["recommendation_combinations"],
@@ -4,6 +4,7 @@ import re
 from typing import List, Optional, Dict,Any
 from datetime import datetime
 from ..AllDao import AllDAO
+from src.database.blob_store import BlobStore
 from src.model.lottery_models import AlgorithmRecommendation
 
 
@@ -118,7 +119,7 @@ class AlgorithmRecommendationDAO(AllDAO):
                 model_weights=json.loads(row['model_weights']) if row['model_weights'] else None,
                 confidence_score=float(row['confidence_score']),
                 risk_level=row['risk_level'],
-                analysis_basis=json.loads(row['analysis_basis']) if row['analysis_basis'] else None,
+                analysis_basis=BlobStore(self).resolve(row['analysis_basis']) if row['analysis_basis'] else None,
                 key_patterns=json.loads(row['key_patterns']) if row['key_patterns'] else None
             )
         return None
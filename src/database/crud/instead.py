@@ -162,20 +162,27 @@ def insert_lottery_record(period_number, draw_date_str, front_numbers, back_numb
             connection.close()
 
 def batch_insert_lottery_records(records):
-    """批量插入开奖记录
+    """批量插入开奖记录 (派生字段向量化计算，多值 INSERT IGNORE 写入，已存在的期号自动跳过)
     :param records: 记录列表，每条记录格式为 (period_number, draw_date_str, front_numbers, back_numbers)
     """
-    success_count = 0
-    fail_count = 0
+    from src.database.database_manager import DatabaseManager
+    from src.analysis.bulk_importer import BulkHistoryImporter, normalize_record
 
-    for record in records:
-        period_number, draw_date_str, front_numbers, back_numbers = record
-        if insert_lottery_record(period_number, draw_date_str, front_numbers, back_numbers):
-            success_count += 1
-        else:
-            fail_count += 1
-
-    print(f"📊 批量插入完成: 成功 {success_count} 条，失败 {fail_count} 条")
+    db_config = {
+        'host': 'localhost',
+        'port': 3309,
+        'user': 'root',
+        'password': '123456789',
+        'database': 'lottery_analysis_system'
+    }
+    normalized = (
+        normalize_record({'period_number': period_number, 'draw_date': draw_date_str,
+                          'front_numbers': front_numbers, 'back_numbers': back_numbers}, 'json_import')
+        for period_number, draw_date_str, front_numbers, back_numbers in records
+    )
+    stats = BulkHistoryImporter(DatabaseManager(**db_config)).import_records(r for r in normalized if r)
+
+    print(f"📊 批量插入完成: 成功 {stats['written']} 条，跳过 {stats['skipped']} 条")
 
 # 示例使用
 # 替换原来的示例使用部分
@@ -38,7 +38,8 @@ class PersonalBettingDAO(AllDAO):
                 winning_amount=float(row['winning_amount']) if row['winning_amount'] else 0.0,
                 strategy_type=row['strategy_type'],
                 confidence_level=row['confidence_level'],
-                analysis_notes=row['analysis_notes']
+                analysis_notes=row['analysis_notes'],
+                is_additional=bool(row.get('is_additional'))
             )
             betting_list.append(betting)
         return betting_list
@@ -50,8 +51,8 @@ class PersonalBettingDAO(AllDAO):
             user_id, period_number, bet_time, bet_type,
             front_numbers, front_count, back_numbers, back_count,
             bet_amount, multiple, is_winning, winning_level,
-            winning_amount, strategy_type, confidence_level, analysis_notes
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            winning_amount, strategy_type, confidence_level, analysis_notes, is_additional
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         params = (
             betting.user_id,
@@ -69,6 +70,7 @@ class PersonalBettingDAO(AllDAO):
             betting.winning_amount,
             betting.strategy_type,
             betting.confidence_level,
-            betting.analysis_notes
+            betting.analysis_notes,
+            betting.is_additional
         )
         return self.execute_update(query, params)
\ No newline at end of file
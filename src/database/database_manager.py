@@ -2,11 +2,14 @@
 
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from contextlib import contextmanager
 import json
 import mysql.connector
 from mysql.connector import pooling
 import logging
 
+from src.database.query_profiler import PROFILER
+
 # 导入您项目中定义的模型类，确保所有函数的返回类型提示正确
 from src.model.lottery_models import (
     LotteryHistory, NumberStatistics, AlgorithmConfig,
@@ -128,9 +131,10 @@ class DatabaseManager:
 
         results = []
         try:
-            with conn.cursor(dictionary=True) as cursor:
+            with PROFILER.measure(query, 'query') as timing, conn.cursor(dictionary=True) as cursor:
                 cursor.execute(query, params or ())
                 results = cursor.fetchall()
+                timing.rows = len(results)
         except mysql.connector.Error as err:
             logging.error(f"查询执行失败: {err.msg} | SQL: {query}")
         finally:
@@ -145,9 +149,10 @@ class DatabaseManager:
 
         result = None
         try:
-            with conn.cursor(dictionary=True) as cursor:
+            with PROFILER.measure(query, 'fetch_one') as timing, conn.cursor(dictionary=True) as cursor:
                 cursor.execute(query, params or ())
                 result = cursor.fetchone()
+                timing.rows = int(result is not None)
         except mysql.connector.Error as err:
             logging.error(f"单条查询执行失败: {err.msg} | SQL: {query}")
         finally:
@@ -165,9 +170,10 @@ class DatabaseManager:
 
         result_id = None
         try:
-            with conn.cursor() as cursor:
+            with PROFILER.measure(query, 'update') as timing, conn.cursor() as cursor:
                 cursor.execute(query, params or ())
                 conn.commit()
+                timing.rows = cursor.rowcount
                 # 更新 last_insert_id 属性，以兼容 get_last_insert_id()
                 self.last_insert_id = cursor.lastrowid
                 result_id = cursor.lastrowid or cursor.rowcount
@@ -234,9 +240,10 @@ class DatabaseManager:
 
         success = False
         try:
-            with conn.cursor() as cursor:
+            with PROFILER.measure(query, 'batch') as timing, conn.cursor() as cursor:
                 cursor.executemany(query, params_list)
                 conn.commit()
+                timing.rows = len(params_list)
                 logging.info(f"批量插入成功，影响行数: {cursor.rowcount}")
                 success = True
         except mysql.connector.Error as err:
@@ -246,6 +253,29 @@ class DatabaseManager:
             if conn: conn.close()
         return success
 
+    @contextmanager
+    def transaction(self):
+        """
+        在单个连接上执行一组写操作，整体提交或整体回滚。
+        用法: with db.transaction() as cursor: cursor.execute(...)
+        任何异常都会触发回滚并继续向上抛出，调用方据此判断该批次未落库。
+        """
+        conn = self._get_connection()
+        if not conn:
+            raise mysql.connector.Error("连接池不可用，无法开启事务。")
+        cursor = conn.cursor()
+        try:
+            # 事务内的每条语句由 ProfiledCursor 单独计时，这里只计提交
+            yield PROFILER.wrap_cursor(cursor)
+            with PROFILER.measure('<transaction>', 'transaction'):
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
     def get_last_insert_id(self) -> Optional[int]:
         """返回上一次 INSERT 操作生成的自增 ID。"""
         return self.last_insert_id
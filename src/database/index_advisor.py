@@ -0,0 +1,246 @@
+# 文件: src/database/index_advisor.py
+"""
+热点查询的 EXPLAIN 检查器。
+
+HOT_QUERIES 收录 DatabaseManager、各 DAO、评估服务与 Streamlit 页面中按期号 / 模型 / 推荐ID 过滤的查询，
+逐条执行 EXPLAIN，找出仍需全表扫描的表：
+- MySQL: EXPLAIN 结果中 type = ALL 的行；
+- SQLite: EXPLAIN QUERY PLAN 中不带 USING INDEX 的 "SCAN 表名"。
+默认在内存 SQLite 中按 MySQL 建表脚本建库、写入模拟数据，分别在迁移前后检查；
+传入 --mysql 时直接检查当前 MySQL 库 (参数取自库中已有数据)。
+用法: python -m src.database.index_advisor [--mysql] [--migrate] [--periods 200]
+"""
+
+import argparse
+import random
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence, Tuple
+
+from src.database.database_manager import DatabaseManager
+from src.database.migrations import MigrationRunner
+from src.database.sqlite_manager import SQLiteDatabaseManager
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    source: str
+    sql: str
+    params: Tuple[str, ...] = ()
+
+
+@dataclass
+class QueryPlan:
+    query: HotQuery
+    plan: List[str] = field(default_factory=list)
+    full_scans: List[str] = field(default_factory=list)
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery('recommendation_by_period_model', 'DatabaseManager.get_recommendation_by_period_and_model',
+             "SELECT * FROM algorithm_recommendation WHERE period_number = %s AND models = %s LIMIT 1",
+             ('period', 'model')),
+    HotQuery('delete_recommendations_by_model_base', 'DatabaseManager.delete_recommendations_by_period_and_model_base',
+             "DELETE FROM algorithm_recommendation WHERE period_number = %s AND models LIKE %s",
+             ('period', 'model_prefix')),
+    HotQuery('performance_by_version', 'DatabaseManager.get_algorithm_performance',
+             "SELECT * FROM algorithm_performance WHERE algorithm_version = %s", ('algorithm_version',)),
+    HotQuery('performance_history', 'AlgorithmPerformanceDAO.get_algorithm_performance_history',
+             "SELECT * FROM algorithm_performance WHERE algorithm = %s ORDER BY created_at DESC LIMIT %s",
+             ('algorithm', 'limit')),
+    HotQuery('recommendation_latest_by_period', 'AlgorithmRecommendationDAO.get_recommendation_by_period',
+             "SELECT * FROM algorithm_recommendation WHERE period_number = %s ORDER BY recommend_time DESC LIMIT 1",
+             ('period',)),
+    HotQuery('details_by_metadata', 'RecommendationDetailsDAO',
+             "SELECT * FROM recommendation_details WHERE recommendation_metadata_id = %s", ('rec_id',)),
+    HotQuery('reward_by_period_recommendation', 'RewardPenaltyRecordsDAO',
+             "SELECT * FROM reward_penalty_records WHERE period_number = %s AND recommendation_id = %s",
+             ('period', 'rec_id')),
+    HotQuery('reward_by_version', 'RewardPenaltyRecordsDAO',
+             "SELECT * FROM reward_penalty_records WHERE algorithm_version = %s ORDER BY evaluation_time DESC LIMIT %s",
+             ('algorithm_version', 'limit')),
+    HotQuery('user_bets', 'PersonalBettingDAO.get_user_bets / pages/Betting.py',
+             "SELECT * FROM personal_betting WHERE user_id = %s ORDER BY bet_time DESC LIMIT %s",
+             ('user_id', 'limit')),
+    HotQuery('reward_exists', 'evaluation_service',
+             "SELECT id FROM reward_penalty_records WHERE recommendation_id = %s", ('rec_id',)),
+    HotQuery('prediction_logs_by_period', 'evaluation_service',
+             "SELECT * FROM algorithm_prediction_logs WHERE period_number = %s", ('period',)),
+    HotQuery('comparison_recommendations', 'pages/Model_Recommendation_Comparison.py',
+             "SELECT * FROM algorithm_recommendation WHERE period_number = %s ORDER BY algorithm_version ASC, id ASC",
+             ('period',)),
+    HotQuery('comparison_details', 'pages/Model_Recommendation_Comparison.py',
+             "SELECT * FROM recommendation_details WHERE recommendation_metadata_id IN (%s, %s) "
+             "ORDER BY win_probability DESC, id ASC", ('rec_id', 'rec_id')),
+    HotQuery('draw_by_period', 'pages/Model_Recommendation_Comparison.py',
+             "SELECT * FROM lottery_history WHERE period_number = %s", ('period',)),
+    HotQuery('betting_latest_details', 'pages/Betting.py',
+             "SELECT rd.recommend_type, rd.strategy_logic, rd.front_numbers, rd.back_numbers "
+             "FROM recommendation_details rd JOIN algorithm_recommendation ar ON rd.recommendation_metadata_id = ar.id "
+             "WHERE ar.period_number = %s ORDER BY ar.recommend_time DESC, rd.win_probability DESC", ('period',)),
+    HotQuery('recommendations_page', 'pages/Recommendations.py',
+             "SELECT ar.algorithm_version, ar.confidence_score, ar.recommend_time, rd.recommend_type, "
+             "rd.front_numbers, rd.back_numbers FROM algorithm_recommendation ar "
+             "LEFT JOIN recommendation_details rd ON ar.id = rd.recommendation_metadata_id "
+             "WHERE ar.period_number = %s ORDER BY ar.recommend_time DESC", ('period',)),
+]
+
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?!.*USING (?:COVERING )?INDEX)")
+
+
+# ----------------------------------------------------------------------
+# 模拟数据 (仅 SQLite 后端)
+# ----------------------------------------------------------------------
+def _placeholder_value(declared_type: str) -> Any:
+    declared_type = (declared_type or '').upper()
+    if 'INT' in declared_type:
+        return 0
+    if declared_type in ('REAL', 'NUMERIC'):
+        return 0.0
+    if declared_type in ('DATETIME', 'TIMESTAMP'):
+        return datetime(2024, 1, 1)
+    if declared_type == 'DATE':
+        return datetime(2024, 1, 1).date()
+    return ''
+
+
+def _insert_rows(db: DatabaseManager, table: str, rows: List[Dict[str, Any]]):
+    """批量写入，未给出的 NOT NULL 且无默认值的列填占位值。"""
+    required = {row['name']: row['type'] for row in db.execute_query(f"SELECT * FROM pragma_table_info('{table}')")
+                if row['notnull'] and row['dflt_value'] is None and not row['pk']}
+    columns = list(rows[0]) + [c for c in required if c not in rows[0]]
+    fillers = {c: _placeholder_value(required[c]) for c in columns if c not in rows[0]}
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    if not db.execute_batch_insert(sql, [tuple(row.get(c, fillers.get(c)) for c in columns) for row in rows]):
+        raise RuntimeError(f"写入模拟数据失败: {table}")
+
+
+def seed_database(db: SQLiteDatabaseManager, periods: int = 200, models: int = 6,
+                  details_per_recommendation: int = 5, users: int = 5, seed: int = 7) -> Dict[str, Any]:
+    """写入 periods 期开奖与 periods*models 条推荐及其明细、奖惩、日志、表现、投注记录，返回检查用参数。"""
+    from src.analysis.bulk_importer import BulkHistoryImporter
+
+    rnd = random.Random(seed)
+    start = datetime(2024, 1, 1, 21, 25)
+    period_list = [str(2024001 + i) for i in range(periods)]
+    BulkHistoryImporter(db).import_api_items([
+        {'expect': p, 'time': (start + timedelta(days=i)).strftime('%Y-%m-%d %H:%M:%S'),
+         'frontArea': sorted(rnd.sample(range(1, 36), 5)), 'backArea': sorted(rnd.sample(range(1, 13), 2))}
+        for i, p in enumerate(period_list)])
+
+    model_names = [f"model_{m}" for m in range(models)]
+    _insert_rows(db, 'algorithm_recommendation', [
+        {'period_number': p, 'models': f"{name}-v1", 'algorithm_version': name,
+         'recommend_time': start + timedelta(days=i), 'confidence_score': rnd.random()}
+        for i, p in enumerate(period_list) for name in model_names])
+    recommendations = db.execute_query("SELECT id, period_number, algorithm_version FROM algorithm_recommendation")
+
+    _insert_rows(db, 'recommendation_details', [
+        {'recommendation_metadata_id': rec['id'], 'recommend_type': f"组合{k}",
+         'front_numbers': '01,02,03,04,05', 'back_numbers': '01,02', 'win_probability': rnd.random()}
+        for rec in recommendations for k in range(details_per_recommendation)])
+    _insert_rows(db, 'reward_penalty_records', [
+        {'period_number': rec['period_number'], 'algorithm_version': rec['algorithm_version'],
+         'recommendation_id': rec['id'], 'evaluation_time': start + timedelta(days=n // models)}
+        for n, rec in enumerate(recommendations)])
+    _insert_rows(db, 'algorithm_prediction_logs', [
+        {'period_number': rec['period_number'], 'algorithm_version': rec['algorithm_version']}
+        for rec in recommendations])
+    _insert_rows(db, 'algorithm_performance', [
+        {'issue': rec['period_number'], 'algorithm': rec['algorithm_version'],
+         'algorithm_version': rec['algorithm_version'], 'created_at': start + timedelta(days=n // models)}
+        for n, rec in enumerate(recommendations)])
+    _insert_rows(db, 'personal_betting', [
+        {'user_id': f"user_{u}", 'period_number': p, 'bet_time': start + timedelta(days=i),
+         'bet_type': 'single', 'front_numbers': '01,02,03,04,05', 'front_count': 5,
+         'back_numbers': '01,02', 'back_count': 2, 'bet_amount': 2.0}
+        for i, p in enumerate(period_list) for u in range(users)])
+    print(f"🌱 已写入模拟数据: {periods} 期，{len(recommendations)} 条推荐")
+    return sample_params(db)
+
+
+def sample_params(db: DatabaseManager) -> Dict[str, Any]:
+    """从库中最近的推荐 / 投注记录取检查参数 (库为空时使用占位值，不影响执行计划)。"""
+    rec = db.fetch_one("SELECT id, period_number, models, algorithm_version FROM algorithm_recommendation "
+                       "ORDER BY id DESC LIMIT 1") or {}
+    bet = db.fetch_one("SELECT user_id FROM personal_betting ORDER BY id DESC LIMIT 1") or {}
+    model = rec.get('models') or 'model'
+    return {
+        'period': rec.get('period_number') or '0',
+        'model': model,
+        'model_prefix': f"{model.split('-')[0]}%",
+        'rec_id': rec.get('id') or 0,
+        'algorithm_version': rec.get('algorithm_version') or model,
+        'algorithm': rec.get('algorithm_version') or model,
+        'user_id': bet.get('user_id') or 'default',
+        'limit': 20,
+    }
+
+
+# ----------------------------------------------------------------------
+# EXPLAIN
+# ----------------------------------------------------------------------
+def explain(db: DatabaseManager, query: HotQuery, params: Dict[str, Any]) -> QueryPlan:
+    args = tuple(params[key] for key in query.params)
+    result = QueryPlan(query)
+    if isinstance(db, SQLiteDatabaseManager):
+        for row in db.execute_query("EXPLAIN QUERY PLAN " + query.sql, args):
+            result.plan.append(row['detail'])
+            match = _SQLITE_SCAN.match(row['detail'])
+            if match:
+                result.full_scans.append(match.group(1))
+    else:
+        for row in db.execute_query("EXPLAIN " + query.sql, args):
+            result.plan.append(f"{row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                               f"rows={row.get('rows')}")
+            if row.get('type') == 'ALL':
+                result.full_scans.append(row.get('table'))
+    return result
+
+
+def check_hot_queries(db: DatabaseManager, params: Dict[str, Any] = None,
+                      queries: Sequence[HotQuery] = tuple(HOT_QUERIES)) -> List[QueryPlan]:
+    params = params or sample_params(db)
+    return [explain(db, query, params) for query in queries]
+
+
+def print_report(results: List[QueryPlan], title: str):
+    flagged = [r for r in results if r.full_scans]
+    print(f"\n📋 {title}: {len(results)} 条热点查询，{len(flagged)} 条存在全表扫描")
+    for r in results:
+        mark = "❌" if r.full_scans else "✅"
+        scans = f"  全表扫描: {', '.join(r.full_scans)}" if r.full_scans else ""
+        print(f"  {mark} {r.query.name:<38} [{r.query.source}]{scans}")
+        for line in r.plan if r.full_scans else ():
+            print(f"       {line}")
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="热点查询索引检查")
+    parser.add_argument('--mysql', action='store_true', help='检查当前 MySQL 库 (默认使用内存 SQLite 模拟库)')
+    parser.add_argument('--migrate', action='store_true', help='检查前先执行索引迁移')
+    parser.add_argument('--periods', type=int, default=200, help='SQLite 模拟库的期数')
+    args = parser.parse_args(argv)
+
+    if args.mysql:
+        from src.config.database_config import DB_CONFIG
+        db = DatabaseManager(**DB_CONFIG)
+        if args.migrate:
+            MigrationRunner(db).apply_all()
+        results = check_hot_queries(db)
+        print_report(results, "MySQL")
+    else:
+        db = SQLiteDatabaseManager(':memory:')
+        params = seed_database(db, periods=args.periods)
+        print_report(check_hot_queries(db, params), "迁移前")
+        MigrationRunner(db).apply_all()
+        results = check_hot_queries(db, params)
+        print_report(results, "迁移后")
+    return 1 if any(r.full_scans for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# 文件: src/database/migrations.py
+"""
+版本化的表结构迁移 (热点查询所需的索引，以及建表脚本中新增、已部署的库中尚缺的列)。
+
+- 每个 Migration 有递增的 version；已执行的版本记录在 schema_migrations 表中，重复运行只补执行新版本；
+- IndexSpec 在创建前先检查表上是否已有以这些列为前缀的索引，已覆盖则跳过，不会产生重复索引；
+- ColumnSpec 在添加前先检查列是否存在 (按新建表脚本建的库已有该列时跳过)，列在同一迁移的索引之前添加；
+- MySQL 通过 information_schema.STATISTICS 检查，SQLite 后端通过 pragma_index_list / pragma_index_info 检查。
+用法: MigrationRunner(db).apply_all()，或 python -m src.database.migrations
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from src.database.database_manager import DatabaseManager
+from src.database.sqlite_manager import SQLiteDatabaseManager
+
+MIGRATIONS_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS `schema_migrations` (
+  `version` int(11) NOT NULL COMMENT '迁移版本号',
+  `name` varchar(200) NOT NULL COMMENT '迁移说明',
+  `applied_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '执行时间',
+  PRIMARY KEY (`version`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '表结构迁移记录表'
+"""
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    table: str
+    name: str
+    columns: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    table: str
+    name: str
+    definition: str
+    comment: str = ''
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    indexes: Tuple[IndexSpec, ...] = ()
+    columns: Tuple[ColumnSpec, ...] = ()
+    statements: Tuple[str, ...] = field(default=())
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "推荐主表按 (期号, 模型) 查询/删除", indexes=(
+        IndexSpec('algorithm_recommendation', 'idx_period_models', ('period_number', 'models')),
+    )),
+    Migration(2, "推荐明细、奖惩记录、预测日志的关联列", indexes=(
+        IndexSpec('recommendation_details', 'idx_metadata_id', ('recommendation_metadata_id',)),
+        IndexSpec('reward_penalty_records', 'idx_recommendation_id', ('recommendation_id',)),
+        IndexSpec('algorithm_prediction_logs', 'idx_period_algo', ('period_number', 'algorithm_version')),
+    )),
+    Migration(3, "算法表现按版本/算法取最新记录", indexes=(
+        IndexSpec('algorithm_performance', 'idx_version_created', ('algorithm_version', 'created_at')),
+        IndexSpec('algorithm_performance', 'idx_algorithm_created', ('algorithm', 'created_at')),
+        IndexSpec('reward_penalty_records', 'idx_version_eval_time', ('algorithm_version', 'evaluation_time')),
+    )),
+    Migration(4, "个人投注按用户取最近记录", indexes=(
+        IndexSpec('personal_betting', 'idx_user_bet_time', ('user_id', 'bet_time')),
+    )),
+    Migration(5, "个人投注的追加标记与按期结算索引", columns=(
+        ColumnSpec('personal_betting', 'is_additional', "tinyint(1) NULL DEFAULT 0", '是否追加投注'),
+    ), indexes=(
+        IndexSpec('personal_betting', 'idx_period_settlement', ('period_number', 'winning_level')),
+    )),
+]
+
+
+def _is_sqlite(db: DatabaseManager) -> bool:
+    return isinstance(db, SQLiteDatabaseManager)
+
+
+def existing_indexes(db: DatabaseManager, table: str) -> Dict[str, List[str]]:
+    """表上现有索引 -> 按顺序排列的列名。"""
+    if _is_sqlite(db):
+        rows = db.execute_query(
+            "SELECT il.name AS index_name, ii.seqno AS seq, ii.name AS column_name "
+            "FROM pragma_index_list(%s) AS il JOIN pragma_index_info(il.name) AS ii "
+            "ORDER BY il.name, ii.seqno", (table,))
+    else:
+        rows = db.execute_query(
+            "SELECT INDEX_NAME AS index_name, SEQ_IN_INDEX AS seq, COLUMN_NAME AS column_name "
+            "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+            "ORDER BY INDEX_NAME, SEQ_IN_INDEX", (table,))
+    indexes: Dict[str, List[str]] = {}
+    for row in rows:
+        indexes.setdefault(row['index_name'], []).append(row['column_name'])
+    return indexes
+
+
+def existing_columns(db: DatabaseManager, table: str) -> List[str]:
+    rows = db.execute_query(
+        "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,))
+    return [row['COLUMN_NAME'] for row in rows]
+
+
+def ensure_column(db: DatabaseManager, spec: ColumnSpec) -> bool:
+    """列已存在时跳过；否则添加。返回是否新增了列。"""
+    if spec.name in existing_columns(db, spec.table):
+        logging.info(f"列 {spec.table}.{spec.name} 已存在")
+        return False
+    if _is_sqlite(db):
+        sql = f'ALTER TABLE "{spec.table}" ADD COLUMN "{spec.name}" {spec.definition}'
+    else:
+        comment = f" COMMENT '{spec.comment}'" if spec.comment else ''
+        sql = f"ALTER TABLE `{spec.table}` ADD COLUMN `{spec.name}` {spec.definition}{comment}"
+    if db.execute_update(sql) is None:
+        raise RuntimeError(f"添加列失败: {sql}")
+    print(f"  ➕ {spec.table}.{spec.name} {spec.definition}")
+    return True
+
+
+def ensure_index(db: DatabaseManager, spec: IndexSpec) -> bool:
+    """已有索引以 spec.columns 为前缀时跳过；否则创建。返回是否新建了索引。"""
+    wanted = list(spec.columns)
+    for name, columns in existing_indexes(db, spec.table).items():
+        if columns[:len(wanted)] == wanted:
+            logging.info(f"索引 {spec.table}({', '.join(wanted)}) 已由 {name} 覆盖")
+            return False
+    if _is_sqlite(db):
+        # SQLite 的索引名在库内全局唯一，沿用建库时 "表名__索引名" 的命名
+        sql = f'CREATE INDEX IF NOT EXISTS "{spec.table}__{spec.name}" ON "{spec.table}" ({", ".join(wanted)})'
+    else:
+        sql = f"CREATE INDEX `{spec.name}` ON `{spec.table}` ({', '.join(f'`{c}`' for c in wanted)})"
+    if db.execute_update(sql) is None:
+        raise RuntimeError(f"创建索引失败: {sql}")
+    print(f"  ➕ {spec.table}.{spec.name} ({', '.join(wanted)})")
+    return True
+
+
+class MigrationRunner:
+    """按版本号顺序执行尚未执行过的迁移。"""
+
+    def __init__(self, db_manager: DatabaseManager, migrations: Sequence[Migration] = tuple(MIGRATIONS)):
+        self.db = db_manager
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+
+    def ensure_table(self):
+        self.db.execute_update(MIGRATIONS_TABLE_DDL)
+
+    def applied_versions(self) -> List[int]:
+        self.ensure_table()
+        rows = self.db.execute_query("SELECT version FROM schema_migrations ORDER BY version")
+        return [int(row['version']) for row in rows]
+
+    def pending(self) -> List[Migration]:
+        applied = set(self.applied_versions())
+        return [m for m in self.migrations if m.version not in applied]
+
+    def apply(self, migration: Migration) -> int:
+        """执行单个迁移并记录版本，返回新建的索引数。"""
+        print(f"🔧 迁移 v{migration.version}: {migration.name}")
+        for spec in migration.columns:
+            ensure_column(self.db, spec)
+        created = sum(ensure_index(self.db, spec) for spec in migration.indexes)
+        for statement in migration.statements:
+            if self.db.execute_update(statement) is None:
+                raise RuntimeError(f"迁移 v{migration.version} 执行失败: {statement.strip()[:80]}")
+        self.db.execute_update(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (migration.version, migration.name))
+        return created
+
+    def apply_all(self) -> Dict[str, int]:
+        pending = self.pending()
+        created = sum(self.apply(migration) for migration in pending)
+        if pending:
+            print(f"✅ 已执行 {len(pending)} 个迁移，新建索引 {created} 个")
+        return {'applied': len(pending), 'indexes_created': created}
+
+
+def main():
+    from src.config.database_config import DB_CONFIG
+    MigrationRunner(DatabaseManager(**DB_CONFIG)).apply_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# 文件: src/database/query_profiler.py
+"""
+数据库调用计时 (DatabaseManager / SQLiteDatabaseManager 内置)。
+
+- 每条语句按"指纹"归类: 去掉字面量与多余空白，IN (%s, %s, ...) 折叠为 IN (...)；
+- 调用方归属: 优先使用 PROFILER.tag('...') 显式标记，否则取数据库层之外的第一个栈帧 (文件:行号 函数名)，
+  经由 DatabaseManager 业务方法 (如 get_latest_lottery_history) 的调用会附带该方法名；
+- transaction() 交给调用方的游标经 ProfiledCursor 包装，事务内每条 execute / executemany 单独计时归类，
+  "<transaction>" 只记录提交本身的耗时；
+- 每个 (指纹, 调用方) 记录调用次数、总/最大耗时、返回或影响的行数、失败次数与对数分桶的耗时直方图；
+- 超过慢查询阈值 (环境变量 DB_SLOW_QUERY_MS，默认 200ms) 的调用写 WARNING 日志；
+- 运行结束时 PROFILER.print_summary() 打印耗时最多的调用点，PROFILER.save(path) 保存为 JSON
+  (run_daily_cycle.py --db-profile PATH；main.py 读取环境变量 DB_PROFILE_FILE)。
+设置环境变量 DB_PROFILE=0 可关闭计时。
+"""
+
+import contextlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 直方图分桶上界 (毫秒)，最后一个桶收集所有更慢的调用
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_DB_LAYER_FILES = {
+    os.path.join(PROJECT_ROOT, 'src', 'database', name)
+    for name in ('database_manager.py', 'sqlite_manager.py', 'query_profiler.py')
+} | {contextlib.__file__}
+_PRIMITIVES = {'execute_query', 'fetch_one', 'execute_update', 'execute_batch_insert', 'execute_insert',
+               'transaction', 'measure', '__enter__', '__exit__', 'execute', 'executemany'}
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.`])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)", re.I)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query: str) -> str:
+    """归一化语句: 字面量 -> ?，IN 列表折叠，空白压缩。"""
+    text = _STRING_LITERAL.sub('?', query)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = text.replace('%s', '?')
+    text = _IN_LIST.sub('IN (...)', text)
+    return ' '.join(text.split()).rstrip(';').strip()
+
+
+class StatementStats:
+    __slots__ = ('calls', 'total_ms', 'max_ms', 'rows', 'errors', 'slow', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.errors = 0
+        self.slow = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def percentile_ms(self, q: float) -> float:
+        """按直方图估计分位数 (返回所在桶的上界；落在最后一个桶时返回最大值)。"""
+        target, seen = q * self.calls, 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return float(BUCKET_BOUNDS_MS[index]) if index < len(BUCKET_BOUNDS_MS) else round(self.max_ms, 2)
+        return 0.0
+
+
+class _Measurement:
+    """PROFILER.measure() 返回的计时器，执行方在 with 块内设置 rows。"""
+    __slots__ = ('profiler', 'query', 'kind', 'caller', 'rows', 'start')
+
+    def __init__(self, profiler: 'QueryProfiler', query: str, kind: str):
+        self.profiler = profiler
+        self.query = query
+        self.kind = kind
+        self.rows = 0
+
+    def __enter__(self):
+        self.caller = self.profiler.current_caller()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        self.profiler.record(self.query, elapsed_ms, self.rows, self.kind, self.caller, failed=exc_type is not None)
+        return False
+
+
+class _NullMeasurement:
+    rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class ProfiledCursor:
+    """事务游标的包装：execute / executemany 逐条计时，其余属性 (fetchall、lastrowid、rowcount...) 透传。"""
+    __slots__ = ('_cursor', '_profiler')
+
+    def __init__(self, cursor, profiler: 'QueryProfiler'):
+        self._cursor = cursor
+        self._profiler = profiler
+
+    def execute(self, query, *args, **kwargs):
+        with self._profiler.measure(query, 'tx_execute') as timing:
+            result = self._cursor.execute(query, *args, **kwargs)
+            timing.rows = max(self._cursor.rowcount or 0, 0)
+        return result
+
+    def executemany(self, query, params_list, *args, **kwargs):
+        params_list = list(params_list)
+        with self._profiler.measure(query, 'tx_batch') as timing:
+            result = self._cursor.executemany(query, params_list, *args, **kwargs)
+            timing.rows = len(params_list)
+        return result
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class QueryProfiler:
+    """线程安全的数据库调用统计。"""
+
+    def __init__(self, enabled: bool = True, slow_ms: float = 200.0):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self._stats: Dict[Tuple[str, str, str], StatementStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started_at = datetime.now()
+
+    # --- 调用方归属 ---
+    @contextlib.contextmanager
+    def tag(self, name: str):
+        """在 with 块内把所有数据库调用归到 name 名下 (可嵌套，取最内层)。"""
+        stack = self._local.__dict__.setdefault('tags', [])
+        stack.append(name)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def current_caller(self) -> str:
+        tags = getattr(self._local, 'tags', None)
+        if tags:
+            return tags[-1]
+        frame, via = sys._getframe(1), None
+        while frame is not None and frame.f_code.co_filename in _DB_LAYER_FILES:
+            if frame.f_code.co_name not in _PRIMITIVES:
+                via = frame.f_code.co_name
+            frame = frame.f_back
+        if frame is None:
+            return via or '<unknown>'
+        path = frame.f_code.co_filename
+        if path.startswith(PROJECT_ROOT):
+            path = os.path.relpath(path, PROJECT_ROOT)
+        caller = f"{path}:{frame.f_lineno} {frame.f_code.co_name}"
+        return f"{caller} -> {via}" if via else caller
+
+    # --- 记录 ---
+    def measure(self, query: str, kind: str):
+        return _Measurement(self, query, kind) if self.enabled else _NullMeasurement()
+
+    def wrap_cursor(self, cursor):
+        """transaction() 使用：关闭计时时原样返回游标。"""
+        return ProfiledCursor(cursor, self) if self.enabled else cursor
+
+    def record(self, query: str, elapsed_ms: float, rows: int = 0, kind: str = 'query',
+               caller: Optional[str] = None, failed: bool = False):
+        if not self.enabled:
+            return
+        caller = caller or self.current_caller()
+        key = (fingerprint(query), caller, kind)
+        slow = elapsed_ms >= self.slow_ms
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats()
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.rows += rows or 0
+            stats.errors += int(failed)
+            stats.slow += int(slow)
+            stats.buckets[bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        if slow:
+            logging.warning(f"慢查询 {elapsed_ms:.1f}ms ({rows} 行) [{caller}] {key[0][:300]}")
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = datetime.now()
+
+    # --- 汇总 ---
+    def summary(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按总耗时降序返回每个 (指纹, 调用方) 的统计。"""
+        with self._lock:
+            items = [(key, stats) for key, stats in self._stats.items()]
+        items.sort(key=lambda item: item[1].total_ms, reverse=True)
+        return [{
+            'fingerprint': sql, 'caller': caller, 'kind': kind, 'calls': s.calls,
+            'total_ms': round(s.total_ms, 2), 'avg_ms': round(s.total_ms / s.calls, 3), 'max_ms': round(s.max_ms, 2),
+            'p50_ms': s.percentile_ms(0.5), 'p95_ms': s.percentile_ms(0.95), 'rows': s.rows,
+            'errors': s.errors, 'slow': s.slow, 'histogram': list(s.buckets),
+        } for (sql, caller, kind), s in items[:top]]
+
+    def by_caller(self) -> List[Dict[str, Any]]:
+        """按调用方合并: 往返次数、总耗时、涉及的不同语句数，用于挑选优先合并/缓存的调用点。"""
+        callers: Dict[str, Dict[str, Any]] = {}
+        for row in self.summary():
+            entry = callers.setdefault(row['caller'], {'caller': row['caller'], 'calls': 0, 'total_ms': 0.0,
+                                                       'rows': 0, 'statements': 0})
+            entry['calls'] += row['calls']
+            entry['total_ms'] = round(entry['total_ms'] + row['total_ms'], 2)
+            entry['rows'] += row['rows']
+            entry['statements'] += 1
+        return sorted(callers.values(), key=lambda e: e['total_ms'], reverse=True)
+
+    def totals(self) -> Dict[str, Any]:
+        rows = self.summary()
+        return {'round_trips': sum(r['calls'] for r in rows),
+                'total_ms': round(sum(r['total_ms'] for r in rows), 2),
+                'statements': len({r['fingerprint'] for r in rows}),
+                'slow': sum(r['slow'] for r in rows), 'errors': sum(r['errors'] for r in rows)}
+
+    def print_summary(self, top: int = 15):
+        totals = self.totals()
+        if not totals['round_trips']:
+            return
+        print("\n" + "=" * 70 + "\n=== 📊 数据库调用统计 ===")
+        print(f"  往返 {totals['round_trips']} 次，总耗时 {totals['total_ms'] / 1000:.2f}s，"
+              f"{totals['statements']} 种语句，慢查询 {totals['slow']} 次，失败 {totals['errors']} 次")
+        print("  --- 耗时最多的调用点 ---")
+        for entry in self.by_caller()[:top]:
+            print(f"  {entry['total_ms']:>10.1f}ms  {entry['calls']:>6} 次  {entry['caller']}")
+        print("  --- 耗时最多的语句 ---")
+        for row in self.summary(top):
+            print(f"  {row['total_ms']:>10.1f}ms  {row['calls']:>6} 次  p95≤{row['p95_ms']}ms  "
+                  f"{row['fingerprint'][:90]}")
+            print(f"  {'':>10}    └ {row['caller']}")
+        print("=" * 70)
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        report = {'started_at': self.started_at.isoformat(timespec='seconds'),
+                  'finished_at': datetime.now().isoformat(timespec='seconds'),
+                  'bucket_bounds_ms': list(BUCKET_BOUNDS_MS), 'slow_ms': self.slow_ms,
+                  'totals': self.totals(), 'callers': self.by_caller(), 'statements': self.summary()}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 数据库调用统计已保存: {path}")
+        return path
+
+
+PROFILER = QueryProfiler(enabled=os.getenv('DB_PROFILE', '1') != '0',
+                         slow_ms=float(os.getenv('DB_SLOW_QUERY_MS', '200')))
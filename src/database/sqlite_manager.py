@@ -0,0 +1,452 @@
+# file: src/database/sqlite_manager.py
+"""
+嵌入式 SQLite 后端，与 DatabaseManager 接口一致，用于回测 / 模拟。
+- path=':memory:' 为进程内内存库；文件库启用 WAL，多个回测可各自使用独立文件并行运行；
+- 表结构由 src/sql/lottery_analysis_system.sql 自动转换建立，运行时执行的 MySQL CREATE TABLE 同样自动转换
+  (外键与 ON UPDATE CURRENT_TIMESTAMP 不转换)；
+- 方言转换覆盖项目中用到的 MySQL 写法: %s 占位符、INSERT IGNORE、
+  ON DUPLICATE KEY UPDATE ... VALUES(col)、CAST(... AS UNSIGNED)、LEAST/GREATEST、NOW()/IF()/MOD()/DATABASE()、
+  INFORMATION_SCHEMA.COLUMNS 列名查询；
+- 继承 DatabaseManager 的全部业务方法 (get_latest_lottery_history 等)，只替换底层执行。
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.database.database_manager import DatabaseManager
+from src.database.query_profiler import PROFILER
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_SCHEMA_FILE = os.path.join(PROJECT_ROOT, 'src', 'sql', 'lottery_analysis_system.sql')
+
+# ----------------------------------------------------------------------
+# 类型适配: 参数中的 numpy 标量 / datetime，结果中的 DATE / DATETIME / TIMESTAMP 列
+# ----------------------------------------------------------------------
+for _np_type in (np.int8, np.int16, np.int32, np.int64, np.uint8, np.uint16, np.uint32, np.uint64):
+    sqlite3.register_adapter(_np_type, int)
+for _np_type in (np.float32, np.float64):
+    sqlite3.register_adapter(_np_type, float)
+sqlite3.register_adapter(np.bool_, bool)
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(datetime, lambda v: v.strftime('%Y-%m-%d %H:%M:%S'))
+sqlite3.register_adapter(date, lambda v: v.isoformat())
+
+
+def _convert_datetime(value: bytes) -> Any:
+    text = value.decode()
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return text
+
+
+def _convert_date(value: bytes) -> Any:
+    converted = _convert_datetime(value)
+    return converted.date() if isinstance(converted, datetime) else converted
+
+
+sqlite3.register_converter('DATETIME', _convert_datetime)
+sqlite3.register_converter('TIMESTAMP', _convert_datetime)
+sqlite3.register_converter('DATE', _convert_date)
+
+
+# ----------------------------------------------------------------------
+# 方言转换
+# ----------------------------------------------------------------------
+_COLUMNS_QUERY = re.compile(
+    r"SELECT\s+COLUMN_NAME\s+FROM\s+INFORMATION_SCHEMA\.COLUMNS\s+WHERE\s+TABLE_SCHEMA\s*=\s*DATABASE\(\)\s+"
+    r"AND\s+TABLE_NAME\s*=\s*%s", re.I)
+_ON_DUPLICATE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.I)
+_VALUES_FUNC = re.compile(r"\bVALUES\s*\(\s*`?(\w+)`?\s*\)", re.I)
+_TRAILING_WHERE = re.compile(r"\bWHERE\b[^()]*$", re.I)
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\b", re.I)
+_INSERT_VALUES = re.compile(r"^\s*INSERT\b[^()]*(\([^)]*\))?\s*VALUES\b", re.I)
+
+
+@lru_cache(maxsize=512)
+def translate_sql(query: str) -> str:
+    """把项目中的 MySQL 语句转换为 SQLite 可执行的语句。"""
+    query = _COLUMNS_QUERY.sub("SELECT name AS COLUMN_NAME FROM pragma_table_info(%s)", query)
+    query = re.sub(r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE", query, flags=re.I)
+    query = re.sub(r"\bAS\s+UNSIGNED\b", "AS INTEGER", query, flags=re.I)
+    query = re.sub(r"\bLEAST\s*\(", "MIN(", query, flags=re.I)  # SQLite 的多参数 MIN/MAX 即标量函数
+    query = re.sub(r"\bGREATEST\s*\(", "MAX(", query, flags=re.I)
+    query = re.sub(r"\bCURRENT_TIMESTAMP\b(?!\s*\()", "NOW()", query, flags=re.I)
+
+    match = _ON_DUPLICATE.search(query)
+    if match:
+        head, assignments = query[:match.start()].rstrip(), query[match.end():]
+        if not _INSERT_VALUES.match(head) and not _TRAILING_WHERE.search(head):
+            head += " WHERE true"  # SQLite 要求 INSERT ... SELECT 的 upsert 带 WHERE 以消除 JOIN ON 歧义
+        assignments = _VALUES_FUNC.sub(r"excluded.\1", assignments.strip())
+        query = f"{head} ON CONFLICT DO UPDATE SET {assignments}"
+
+    return query.replace('%%', '\0').replace('%s', '?').replace('\0', '%')
+
+
+def _mysql_if(condition, true_value, false_value):
+    return true_value if condition else false_value
+
+
+def _mysql_mod(a, b):
+    if a is None or b in (None, 0):
+        return None
+    return a % b if isinstance(a, int) and isinstance(b, int) else float(np.fmod(a, b))
+
+
+# ----------------------------------------------------------------------
+# 表结构转换
+# ----------------------------------------------------------------------
+_TYPE_MAP = (
+    (re.compile(r'^(tinyint|smallint|mediumint|int|integer|bigint|bit|year|boolean|bool)$'), 'INTEGER'),
+    (re.compile(r'^(decimal|numeric|float|double|real)$'), 'REAL'),
+    (re.compile(r'^datetime$'), 'DATETIME'),
+    (re.compile(r'^timestamp$'), 'TIMESTAMP'),
+    (re.compile(r'^date$'), 'DATE'),
+    (re.compile(r'^(longblob|mediumblob|blob|varbinary|binary)$'), 'BLOB'),
+)
+_COLUMN_LINE = re.compile(r"^`(\w+)`\s+(\w+)(?:\([^)]*\))?\s*(.*)$", re.S)
+_KEY_COLUMNS = re.compile(r"`(\w+)`(?:\(\d+\))?\s*(?:ASC|DESC)?")
+
+
+def _sqlite_type(mysql_type: str) -> str:
+    for pattern, sqlite_type in _TYPE_MAP:
+        if pattern.match(mysql_type.lower()):
+            return sqlite_type
+    return 'TEXT'
+
+
+def _column_default(rest: str) -> str:
+    match = re.search(r"\bDEFAULT\s+('(?:[^'\\]|\\.)*'|[\w.+-]+)", rest, re.I)
+    if not match:
+        return ''
+    value = match.group(1)
+    if value.upper() == 'CURRENT_TIMESTAMP':
+        return " DEFAULT (datetime('now', 'localtime'))"
+    return f" DEFAULT {value}"
+
+
+def _split_top_level(text: str, start: int = 0):
+    """从 text[start] 处的 '(' 开始，返回 (括号内按顶层逗号切分的片段, 右括号位置)；忽略引号内的字符。"""
+    parts, depth, quote, current = [], 0, None, []
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if quote:
+            current.append(char)
+            if char == quote and text[pos - 1] != '\\':
+                quote = None
+            continue
+        if char in ("'", '"', '`'):
+            quote = char
+        elif char == '(':
+            depth += 1
+            if depth == 1:
+                continue
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                parts.append(''.join(current).strip())
+                return [p for p in parts if p], pos
+        elif char == ',' and depth == 1:
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    raise ValueError("CREATE TABLE 语句括号不匹配")
+
+
+def mysql_to_sqlite_ddl(create_statement: str) -> List[str]:
+    """单条 MySQL CREATE TABLE -> [SQLite CREATE TABLE, CREATE INDEX ...]。"""
+    header = re.search(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\(", create_statement, re.I)
+    table = header.group(1)
+    definitions_raw, _ = _split_top_level(create_statement, header.end() - 1)
+    columns, constraints, indexes = [], [], []
+    auto_increment, primary_key = None, None
+    for line in definitions_raw:
+        upper = line.upper()
+        if upper.startswith('PRIMARY KEY'):
+            primary_key = _KEY_COLUMNS.findall(line)
+        elif upper.startswith('UNIQUE'):
+            constraints.append(f"UNIQUE ({', '.join(_KEY_COLUMNS.findall(line.split('(', 1)[1]))})")
+        elif upper.startswith(('INDEX', 'KEY', 'FULLTEXT')):
+            name = re.search(r"`(\w+)`", line).group(1)
+            key_columns = _KEY_COLUMNS.findall(line.split('(', 1)[1])
+            indexes.append(f'CREATE INDEX IF NOT EXISTS "{table}__{name}" ON "{table}" ({", ".join(key_columns)})')
+        elif upper.startswith('CONSTRAINT'):
+            continue  # 外键不转换：回测库只保存一次性的结果
+        else:
+            match = _COLUMN_LINE.match(line)
+            if not match:
+                continue
+            name, mysql_type, rest = match.groups()
+            if re.search(r"\bAUTO_INCREMENT\b", rest, re.I):
+                auto_increment = name
+            not_null = ' NOT NULL' if re.search(r"\bNOT\s+NULL\b", rest, re.I) else ''
+            columns.append([name, f'"{name}" {_sqlite_type(mysql_type)}{not_null}{_column_default(rest)}'])
+
+    definitions = []
+    for name, definition in columns:
+        if primary_key == [name] and name == auto_increment:
+            definition = f'"{name}" INTEGER PRIMARY KEY AUTOINCREMENT'
+        definitions.append(definition)
+    if primary_key and not (primary_key == [auto_increment]):
+        definitions.append(f"PRIMARY KEY ({', '.join(primary_key)})")
+    definitions += constraints
+    return [f'CREATE TABLE IF NOT EXISTS "{table}" (\n  ' + ',\n  '.join(definitions) + '\n)'] + indexes
+
+
+def schema_statements(schema_file: str = DEFAULT_SCHEMA_FILE) -> List[str]:
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    statements = []
+    for match in re.finditer(r"CREATE\s+TABLE\b", content, re.I):
+        statements.extend(mysql_to_sqlite_ddl(content[match.start():]))
+    return statements
+
+
+# ----------------------------------------------------------------------
+# 连接 / 游标包装 (模拟 mysql.connector 的 dictionary 游标与上下文管理)
+# ----------------------------------------------------------------------
+class _SQLiteCursor:
+    def __init__(self, cursor: sqlite3.Cursor, dictionary: bool = False):
+        self._cursor = cursor
+        if dictionary:
+            cursor.row_factory = lambda c, row: {d[0]: v for d, v in zip(c.description, row)}
+
+    def execute(self, query: str, params: Sequence[Any] = ()):
+        if _CREATE_TABLE.match(query):
+            for statement in mysql_to_sqlite_ddl(query):
+                self._cursor.execute(statement)
+            return self
+        self._cursor.execute(translate_sql(query), tuple(params or ()))
+        return self
+
+    def executemany(self, query: str, params_list: Iterable[Sequence[Any]]):
+        self._cursor.executemany(translate_sql(query), [tuple(p) for p in params_list])
+        return self
+
+    def fetchall(self) -> List[Any]:
+        return self._cursor.fetchall()
+
+    def fetchone(self) -> Any:
+        return self._cursor.fetchone()
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _SQLiteConnection:
+    """共享连接的轻量句柄；close() 只释放锁，不关闭底层连接 (内存库关闭即丢失)。"""
+
+    def __init__(self, manager: 'SQLiteDatabaseManager'):
+        self._manager = manager
+        self._conn = manager._conn
+        manager._lock.acquire()
+        self._closed = False
+
+    def cursor(self, dictionary: bool = False, **_: Any) -> _SQLiteCursor:
+        return _SQLiteCursor(self._conn.cursor(), dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self) -> bool:
+        return not self._closed
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._manager._lock.release()
+
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """
+    DatabaseManager 的嵌入式实现。
+    用法: db = SQLiteDatabaseManager(':memory:') 或 SQLiteDatabaseManager('data/backtest_a.db')
+    """
+
+    def __init__(self, path: str = ':memory:', schema_file: Optional[str] = DEFAULT_SCHEMA_FILE):
+        self.path = path
+        self.db_config = {'database': path}
+        self.last_insert_id = None
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        self._conn.create_function('NOW', 0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        self._conn.create_function('IF', 3, _mysql_if)
+        self._conn.create_function('MOD', 2, _mysql_mod)
+        self._conn.create_function('DATABASE', 0, lambda: 'main')
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        if schema_file:
+            self.bootstrap_schema(schema_file)
+
+    def bootstrap_schema(self, schema_file: str = DEFAULT_SCHEMA_FILE):
+        """按 MySQL 建表脚本建立全部表 (已存在的表保持不变)。"""
+        with self._lock:
+            for statement in schema_statements(schema_file):
+                self._conn.execute(statement)
+            self._conn.commit()
+
+    # --- 连接相关 ---
+    def _get_connection(self):
+        if self._conn is None:
+            logging.error("SQLite 连接已关闭。")
+            return None
+        return _SQLiteConnection(self)
+
+    def connect(self) -> bool:
+        return self._conn is not None
+
+    def close(self):
+        """关闭底层连接 (内存库数据随之释放)。"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_current_time(self):
+        return datetime.now()
+
+    # --- 底层数据执行方法 (与 DatabaseManager 语义一致) ---
+    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        conn = self._get_connection()
+        if not conn:
+            return []
+        try:
+            with PROFILER.measure(query, 'query') as timing, conn.cursor(dictionary=True) as cursor:
+                results = cursor.execute(query, params or ()).fetchall()
+                timing.rows = len(results)
+                return results
+        except sqlite3.Error as err:
+            logging.error(f"查询执行失败: {err} | SQL: {query}")
+            return []
+        finally:
+            conn.close()
+
+    def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        conn = self._get_connection()
+        if not conn:
+            return None
+        try:
+            with PROFILER.measure(query, 'fetch_one') as timing, conn.cursor(dictionary=True) as cursor:
+                result = cursor.execute(query, params or ()).fetchone()
+                timing.rows = int(result is not None)
+                return result
+        except sqlite3.Error as err:
+            logging.error(f"单条查询执行失败: {err} | SQL: {query}")
+            return None
+        finally:
+            conn.close()
+
+    def execute_update(self, query: str, params: tuple = None) -> Optional[int]:
+        conn = self._get_connection()
+        if not conn:
+            return None
+        try:
+            with PROFILER.measure(query, 'update') as timing, conn.cursor() as cursor:
+                cursor.execute(query, params or ())
+                conn.commit()
+                timing.rows = cursor.rowcount
+                self.last_insert_id = cursor.lastrowid
+                return cursor.lastrowid or cursor.rowcount
+        except sqlite3.Error as err:
+            logging.error(f"更新操作失败: {err} | SQL: {query}")
+            conn.rollback()
+            return None
+        finally:
+            conn.close()
+
+    def execute_batch_insert(self, query: str, params_list: List[tuple]) -> bool:
+        if not params_list:
+            return False
+        conn = self._get_connection()
+        if not conn:
+            return False
+        try:
+            with PROFILER.measure(query, 'batch') as timing, conn.cursor() as cursor:
+                cursor.executemany(query, params_list)
+                conn.commit()
+                timing.rows = len(params_list)
+                return True
+        except sqlite3.Error as err:
+            logging.error(f"批量插入失败: {err} | SQL: {query}")
+            conn.rollback()
+            return False
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        conn = self._get_connection()
+        if not conn:
+            raise sqlite3.OperationalError("SQLite 连接已关闭，无法开启事务。")
+        cursor = conn.cursor()
+        try:
+            # 事务内的每条语句由 ProfiledCursor 单独计时，这里只计提交
+            yield PROFILER.wrap_cursor(cursor)
+            with PROFILER.measure('<transaction>', 'transaction'):
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    # --- 数据准备 ---
+    def copy_tables_from(self, source: DatabaseManager, tables: Sequence[str] = ('lottery_history',),
+                         chunk_size: int = 1000) -> Dict[str, int]:
+        """从另一个 DatabaseManager (通常是线上 MySQL) 复制整表数据，用于准备回测库。"""
+        copied = {}
+        for table in tables:
+            own_columns = {row['COLUMN_NAME'] for row in self.execute_query(
+                "SELECT name AS COLUMN_NAME FROM pragma_table_info(%s)", (table,))}
+            rows = source.execute_query(f"SELECT * FROM {table}")
+            if not rows:
+                copied[table] = 0
+                continue
+            columns = [c for c in rows[0] if c in own_columns]
+            query = (f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join(['%s'] * len(columns))})")
+            with self.transaction() as cursor:
+                for start in range(0, len(rows), chunk_size):
+                    cursor.executemany(query, [tuple(r[c] for c in columns) for r in rows[start:start + chunk_size]])
+            copied[table] = len(rows)
+        logging.info(f"已复制到 SQLite: {copied}")
+        return copied
@@ -0,0 +1,165 @@
+# src/engine/betting_settlement.py
+import json
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.database.database_manager import DatabaseManager
+from src.utils.bitmask import numbers_to_mask, popcount64
+from src.utils.prize_rules import LEVEL_NAMES, prize_matrices
+from src.utils.ticket_set import bet_key, expand_bet_masks
+
+INVALID_LEVEL = '无效投注'
+
+
+def _load_numbers(value: Any) -> Any:
+    """personal_betting 的号码列是 JSON：单式/复式为列表，胆拖为 {'dan': [...], 'tuo': [...]}。"""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8')
+    if isinstance(value, str) and value.strip()[:1] in ('[', '{'):
+        return json.loads(value)
+    return value
+
+
+def settle_bets(bets: Sequence[Dict[str, Any]], draw_front: Sequence[int], draw_back: Sequence[int],
+                floating_prizes: Optional[Dict[int, float]] = None) -> List[Dict[str, Any]]:
+    """
+    对一期开奖结算一批投注。
+    bets 每项含 id、front_numbers、back_numbers、multiple、is_additional (可缺省)。
+    所有投注先展开成单式注，拼成一个大数组后一次性完成命中计数与查表：
+    命中数 = popcount(投注掩码 & 开奖掩码)，奖级/奖金 = 奖级矩阵[前区命中, 后区命中]。
+    返回 [{id, is_winning, winning_level, winning_amount}]，号码无效的投注记为"无效投注"。
+    """
+    levels_matrix, amounts_matrix, additional_matrix = prize_matrices(floating_prizes)
+    expansion_cache: Dict[Tuple[int, int, int, int], Tuple[np.ndarray, np.ndarray]] = {}
+    valid, invalid = [], []
+    front_parts, back_parts = [], []
+    for bet in bets:
+        try:
+            key = bet_key(_load_numbers(bet.get('front_numbers')), _load_numbers(bet.get('back_numbers')))
+        except (TypeError, ValueError):
+            key = None
+        if key is None:
+            invalid.append(bet)
+            continue
+        if key not in expansion_cache:
+            expansion_cache[key] = expand_bet_masks(key)
+        front, back = expansion_cache[key]
+        front_parts.append(front)
+        back_parts.append(back)
+        valid.append(bet)
+
+    results = [{'id': bet['id'], 'is_winning': 0, 'winning_level': INVALID_LEVEL, 'winning_amount': 0.0}
+               for bet in invalid]
+    if not valid:
+        return results
+
+    owner = np.repeat(np.arange(len(valid)), [len(part) for part in front_parts])
+    front_masks, back_masks = np.concatenate(front_parts), np.concatenate(back_parts)
+    front_hits = popcount64(front_masks & np.uint64(numbers_to_mask(draw_front)))
+    back_hits = popcount64(back_masks & np.uint64(numbers_to_mask(draw_back)))
+
+    multiples = np.array([int(bet.get('multiple') or 1) for bet in valid], dtype=np.float64)
+    additional = np.array([bool(bet.get('is_additional')) for bet in valid], dtype=np.float64)
+    ticket_amounts = amounts_matrix[front_hits, back_hits] + \
+        additional_matrix[front_hits, back_hits] * additional[owner]
+    bet_amounts = np.bincount(owner, weights=ticket_amounts, minlength=len(valid)) * multiples
+
+    # 每注投注记录最高奖级 (数字越小奖级越高，未中奖按 10 处理)
+    ticket_levels = levels_matrix[front_hits, back_hits].astype(np.int64)
+    ticket_levels[ticket_levels == 0] = 10
+    best_levels = np.full(len(valid), 10, dtype=np.int64)
+    np.minimum.at(best_levels, owner, ticket_levels)
+
+    for bet, amount, level in zip(valid, bet_amounts, best_levels):
+        level = int(level) if level < 10 else 0
+        results.append({'id': bet['id'], 'is_winning': int(level > 0), 'winning_level': LEVEL_NAMES[level],
+                        'winning_amount': round(float(amount), 2)})
+    return results
+
+
+class BettingSettlementEngine:
+    """
+    个人投注批量结算
+    - winning_level 为 NULL 的记录视为未结算；每期开奖入库后调用 settle_pending() 即可；
+    - 一期的全部未结算投注一次查出、在内存中向量化结算，再按 (是否中奖, 奖级, 奖金) 分组，
+      每组用 id IN (...) 分块 UPDATE，在同一事务中写回 (未中奖的大多数记录合并成少数几条语句)。
+    """
+
+    def __init__(self, db_manager: DatabaseManager, floating_prizes: Optional[Dict[int, float]] = None,
+                 chunk_size: int = 1000):
+        self.db = db_manager
+        self.floating_prizes = floating_prizes
+        self.chunk_size = chunk_size
+
+    def pending_periods(self) -> List[str]:
+        """已开奖但仍有未结算投注的期号 (升序)。"""
+        rows = self.db.execute_query("""
+            SELECT DISTINCT pb.period_number
+            FROM personal_betting pb
+            JOIN lottery_history lh ON lh.period_number = pb.period_number
+            WHERE pb.winning_level IS NULL
+            ORDER BY pb.period_number
+        """)
+        return [row['period_number'] for row in rows]
+
+    def _get_draw(self, period_number: str) -> Optional[Tuple[List[int], List[int]]]:
+        row = self.db.fetch_one("""
+            SELECT front_area_1, front_area_2, front_area_3, front_area_4, front_area_5,
+                   back_area_1, back_area_2
+            FROM lottery_history WHERE period_number = %s
+        """, (period_number,))
+        if not row:
+            return None
+        return ([row[f'front_area_{i}'] for i in range(1, 6)], [row['back_area_1'], row['back_area_2']])
+
+    def settle_period(self, period_number: str) -> Dict[str, Any]:
+        draw = self._get_draw(period_number)
+        if draw is None:
+            print(f"  - ⚠️ 期号 {period_number} 尚未开奖，跳过结算。")
+            return {'period_number': period_number, 'settled': 0}
+
+        # SELECT * 兼容尚未添加 is_additional 列的旧表结构
+        bets = self.db.execute_query(
+            "SELECT * FROM personal_betting WHERE period_number = %s AND winning_level IS NULL", (period_number,))
+        if not bets:
+            return {'period_number': period_number, 'settled': 0}
+
+        results = settle_bets(bets, draw[0], draw[1], self.floating_prizes)
+        groups: Dict[Tuple[int, str, float], List[int]] = defaultdict(list)
+        for result in results:
+            groups[(result['is_winning'], result['winning_level'], result['winning_amount'])].append(result['id'])
+
+        statements = 0
+        try:
+            with self.db.transaction() as cursor:
+                for (is_winning, level, amount), ids in groups.items():
+                    for start in range(0, len(ids), self.chunk_size):
+                        chunk = ids[start:start + self.chunk_size]
+                        cursor.execute(f"""
+                            UPDATE personal_betting
+                            SET is_winning = %s, winning_level = %s, winning_amount = %s
+                            WHERE id IN ({', '.join(['%s'] * len(chunk))}) AND winning_level IS NULL
+                        """, (is_winning, level, amount, *chunk))
+                        statements += 1
+        except Exception as e:
+            print(f"  - ❌ 期号 {period_number} 结算写回失败: {e}")
+            return {'period_number': period_number, 'settled': 0, 'error': str(e)}
+
+        winners = [r for r in results if r['is_winning']]
+        summary = {
+            'period_number': period_number,
+            'settled': len(results),
+            'winning_bets': len(winners),
+            'total_winning_amount': round(sum(r['winning_amount'] for r in winners), 2),
+            'invalid_bets': sum(1 for r in results if r['winning_level'] == INVALID_LEVEL),
+            'update_statements': statements
+        }
+        print(f"  - ✅ 期号 {period_number} 结算完成: {summary['settled']} 笔投注，"
+              f"中奖 {summary['winning_bets']} 笔，共 ¥{summary['total_winning_amount']:.2f}")
+        return summary
+
+    def settle_pending(self) -> List[Dict[str, Any]]:
+        """结算所有已开奖期号的未结算投注。"""
+        return [self.settle_period(period) for period in self.pending_periods()]
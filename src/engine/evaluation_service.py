@@ -92,16 +92,20 @@ def run_evaluation_for_period(db_manager: DatabaseManager, period_to_evaluate: s
 
 def _evaluate_base_algorithms_logs(db_manager, period, actual_front, actual_back):
     """
-    辅助函数: 评估基础算法并更新 algorithm_performance。
-    (V4 - 修复了 Decimal 与 float 的类型冲突，并增强了健壮性)
+    辅助函数: 评估基础算法并更新滚动性能汇总。
+    (V5 - 先在内存中算完所有算法的命中，再以一次集合式 upsert 更新 algorithm_performance_summary，
+     不再逐行读取/改写 algorithm_performance 的累计均值)
     """
-    prediction_logs = db_manager.execute_query(
-        "SELECT * FROM algorithm_prediction_logs WHERE period_number = %s", (period,)
-    )
+    from src.engine.performance_aggregates import PerformanceAggregateStore
+    from src.engine.prediction_log_retention import load_prediction_logs
+
+    # 已被保留策略归档的期号透明地从压缩文件读取
+    prediction_logs = load_prediction_logs(db_manager, period)
     if not prediction_logs:
         return
 
     print(f"\n  [评估1/2] 正在评估 {len(prediction_logs)} 个基础算法的长期性能...")
+    rows = []
     for log in prediction_logs:
         algo_version = log['algorithm_version']
         try:
@@ -113,74 +117,18 @@ def _evaluate_base_algorithms_logs(db_manager, period, actual_front, actual_back
             front_hits = calculate_hits_from_list(primary_rec.get('front_numbers', []), actual_front)
             back_hits = calculate_hits_from_list(primary_rec.get('back_numbers', []), actual_back)
 
-            # --- 核心修复：在这里进行类型转换和计算 ---
-
-            # 1. 读取旧的统计数据
-            current_stats_raw = db_manager.execute_query(
-                "SELECT total_periods_analyzed, avg_front_hit_rate, avg_back_hit_rate FROM algorithm_performance WHERE algorithm_version = %s",
-                (algo_version,)
-            )
-
-            # 2. 计算本期表现 (使用 float 类型)
-            current_front_hit_rate = float(front_hits / 5.0)
-            current_back_hit_rate = float(back_hits / 2.0)
-
-            if not current_stats_raw:
-                # 如果没有旧记录，直接插入一条全新的性能记录
-                print(f"    - ⚠️ 警告: 未找到 {algo_version} 的性能记录，正在为其创建初始记录...")
-                # 注意：这里的 INSERT 语句需要与您的 algorithm_performance 表结构完全匹配
-                # 这是一个基于您之前提供的“超级表”结构的示例
-                insert_sql = """
-                             INSERT INTO algorithm_performance
-                             (algorithm_version, issue, algorithm, period_number, total_periods_analyzed, \
-                              total_recommendations,
-                              avg_front_hit_rate, avg_back_hit_rate, hits, hit_rate, score)
-                             VALUES (%s, %s, %s, %s, 1, 1, %s, %s, %s, %s, %s) \
-                             """
-                # 从版本号中分离出算法名
-                algorithm_name = algo_version.split('_')[0]
-
-                # 计算 hits, hit_rate, score
-                total_hits = front_hits + back_hits
-                hit_rate = total_hits / 7.0
-                confidence_score = float(log.get('confidence_score', 0.5))
-                score = hit_rate * confidence_score
-
-                db_manager.execute_update(
-                    insert_sql,
-                    (algo_version, period, algorithm_name, period, current_front_hit_rate, current_back_hit_rate,
-                     total_hits, hit_rate, score)
-                )
-                continue
-
-            # 3. (关键) 将从数据库读出的 Decimal/None 安全地转换为 float
-            current_stats = current_stats_raw[0]
-            total_periods = int(current_stats.get('total_periods_analyzed') or 0)
-            old_front_rate = float(current_stats.get('avg_front_hit_rate') or 0.0)
-            old_back_rate = float(current_stats.get('avg_back_hit_rate') or 0.0)
-
-            # 4. 现在，所有变量都是 Python 的原生数字类型，可以安全计算
-            new_total_periods = total_periods + 1
-            new_front_rate = ((old_front_rate * total_periods) + current_front_hit_rate) / new_total_periods
-            new_back_rate = ((old_back_rate * total_periods) + current_back_hit_rate) / new_total_periods
-
-            # 5. 更新数据库中的长期统计数据
-            update_sql = """
-                         UPDATE algorithm_performance
-                         SET total_periods_analyzed = %s,
-                             total_recommendations  = total_recommendations + 1,
-                             avg_front_hit_rate     = %s,
-                             avg_back_hit_rate      = %s,
-                             last_updated           = NOW()
-                         WHERE algorithm_version = %s \
-                         """
-            params = (new_total_periods, new_front_rate, new_back_rate, algo_version)
-            if db_manager.execute_update(update_sql, params):
-                print(f"  - 算法: {algo_version} -> 命中: {front_hits}+{back_hits}。长期性能已更新。")
-
+            # Decimal/None 统一转换为 float 后再计算
+            hit_rate = (front_hits + back_hits) / 7.0
+            confidence_score = float(log.get('confidence_score') or 0.5)
+            rows.append({'algorithm_version': algo_version, 'front_hits': front_hits, 'back_hits': back_hits,
+                         'hit_rate': hit_rate, 'score': hit_rate * confidence_score})
+            print(f"  - 算法: {algo_version} -> 命中: {front_hits}+{back_hits}。")
         except Exception as e:
             print(f"  - ❌ 评估基础算法 {algo_version} 时出错: {e}")
 
+    if rows and PerformanceAggregateStore(db_manager).record_period(period, rows):
+        print(f"  - ✅ {len(rows)} 个算法的滚动性能汇总已更新。")
+
 
 def _evaluate_final_recommendations(db_manager, period, actual_draw):
     """
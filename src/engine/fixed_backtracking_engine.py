@@ -5,7 +5,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import json
@@ -13,9 +13,38 @@ import re
 from decimal import Decimal
 
 
+REWARD_INSERT_QUERY = """
+INSERT INTO reward_penalty_records 
+(period_number, algorithm_version, recommendation_id, front_hit_count, 
+ back_hit_count, hit_score, reward_points, penalty_points, net_points,
+ performance_rating, hit_details, evaluation_time) 
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# 批量模式：开奖数据与推荐明细一次 JOIN 取回 (派生表先取最近 N 期，再关联推荐)
+WINDOW_RECOMMENDATION_QUERY = """
+SELECT lh.period_number, lh.front_area_1, lh.front_area_2, lh.front_area_3,
+       lh.front_area_4, lh.front_area_5, lh.back_area_1, lh.back_area_2,
+       ar.id, ar.algorithm_version, rd.front_numbers, rd.back_numbers
+FROM (
+    SELECT period_number, draw_date, front_area_1, front_area_2, front_area_3,
+           front_area_4, front_area_5, back_area_1, back_area_2
+    FROM lottery_history 
+    ORDER BY draw_date DESC 
+    LIMIT %s
+) lh
+LEFT JOIN algorithm_recommendation ar ON ar.period_number = lh.period_number
+LEFT JOIN recommendation_details rd ON ar.id = rd.recommendation_metadata_id
+                                   AND rd.front_numbers IS NOT NULL
+ORDER BY lh.draw_date DESC, ar.id, rd.id
+"""
+
+
 class FixedBacktrackingEngine:
     """修复版回溯引擎 - 解决所有已知问题"""
 
+    _connection_pool = None
+
     def __init__(self, db_config=None):
         if db_config is None:
             try:
@@ -32,10 +61,23 @@ class FixedBacktrackingEngine:
                 }
         else:
             self.db_config = db_config
+        self._table_columns_cache: Dict[str, set] = {}
 
     def _get_connection(self):
-        """获取数据库连接"""
+        """获取数据库连接 (优先从连接池取，close() 即归还)"""
+        if FixedBacktrackingEngine._connection_pool is None:
+            try:
+                FixedBacktrackingEngine._connection_pool = pooling.MySQLConnectionPool(
+                    pool_name="backtrack_pool",
+                    pool_size=3,
+                    pool_reset_session=True,
+                    **self.db_config
+                )
+            except Error as e:
+                print(f"⚠️ 创建连接池失败，改用直连: {e}")
         try:
+            if FixedBacktrackingEngine._connection_pool is not None:
+                return FixedBacktrackingEngine._connection_pool.get_connection()
             return mysql.connector.connect(**self.db_config)
         except Error as e:
             print(f"数据库连接失败: {e}")
@@ -100,15 +142,18 @@ class FixedBacktrackingEngine:
 
         return numbers
 
-    def run_algorithm_backtracking(self, period_count: int = 50) -> Dict[str, Any]:
+    def run_algorithm_backtracking(self, period_count: int = 50, bulk: bool = True) -> Dict[str, Any]:
         """
         运行算法回溯分析
         Args:
             period_count: 回溯期数
+            bulk: 批量模式 (默认)。整个窗口只需固定几次数据库往返；False 时按期逐条查询/写入
         Returns:
             回溯分析结果
         """
         print(f"🚀 开始算法回溯分析，回溯期数: {period_count}")
+        if bulk:
+            return self._run_bulk_backtracking(period_count)
 
         try:
             # 获取历史开奖数据
@@ -176,6 +221,172 @@ class FixedBacktrackingEngine:
             traceback.print_exc()
             return {"status": "error", "message": str(e)}
 
+    # ------------------------------------------------------------------
+    # 批量模式：一次 JOIN 取数、内存评分、批量写回，全程复用同一个池化连接
+    # ------------------------------------------------------------------
+    def _run_bulk_backtracking(self, period_count: int) -> Dict[str, Any]:
+        """批量回溯：整个窗口固定几次数据库往返，奖罚记录与性能统计在同一事务中写回"""
+        connection = self._get_connection()
+        if connection is None:
+            return {"status": "error", "message": "数据库连接失败"}
+
+        self._table_columns_cache = {}  # 表结构每次运行只查询一次
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(WINDOW_RECOMMENDATION_QUERY, (period_count,))
+            window_rows = cursor.fetchall()
+
+            if not window_rows:
+                return {"status": "error", "message": "没有找到历史开奖数据"}
+
+            backtrack_results, period_total = self._group_window_rows(window_rows)
+            print(f"📊 获取到 {period_total} 期历史数据")
+            print(f"✅ 成功分析 {len(backtrack_results)} 期数据")
+
+            if backtrack_results:
+                self._bulk_save_reward_penalty_records(cursor, backtrack_results)
+                self._bulk_update_algorithm_performance(cursor, backtrack_results)
+                connection.commit()
+
+            summary_metrics = self._calculate_summary_metrics(backtrack_results)
+            summary_metrics = self._convert_decimals_to_float(summary_metrics)
+
+            return {
+                'status': 'success',
+                'total_periods_analyzed': len(backtrack_results),
+                'backtrack_results': self._convert_decimals_to_float(backtrack_results),
+                'summary_metrics': summary_metrics
+            }
+
+        except Exception as e:
+            print(f"❌ 算法回溯分析失败: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            import traceback
+            traceback.print_exc()
+            return {"status": "error", "message": str(e)}
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if connection.is_connected():
+                connection.close()
+
+    def _group_window_rows(self, window_rows: List[Dict]) -> tuple:
+        """把 JOIN 结果按期号分组并在内存中评分，返回 (逐期结果, 窗口期数)"""
+        periods: Dict[str, Dict[str, Any]] = {}
+        for row in window_rows:
+            period = periods.setdefault(row['period_number'], {'draw': row, 'recommendations': []})
+            if row.get('id') is not None and row.get('front_numbers') is not None:
+                period['recommendations'].append(row)
+
+        backtrack_results = [
+            self._analyze_period_performance(
+                period_number, self._extract_actual_numbers(period['draw']), period['recommendations']
+            )
+            for period_number, period in periods.items() if period['recommendations']
+        ]
+        return backtrack_results, len(periods)
+
+    def _get_table_columns(self, cursor, table_name: str) -> set:
+        """读取表的列名集合 (按运行缓存)"""
+        if table_name not in self._table_columns_cache:
+            cursor.execute("""
+            SELECT COLUMN_NAME 
+            FROM INFORMATION_SCHEMA.COLUMNS 
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            """, (table_name,))
+            self._table_columns_cache[table_name] = {row['COLUMN_NAME'] for row in cursor.fetchall()}
+        return self._table_columns_cache[table_name]
+
+    def _bulk_save_reward_penalty_records(self, cursor, backtrack_results: List[Dict]):
+        """一次查出窗口内已有的奖罚记录，剩余记录用 executemany 合并为多值 INSERT"""
+        recommendation_ids = sorted({
+            rec_result['recommendation_id']
+            for period_result in backtrack_results
+            for rec_result in period_result['recommendation_results']
+        })
+        placeholders = ', '.join(['%s'] * len(recommendation_ids))
+        cursor.execute(f"""
+        SELECT period_number, recommendation_id FROM reward_penalty_records 
+        WHERE recommendation_id IN ({placeholders})
+        """, recommendation_ids)
+        existing = {(str(row['period_number']), row['recommendation_id']) for row in cursor.fetchall()}
+
+        params_list, skipped = [], 0
+        for period_result in backtrack_results:
+            period_number = period_result['period_number']
+            for rec_result in period_result['recommendation_results']:
+                key = (str(period_number), rec_result['recommendation_id'])
+                if key in existing:
+                    skipped += 1
+                    continue
+                existing.add(key)
+                params_list.append(self._build_reward_record_params(period_number, rec_result))
+
+        if params_list:
+            cursor.executemany(REWARD_INSERT_QUERY, params_list)
+        print(f"✅ 保存奖罚记录 {len(params_list)} 条 (已存在跳过 {skipped} 条)")
+
+    def _bulk_update_algorithm_performance(self, cursor, backtrack_results: List[Dict]):
+        """按缓存的表结构组装字段，已有算法用一条 CASE UPDATE 更新，新算法批量 INSERT"""
+        algorithm_stats = self._collect_algorithm_stats(backtrack_results)
+        available_columns = self._get_table_columns(cursor, 'algorithm_performance')
+
+        values_by_algo = {}
+        now = datetime.now()
+        for algo_version, stats in algorithm_stats.items():
+            candidates = {
+                'total_recommendations': stats['total_recommendations'],
+                'total_periods_analyzed': len(backtrack_results),
+                'confidence_accuracy': float(stats['winning_count'] / stats['total_recommendations']),
+                'last_updated': now
+            }
+            values_by_algo[algo_version] = {k: v for k, v in candidates.items() if k in available_columns}
+
+        fields = [f for f in ('total_recommendations', 'total_periods_analyzed', 'confidence_accuracy',
+                              'last_updated') if f in available_columns]
+        if not fields:
+            print("⚠️ algorithm_performance 表缺少性能统计字段，跳过性能更新")
+            return
+
+        versions = list(values_by_algo)
+        placeholders = ', '.join(['%s'] * len(versions))
+        cursor.execute(
+            f"SELECT DISTINCT algorithm_version FROM algorithm_performance WHERE algorithm_version IN ({placeholders})",
+            versions
+        )
+        existing = {row['algorithm_version'] for row in cursor.fetchall()}
+        to_update = [v for v in versions if v in existing]
+        to_insert = [v for v in versions if v not in existing]
+
+        if to_update:
+            set_clauses, params = [], []
+            for field in fields:
+                cases = ' '.join(['WHEN %s THEN %s'] * len(to_update))
+                set_clauses.append(f"{field} = CASE algorithm_version {cases} ELSE {field} END")
+                for version in to_update:
+                    params.extend([version, values_by_algo[version][field]])
+            params.extend(to_update)
+            cursor.execute(f"""
+            UPDATE algorithm_performance 
+            SET {', '.join(set_clauses)}
+            WHERE algorithm_version IN ({', '.join(['%s'] * len(to_update))})
+            """, params)
+
+        if to_insert:
+            cursor.executemany(f"""
+            INSERT INTO algorithm_performance 
+            (algorithm_version, {', '.join(fields)}) 
+            VALUES ({', '.join(['%s'] * (len(fields) + 1))})
+            """, [[version] + [values_by_algo[version][f] for f in fields] for version in to_insert])
+
+        for algo_version in versions:
+            stats = algorithm_stats[algo_version]
+            print(f"📈 更新算法性能: {algo_version} (胜率: {stats['winning_count'] / stats['total_recommendations']:.2%})")
+
     def _extract_actual_numbers(self, period_data: Dict) -> Dict[str, List[int]]:
         """从开奖数据中提取实际号码"""
         return {
@@ -289,7 +500,6 @@ class FixedBacktrackingEngine:
         """保存奖罚记录"""
         for rec_result in period_result['recommendation_results']:
             try:
-                performance = rec_result['performance']
                 period_number = period_result['period_number']
                 recommendation_id = rec_result['recommendation_id']
 
@@ -304,35 +514,9 @@ class FixedBacktrackingEngine:
                     print(f"⏭️ 期号 {period_number} 的奖罚记录已存在，跳过")
                     continue
 
-                # 插入新记录
-                insert_query = """
-                INSERT INTO reward_penalty_records 
-                (period_number, algorithm_version, recommendation_id, front_hit_count, 
-                 back_hit_count, hit_score, reward_points, penalty_points, net_points,
-                 performance_rating, hit_details, evaluation_time) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
+                params = self._build_reward_record_params(period_number, rec_result)
 
-                reward_points = float(performance['hit_score']) * 10
-                penalty_points = 0.0 if performance['hit_score'] > 0 else 2.0
-                net_points = reward_points - penalty_points
-
-                params = (
-                    period_number,
-                    rec_result['algorithm_version'],
-                    recommendation_id,
-                    performance['front_hits'],
-                    performance['back_hits'],
-                    float(performance['hit_score']),
-                    float(reward_points),
-                    float(penalty_points),
-                    float(net_points),
-                    self._calculate_performance_rating(performance['hit_score']),
-                    json.dumps(performance, ensure_ascii=False),
-                    datetime.now()
-                )
-
-                rows_affected = self._execute_update(insert_query, params)
+                rows_affected = self._execute_update(REWARD_INSERT_QUERY, params)
                 if rows_affected > 0:
                     print(f"✅ 保存奖罚记录: 期号 {period_number}, 算法 {rec_result['algorithm_version']}")
                 else:
@@ -342,6 +526,28 @@ class FixedBacktrackingEngine:
                 print(f"❌ 保存奖罚记录异常: {e}")
                 continue
 
+    def _build_reward_record_params(self, period_number: str, rec_result: Dict) -> tuple:
+        """生成一条奖罚记录的插入参数 (对应 REWARD_INSERT_QUERY)"""
+        performance = rec_result['performance']
+        reward_points = float(performance['hit_score']) * 10
+        penalty_points = 0.0 if performance['hit_score'] > 0 else 2.0
+        net_points = reward_points - penalty_points
+
+        return (
+            period_number,
+            rec_result['algorithm_version'],
+            rec_result['recommendation_id'],
+            performance['front_hits'],
+            performance['back_hits'],
+            float(performance['hit_score']),
+            float(reward_points),
+            float(penalty_points),
+            float(net_points),
+            self._calculate_performance_rating(performance['hit_score']),
+            json.dumps(performance, ensure_ascii=False),
+            datetime.now()
+        )
+
     def _calculate_performance_rating(self, hit_score: float) -> int:
         """计算表现评级"""
         if hit_score >= 50:
@@ -355,8 +561,8 @@ class FixedBacktrackingEngine:
         else:
             return 1
 
-    def _update_algorithm_performance(self, backtrack_results: List[Dict]):
-        """更新算法性能统计 - 修复版"""
+    def _collect_algorithm_stats(self, backtrack_results: List[Dict]) -> Dict[str, Dict[str, Any]]:
+        """按算法版本汇总推荐数、命中得分与中奖次数"""
         algorithm_stats = {}
 
         for period_result in backtrack_results:
@@ -377,6 +583,12 @@ class FixedBacktrackingEngine:
                 if performance['is_winning']:
                     stats['winning_count'] += 1
 
+        return algorithm_stats
+
+    def _update_algorithm_performance(self, backtrack_results: List[Dict]):
+        """更新算法性能统计 - 修复版"""
+        algorithm_stats = self._collect_algorithm_stats(backtrack_results)
+
         # 更新数据库 - 修复版，检查表结构
         for algo_version, stats in algorithm_stats.items():
             try:
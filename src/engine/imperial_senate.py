@@ -6,6 +6,7 @@ import json
 import random
 from typing import List, Dict, Any, Tuple
 
+from src.algorithms.advanced_algorithms.cooccurrence_store import CooccurrenceStore, PERSISTED_DECAY
 from src.model.lottery_models import LotteryHistory
 
 
@@ -39,13 +40,15 @@ class ImperialSenate:
                 front_a = [item['number'] for item in front_heatmap[:7]]
                 back_a = [item['number'] for item in back_heatmap[:3]]
 
-        # Fallback: 如果上面的逻辑失败，则使用简单的历史频率
+        # Fallback: 如果上面的逻辑失败，则使用衰减加权的号码共现统计
         if not front_a or not back_a:
-            role_description = "军团重装 (降级：使用历史频率)"
-            all_front = [n for d in history[-8:] for n in d.front_area]
-            front_a = sorted(list(set(all_front)))[:7] or [6, 9, 14, 20, 26, 27, 30]
-            all_back = [n for d in history[-8:] for n in d.back_area]
-            back_a = sorted(list(set(all_back)))[:3] or [2, 8, 9]
+            role_description = "军团重装 (降级：使用号码共现统计)"
+            store = self._load_cooccurrence(history)
+            if store.draw_count:
+                front_a = store.companions('front', 7)
+                back_a = store.companions('back', 3)
+            else:
+                front_a, back_a = [6, 9, 14, 20, 26, 27, 30], [2, 8, 9]
 
         quant_proposal = {
             "portfolio": [{"type": "荣耀核心(7+3)", "cost": 42.0, "front_numbers": front_a, "back_numbers": back_a,
@@ -54,6 +57,22 @@ class ImperialSenate:
         }
         return json.dumps(quant_proposal, ensure_ascii=False)
 
+    def _load_cooccurrence(self, history: List[LotteryHistory]) -> CooccurrenceStore:
+        """
+        只使用传入的历史 (历史模拟中不能看到目标期之后的开奖)。
+        数据库中持久化的统计恰好截止到 history 的最新一期时直接读取 (只读)，否则由 history 在内存中构建。
+        """
+        history = history or []
+        latest = max((str(record.period_number) for record in history), default=None)
+        if self.db is not None and latest is not None:
+            try:
+                store = CooccurrenceStore.load(self.db, PERSISTED_DECAY)
+                if store.draw_count and store.last_period == latest:
+                    return store
+            except Exception as e:
+                print(f"⚠️ 共现统计读取失败，改用内存构建: {e}")
+        return CooccurrenceStore.from_history(history, PERSISTED_DECAY)
+
     def _generate_ml_briefing(self, history: List[LotteryHistory], tuner_tweak: Dict) -> str:
         # (保持模拟)
         ml_briefing = {"trends": ["东境反弹+18%"], "risks": ["后区沼泽冷奇袭"], "confidence": 0.94}
@@ -0,0 +1,390 @@
+# 文件: src/engine/job_queue.py
+"""
+页面触发的长耗时工作流的本地后台任务队列 (SQLite 持久化 + 工作进程池)。
+
+原先 Chatbot 页面在 Streamlit 请求内直接启动 main.py 子进程并读取输出：多个用户同时点击会重复跑完整流程，
+页面会话结束后任务也随之中断。现在:
+- 页面调用 JobQueue.enqueue(工作流, 目标期号) 提交任务，同一 (工作流, 目标期号) 在排队/执行中时只保留一个任务
+  (部分唯一索引保证)，重复提交只累加请求次数并返回已有任务；默认已成功完成的同一任务也直接复用结果；
+- 工作进程 (python -m src.engine.job_queue worker) 原子地领取排队任务，以子进程运行工作流脚本，
+  把输出追加到 jobs.log，并根据 "[任务i/n]"、"[步骤i/n]" 标记估算进度，页面轮询 jobs 表展示状态与日志；
+- 工作进程定期写心跳，超时未更新的执行中任务视为工作进程已退出并标记为失败；
+  页面提交任务时若没有存活的工作进程，会以独立会话启动一个 (空闲一段时间后自动退出)。
+队列库默认位于 data/job_queue.sqlite3，与业务数据库无关。
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from multiprocessing import Process
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_QUEUE_PATH = os.path.join(PROJECT_ROOT, 'data', 'job_queue.sqlite3')
+
+# 工作流名 -> 传给当前 Python 解释器的参数 (在项目根目录下执行)
+WORKFLOWS: Dict[str, List[str]] = {
+    'daily_workflow': ['main.py'],
+}
+
+ACTIVE_STATUSES = ('queued', 'running')
+HEARTBEAT_SECONDS = 5.0
+STALE_AFTER_SECONDS = 60.0
+LOG_FLUSH_SECONDS = 1.0
+LOG_LIMIT_CHARS = 200_000
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  workflow TEXT NOT NULL,
+  target_period TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'queued',
+  progress REAL NOT NULL DEFAULT 0,
+  message TEXT,
+  log TEXT NOT NULL DEFAULT '',
+  result TEXT,
+  return_code INTEGER,
+  requested_by TEXT,
+  request_count INTEGER NOT NULL DEFAULT 1,
+  worker_pid INTEGER,
+  created_at TEXT NOT NULL,
+  started_at TEXT,
+  finished_at TEXT,
+  heartbeat_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key ON jobs (workflow, target_period)
+  WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_status_id ON jobs (status, id);
+CREATE TABLE IF NOT EXISTS job_workers (
+  pid INTEGER PRIMARY KEY,
+  started_at TEXT NOT NULL,
+  heartbeat_at TEXT NOT NULL
+);
+"""
+
+_TASK_MARK = re.compile(r"\[任务\s*(\d+)\s*/\s*(\d+)\]")
+_STEP_MARK = re.compile(r"\[步骤\s*(\d+)\s*/\s*(\d+)\]")
+
+
+def _now(offset_seconds: float = 0.0) -> str:
+    return (datetime.now() + timedelta(seconds=offset_seconds)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ProgressTracker:
+    """根据工作流输出中的 "[任务i/n]" 与 "[步骤i/n]" 标记估算进度 (完成前最多 0.99)。"""
+
+    def __init__(self):
+        self.task = (0, 1)
+        self.step = (0, 1)
+        self.progress = 0.0
+        self.message: Optional[str] = None
+
+    def feed(self, line: str) -> bool:
+        """处理一行输出，进度或说明发生变化时返回 True。"""
+        task_match, step_match = _TASK_MARK.search(line), _STEP_MARK.search(line)
+        if not task_match and not step_match:
+            return False
+        if task_match:
+            self.task = (int(task_match.group(1)), max(int(task_match.group(2)), 1))
+            self.step = (0, 1)
+        if step_match:
+            self.step = (int(step_match.group(1)), max(int(step_match.group(2)), 1))
+        (task_index, tasks), (step_index, steps) = self.task, self.step
+        done = max(task_index - 1, 0) + (max(step_index - 1, 0) / steps if step_index else 0.0)
+        self.progress = max(self.progress, min(done / tasks, 0.99))
+        self.message = line.strip().strip('=-# ').strip()[:200]
+        return True
+
+
+class JobQueue:
+    """jobs / job_workers 两张表的读写封装；每个操作使用独立连接，可在多进程、多线程中共用同一个库文件。"""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(QUEUE_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """BEGIN IMMEDIATE 事务：同一时刻只有一个写者，领取/合并判断不会出现竞态。"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(conn: sqlite3.Connection, job_id: int) -> Dict[str, Any]:
+        return dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    # --- 提交与查询 ---
+    def enqueue(self, workflow: str, target_period: str, requested_by: Optional[str] = None,
+                reuse_succeeded: bool = True) -> Tuple[Dict[str, Any], bool]:
+        """
+        提交任务，返回 (任务, 是否新建)。
+        同一 (workflow, target_period) 已在排队/执行时返回该任务；reuse_succeeded 时已成功完成的同一任务也直接返回。
+        """
+        if workflow not in WORKFLOWS:
+            raise ValueError(f"未知的工作流: {workflow} (可选: {', '.join(WORKFLOWS)})")
+        target_period = str(target_period)
+        self.reap_orphans()
+        with self._write() as conn:
+            statuses = ACTIVE_STATUSES + (('succeeded',) if reuse_succeeded else ())
+            existing = conn.execute(
+                f"SELECT id FROM jobs WHERE workflow = ? AND target_period = ? "
+                f"AND status IN ({', '.join('?' * len(statuses))}) "
+                f"ORDER BY status IN ('queued', 'running') DESC, id DESC LIMIT 1",
+                (workflow, target_period, *statuses)).fetchone()
+            if existing:
+                conn.execute("UPDATE jobs SET request_count = request_count + 1 WHERE id = ?", (existing['id'],))
+                return self._row(conn, existing['id']), False
+            cursor = conn.execute(
+                "INSERT INTO jobs (workflow, target_period, requested_by, message, created_at) "
+                "VALUES (?, ?, ?, ?, ?)", (workflow, target_period, requested_by, '排队中', _now()))
+            return self._row(conn, cursor.lastrowid), True
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def list_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return self._query(
+            "SELECT id, workflow, target_period, status, progress, message, request_count, requested_by, "
+            "created_at, started_at, finished_at, return_code FROM jobs ORDER BY id DESC LIMIT ?", (limit,))
+
+    # --- 工作进程侧 ---
+    def claim(self, worker_pid: int) -> Optional[Dict[str, Any]]:
+        """领取最早的排队任务并标记为执行中；没有任务时返回 None。"""
+        with self._write() as conn:
+            row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            now = _now()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker_pid = ?, started_at = ?, heartbeat_at = ?, "
+                "message = '开始执行' WHERE id = ?", (worker_pid, now, now, row['id']))
+            return self._row(conn, row['id'])
+
+    def append_log(self, job_id: int, text: str, progress: Optional[float] = None, message: Optional[str] = None):
+        """追加输出 (只保留末尾 LOG_LIMIT_CHARS 个字符)，同时刷新心跳与进度。"""
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE jobs SET log = substr(log || ?, ?), heartbeat_at = ?, "
+                "progress = COALESCE(?, progress), message = COALESCE(?, message) WHERE id = ?",
+                (text, -LOG_LIMIT_CHARS, _now(), progress, message, job_id))
+
+    def finish(self, job_id: int, return_code: int, result: Optional[Dict[str, Any]] = None):
+        succeeded = return_code == 0
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, return_code = ?, result = ?, finished_at = ?, heartbeat_at = ?, "
+                "progress = CASE WHEN ? THEN 1.0 ELSE progress END, message = ? WHERE id = ?",
+                ('succeeded' if succeeded else 'failed', return_code,
+                 json.dumps(result, ensure_ascii=False) if result is not None else None, _now(), _now(),
+                 succeeded, '执行完毕' if succeeded else f'执行失败 (返回码 {return_code})', job_id))
+
+    def heartbeat(self, worker_pid: int, job_id: Optional[int] = None):
+        now = _now()
+        with self._write() as conn:
+            conn.execute("INSERT INTO job_workers (pid, started_at, heartbeat_at) VALUES (?, ?, ?) "
+                         "ON CONFLICT(pid) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                         (worker_pid, now, now))
+            if job_id is not None:
+                conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (now, job_id))
+
+    def unregister_worker(self, worker_pid: int):
+        with self._write() as conn:
+            conn.execute("DELETE FROM job_workers WHERE pid = ?", (worker_pid,))
+
+    def live_workers(self) -> int:
+        rows = self._query("SELECT COUNT(*) AS n FROM job_workers WHERE heartbeat_at >= ?",
+                           (_now(-STALE_AFTER_SECONDS),))
+        return int(rows[0]['n'])
+
+    def reap_orphans(self) -> int:
+        """心跳超时的执行中任务标记为失败 (工作进程已退出)，同时清理过期的工作进程记录。"""
+        cutoff = _now(-STALE_AFTER_SECONDS)
+        with self._write() as conn:
+            reaped = conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, message = '工作进程已退出，任务中断' "
+                "WHERE status = 'running' AND heartbeat_at < ?", (_now(), cutoff)).rowcount
+            conn.execute("DELETE FROM job_workers WHERE heartbeat_at < ?", (cutoff,))
+        return reaped
+
+
+def run_job(queue: JobQueue, job: Dict[str, Any]) -> int:
+    """以子进程执行任务对应的工作流，期间持续写入输出、进度与心跳，返回子进程返回码。"""
+    job_id, worker_pid = job['id'], os.getpid()
+    command = [sys.executable, *WORKFLOWS[job['workflow']]]
+    env = dict(os.environ, JOB_ID=str(job_id), JOB_TARGET_PERIOD=job['target_period'],
+               PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+    started = time.perf_counter()
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(HEARTBEAT_SECONDS):
+            queue.heartbeat(worker_pid, job_id)
+
+    heart = threading.Thread(target=beat, daemon=True)
+    heart.start()
+    tracker, pending, tail, last_flush = ProgressTracker(), [], [], time.monotonic()
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                   encoding='utf-8', errors='replace', bufsize=1, cwd=PROJECT_ROOT, env=env)
+        for line in process.stdout:
+            pending.append(line)
+            tail = (tail + [line.rstrip()])[-20:]
+            changed = tracker.feed(line)
+            if changed or time.monotonic() - last_flush >= LOG_FLUSH_SECONDS:
+                queue.append_log(job_id, ''.join(pending), tracker.progress, tracker.message)
+                pending, last_flush = [], time.monotonic()
+        return_code = process.wait()
+    except Exception as e:
+        pending.append(f"\n❌ 启动工作流失败: {e}\n")
+        return_code = -1
+    finally:
+        stop.set()
+        heart.join()
+    if pending:
+        queue.append_log(job_id, ''.join(pending), tracker.progress, tracker.message)
+    queue.finish(job_id, return_code, {'return_code': return_code,
+                                       'duration_s': round(time.perf_counter() - started, 1), 'tail': tail})
+    return return_code
+
+
+def worker_loop(queue_path: str = DEFAULT_QUEUE_PATH, poll_seconds: float = 2.0,
+                idle_exit: Optional[float] = None, max_jobs: Optional[int] = None) -> int:
+    """循环领取并执行任务；空闲超过 idle_exit 秒或执行满 max_jobs 个任务后退出，返回执行的任务数。"""
+    queue, pid = JobQueue(queue_path), os.getpid()
+    done, idle_since = 0, time.monotonic()
+    print(f"👷 工作进程 {pid} 已启动，队列: {queue_path}")
+    try:
+        while True:
+            queue.heartbeat(pid)
+            queue.reap_orphans()
+            job = queue.claim(pid)
+            if job is None:
+                if idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+                    break
+                time.sleep(poll_seconds)
+                continue
+            print(f"  ▶️ [{pid}] 执行任务 #{job['id']}: {job['workflow']} (目标期号 {job['target_period']})")
+            return_code = run_job(queue, job)
+            print(f"  {'✅' if return_code == 0 else '❌'} [{pid}] 任务 #{job['id']} 结束，返回码 {return_code}")
+            done += 1
+            idle_since = time.monotonic()
+            if max_jobs is not None and done >= max_jobs:
+                break
+    finally:
+        queue.unregister_worker(pid)
+    return done
+
+
+class JobWorkerPool:
+    """启动多个 worker_loop 进程，同时执行不同的任务 (相同任务已在入队时合并)。"""
+
+    def __init__(self, queue_path: str = DEFAULT_QUEUE_PATH, processes: int = 2, poll_seconds: float = 2.0,
+                 idle_exit: Optional[float] = None):
+        self.queue_path = queue_path
+        self.processes = max(1, processes)
+        self.poll_seconds = poll_seconds
+        self.idle_exit = idle_exit
+        self.workers: List[Process] = []
+
+    def start(self) -> 'JobWorkerPool':
+        for _ in range(self.processes):
+            process = Process(target=worker_loop, args=(self.queue_path, self.poll_seconds, self.idle_exit))
+            process.start()
+            self.workers.append(process)
+        return self
+
+    def join(self):
+        for process in self.workers:
+            process.join()
+
+    def stop(self):
+        for process in self.workers:
+            if process.is_alive():
+                process.terminate()
+        self.join()
+
+
+def ensure_workers(queue_path: str = DEFAULT_QUEUE_PATH, processes: int = 1, idle_exit: float = 300.0) -> bool:
+    """没有存活的工作进程时，以独立会话启动一个工作进程池 (不随页面会话结束)，返回是否新启动。"""
+    if JobQueue(queue_path).live_workers() > 0:
+        return False
+    command = [sys.executable, '-m', 'src.engine.job_queue', '--queue', queue_path, 'worker',
+               '--processes', str(processes), '--idle-exit', str(idle_exit)]
+    options: Dict[str, Any] = {'cwd': PROJECT_ROOT, 'stdin': subprocess.DEVNULL,
+                               'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+    if os.name == 'nt':
+        options['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options['start_new_session'] = True
+    subprocess.Popen(command, **options)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="后台任务队列：执行页面提交的长耗时工作流。")
+    parser.add_argument('--queue', default=DEFAULT_QUEUE_PATH, help='队列库路径 (默认 data/job_queue.sqlite3)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    worker = commands.add_parser('worker', help='启动工作进程池')
+    worker.add_argument('--processes', type=int, default=2, help='工作进程数 (默认2)')
+    worker.add_argument('--poll', type=float, default=2.0, help='空闲时的轮询间隔秒数')
+    worker.add_argument('--idle-exit', type=float, default=None, help='空闲超过该秒数后退出 (默认常驻)')
+    enqueue = commands.add_parser('enqueue', help='提交任务')
+    enqueue.add_argument('workflow', choices=sorted(WORKFLOWS))
+    enqueue.add_argument('--period', required=True, help='目标期号')
+    enqueue.add_argument('--rerun', action='store_true', help='忽略已成功完成的同一任务，重新执行')
+    status = commands.add_parser('status', help='查看最近的任务')
+    status.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == 'worker':
+        if args.processes == 1:
+            worker_loop(args.queue, args.poll, args.idle_exit)
+        else:
+            JobWorkerPool(args.queue, args.processes, args.poll, args.idle_exit).start().join()
+    elif args.command == 'enqueue':
+        job, created = JobQueue(args.queue).enqueue(args.workflow, args.period, reuse_succeeded=not args.rerun)
+        print(f"{'➕ 已提交' if created else '🔁 已合并到'}任务 #{job['id']} ({job['status']})")
+    else:
+        for job in JobQueue(args.queue).list_jobs(args.limit):
+            print(f"#{job['id']:<5} {job['workflow']:<16} {job['target_period']:<10} {job['status']:<10} "
+                  f"{job['progress']:>5.0%}  请求 {job['request_count']} 次  {job['created_at']}  {job['message'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
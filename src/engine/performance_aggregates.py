@@ -0,0 +1,236 @@
+# 文件: src/engine/performance_aggregates.py
+"""
+算法滚动性能汇总。
+
+- algorithm_performance_summary: 每个算法一行，保存 EWMA、最近 N 期的和/平方和 (得到均值与方差)、
+  累计命中数以及前区 0-5 / 后区 0-2 命中次数直方图。
+- algorithm_performance_window: 最近 N 期得分的环形缓冲区 (slot = 期序号 mod N)，
+  新一期覆盖的正是滑出窗口的那一期，汇总表据此做减法，无需重扫日志。
+每评估一期只执行两条集合式语句 (汇总表一条 upsert、环形缓冲区一条 upsert)，在同一事务内提交；
+读取方直接读汇总表，权重计算的开销与日志规模无关。
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.database.database_manager import DatabaseManager
+
+SUMMARY_TABLE = 'algorithm_performance_summary'
+# 汇总表与环形缓冲区按表统一的窗口期数与 EWMA 系数 (所有写入方共用，避免不同配置交替写入同一行)
+WINDOW_SIZE = 20
+EWMA_ALPHA = 0.3
+
+FRONT_HIT_LEVELS = range(0, 6)
+BACK_HIT_LEVELS = range(0, 3)
+
+SUMMARY_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS `algorithm_performance_summary` (
+  `algorithm_version` varchar(100) NOT NULL COMMENT '算法版本',
+  `window_size` int(11) NOT NULL DEFAULT 20 COMMENT '滚动窗口期数 N',
+  `ewma_alpha` double NOT NULL DEFAULT 0.3 COMMENT 'EWMA 平滑系数',
+  `periods_evaluated` int(11) NOT NULL DEFAULT 0 COMMENT '累计评估期数',
+  `last_period` varchar(20) NULL DEFAULT NULL COMMENT '最近评估的期号',
+  `ewma_score` double NOT NULL DEFAULT 0 COMMENT '得分 EWMA',
+  `ewma_hit_rate` double NOT NULL DEFAULT 0 COMMENT '命中率 EWMA',
+  `window_count` int(11) NOT NULL DEFAULT 0 COMMENT '窗口内有效期数',
+  `window_sum` double NOT NULL DEFAULT 0 COMMENT '窗口内得分和',
+  `window_sq_sum` double NOT NULL DEFAULT 0 COMMENT '窗口内得分平方和',
+  `evicted_score` double NOT NULL DEFAULT 0 COMMENT '最近一次滑出窗口的得分',
+  `total_score` double NOT NULL DEFAULT 0 COMMENT '累计得分',
+  `total_front_hits` int(11) NOT NULL DEFAULT 0 COMMENT '累计前区命中数',
+  `total_back_hits` int(11) NOT NULL DEFAULT 0 COMMENT '累计后区命中数',
+  `front_hits_0` int(11) NOT NULL DEFAULT 0, `front_hits_1` int(11) NOT NULL DEFAULT 0,
+  `front_hits_2` int(11) NOT NULL DEFAULT 0, `front_hits_3` int(11) NOT NULL DEFAULT 0,
+  `front_hits_4` int(11) NOT NULL DEFAULT 0, `front_hits_5` int(11) NOT NULL DEFAULT 0,
+  `back_hits_0` int(11) NOT NULL DEFAULT 0, `back_hits_1` int(11) NOT NULL DEFAULT 0,
+  `back_hits_2` int(11) NOT NULL DEFAULT 0,
+  `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`algorithm_version`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '算法滚动性能汇总表'
+"""
+
+WINDOW_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS `algorithm_performance_window` (
+  `algorithm_version` varchar(100) NOT NULL COMMENT '算法版本',
+  `slot` int(11) NOT NULL COMMENT '环形缓冲区位置 = 期序号 mod N',
+  `period_number` varchar(20) NOT NULL COMMENT '该位置当前保存的期号',
+  `score` double NOT NULL DEFAULT 0,
+  `front_hits` tinyint(4) NOT NULL DEFAULT 0,
+  `back_hits` tinyint(4) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`algorithm_version`, `slot`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '算法最近N期得分环形缓冲区'
+"""
+
+
+def _target(column: str) -> str:
+    """
+    upsert 中引用汇总表已有值时必须带表名：INSERT ... SELECT 的派生表 v、关联的汇总表 s 中有同名列，
+    不带表名的列在 MySQL 中会报 1052 (ambiguous column)。
+    """
+    return f"{SUMMARY_TABLE}.{column}"
+
+
+def _guarded(column: str, expression: str) -> str:
+    """只有新期号比已记录的期号更新时才修改该列，同一期重复评估不会重复累加。"""
+    last_period = _target('last_period')
+    return (f"{column} = IF({last_period} IS NULL OR VALUES(last_period) > {last_period}, "
+            f"{expression}, {_target(column)})")
+
+
+class PerformanceAggregateStore:
+    """算法滚动性能汇总的读写封装。"""
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+        self.window_size = WINDOW_SIZE
+        self.ewma_alpha = EWMA_ALPHA
+        self._tables_ready = False
+
+    def ensure_tables(self):
+        if not self._tables_ready:
+            self.db.execute_update(SUMMARY_TABLE_DDL)
+            self.db.execute_update(WINDOW_TABLE_DDL)
+            self._tables_ready = True
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _derived_values(columns: Sequence[str], row_count: int) -> str:
+        """多行参数拼成的派生表 (SELECT %s AS a, ... UNION ALL ...)。"""
+        row = "SELECT " + ", ".join(f"%s AS {col}" for col in columns)
+        return " UNION ALL ".join([row] * row_count)
+
+    def _summary_upsert_sql(self, row_count: int) -> str:
+        hist_columns = [f"front_hits_{k}" for k in FRONT_HIT_LEVELS] + [f"back_hits_{k}" for k in BACK_HIT_LEVELS]
+        columns = ['algorithm_version', 'window_size', 'ewma_alpha', 'periods_evaluated', 'last_period',
+                   'ewma_score', 'ewma_hit_rate', 'window_count', 'window_sum', 'window_sq_sum', 'total_score',
+                   'total_front_hits', 'total_back_hits'] + hist_columns
+
+        # 新值写入环形缓冲区的位置 = 更新前的 periods_evaluated mod N，窗口已满时该位置上的旧得分滑出窗口；
+        # 滑出的得分在 SELECT 中一并取出，写入 evicted_score 供 ON DUPLICATE KEY UPDATE 做减法
+        select = (
+            f"SELECT {', '.join('v.' + col for col in columns)}, "
+            "IF(s.periods_evaluated >= s.window_size, COALESCE(w.score, 0), 0) AS evicted_score "
+            f"FROM ({self._derived_values(columns, row_count)}) v "
+            "LEFT JOIN algorithm_performance_summary s ON s.algorithm_version = v.algorithm_version "
+            "LEFT JOIN algorithm_performance_window w ON w.algorithm_version = v.algorithm_version "
+            "AND w.slot = MOD(s.periods_evaluated, s.window_size)"
+        )
+        # MySQL 按书写顺序执行赋值，后面的表达式看到的是前面已更新的值：
+        # 依赖旧 periods_evaluated / last_period 的列必须写在它们之前
+        assignments = [
+            _guarded('window_sum', f"{_target('window_sum')} + VALUES(window_sum) - VALUES(evicted_score)"),
+            _guarded('window_sq_sum',
+                     f"{_target('window_sq_sum')} + VALUES(window_sq_sum) - POW(VALUES(evicted_score), 2)"),
+            _guarded('evicted_score', "VALUES(evicted_score)"),
+            _guarded('window_count', f"LEAST({_target('window_count')} + 1, {_target('window_size')})"),
+            *[_guarded(col, f"{_target('ewma_alpha')} * VALUES({col}) + (1 - {_target('ewma_alpha')}) * {_target(col)}")
+              for col in ('ewma_score', 'ewma_hit_rate')],
+            *[_guarded(col, f"{_target(col)} + VALUES({col})")
+              for col in ['total_score', 'total_front_hits', 'total_back_hits'] + hist_columns],
+            _guarded('periods_evaluated', f"{_target('periods_evaluated')} + 1"),
+            _guarded('last_period', "VALUES(last_period)"),
+        ]
+        return (f"INSERT INTO algorithm_performance_summary ({', '.join(columns)}, evicted_score) {select} "
+                "ON DUPLICATE KEY UPDATE " + ", ".join(assignments))
+
+    def _summary_params(self, period: str, rows: Sequence[Dict[str, Any]]) -> List[Any]:
+        params = []
+        for row in rows:
+            score = float(row.get('score', 0.0))
+            front_hits, back_hits = int(row.get('front_hits', 0)), int(row.get('back_hits', 0))
+            hit_rate = float(row.get('hit_rate', (front_hits + back_hits) / 7.0))
+            params.extend([row['algorithm_version'], self.window_size, self.ewma_alpha, 1, period,
+                           score, hit_rate, 1, score, score * score, score, front_hits, back_hits])
+            params.extend(int(front_hits == k) for k in FRONT_HIT_LEVELS)
+            params.extend(int(back_hits == k) for k in BACK_HIT_LEVELS)
+        return params
+
+    def _window_upsert_sql(self, row_count: int) -> str:
+        values = self._derived_values(['algorithm_version', 'score', 'front_hits', 'back_hits'], row_count)
+        return (
+            "INSERT INTO algorithm_performance_window "
+            "(algorithm_version, slot, period_number, score, front_hits, back_hits) "
+            "SELECT s.algorithm_version, MOD(s.periods_evaluated - 1, s.window_size), s.last_period, "
+            "v.score, v.front_hits, v.back_hits "
+            f"FROM algorithm_performance_summary s JOIN ({values}) v ON v.algorithm_version = s.algorithm_version "
+            "WHERE s.last_period = %s "
+            "ON DUPLICATE KEY UPDATE period_number = VALUES(period_number), score = VALUES(score), "
+            "front_hits = VALUES(front_hits), back_hits = VALUES(back_hits)"
+        )
+
+    def record_period(self, period_number: str, rows: Sequence[Dict[str, Any]]) -> bool:
+        """
+        记录一期所有算法的评估结果。
+        rows: [{'algorithm_version', 'score', 'front_hits', 'back_hits', 可选 'hit_rate'}]
+        期号不晚于已记录期号的算法会被忽略 (重复评估是幂等的)。
+        """
+        rows = [r for r in rows if r.get('algorithm_version')]
+        if not rows:
+            return True
+        period_number = str(period_number)
+        window_params = []
+        for row in rows:
+            window_params.extend([row['algorithm_version'], float(row.get('score', 0.0)),
+                                  int(row.get('front_hits', 0)), int(row.get('back_hits', 0))])
+        window_params.append(period_number)
+        try:
+            self.ensure_tables()
+            with self.db.transaction() as cursor:
+                cursor.execute(self._summary_upsert_sql(len(rows)), self._summary_params(period_number, rows))
+                cursor.execute(self._window_upsert_sql(len(rows)), window_params)
+            return True
+        except Exception as e:
+            print(f"  - ❌ [PerformanceAggregates] 更新第 {period_number} 期滚动汇总失败: {e}")
+            return False
+
+    def resync_windows(self):
+        """用环形缓冲区重新计算窗口和/平方和，消除长期累加的浮点误差 (按需偶尔调用)。"""
+        self.db.execute_update(
+            "UPDATE algorithm_performance_summary s JOIN ("
+            "  SELECT algorithm_version, COUNT(*) AS cnt, SUM(score) AS total, SUM(score * score) AS sq "
+            "  FROM algorithm_performance_window GROUP BY algorithm_version"
+            ") w ON w.algorithm_version = s.algorithm_version "
+            "SET s.window_count = w.cnt, s.window_sum = w.total, s.window_sq_sum = w.sq"
+        )
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+    def get_aggregates(self, algorithm_versions: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """{算法版本: 汇总指标}，均值/方差/命中率由汇总列直接换算。"""
+        query = "SELECT * FROM algorithm_performance_summary"
+        params = None
+        if algorithm_versions:
+            query += " WHERE algorithm_version IN (" + ", ".join(["%s"] * len(algorithm_versions)) + ")"
+            params = tuple(algorithm_versions)
+        result = {}
+        for row in self.db.execute_query(query, params) or []:
+            periods = int(row['periods_evaluated'] or 0)
+            count = int(row['window_count'] or 0)
+            mean = float(row['window_sum']) / count if count else 0.0
+            variance = max(float(row['window_sq_sum']) / count - mean ** 2, 0.0) if count else 0.0
+            result[row['algorithm_version']] = {
+                'periods_evaluated': periods,
+                'last_period': row['last_period'],
+                'ewma_score': float(row['ewma_score']),
+                'ewma_hit_rate': float(row['ewma_hit_rate']),
+                'window_count': count,
+                'window_mean': mean,
+                'window_variance': variance,
+                'avg_score': float(row['total_score']) / periods if periods else 0.0,
+                'avg_front_hit_rate': int(row['total_front_hits']) / (5.0 * periods) if periods else 0.0,
+                'avg_back_hit_rate': int(row['total_back_hits']) / (2.0 * periods) if periods else 0.0,
+                'front_hit_histogram': {k: int(row[f'front_hits_{k}']) for k in FRONT_HIT_LEVELS},
+                'back_hit_histogram': {k: int(row[f'back_hits_{k}']) for k in BACK_HIT_LEVELS},
+            }
+        return result
+
+    def get_weights(self, metric: str = 'ewma_score',
+                    algorithm_versions: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """按指定汇总指标归一化得到权重 (全部为 0 时返回空字典，由调用方退回默认权重)。"""
+        aggregates = self.get_aggregates(algorithm_versions)
+        total = sum(max(a[metric], 0.0) for a in aggregates.values())
+        if total <= 0:
+            return {}
+        return {name: max(a[metric], 0.0) / total for name, a in aggregates.items()}
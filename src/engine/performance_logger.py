@@ -3,6 +3,7 @@ import json
 from typing import Dict, Any, List
 from datetime import datetime
 from src.model.lottery_models import LotteryHistory, AlgorithmPerformance
+from src.engine.performance_aggregates import PerformanceAggregateStore
 
 
 class AlgorithmPerformanceDAO:
@@ -131,6 +132,9 @@ class PerformanceLogger:
         self.dao = AlgorithmPerformanceDAO(db_manager)
         self.updater = AdaptiveWeightUpdater(alpha=smoothing_alpha)
         self.hist_window = hist_window
+        # 滚动汇总：权重与历史均值直接读汇总表，开销不随日志增长
+        # (窗口期数与 EWMA 系数由汇总表统一配置，与 evaluation_service 写入同一批行)
+        self.aggregates = PerformanceAggregateStore(db_manager)
         print("[PerformanceLogger] 初始化成功")
 
     def _score_from_predictions(self, prediction, actual_draw):
@@ -200,7 +204,13 @@ class PerformanceLogger:
     def get_latest_adaptive_weights(self) -> Dict[str, float]:
         """获取最新的自适应权重"""
         try:
-            hist_avg = self.dao.get_average_scores_last_n_issues(self.hist_window)
+            try:
+                hist_avg = self.aggregates.get_weights('ewma_score')
+            except Exception as e:
+                print(f"[PerformanceLogger] 读取滚动汇总失败，改用明细表: {e}")
+                hist_avg = {}
+            if not hist_avg:
+                hist_avg = self.dao.get_average_scores_last_n_issues(self.hist_window)
             if not hist_avg:
                 print("[PerformanceLogger] 警告: 无法获取历史权重，使用空字典")
                 return {}
@@ -211,24 +221,10 @@ class PerformanceLogger:
 
     def _get_historical_avg(self) -> Dict[str, float]:
         """
-        获取历史平均值 - 简化版本
+        获取历史平均值：读取滚动汇总表中最近 WINDOW_SIZE 期的得分均值
         """
         try:
-            performances = self.dao.get_algorithm_performance()
-            algo_scores = {}
-
-            for perf in performances:
-                algo_name = perf.get('algorithm_version', 'unknown')
-                score = perf.get('confidence_score', 0.0)
-                algo_scores.setdefault(algo_name, []).append(score)
-
-            # 计算每个算法的平均分
-            hist_avg = {}
-            for algo, scores in algo_scores.items():
-                recent_scores = scores[-self.hist_window:] if len(scores) > self.hist_window else scores
-                hist_avg[algo] = sum(recent_scores) / len(recent_scores) if recent_scores else 0.0
-
-            return hist_avg
+            return {algo: agg['window_mean'] for algo, agg in self.aggregates.get_aggregates().items()}
         except Exception as e:
             print(f"[PerformanceLogger] 获取历史平均值失败: {e}")
             return {}
@@ -240,6 +236,7 @@ class PerformanceLogger:
         返回简化准确率结果: {算法名: 命中率}
         """
         simple_accuracy_dict = {}
+        aggregate_rows = []
 
         for algo_name, prediction in (model_outputs or {}).items():
             try:
@@ -262,11 +259,14 @@ class PerformanceLogger:
 
                 # 存储简化准确率
                 simple_accuracy_dict[algo_name] = round(metrics.get('hit_rate', 0.0), 4)
+                aggregate_rows.append({'algorithm_version': algo_name, **metrics})
 
             except Exception as e:
                 print(f"[PerformanceLogger] 评估{algo_name}失败: {e}")
                 continue
 
+        # 本期所有算法的滚动汇总一次性更新
+        self.aggregates.record_period(issue, aggregate_rows)
         return simple_accuracy_dict
 
     def get_recommended_weights(self) -> Dict[str, float]:
@@ -0,0 +1,283 @@
+# 文件: src/engine/prediction_log_retention.py
+"""
+algorithm_prediction_logs 的分期保留与归档。
+
+- 热表只保留最近 keep_periods 个期号的原始日志；更早且已开奖的期号被压缩：
+  1) 原始行按期号写入 data/prediction_log_archive/period_year=YYYY/<期号>.jsonl.gz (先写临时文件再原子替换)；
+  2) 每个 (期号, 算法版本) 生成一行汇总写入 algorithm_prediction_rollups:
+     日志条数、平均置信度、首条推荐及其命中、全部推荐中的最佳命中、按置信度加权的前区/后区 top-K 号码；
+  3) 汇总 upsert 与热表删除在同一事务内提交，归档文件已先落盘，任何时刻中断都不会丢数据。
+- 同一期号之后又写入新日志时，再次压缩会与已有归档合并 (按 id 去重) 并重算汇总。
+- 读取: load_prediction_logs(db, period) 先查热表，查不到时透明地回退到归档文件，返回的行结构与热表一致。
+- 未开奖的期号 (包括 UNKNOWN) 不压缩，评估时仍需读取其原始日志。
+用法: python -m src.engine.prediction_log_retention --keep 300
+"""
+
+import argparse
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.database.database_manager import DatabaseManager
+from src.utils.bitmask import numbers_to_mask, popcount
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_ARCHIVE_DIR = os.path.join(PROJECT_ROOT, 'data', 'prediction_log_archive')
+DEFAULT_KEEP_PERIODS = 300
+TOP_K_FRONT = 10
+TOP_K_BACK = 4
+
+ROLLUP_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS `algorithm_prediction_rollups` (
+  `id` bigint(20) NOT NULL AUTO_INCREMENT,
+  `period_number` varchar(20) NOT NULL COMMENT '期号',
+  `algorithm_version` varchar(50) NOT NULL COMMENT '算法版本',
+  `log_count` int(11) NOT NULL DEFAULT 0 COMMENT '被压缩的原始日志条数',
+  `avg_confidence` decimal(5, 4) NULL DEFAULT NULL COMMENT '平均置信度',
+  `primary_front` varchar(100) NULL DEFAULT NULL COMMENT '首条推荐前区 (JSON)',
+  `primary_back` varchar(50) NULL DEFAULT NULL COMMENT '首条推荐后区 (JSON)',
+  `front_hits` tinyint(4) NULL DEFAULT NULL COMMENT '首条推荐前区命中数',
+  `back_hits` tinyint(4) NULL DEFAULT NULL COMMENT '首条推荐后区命中数',
+  `best_front_hits` tinyint(4) NULL DEFAULT NULL COMMENT '全部推荐中的最佳前区命中数',
+  `best_back_hits` tinyint(4) NULL DEFAULT NULL COMMENT '全部推荐中的最佳后区命中数',
+  `top_front` varchar(200) NULL DEFAULT NULL COMMENT '置信度加权的前区 top-K (JSON)',
+  `top_back` varchar(100) NULL DEFAULT NULL COMMENT '置信度加权的后区 top-K (JSON)',
+  `archive_file` varchar(255) NULL DEFAULT NULL COMMENT '原始日志归档文件 (相对归档目录)',
+  `archived_at` datetime NULL DEFAULT NULL,
+  PRIMARY KEY (`id`) USING BTREE,
+  UNIQUE INDEX `uq_period_algo`(`period_number` ASC, `algorithm_version` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '预测日志按期汇总表'
+"""
+
+ROLLUP_COLUMNS = ('period_number', 'algorithm_version', 'log_count', 'avg_confidence', 'primary_front',
+                  'primary_back', 'front_hits', 'back_hits', 'best_front_hits', 'best_back_hits',
+                  'top_front', 'top_back', 'archive_file', 'archived_at')
+
+
+def period_partition(period: str) -> str:
+    period = str(period)
+    return f"period_year={period[:4]}" if period[:4].isdigit() else "period_year=unknown"
+
+
+def archive_path(archive_dir: str, period: str) -> str:
+    return os.path.join(archive_dir, period_partition(period), f"{period}.jsonl.gz")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+
+def read_archive(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_archive(path: str, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """与已有归档按 id 合并后原子写入，返回合并后的全部行 (按 id 排序)。"""
+    merged = {row['id']: row for row in read_archive(path)}
+    for row in rows:
+        merged[row['id']] = json.loads(json.dumps(row, ensure_ascii=False, default=_json_default))
+    ordered = [merged[key] for key in sorted(merged)]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        for row in ordered:
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+    return ordered
+
+
+def _numbers(value: Any) -> List[int]:
+    if isinstance(value, str):
+        value = value.replace('+', ',').split(',')
+    result = []
+    for item in value or []:
+        try:
+            result.append(int(item))
+        except (TypeError, ValueError):
+            continue
+    return result
+
+
+def build_rollups(rows: Sequence[Dict[str, Any]], draw: Optional[Tuple[int, int]],
+                  archive_file: str = None) -> List[Tuple]:
+    """同一期号的原始日志 -> 每个算法版本一行汇总 (列顺序同 ROLLUP_COLUMNS)。draw 为 (前区掩码, 后区掩码)。"""
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        groups[row['algorithm_version']].append(row)
+
+    now = datetime.now().replace(microsecond=0)
+    rollups = []
+    for version, logs in sorted(groups.items()):
+        front_weight, back_weight = defaultdict(float), defaultdict(float)
+        confidences, primary, best = [], None, None
+        for log in sorted(logs, key=lambda r: r['id']):
+            if log.get('confidence_score') is not None:
+                confidences.append(float(log['confidence_score']))
+            payload = log.get('predictions')
+            if isinstance(payload, str):
+                try:
+                    payload = json.loads(payload)
+                except ValueError:
+                    payload = None
+            recommendations = payload.get('recommendations') if isinstance(payload, dict) else None
+            for rec in recommendations or []:
+                if not isinstance(rec, dict):
+                    continue
+                front, back = _numbers(rec.get('front_numbers')), _numbers(rec.get('back_numbers'))
+                weight = float(rec.get('confidence') or log.get('confidence_score') or 0.5)
+                for n in front:
+                    front_weight[n] += weight
+                for n in back:
+                    back_weight[n] += weight
+                if primary is None:
+                    primary = (front, back)
+                if draw is not None:
+                    hits = (popcount(numbers_to_mask(front) & draw[0]), popcount(numbers_to_mask(back) & draw[1]))
+                    if best is None or sum(hits) > sum(best):
+                        best = hits
+        front_hits = back_hits = None
+        if draw is not None and primary is not None:
+            front_hits = popcount(numbers_to_mask(primary[0]) & draw[0])
+            back_hits = popcount(numbers_to_mask(primary[1]) & draw[1])
+        top_front = sorted(front_weight, key=lambda n: (-front_weight[n], n))[:TOP_K_FRONT]
+        top_back = sorted(back_weight, key=lambda n: (-back_weight[n], n))[:TOP_K_BACK]
+        rollups.append((
+            str(logs[0]['period_number']), version, len(logs),
+            round(sum(confidences) / len(confidences), 4) if confidences else None,
+            json.dumps(primary[0]) if primary else None, json.dumps(primary[1]) if primary else None,
+            front_hits, back_hits, best[0] if best else None, best[1] if best else None,
+            json.dumps(top_front), json.dumps(top_back), archive_file, now
+        ))
+    return rollups
+
+
+class PredictionLogRetention:
+    """热表保留窗口 + 归档 + 汇总。"""
+
+    def __init__(self, db_manager: DatabaseManager, archive_dir: str = DEFAULT_ARCHIVE_DIR,
+                 keep_periods: int = DEFAULT_KEEP_PERIODS, chunk_periods: int = 50):
+        self.db = db_manager
+        self.archive_dir = archive_dir
+        self.keep_periods = keep_periods
+        self.chunk_periods = chunk_periods
+
+    def ensure_table(self):
+        self.db.execute_update(ROLLUP_TABLE_DDL)
+
+    def _draws(self, periods: Sequence[str]) -> Dict[str, Tuple[int, int]]:
+        placeholders = ', '.join(['%s'] * len(periods))
+        rows = self.db.execute_query(
+            f"SELECT period_number, front_area_1, front_area_2, front_area_3, front_area_4, front_area_5, "
+            f"back_area_1, back_area_2 FROM lottery_history WHERE period_number IN ({placeholders})", tuple(periods))
+        return {str(row['period_number']): (numbers_to_mask(row[f'front_area_{i}'] for i in range(1, 6)),
+                                            numbers_to_mask((row['back_area_1'], row['back_area_2'])))
+                for row in rows}
+
+    def periods_to_compact(self) -> List[str]:
+        """保留窗口之外、且已开奖的期号 (升序)。"""
+        rows = self.db.execute_query(
+            "SELECT DISTINCT period_number FROM algorithm_prediction_logs ORDER BY period_number ASC")
+        periods = [str(row['period_number']) for row in rows if str(row['period_number']).isdigit()]
+        candidates = periods[:max(len(periods) - self.keep_periods, 0)]
+        drawn = set()
+        for start in range(0, len(candidates), 500):
+            drawn.update(self._draws(candidates[start:start + 500]))
+        return [p for p in candidates if p in drawn]
+
+    def compact(self, dry_run: bool = False) -> Dict[str, int]:
+        self.ensure_table()
+        periods = self.periods_to_compact()
+        stats = {'periods': len(periods), 'logs': 0, 'rollups': 0}
+        if dry_run or not periods:
+            print(f"🗜️ 预测日志待压缩期号: {len(periods)} 个" + (" (演练模式，未修改)" if dry_run else ""))
+            return stats
+
+        upsert_sql = (f"INSERT INTO algorithm_prediction_rollups ({', '.join(ROLLUP_COLUMNS)}) "
+                      f"VALUES ({', '.join(['%s'] * len(ROLLUP_COLUMNS))}) ON DUPLICATE KEY UPDATE "
+                      + ', '.join(f"{c} = VALUES({c})" for c in ROLLUP_COLUMNS[2:]))
+        for start in range(0, len(periods), self.chunk_periods):
+            chunk = periods[start:start + self.chunk_periods]
+            in_clause = ', '.join(['%s'] * len(chunk))
+            rows = self.db.execute_query(
+                f"SELECT * FROM algorithm_prediction_logs WHERE period_number IN ({in_clause}) ORDER BY id",
+                tuple(chunk))
+            by_period: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for row in rows:
+                by_period[str(row['period_number'])].append(row)
+            draws = self._draws(chunk)
+
+            rollups, ids = [], []
+            for period, period_rows in by_period.items():
+                path = archive_path(self.archive_dir, period)
+                archived = write_archive(path, period_rows)
+                rollups.extend(build_rollups(archived, draws.get(period), os.path.relpath(path, self.archive_dir)))
+                ids.extend(row['id'] for row in period_rows)
+
+            # 只删除已归档的这些 id：压缩期间新写入同一期号的日志留到下一次压缩
+            with self.db.transaction() as cursor:
+                cursor.executemany(upsert_sql, rollups)
+                for id_start in range(0, len(ids), 1000):
+                    id_chunk = ids[id_start:id_start + 1000]
+                    cursor.execute(f"DELETE FROM algorithm_prediction_logs WHERE id IN "
+                                   f"({', '.join(['%s'] * len(id_chunk))})", tuple(id_chunk))
+            stats['logs'] += len(ids)
+            stats['rollups'] += len(rollups)
+        print(f"✅ 已压缩 {stats['periods']} 个期号的 {stats['logs']} 条预测日志，生成/更新 {stats['rollups']} 条汇总")
+        return stats
+
+    # --- 读取 ---
+    def load_logs(self, period: str) -> List[Dict[str, Any]]:
+        return load_prediction_logs(self.db, period, self.archive_dir)
+
+    def rollups(self, period: str) -> List[Dict[str, Any]]:
+        self.ensure_table()
+        return self.db.execute_query(
+            "SELECT * FROM algorithm_prediction_rollups WHERE period_number = %s ORDER BY algorithm_version",
+            (str(period),))
+
+    def all_periods(self) -> List[str]:
+        """热表与汇总表中出现过的全部期号 (升序)。"""
+        self.ensure_table()
+        rows = self.db.execute_query(
+            "SELECT period_number FROM algorithm_prediction_logs UNION "
+            "SELECT period_number FROM algorithm_prediction_rollups ORDER BY period_number ASC")
+        return [str(row['period_number']) for row in rows]
+
+
+def load_prediction_logs(db_manager: DatabaseManager, period: str,
+                         archive_dir: str = DEFAULT_ARCHIVE_DIR) -> List[Dict[str, Any]]:
+    """某期全部原始预测日志: 热表优先，已归档时读取压缩文件 (predictions 仍为 JSON 字符串)。"""
+    rows = db_manager.execute_query("SELECT * FROM algorithm_prediction_logs WHERE period_number = %s",
+                                    (str(period),))
+    if rows:
+        return rows
+    archived = read_archive(archive_path(archive_dir, str(period)))
+    for row in archived:
+        if row.get('predictions') is not None and not isinstance(row['predictions'], str):
+            row['predictions'] = json.dumps(row['predictions'], ensure_ascii=False)
+    return archived
+
+
+def main():
+    from src.config.database_config import DB_CONFIG
+    parser = argparse.ArgumentParser(description="预测日志保留与归档")
+    parser.add_argument('--keep', type=int, default=DEFAULT_KEEP_PERIODS, help='热表保留的最近期号数')
+    parser.add_argument('--archive-dir', type=str, default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument('--dry-run', action='store_true', help='只统计待压缩期号，不修改数据')
+    args = parser.parse_args()
+    PredictionLogRetention(DatabaseManager(**DB_CONFIG), args.archive_dir, args.keep).compact(dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# 文件: src/engine/simulation_checkpoint.py
+"""
+可断点续跑的历史模拟执行器。
+
+- SimulationCheckpointStore: 在 simulation_checkpoints 表中记录已完成的 (模型, 期号)。
+- CheckpointedSimulationRunner: 跳过已完成的期号，按批次在单个事务内落库。
+  一个批次内的业务数据与检查点标记同生共死，因此任何时刻中断，库里的数据都是一致的；
+  重跑时只需补完剩余的期号。
+- shard_periods / run_sharded: 将期号区间切分给多个工作进程并行模拟。
+"""
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from src.database.database_manager import DatabaseManager
+
+CHECKPOINT_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS `simulation_checkpoints` (
+  `id` bigint(20) NOT NULL AUTO_INCREMENT,
+  `run_tag` varchar(100) NOT NULL COMMENT '模拟任务标识，如 full_historical_simulation',
+  `model_name` varchar(100) NOT NULL COMMENT '被模拟的LLM模型',
+  `period_number` varchar(20) NOT NULL COMMENT '已完成的期号',
+  `recommendation_id` bigint(20) NULL DEFAULT NULL COMMENT '该期生成的推荐主记录ID',
+  `shard_index` int(11) NULL DEFAULT 0 COMMENT '完成该期的分片编号',
+  `completed_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`) USING BTREE,
+  UNIQUE INDEX `uq_run_model_period`(`run_tag` ASC, `model_name` ASC, `period_number` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '历史模拟断点记录表'
+"""
+
+# 模拟函数: (模型名, 期号在历史中的下标) -> 待落库的载荷 (失败时返回 None)
+SimulateFn = Callable[[str, int], Optional[Dict[str, Any]]]
+# 落库函数: (事务游标, 载荷) -> 推荐主记录ID
+PersistFn = Callable[[Any, Dict[str, Any]], Optional[int]]
+
+
+def shard_periods(items: Sequence[Any], shard_count: int = 1, shard_index: int = 0) -> List[Any]:
+    """
+    按步长切分期号列表。
+    越靠后的期号训练数据越多、耗时越长，交错切分能让各分片的工作量大致均衡。
+    """
+    if shard_count <= 1:
+        return list(items)
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"分片编号 {shard_index} 超出范围 [0, {shard_count})")
+    return list(items[shard_index::shard_count])
+
+
+def _reset_inherited_pool():
+    """工作进程初始化：丢弃从父进程继承的类级连接池，子进程首次创建 DatabaseManager 时重建自己的连接池。"""
+    DatabaseManager._connection_pool = None
+
+
+def run_sharded(worker: Callable[..., Dict[str, Any]], shard_count: int, *args: Any) -> List[Dict[str, Any]]:
+    """
+    在 shard_count 个进程中并行执行 worker(*args, shard_index, shard_count)。
+    worker 必须是模块级函数，并在子进程内自行创建 DatabaseManager。
+    DatabaseManager 的连接池是类属性，fork 出的子进程会继承父进程已建立的 MySQL 套接字，
+    多个进程共用同一套接字会互相打乱报文；因此使用 spawn 启动子进程，并在初始化时清空继承的连接池。
+    """
+    if shard_count <= 1:
+        return [worker(*args, 0, 1)]
+    with ProcessPoolExecutor(max_workers=shard_count, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_reset_inherited_pool) as executor:
+        futures = [executor.submit(worker, *args, index, shard_count) for index in range(shard_count)]
+        return [future.result() for future in futures]
+
+
+class SimulationCheckpointStore:
+    """simulation_checkpoints 表的读写封装。"""
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+
+    def ensure_table(self):
+        self.db.execute_update(CHECKPOINT_TABLE_DDL)
+
+    def completed_periods(self, run_tag: str, model_name: str) -> Set[str]:
+        rows = self.db.execute_query(
+            "SELECT period_number FROM simulation_checkpoints WHERE run_tag = %s AND model_name = %s",
+            (run_tag, model_name)
+        )
+        return {str(row['period_number']) for row in rows}
+
+    def mark_completed(self, cursor, run_tag: str, model_name: str, period_number: str,
+                       recommendation_id: Optional[int] = None, shard_index: int = 0):
+        """在调用方的事务内写入检查点，保证与业务数据一起提交。"""
+        cursor.execute(
+            "INSERT INTO simulation_checkpoints (run_tag, model_name, period_number, recommendation_id, shard_index) "
+            "VALUES (%s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE "
+            "recommendation_id = VALUES(recommendation_id), completed_at = CURRENT_TIMESTAMP",
+            (run_tag, model_name, period_number, recommendation_id, shard_index)
+        )
+
+    def clear(self, run_tag: Optional[str] = None):
+        if run_tag:
+            self.db.execute_update("DELETE FROM simulation_checkpoints WHERE run_tag = %s", (run_tag,))
+        else:
+            self.db.execute_update("TRUNCATE TABLE simulation_checkpoints;")
+
+
+class CheckpointedSimulationRunner:
+    """
+    断点续跑执行器。
+    只负责“跳过 / 分片 / 分批提交”，具体的模拟与落库逻辑由调用方通过回调注入。
+    """
+
+    def __init__(self, db_manager: DatabaseManager, run_tag: str, batch_size: int = 10,
+                 shard_index: int = 0, shard_count: int = 1):
+        self.db = db_manager
+        self.run_tag = run_tag
+        self.batch_size = max(1, batch_size)
+        self.shard_index = shard_index
+        self.shard_count = max(1, shard_count)
+        self.store = SimulationCheckpointStore(db_manager)
+        self.store.ensure_table()
+
+    def pending_indices(self, model_name: str, period_numbers: Sequence[str], start_index: int = 0) -> List[int]:
+        """返回本分片中尚未完成的期号下标 (下标指向 period_numbers)。"""
+        done = self.store.completed_periods(self.run_tag, model_name)
+        candidates = shard_periods(range(start_index, len(period_numbers)), self.shard_count, self.shard_index)
+        return [idx for idx in candidates if str(period_numbers[idx]) not in done]
+
+    def run(self, model_name: str, period_numbers: Sequence[str], simulate_fn: SimulateFn,
+            persist_fn: PersistFn, start_index: int = 0) -> Dict[str, Any]:
+        """
+        对一个模型执行模拟。
+        :param period_numbers: 完整历史的期号列表 (升序)。
+        :param start_index: 从哪个下标开始模拟 (之前的期号只作为训练数据)。
+        :return: 本次运行的统计信息。
+        """
+        pending = self.pending_indices(model_name, period_numbers, start_index)
+        total_in_shard = len(shard_periods(range(start_index, len(period_numbers)),
+                                           self.shard_count, self.shard_index))
+        stats = {'model_name': model_name, 'shard_index': self.shard_index,
+                 'skipped': total_in_shard - len(pending), 'completed': 0, 'failed': 0, 'elapsed': 0.0}
+        print(f"  - [断点] 模型 [{model_name}] 分片 {self.shard_index + 1}/{self.shard_count}: "
+              f"已完成 {stats['skipped']} 期，待模拟 {len(pending)} 期。")
+
+        started = time.perf_counter()
+        buffer: List[Dict[str, Any]] = []
+        for position, idx in enumerate(pending, 1):
+            period = str(period_numbers[idx])
+            print(f"\n--- 模拟进度 [{model_name}]: {position}/{len(pending)} (期号: {period}) ---")
+            try:
+                payload = simulate_fn(model_name, idx)
+            except Exception as e:
+                logging.error(f"模拟期号 {period} 失败: {e}")
+                payload = None
+            if payload is None:
+                stats['failed'] += 1
+                continue
+            buffer.append({'period_number': period, 'payload': payload})
+            if len(buffer) >= self.batch_size:
+                self._flush(model_name, buffer, persist_fn, stats)
+                buffer = []
+
+        if buffer:
+            self._flush(model_name, buffer, persist_fn, stats)
+        stats['elapsed'] = round(time.perf_counter() - started, 3)
+        return stats
+
+    def _flush(self, model_name: str, buffer: List[Dict[str, Any]], persist_fn: PersistFn,
+               stats: Dict[str, Any]):
+        """在一个事务中写入整批结果及其检查点；失败则整批回滚，下次重跑时重新模拟。"""
+        try:
+            with self.db.transaction() as cursor:
+                for item in buffer:
+                    recommendation_id = persist_fn(cursor, item['payload'])
+                    self.store.mark_completed(cursor, self.run_tag, model_name, item['period_number'],
+                                              recommendation_id, self.shard_index)
+            stats['completed'] += len(buffer)
+            print(f"  - 💾 [断点] 已提交 {len(buffer)} 期 (截至期号 {buffer[-1]['period_number']})。")
+        except Exception as e:
+            stats['failed'] += len(buffer)
+            print(f"  - ❌ [断点] 批次提交失败，已回滚 {len(buffer)} 期: {e}")
@@ -203,6 +203,14 @@ class SystemOrchestrator:
             for stats_data in stats_to_insert:
                 self.db.execute_insert('number_statistics', stats_data)
 
+            # 6. 同步重建号码对/三元组共现统计 (与 number_statistics 一同持久化)
+            from src.algorithms.advanced_algorithms.cooccurrence_store import CooccurrenceStore, PERSISTED_DECAY
+            from src.model.lottery_models import LotteryHistory
+            cooccurrence = CooccurrenceStore.from_history([LotteryHistory.from_dict(row) for row in all_history_raw],
+                                                          PERSISTED_DECAY)
+            if cooccurrence.save(self.db):
+                print(f"    - 已写入 {len(cooccurrence.to_rows())} 条号码共现统计记录。")
+
             print("  - ✅ [Orchestrator] 号码统计数据填充成功！")
 
         except Exception as e:
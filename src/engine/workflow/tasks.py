@@ -11,12 +11,14 @@ from typing import List, Dict, Any
 
 # --- 核心组件导入 ---
 from src.database.database_manager import DatabaseManager
+from src.database.blob_store import BlobStore
 from src.model.lottery_models import LotteryHistory
 from src.engine.imperial_senate import ImperialSenate
 from src.prompt_templates import build_final_mandate_prompt
 from src.llm.clients import get_llm_client
 from src.algorithms import AVAILABLE_ALGORITHMS
 from src.algorithms.dynamic_ensemble_optimizer import DynamicEnsembleOptimizer
+from src.algorithms.advanced_algorithms.monte_carlo_bankroll import portfolio_roi_summary
 from src.engine.recommendation_engine import RecommendationEngine
 
 
@@ -63,6 +65,12 @@ from src.engine.imperial_senate import ImperialSenate
 class PredictionTask(BaseTask):
     """任务3：执行核心预测工作流 (V4.1 - 最终清洁版)"""
 
+    def __init__(self, db_manager: DatabaseManager):
+        super().__init__(db_manager)
+        # analysis_basis / llm_cognitive_details 以压缩 blob 存储，同一期各模型共用一份
+        self.blobs = BlobStore(db_manager)
+        self.blobs.ensure_table()
+
     def run(self, context: dict) -> bool:
         # 这个方法已经确认是正确的，请确保您使用的是这个版本
         print("\n" + "=" * 70 + "\n=== 👑 [任务3/3] 执行: 最终预测 (The Final Mandate) ===\n" + "=" * 70)
@@ -142,11 +150,10 @@ class PredictionTask(BaseTask):
                 'algorithm_version': f"TheFinalMandate_{model_name}_V1.1",
                 'confidence_score': 0.9 if response_data.get('self_check', {}).get('e_hits_ok', False) else 0.7,
                 'risk_level': response_data.get('meta', {}).get('constraints', {}).get('risk_preference', '中性'),
-                'analysis_basis': json.dumps(model_outputs, ensure_ascii=False),
-                'llm_cognitive_details': json.dumps({'senate_edict': edict, 'quant_proposal': json.loads(quant_prop),
-                                                     'ml_briefing': json.loads(ml_brief),
-                                                     'final_memo': response_data.get('edict', {}).get('final_memo')},
-                                                    ensure_ascii=False),
+                'analysis_basis': self.blobs.put(model_outputs),
+                'llm_cognitive_details': self.blobs.put({'senate_edict': edict, 'quant_proposal': json.loads(quant_prop),
+                                                         'ml_briefing': json.loads(ml_brief),
+                                                         'final_memo': response_data.get('edict', {}).get('final_memo')}),
                 'models': model_name
             }
             recommendation_id = self.db.execute_insert('algorithm_recommendation', meta_data)
@@ -184,7 +191,7 @@ class PredictionTask(BaseTask):
                 "portfolio": json.dumps(portfolio, ensure_ascii=False),
                 "memo": final_edict.get('final_memo'),
                 "expected_hits_range": str(portfolio.get('overall_e_hits_range', 'N/A')),
-                "predicted_roi": portfolio.get('allocation_summary', ''),
+                "predicted_roi": portfolio_roi_summary(recommendations) or portfolio.get('allocation_summary', ''),
                 "self_check_details": json.dumps(response_data.get('self_check', {}), ensure_ascii=False)
             }
             self.db.execute_insert('prediction_outputs', output_data)
@@ -8,6 +8,7 @@ import os
 # 添加配置文件路径
 sys.path.append('E:/pyhton/AI/AICp/src/llm')
 from src.llm.config import MODEL_CONFIG
+from src.llm.history_snapshot import get_history_snapshot
 
 
 class DltAdvancedAnalyzer:
@@ -32,15 +33,10 @@ class DltAdvancedAnalyzer:
 
     def load_history_data(self):
         """
-        加载大乐透历史数据
+        加载大乐透历史数据（进程内共享快照，按期号升序）
         """
-        try:
-            with open('E:/pyhton/AI/AICp/src/analysis/dlt_history_data.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data
-        except Exception as e:
-            print(f"❌ 加载历史数据失败: {e}")
-            return []
+        self.snapshot = get_history_snapshot()
+        return self.snapshot.records
 
     def get_next_period_info(self):
         """
@@ -93,41 +89,13 @@ class DltAdvancedAnalyzer:
 
     def prepare_simple_data_summary(self):
         """
-        准备简单的数据摘要（不需要复杂计算）
+        准备简单的数据摘要（由共享快照计算并按版本缓存）
         """
         if not self.history_data:
             return None
 
         print("📊 准备数据摘要...")
-
-        recent_data = self.history_data[-100:]  # 使用最近100期
-
-        # 简单统计
-        front_counts = {}
-        back_counts = {}
-        sums = []
-
-        for item in recent_data:
-            for num in item['frontArea']:
-                front_counts[num] = front_counts.get(num, 0) + 1
-            for num in item['backArea']:
-                back_counts[num] = back_counts.get(num, 0) + 1
-            sums.append(item['frontArea_Sum'])
-
-        # 热门号码
-        front_hot = sorted(front_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        back_hot = sorted(back_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-
-        data_summary = {
-            "periods_analyzed": len(recent_data),
-            "date_range": f"{recent_data[0]['time']} 至 {recent_data[-1]['time']}",
-            "front_hot_numbers": [x[0] for x in front_hot],
-            "back_hot_numbers": [x[0] for x in back_hot],
-            "average_sum": sum(sums) / len(sums),
-            "recent_20_data": recent_data[-20:]  # 最近20期详细数据
-        }
-
-        return data_summary
+        return self.snapshot.summary(window=100, detail_periods=20)
 
     def call_gpt4o_advanced_analysis(self, prompt: str) -> dict:
         """
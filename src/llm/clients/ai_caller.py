@@ -4,6 +4,7 @@ from openai import OpenAI
 # from src.prompt_templates import b  # 用你的新函数；如果有build_lotto_pro_prompt，替换
 from src.llm.clients.openai_compatible import OpenAICompatibleClient
 from src.database.database_manager import DatabaseManager  # 绝对路径，兼容
+from src.llm.history_snapshot import get_history_snapshot
 from typing import List, Dict
 import re
 import json  # 加：JSON处理
@@ -106,7 +107,8 @@ if not db_manager.connect():
     exit(1)
 try:
     # 从数据库获取数据 (保持)
-    recent_draws = db_manager.get_latest_lottery_history(50)  # 获取最近50期开奖数据
+    snapshot = get_history_snapshot(db_manager)  # 共享历史快照 (期号不变时复用)
+    recent_draws = snapshot.to_lottery_history(50)  # 获取最近50期开奖数据
     print(f"获取到 {len(recent_draws)} 期历史数据")
     if recent_draws:
         print(f"最新期号: {recent_draws[0].period_number}")
@@ -114,7 +116,7 @@ try:
     user_bets = db_manager.get_user_bets('default', 20)  # 获取用户最近20笔投注记录
 
     # 获取下一期期号 (保持)
-    next_issue = db_manager.get_next_period_number()
+    next_issue = snapshot.next_period() if snapshot.version else db_manager.get_next_period_number()
     print(f"预测期号: {next_issue}")
 
     # 构建提示词 (修复：用新函数 + 参数匹配你的修改逻辑)
@@ -13,6 +13,7 @@ except ImportError:
     # 如果导入失败，尝试其他路径
     sys.path.append('E:/python/AI/AICp/src/llm')
     from src.llm.config import MODEL_CONFIG
+from src.llm.history_snapshot import get_history_snapshot
 
 
 class PromptBasedAdvancedPredictor:
@@ -40,60 +41,20 @@ class PromptBasedAdvancedPredictor:
 
     def load_history_data(self):
         """
-        加载大乐透历史数据
+        加载大乐透历史数据（进程内共享快照，按期号升序）
         """
-        try:
-            with open('E:/pyhton/AI/AICp/src/analysis/dlt_history_data.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data
-        except Exception as e:
-            print(f"❌ 加载历史数据失败: {e}")
-            # 尝试其他路径
-            try:
-                with open('E:/python/AI/AICp/src/analysis/dlt_history_data.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return data
-            except Exception as e2:
-                print(f"❌ 备用路径也失败: {e2}")
-                return []
+        self.snapshot = get_history_snapshot()
+        return self.snapshot.records
 
     def prepare_simple_data_summary(self):
         """
-        准备简单的数据摘要（不需要复杂计算）
+        准备简单的数据摘要（由共享快照计算并按版本缓存）
         """
         if not self.history_data:
             return None
 
         print("📊 准备数据摘要...")
-
-        recent_data = self.history_data[-100:]  # 使用最近100期
-
-        # 简单统计
-        front_counts = {}
-        back_counts = {}
-        sums = []
-
-        for item in recent_data:
-            for num in item['frontArea']:
-                front_counts[num] = front_counts.get(num, 0) + 1
-            for num in item['backArea']:
-                back_counts[num] = back_counts.get(num, 0) + 1
-            sums.append(item['frontArea_Sum'])
-
-        # 热门号码
-        front_hot = sorted(front_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        back_hot = sorted(back_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-
-        data_summary = {
-            "periods_analyzed": len(recent_data),
-            "date_range": f"{recent_data[0]['time']} 至 {recent_data[-1]['time']}",
-            "front_hot_numbers": [x[0] for x in front_hot],
-            "back_hot_numbers": [x[0] for x in back_hot],
-            "average_sum": sum(sums) / len(sums),
-            "recent_20_data": recent_data[-20:]  # 最近20期详细数据
-        }
-
-        return data_summary
+        return self.snapshot.summary(window=100, detail_periods=20)
 
     def call_advanced_prompt_analysis(self, prompt: str, max_retries: int = 3) -> Dict:
         """
@@ -576,11 +537,7 @@ E[收益] = ∑ 中奖概率 × 中奖金额 - 成本
         """获取下一期期号"""
         if not self.history_data:
             return "下一期"
-        latest_period = self.history_data[-1]['expect']
-        try:
-            return str(int(latest_period) + 1)
-        except:
-            return "下一期"
+        return self.snapshot.next_period()
 
     def display_algorithm_results(self, result: Dict, next_period: str):
         """
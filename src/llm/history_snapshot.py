@@ -0,0 +1,159 @@
+# 文件: src/llm/history_snapshot.py
+"""
+LLM 分析器共享的历史开奖快照。
+- 每个进程只解析一次数据源 (数据库 lottery_history 或本地 JSON)，以最新期号作为快照版本；
+- 再次获取时只做一次轻量的版本检查 (数据库 MAX(period_number)+COUNT(*) / 文件 mtime+大小)，
+  未变化则直接复用已解析的快照；
+- 数据摘要按 (窗口, 明细期数) 在快照内记忆化，4o.py、deepseek.py、ai_caller.py 共用同一份结果。
+记录统一为升序排列的精简字典: expect, time, frontArea, backArea, frontArea_Sum,
+frontArea_OddEven, frontArea_IsConsecutive, frontArea_Span。
+"""
+
+import json
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.analysis.bulk_importer import normalize_record
+from src.model.lottery_models import LotteryHistory
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_HISTORY_FILE = os.path.join(PROJECT_ROOT, 'src', 'analysis', 'dlt_history_data.json')
+
+
+def _make_record(period: str, time_str: str, front: List[int], back: List[int]) -> Dict[str, Any]:
+    front, back = sorted(int(n) for n in front), sorted(int(n) for n in back)
+    odd = sum(n % 2 for n in front)
+    return {
+        'expect': str(period),
+        'time': time_str,
+        'frontArea': front,
+        'backArea': back,
+        'frontArea_Sum': sum(front),
+        'frontArea_OddEven': f"{odd}:{len(front) - odd}",
+        'frontArea_IsConsecutive': any(b - a == 1 for a, b in zip(front, front[1:])),
+        'frontArea_Span': front[-1] - front[0],
+    }
+
+
+class HistorySnapshot:
+    """一份不可变的历史数据快照，records 按期号升序 (records[-1] 为最新一期)。"""
+
+    def __init__(self, records: List[Dict[str, Any]], source: str):
+        self.records = records
+        self.source = source
+        self.version = records[-1]['expect'] if records else ''
+        self._summaries: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def recent(self, num_periods: int) -> List[Dict[str, Any]]:
+        return self.records[-num_periods:] if num_periods > 0 else []
+
+    def next_period(self) -> str:
+        try:
+            return str(int(self.version) + 1)
+        except ValueError:
+            return "下一期"
+
+    def summary(self, window: int = 100, detail_periods: int = 20) -> Optional[Dict[str, Any]]:
+        """最近 window 期的热号、平均和值及最近 detail_periods 期明细 (同一快照内只计算一次)。"""
+        if not self.records:
+            return None
+        key = (window, detail_periods)
+        with self._lock:
+            if key not in self._summaries:
+                recent_data = self.recent(window)
+                front_counts = Counter(n for item in recent_data for n in item['frontArea'])
+                back_counts = Counter(n for item in recent_data for n in item['backArea'])
+                self._summaries[key] = {
+                    "periods_analyzed": len(recent_data),
+                    "date_range": f"{recent_data[0]['time']} 至 {recent_data[-1]['time']}",
+                    "front_hot_numbers": [n for n, _ in front_counts.most_common(10)],
+                    "back_hot_numbers": [n for n, _ in back_counts.most_common(5)],
+                    "average_sum": sum(item['frontArea_Sum'] for item in recent_data) / len(recent_data),
+                    "recent_20_data": recent_data[-detail_periods:],
+                    "snapshot_version": self.version
+                }
+            return self._summaries[key]
+
+    def to_lottery_history(self, limit: int = 50) -> List[LotteryHistory]:
+        """最近 limit 期转为 LotteryHistory (最新在前，与 get_latest_lottery_history 一致)。"""
+        return [LotteryHistory(period_number=item['expect'], draw_date=item['time'].split(' ')[0],
+                               draw_time=item['time'], front_area=list(item['frontArea']),
+                               back_area=list(item['backArea']), sum_value=item['frontArea_Sum'],
+                               span_value=item['frontArea_Span'], odd_even_ratio=item['frontArea_OddEven'])
+                for item in reversed(self.recent(limit))]
+
+
+# ----------------------------------------------------------------------
+# 进程级缓存: 数据源 -> (版本标记, 快照)
+# ----------------------------------------------------------------------
+_SNAPSHOTS: Dict[str, Tuple[Any, HistorySnapshot]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _load_file_records(path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"❌ 加载历史数据失败: {e}")
+        return []
+    items = data.get('data', []) if isinstance(data, dict) else data
+    records = {}
+    for item in items:
+        record = normalize_record(item)
+        if record:
+            records[record['period_number']] = _make_record(
+                record['period_number'], record['draw_time'], record['front'], record['back'])
+    return [records[period] for period in sorted(records)]
+
+
+def _load_db_records(db_manager) -> List[Dict[str, Any]]:
+    rows = db_manager.execute_query("""
+        SELECT period_number, draw_date, draw_time,
+               front_area_1, front_area_2, front_area_3, front_area_4, front_area_5,
+               back_area_1, back_area_2
+        FROM lottery_history ORDER BY period_number ASC
+    """)
+    return [_make_record(row['period_number'], str(row.get('draw_time') or row.get('draw_date') or ''),
+                         [row[f'front_area_{i}'] for i in range(1, 6)], [row['back_area_1'], row['back_area_2']])
+            for row in rows]
+
+
+def get_history_snapshot(db_manager=None, path: Optional[str] = None) -> HistorySnapshot:
+    """
+    获取共享快照。传入 db_manager 时从数据库加载，否则读取 path (默认 src/analysis/dlt_history_data.json)。
+    数据源未变化时返回同一个快照对象。
+    """
+    if db_manager is not None:
+        key = 'db'
+        latest = db_manager.fetch_one(
+            "SELECT MAX(period_number) AS latest, COUNT(*) AS total FROM lottery_history") or {}
+        marker = (latest['latest'], latest['total']) if latest.get('latest') else None
+    else:
+        key = os.path.abspath(path or DEFAULT_HISTORY_FILE)
+        try:
+            stat = os.stat(key)
+            marker = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            marker = None
+
+    with _CACHE_LOCK:
+        cached = _SNAPSHOTS.get(key)
+        if cached and cached[0] == marker and marker is not None:
+            return cached[1]
+        records = _load_db_records(db_manager) if db_manager is not None else _load_file_records(key)
+        snapshot = HistorySnapshot(records, 'database' if db_manager is not None else key)
+        _SNAPSHOTS[key] = (marker, snapshot)
+        print(f"📦 历史快照已加载: {len(snapshot)} 期，版本 {snapshot.version or '空'}")
+        return snapshot
+
+
+def clear_history_snapshots():
+    with _CACHE_LOCK:
+        _SNAPSHOTS.clear()
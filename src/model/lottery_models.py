@@ -229,7 +229,8 @@ class PersonalBetting:
                  bet_amount: float = None, multiple: int = None,
                  is_winning: bool = None, winning_level: str = None,
                  winning_amount: float = None, strategy_type: str = None,
-                 confidence_level: int = None, analysis_notes: str = None):
+                 confidence_level: int = None, analysis_notes: str = None,
+                 is_additional: bool = False):
         self.id = id
         self.user_id = user_id
         self.period_number = period_number
@@ -247,6 +248,7 @@ class PersonalBetting:
         self.strategy_type = strategy_type
         self.confidence_level = confidence_level
         self.analysis_notes = analysis_notes
+        self.is_additional = is_additional
 
 class RewardPenaltyRecord:
     """奖罚记录实体类"""
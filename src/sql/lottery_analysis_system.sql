@@ -119,6 +119,48 @@ INSERT INTO `algorithm_performance` VALUES (10, '2025124', 'bayesian_number_pred
 INSERT INTO `algorithm_performance` VALUES (11, '2025124', 'markov_transition_model', 'markov_transition_model_1.0', '2025124', '{\"algorithm\": \"markov_transition_model\", \"version\": \"1.0\", \"recommendations\": [{\"front_numbers\": [2, 8, 12, 14, 16], \"back_numbers\": [1, 2]}], \"analysis\": {\"transition_top\": [[14, 0.32222222222222224], [2, 0.25], [12, 0.22500000000000003], [8, 0.2222222222222222], [16, 0.20833333333333334], [5, 0.20833333333333334], [19, 0.20833333333333334], [34, 0.20555555555555555], [18, 0.20277777777777778], [32, 0.18611111111111112]]}}', 0.5, 0, 0, 0, '2025-10-31 17:30:19', '2025-10-31 17:30:19');
 INSERT INTO `algorithm_performance` VALUES (12, '2025124', 'number_graph_analyzer', 'number_graph_analyzer_1.0', '2025124', '{\"algorithm\": \"number_graph_analyzer\", \"version\": \"1.0\", \"recommendations\": [{\"front_numbers\": [2, 4, 5, 9, 10], \"back_numbers\": [1, 2]}], \"analysis\": {\"pagerank_top\": [[2, 0.06030865432764288], [5, 0.05521237779733857], [9, 0.053244303843265735], [10, 0.051329470656757685], [4, 0.04758140127652313], [8, 0.045019914988134506], [12, 0.044972313872974526], [1, 0.04113586752078996], [6, 0.040120169451456064], [3, 0.03808150077109659]]}}', 0.5, 0, 0, 0, '2025-10-31 17:30:19', '2025-10-31 17:30:19');
 
+-- ----------------------------
+-- Table structure for algorithm_performance_summary
+-- ----------------------------
+DROP TABLE IF EXISTS `algorithm_performance_summary`;
+CREATE TABLE `algorithm_performance_summary` (
+  `algorithm_version` varchar(100) NOT NULL COMMENT '算法版本',
+  `window_size` int(11) NOT NULL DEFAULT 20 COMMENT '滚动窗口期数 N',
+  `ewma_alpha` double NOT NULL DEFAULT 0.3 COMMENT 'EWMA 平滑系数',
+  `periods_evaluated` int(11) NOT NULL DEFAULT 0 COMMENT '累计评估期数',
+  `last_period` varchar(20) NULL DEFAULT NULL COMMENT '最近评估的期号',
+  `ewma_score` double NOT NULL DEFAULT 0 COMMENT '得分 EWMA',
+  `ewma_hit_rate` double NOT NULL DEFAULT 0 COMMENT '命中率 EWMA',
+  `window_count` int(11) NOT NULL DEFAULT 0 COMMENT '窗口内有效期数',
+  `window_sum` double NOT NULL DEFAULT 0 COMMENT '窗口内得分和',
+  `window_sq_sum` double NOT NULL DEFAULT 0 COMMENT '窗口内得分平方和',
+  `evicted_score` double NOT NULL DEFAULT 0 COMMENT '最近一次滑出窗口的得分',
+  `total_score` double NOT NULL DEFAULT 0 COMMENT '累计得分',
+  `total_front_hits` int(11) NOT NULL DEFAULT 0 COMMENT '累计前区命中数',
+  `total_back_hits` int(11) NOT NULL DEFAULT 0 COMMENT '累计后区命中数',
+  `front_hits_0` int(11) NOT NULL DEFAULT 0, `front_hits_1` int(11) NOT NULL DEFAULT 0,
+  `front_hits_2` int(11) NOT NULL DEFAULT 0, `front_hits_3` int(11) NOT NULL DEFAULT 0,
+  `front_hits_4` int(11) NOT NULL DEFAULT 0, `front_hits_5` int(11) NOT NULL DEFAULT 0,
+  `back_hits_0` int(11) NOT NULL DEFAULT 0, `back_hits_1` int(11) NOT NULL DEFAULT 0,
+  `back_hits_2` int(11) NOT NULL DEFAULT 0,
+  `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`algorithm_version`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '算法滚动性能汇总表' ROW_FORMAT = DYNAMIC;
+
+-- ----------------------------
+-- Table structure for algorithm_performance_window
+-- ----------------------------
+DROP TABLE IF EXISTS `algorithm_performance_window`;
+CREATE TABLE `algorithm_performance_window` (
+  `algorithm_version` varchar(100) NOT NULL COMMENT '算法版本',
+  `slot` int(11) NOT NULL COMMENT '环形缓冲区位置 = 期序号 mod N',
+  `period_number` varchar(20) NOT NULL COMMENT '该位置当前保存的期号',
+  `score` double NOT NULL DEFAULT 0,
+  `front_hits` tinyint(4) NOT NULL DEFAULT 0,
+  `back_hits` tinyint(4) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`algorithm_version`, `slot`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '算法最近N期得分环形缓冲区' ROW_FORMAT = DYNAMIC;
+
 -- ----------------------------
 -- Table structure for algorithm_prediction_logs
 -- ----------------------------
@@ -480,6 +522,23 @@ CREATE TABLE `notifications`  (
 INSERT INTO `notifications` VALUES (1, 'system', 'system', '系统初始化完成', '彩票分析系统已完成基础数据初始化，可以开始使用。', 'system', 1, 0, 0, NULL, '2025-10-31 17:30:19');
 INSERT INTO `notifications` VALUES (2, 'admin', 'system', '欢迎使用彩票分析系统', '系统已准备就绪，请开始您的分析之旅。', 'system', 1, 0, 0, NULL, '2025-10-31 17:30:19');
 
+-- ----------------------------
+-- Table structure for number_cooccurrence
+-- ----------------------------
+DROP TABLE IF EXISTS `number_cooccurrence`;
+CREATE TABLE `number_cooccurrence`  (
+  `decay` decimal(6, 4) NOT NULL DEFAULT 1.0000 COMMENT '指数衰减系数 (1 表示不衰减)',
+  `number_type` enum('front','back') CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '号码类型',
+  `number_a` tinyint(4) NOT NULL COMMENT '号码A (0 表示元数据行)',
+  `number_b` tinyint(4) NOT NULL DEFAULT 0 COMMENT '号码B (0 表示单号计数)',
+  `number_c` tinyint(4) NOT NULL DEFAULT 0 COMMENT '号码C (0 表示号码对)',
+  `weight` double NOT NULL DEFAULT 0 COMMENT '(衰减后的) 共现权重',
+  `draw_count` int(11) NOT NULL DEFAULT 0 COMMENT '元数据行: 已计入的开奖期数',
+  `last_period` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL DEFAULT NULL COMMENT '元数据行: 最后计入的期号',
+  `last_updated` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`decay`, `number_type`, `number_a`, `number_b`, `number_c`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '号码对/三元组共现统计表' ROW_FORMAT = DYNAMIC;
+
 -- ----------------------------
 -- Table structure for number_statistics
 -- ----------------------------
@@ -559,6 +618,7 @@ CREATE TABLE `personal_betting`  (
   `back_count` tinyint(4) NOT NULL COMMENT '后区号码数量',
   `bet_amount` decimal(10, 2) NOT NULL COMMENT '投注金额',
   `multiple` tinyint(4) NULL DEFAULT 1 COMMENT '投注倍数',
+  `is_additional` tinyint(1) NULL DEFAULT 0 COMMENT '是否追加投注',
   `is_winning` tinyint(1) NULL DEFAULT 0 COMMENT '是否中奖',
   `winning_level` varchar(50) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL DEFAULT NULL COMMENT '中奖等级',
   `winning_amount` decimal(12, 2) NULL DEFAULT 0.00 COMMENT '中奖金额',
@@ -567,7 +627,8 @@ CREATE TABLE `personal_betting`  (
   `analysis_notes` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL COMMENT '投注分析笔记',
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-  PRIMARY KEY (`id`) USING BTREE
+  PRIMARY KEY (`id`) USING BTREE,
+  INDEX `idx_period_settlement`(`period_number` ASC, `winning_level` ASC) USING BTREE
 ) ENGINE = InnoDB AUTO_INCREMENT = 3 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '个人自由投注记录表' ROW_FORMAT = DYNAMIC;
 
 -- ----------------------------
@@ -777,6 +838,26 @@ CREATE TABLE `reward_penalty_records`  (
 -- ----------------------------
 INSERT INTO `reward_penalty_records` VALUES (1, '2024100', 'FrequencyAnalysisAlgorithm_1.0', 1, 3, 1, 75.00, 25.00, 0.00, 25.00, '{\"back_hits\": [8], \"front_hits\": [5, 12, 23]}', '{\"back_missed\": [3], \"front_missed\": [7, 18]}', 4, 0.1500, '建议结合热冷号分析提高前区命中率', '2025-10-31 17:30:19');
 
+-- ----------------------------
+-- Table structure for simulation_checkpoints
+-- ----------------------------
+DROP TABLE IF EXISTS `simulation_checkpoints`;
+CREATE TABLE `simulation_checkpoints`  (
+  `id` bigint(20) NOT NULL AUTO_INCREMENT,
+  `run_tag` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '模拟任务标识，如 full_historical_simulation',
+  `model_name` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '被模拟的LLM模型',
+  `period_number` varchar(20) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '已完成的期号',
+  `recommendation_id` bigint(20) NULL DEFAULT NULL COMMENT '该期生成的推荐主记录ID',
+  `shard_index` int(11) NULL DEFAULT 0 COMMENT '完成该期的分片编号',
+  `completed_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`) USING BTREE,
+  UNIQUE INDEX `uq_run_model_period`(`run_tag` ASC, `model_name` ASC, `period_number` ASC) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci COMMENT = '历史模拟断点记录表' ROW_FORMAT = DYNAMIC;
+
+-- ----------------------------
+-- Records of simulation_checkpoints
+-- ----------------------------
+
 -- ----------------------------
 -- Table structure for system_logs
 -- ----------------------------
@@ -0,0 +1,70 @@
+# 文件: src/utils/bitmask.py
+"""
+号码位掩码工具。
+前区 1-35 映射到第 0-34 位，后区 1-12 映射到第 0-11 位，统一用 uint64 存储，
+两组号码的交集数量 = popcount(mask_a & mask_b)。
+"""
+
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+FRONT_RANGE = 35
+BACK_RANGE = 12
+
+# 8 位查表，用于不支持 np.bitwise_count 的 NumPy 版本 (< 2.0)
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def numbers_to_mask(numbers: Iterable[int]) -> int:
+    """号码列表 -> 位掩码 (号码 n 对应第 n-1 位)。"""
+    mask = 0
+    for num in numbers:
+        if num is not None:
+            mask |= 1 << (int(num) - 1)
+    return mask
+
+
+def mask_to_numbers(mask: int) -> List[int]:
+    """位掩码 -> 升序号码列表。"""
+    mask = int(mask)
+    numbers = []
+    while mask:
+        low = mask & -mask
+        numbers.append(low.bit_length())
+        mask ^= low
+    return numbers
+
+
+def popcount(mask: int) -> int:
+    return bin(int(mask)).count('1')
+
+
+def popcount64(masks: np.ndarray) -> np.ndarray:
+    """对 uint64 数组逐元素求置位数量，返回同形状的整型数组。"""
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks).astype(np.int64)
+    as_bytes = masks.view(np.uint8).reshape(masks.shape + (8,))
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def masks_to_bits(masks: np.ndarray, width: int) -> np.ndarray:
+    """(N,) 位掩码 -> (N, width) 布尔矩阵，第 j 列表示号码 j+1。"""
+    shifts = np.arange(width, dtype=np.uint64)
+    return ((np.asarray(masks, dtype=np.uint64)[:, None] >> shifts) & np.uint64(1)).astype(bool)
+
+
+def bits_to_masks(bits: np.ndarray) -> np.ndarray:
+    """(N, width) 布尔矩阵 -> (N,) uint64 位掩码。"""
+    weights = np.left_shift(np.uint64(1), np.arange(bits.shape[1], dtype=np.uint64))
+    return (bits.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+
+
+def history_to_masks(history_data: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """LotteryHistory 列表 -> (前区掩码数组, 后区掩码数组)，顺序与输入一致。"""
+    front = np.fromiter((numbers_to_mask(rec.front_area) for rec in history_data),
+                        dtype=np.uint64, count=len(history_data))
+    back = np.fromiter((numbers_to_mask(rec.back_area) for rec in history_data),
+                       dtype=np.uint64, count=len(history_data))
+    return front, back
@@ -2,6 +2,7 @@
 import streamlit as st
 from functools import wraps
 from src.database.database_manager import DatabaseManager
+from src.database.migrations import MigrationRunner
 
 # --- 1. 标准化的数据库连接管理器 ---
 # 使用 @st.cache_resource 确保在整个用户会话中，数据库连接只被创建一次。
@@ -22,6 +23,11 @@ def get_db_manager():
         )
         if db_manager.connect():
             print("Database connection successful.") # 在后台终端打印日志，便于调试
+            # 补齐已部署库中缺少的列与索引 (如 personal_betting.is_additional)，已执行的版本会跳过
+            try:
+                MigrationRunner(db_manager).apply_all()
+            except Exception as e:
+                print(f"⚠️ 表结构迁移失败: {e}")
             return db_manager
         else:
             st.error("数据库连接失败！应用无法启动。")
@@ -1,10 +1,14 @@
 # src/utils/log_predictor.py
 import json
+import os
 from functools import wraps
 from datetime import datetime
 from src.database.database_manager import DatabaseManager
 from src.config.database_config import DB_CONFIG
 
+# 设置该环境变量 (如基准测试、离线回测) 时跳过数据库写入，只返回预测结果
+DISABLE_ENV_VAR = "LOTTERY_DISABLE_PREDICTION_LOG"
+
 
 def log_prediction(func):
     """
@@ -19,7 +23,7 @@ def log_prediction(func):
         prediction_result = func(self, history_data, *args, **kwargs)
 
         # 2. If the prediction was successful, log it
-        if prediction_result and 'error' not in prediction_result:
+        if prediction_result and 'error' not in prediction_result and not os.environ.get(DISABLE_ENV_VAR):
             try:
                 # Determine the next period for the log entry
                 next_period = "UNKNOWN"
@@ -0,0 +1,88 @@
+# 文件: src/utils/prize_rules.py
+"""
+大乐透官方奖级规则 (单注 2 元，追加投注每注另加 1 元)。
+- 一、二等奖为浮动奖金，这里使用可配置的估算值；追加投注时一、二等奖额外获得基本奖金的 80%。
+- 三至九等奖为固定奖金，追加投注不增加奖金。
+PRIZE_LEVEL_MATRIX / PRIZE_AMOUNT_MATRIX 以 [前区命中数, 后区命中数] 为下标，可直接用于向量化查表。
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+TICKET_PRICE = 2.0
+ADDITIONAL_TICKET_PRICE = 1.0
+
+# 浮动奖金估算值 (元)
+ESTIMATED_FLOATING_PRIZES = {1: 10_000_000.0, 2: 200_000.0}
+
+# (前区命中, 后区命中) -> 奖级
+PRIZE_LEVELS: Dict[Tuple[int, int], int] = {
+    (5, 2): 1,
+    (5, 1): 2,
+    (5, 0): 3,
+    (4, 2): 4,
+    (4, 1): 5,
+    (3, 2): 6,
+    (4, 0): 7,
+    (3, 1): 8, (2, 2): 8,
+    (3, 0): 9, (1, 2): 9, (2, 1): 9, (0, 2): 9,
+}
+
+# 奖级 -> 单注基本奖金 (元)
+BASE_PRIZES: Dict[int, float] = {
+    1: ESTIMATED_FLOATING_PRIZES[1],
+    2: ESTIMATED_FLOATING_PRIZES[2],
+    3: 10_000.0,
+    4: 3_000.0,
+    5: 300.0,
+    6: 200.0,
+    7: 100.0,
+    8: 15.0,
+    9: 5.0,
+}
+
+# 追加投注的额外奖金比例 (仅一、二等奖)
+ADDITIONAL_PRIZE_RATIO: Dict[int, float] = {1: 0.8, 2: 0.8}
+
+LEVEL_NAMES = {0: '未中奖', 1: '一等奖', 2: '二等奖', 3: '三等奖', 4: '四等奖', 5: '五等奖',
+               6: '六等奖', 7: '七等奖', 8: '八等奖', 9: '九等奖'}
+
+
+def _build_matrices(base_prizes: Dict[int, float]):
+    levels = np.zeros((6, 3), dtype=np.int8)
+    amounts = np.zeros((6, 3), dtype=np.float64)
+    additional = np.zeros((6, 3), dtype=np.float64)
+    for (front_hits, back_hits), level in PRIZE_LEVELS.items():
+        levels[front_hits, back_hits] = level
+        amounts[front_hits, back_hits] = base_prizes[level]
+        additional[front_hits, back_hits] = base_prizes[level] * ADDITIONAL_PRIZE_RATIO.get(level, 0.0)
+    return levels, amounts, additional
+
+
+PRIZE_LEVEL_MATRIX, PRIZE_AMOUNT_MATRIX, ADDITIONAL_AMOUNT_MATRIX = _build_matrices(BASE_PRIZES)
+
+
+def prize_matrices(floating_prizes: Dict[int, float] = None):
+    """按给定的浮动奖金估算值生成 (奖级矩阵, 基本奖金矩阵, 追加奖金矩阵)。"""
+    if not floating_prizes:
+        return PRIZE_LEVEL_MATRIX, PRIZE_AMOUNT_MATRIX, ADDITIONAL_AMOUNT_MATRIX
+    return _build_matrices({**BASE_PRIZES, **floating_prizes})
+
+
+def prize_level(front_hits: int, back_hits: int) -> int:
+    """返回奖级 (0 表示未中奖)。"""
+    return PRIZE_LEVELS.get((int(front_hits), int(back_hits)), 0)
+
+
+def prize_amount(front_hits: int, back_hits: int, is_additional: bool = False) -> float:
+    """单注奖金 (元)。"""
+    amount = float(PRIZE_AMOUNT_MATRIX[front_hits, back_hits])
+    if is_additional:
+        amount += float(ADDITIONAL_AMOUNT_MATRIX[front_hits, back_hits])
+    return amount
+
+
+def ticket_cost(tickets: int = 1, multiple: int = 1, is_additional: bool = False) -> float:
+    price = TICKET_PRICE + (ADDITIONAL_TICKET_PRICE if is_additional else 0.0)
+    return price * tickets * multiple
@@ -0,0 +1,205 @@
+# 文件: src/utils/ticket_set.py
+"""
+投注集合引擎。
+每个投注 (单式 / 复式 / 胆拖) 按区域编码为两组位掩码 (见 src.utils.bitmask):
+- span: 该区所有可能出现的号码 (胆码 ∪ 拖码)；
+- core: 该区每一注都必然包含的号码 (胆码；拖码恰好够数时等于 span)。
+该区展开的单式号码 = span 中包含 core 的全部 k 元子集 (前区 k=5，后区 k=2)。
+因此投注 A 的全部单式注 ⊆ 投注 B 的全部单式注，当且仅当两个区都满足
+span(A) ⊆ span(B) 且 core(B) ⊆ core(A)，用按位与即可判断。
+普通组合 (core 为空) 就退化为 (front_mask, back_mask) 的子集判断。
+"""
+
+from itertools import combinations
+from math import comb
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.bitmask import FRONT_RANGE, BACK_RANGE, numbers_to_mask, mask_to_numbers, popcount
+from src.utils.prize_rules import ticket_cost
+
+FRONT_PICK = 5
+BACK_PICK = 2
+
+
+def _parse_numbers(value: Any) -> List[int]:
+    """兼容 [1, 2]、'1,2'、'01 02' 等格式。"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.replace(' ', ',').split(',')
+    return sorted({int(n) for n in value if str(n).strip()})
+
+
+def _area_key(dan_mask: int, tuo_mask: int, pick: int) -> Optional[Tuple[int, int]]:
+    """单区 (胆码, 拖码) -> 规范化的 (span, core)；号码数不足 pick 时返回 None。"""
+    tuo_mask &= ~dan_mask
+    dan_count, tuo_count = popcount(dan_mask), popcount(tuo_mask)
+    need = pick - dan_count
+    if need < 0 or tuo_count < need:
+        return None
+    span = dan_mask | tuo_mask
+    core = span if tuo_count == need else dan_mask
+    return span, core
+
+
+def _area_singles(span: int, core: int, pick: int) -> Iterator[int]:
+    rest = mask_to_numbers(span & ~core)
+    for chosen in combinations(rest, pick - popcount(core)):
+        yield core | numbers_to_mask(chosen)
+
+
+def _area_count(span: int, core: int, pick: int) -> int:
+    return comb(popcount(span & ~core), pick - popcount(core))
+
+
+def bet_key(front: Any, back: Any) -> Optional[Tuple[int, int, int, int]]:
+    """
+    投注号码 -> (front_span, front_core, back_span, back_core)；号码无效或不足时返回 None。
+    号码可以是列表或逗号分隔字符串；胆拖以 {'dan': [...], 'tuo': [...]} 形式给出。
+    """
+    try:
+        front = front if isinstance(front, dict) else {'tuo': front}
+        back = back if isinstance(back, dict) else {'tuo': back}
+        front_key = _area_key(numbers_to_mask(_parse_numbers(front.get('dan'))),
+                              numbers_to_mask(_parse_numbers(front.get('tuo'))), FRONT_PICK)
+        back_key = _area_key(numbers_to_mask(_parse_numbers(back.get('dan'))),
+                             numbers_to_mask(_parse_numbers(back.get('tuo'))), BACK_PICK)
+    except (TypeError, ValueError, AttributeError):
+        return None
+    if front_key is None or back_key is None:
+        return None
+    return front_key + back_key
+
+
+def expand_bet_masks(bet: Tuple[int, int, int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """投注 -> 全部单式注的 (前区掩码数组, 后区掩码数组)，两数组等长一一对应。"""
+    front = np.fromiter(_area_singles(bet[0], bet[1], FRONT_PICK), dtype=np.uint64)
+    back = np.fromiter(_area_singles(bet[2], bet[3], BACK_PICK), dtype=np.uint64)
+    return np.repeat(front, len(back)), np.tile(back, len(front))
+
+
+class TicketSet:
+    """
+    投注集合：去重、剔除被其他投注完全覆盖的投注、惰性展开为单式注、计算成本与覆盖。
+    内部每个投注是 (front_span, front_core, back_span, back_core) 四元组，重复投注在加入时即被合并。
+    """
+
+    def __init__(self):
+        self._bets: Dict[Tuple[int, int, int, int], None] = {}  # 用 dict 保持加入顺序
+
+    def __len__(self) -> int:
+        return len(self._bets)
+
+    # ------------------------------------------------------------------
+    # 加入投注
+    # ------------------------------------------------------------------
+    def add_dantuo(self, front_dan: Iterable[int], front_tuo: Iterable[int],
+                   back_dan: Iterable[int] = (), back_tuo: Iterable[int] = ()) -> bool:
+        """加入胆拖投注 (单式/复式即胆码为空的特例)；号码不足时返回 False。"""
+        front = _area_key(numbers_to_mask(front_dan), numbers_to_mask(front_tuo), FRONT_PICK)
+        back = _area_key(numbers_to_mask(back_dan), numbers_to_mask(back_tuo), BACK_PICK)
+        if front is None or back is None:
+            return False
+        self._bets[front + back] = None
+        return True
+
+    def add(self, front_numbers: Iterable[int], back_numbers: Iterable[int]) -> bool:
+        """加入单式或复式投注。"""
+        return self.add_dantuo((), front_numbers, (), back_numbers)
+
+    @classmethod
+    def from_combos(cls, combo_list: Iterable[Dict[str, Any]]) -> 'TicketSet':
+        """
+        由推荐组合列表构造，每项为 {front_numbers, back_numbers}
+        (号码可以是列表或逗号分隔字符串)；胆拖以 {'dan': [...], 'tuo': [...]} 形式给出。
+        """
+        ticket_set = cls()
+        for combo in combo_list:
+            bet = bet_key(combo.get('front_numbers'), combo.get('back_numbers'))
+            if bet is not None:
+                ticket_set._bets[bet] = None
+        return ticket_set
+
+    # ------------------------------------------------------------------
+    # 去除被覆盖的投注
+    # ------------------------------------------------------------------
+    def remove_dominated(self) -> 'TicketSet':
+        """
+        剔除单式注集合被其他投注完全包含的投注，返回新的 TicketSet。
+        按单式注数 (其次号码数) 从大到小扫描：能包含当前投注的投注注数一定更多，早已处理过；
+        且包含关系可传递，只需与已保留的投注比较，每次比较是一次向量化的按位与。
+        """
+        bets = sorted(self._bets, key=lambda b: (self._count(b), popcount(b[0]) + popcount(b[2])), reverse=True)
+        kept = np.zeros((len(bets), 4), dtype=np.uint64)
+        n_kept = 0
+        result = TicketSet()
+        for bet in bets:
+            fs, fc, bs, bc = (np.uint64(v) for v in bet)
+            k = kept[:n_kept]
+            covered = ((fs & ~k[:, 0]) == 0) & ((k[:, 1] & ~fc) == 0) & \
+                      ((bs & ~k[:, 2]) == 0) & ((k[:, 3] & ~bc) == 0)
+            if not covered.any():
+                kept[n_kept] = bet
+                n_kept += 1
+                result._bets[bet] = None
+        return result
+
+    # ------------------------------------------------------------------
+    # 展开、成本与覆盖
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _count(bet: Tuple[int, int, int, int]) -> int:
+        return _area_count(bet[0], bet[1], FRONT_PICK) * _area_count(bet[2], bet[3], BACK_PICK)
+
+    def ticket_count(self) -> int:
+        """按投注逐个购买时的总注数 (不同投注重叠的单式注会重复计算)。"""
+        return sum(self._count(bet) for bet in self._bets)
+
+    def total_cost(self, multiple: int = 1, is_additional: bool = False) -> float:
+        return ticket_cost(self.ticket_count(), multiple, is_additional)
+
+    def iter_singles(self, unique: bool = True) -> Iterator[Tuple[int, int]]:
+        """惰性展开为单式注 (front_mask, back_mask)；unique=True 时跳过重叠的单式注。"""
+        seen = set()
+        for fs, fc, bs, bc in self._bets:
+            back_singles = list(_area_singles(bs, bc, BACK_PICK))
+            for front in _area_singles(fs, fc, FRONT_PICK):
+                for back in back_singles:
+                    if unique:
+                        if (front, back) in seen:
+                            continue
+                        seen.add((front, back))
+                    yield front, back
+
+    def coverage(self) -> Dict[str, Any]:
+        """并集覆盖：不重复单式注数、重叠注数，以及覆盖到的前后区号码。"""
+        front_union = back_union = 0
+        for fs, _, bs, _ in self._bets:
+            front_union |= fs
+            back_union |= bs
+        unique_tickets = sum(1 for _ in self.iter_singles(unique=True))
+        total = self.ticket_count()
+        return {
+            'bets': len(self._bets),
+            'total_tickets': total,
+            'unique_tickets': unique_tickets,
+            'overlapping_tickets': total - unique_tickets,
+            'front_numbers': mask_to_numbers(front_union),
+            'back_numbers': mask_to_numbers(back_union),
+            'front_coverage': popcount(front_union) / FRONT_RANGE,
+            'back_coverage': popcount(back_union) / BACK_RANGE,
+        }
+
+    def to_combos(self) -> List[Dict[str, Any]]:
+        """输出 [{front, back}]；含胆码的投注额外给出 front_dan / back_dan。"""
+        combos = []
+        for fs, fc, bs, bc in self._bets:
+            combo = {'front': mask_to_numbers(fs), 'back': mask_to_numbers(bs)}
+            if fc and fc != fs:
+                combo['front_dan'] = mask_to_numbers(fc)
+            if bc and bc != bs:
+                combo['back_dan'] = mask_to_numbers(bc)
+            combos.append(combo)
+        return combos